@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Campaign State Store for Skyrim TTRPG
+
+Shared load/save for state/campaign_state.json with an optional
+transaction that spans several managers:
+
+    with campaign_state_transaction("state/campaign_state.json") as state:
+        story_manager.advance_questline("main", "battle_of_whiterun", "completed")
+        npc_manager.update_loyalty("lydia", 5, "Held the gate")
+        events = whiterun_location_triggers("whiterun_gate", state)
+
+Inside a transaction every load_state() for the same file returns the same
+live dict and save_state() only marks it for writing, so StoryManager,
+NPCManager, GMTools, first_impression and the trigger modules all work on
+one copy. The file is written once when the outermost block exits, and not
+at all if nothing changed. If the block raises, the live dict is restored
+to what it was on entry and nothing is written.
+
+Transactions nest: an inner block joins the outer one, and an exception in
+the inner block only undoes the inner block's changes.
+
+Outside a transaction, load_state()/save_state() read and write the file
+directly, as before.
+
+Journal mode
+------------
+When state/campaign_state.journal.jsonl exists (see enable_journal()),
+saves append one JSON-patch (RFC 6902) line with just the changes instead
+of rewriting the whole file. load_state() rebuilds the state from the
+snapshot (campaign_state.json) plus the journal tail. Once the journal
+holds COMPACT_ENTRIES entries or COMPACT_BYTES bytes it is folded into a
+fresh snapshot and restarted.
+
+The journal's header line records the snapshot it applies to. If the
+snapshot is replaced by something else (a manual edit, git checkout, or a
+tool writing the file directly), the journal no longer matches and is
+ignored, so the snapshot on disk always wins.
+
+To keep a journaled save proportional to the change, a private copy of
+the last persisted state is kept per file, together with the snapshot and
+journal mtime/size. A save diffs against that copy (re-reading the files
+only if they changed behind its back) and then patches the copy with the
+same operations it appended. The whole state is serialized only when a
+full snapshot is written.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+# Compact the journal into a new snapshot past either threshold
+COMPACT_ENTRIES = 200
+COMPACT_BYTES = 256 * 1024
+
+_LOCAL = threading.local()
+_PERSISTED = {}
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _key(path):
+    return str(Path(path).resolve())
+
+
+def _sessions():
+    sessions = getattr(_LOCAL, "sessions", None)
+    if sessions is None:
+        sessions = _LOCAL.sessions = {}
+    return sessions
+
+
+def _path_lock(key):
+    with _PATH_LOCKS_GUARD:
+        lock = _PATH_LOCKS.get(key)
+        if lock is None:
+            lock = _PATH_LOCKS[key] = threading.RLock()
+        return lock
+
+
+def _decode(raw):
+    """Unicode-tolerant JSON decode (UTF-8 variants first, then fallbacks)."""
+    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
+        try:
+            return json.loads(raw.decode(enc))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            continue
+    return json.loads(raw.decode("latin-1", errors="replace"))
+
+
+def _serialize(state):
+    return json.dumps(state, indent=2)
+
+
+def _json_copy(state):
+    """Deep copy of a JSON document (faster than copy.deepcopy)."""
+    return json.loads(json.dumps(state))
+
+
+def _write_atomic(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _replace_contents(live, new):
+    """Make live equal to new without changing its identity."""
+    live.clear()
+    live.update(new)
+
+
+# ----------------------------------------------------------------------
+# JSON patch
+# ----------------------------------------------------------------------
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+_MISSING = object()
+
+
+def _same(a, b):
+    return type(a) is type(b) and a == b
+
+
+def diff_state(old, new, path=""):
+    """
+    JSON-patch operations that turn old into new.
+
+    Dicts are diffed key by key, lists that only grew get 'add' operations
+    for the new tail, and anything else is replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        if old.keys() - new.keys():
+            for key in old:
+                if key not in new:
+                    ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        get = old.get
+        for key, value in new.items():
+            previous = get(key, _MISSING)
+            # Unchanged scalars are the common case in big flag dicts
+            if previous is value:
+                continue
+            if previous is _MISSING:
+                ops.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": value})
+            elif type(previous) is not type(value) or type(value) in (dict, list) or previous != value:
+                ops.extend(diff_state(previous, value, f"{path}/{_escape(key)}"))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        if old == new and all(_same(a, b) for a, b in zip(old, new)):
+            return []
+        n = len(old)
+        if len(new) > n and all(_same(a, b) for a, b in zip(old, new[:n])):
+            return [{"op": "add", "path": f"{path}/{i}", "value": new[i]} for i in range(n, len(new))]
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if _same(old, new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(state, ops):
+    """
+    Apply JSON-patch add/remove/replace operations in place.
+
+    Returns:
+        The patched document (a new object only if the root was replaced)
+    """
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            state = copy.deepcopy(op["value"])
+            continue
+        tokens = [_unescape(t) for t in path.split("/")[1:]]
+        parent = state
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        kind = op["op"]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if kind == "add":
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif kind == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        elif kind == "remove":
+            del parent[last]
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return state
+
+
+# ----------------------------------------------------------------------
+# Snapshot + journal
+# ----------------------------------------------------------------------
+
+def journal_path(state_path):
+    """Journal file that belongs to a campaign state snapshot."""
+    state_path = Path(state_path)
+    return state_path.with_name(state_path.stem + JOURNAL_SUFFIX)
+
+
+def _snapshot_base(path):
+    st = os.stat(path)
+    return {
+        "base_sha1": hashlib.sha1(Path(path).read_bytes()).hexdigest(),
+        "base_size": st.st_size,
+        "base_mtime_ns": st.st_mtime_ns,
+    }
+
+
+def _header_matches(header, path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if header.get("base_size") == st.st_size and header.get("base_mtime_ns") == st.st_mtime_ns:
+        return True
+    return header.get("base_sha1") == hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def _reset_journal(path):
+    header = dict(_snapshot_base(path), created=datetime.now().isoformat())
+    _write_atomic(journal_path(path), json.dumps(header) + "\n")
+
+
+def _read_current(path):
+    """
+    Current state of a campaign state file: the snapshot plus any journal
+    entries that apply to it.
+
+    Returns:
+        tuple: (state or None if the snapshot is missing, journal entry count)
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except FileNotFoundError:
+        return None, 0
+    state = _decode(raw)
+
+    jpath = journal_path(path)
+    try:
+        with open(jpath, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return state, 0
+    if not lines:
+        return state, 0
+
+    try:
+        header = json.loads(lines[0])
+    except json.JSONDecodeError:
+        header = {}
+    if not _header_matches(header, path):
+        if len(lines) > 1:
+            print(f"Warning: {jpath.name} does not match {Path(path).name}; "
+                  f"ignoring {len(lines) - 1} journal entries")
+        return state, 0
+
+    entries = 0
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        try:
+            state = apply_patch(state, json.loads(line)["ops"])
+        except (json.JSONDecodeError, KeyError, IndexError, ValueError, TypeError) as e:
+            # A torn final write: keep everything before it
+            print(f"Warning: Stopping replay of {jpath.name} at a bad entry: {e}")
+            break
+        entries += 1
+    return state, entries
+
+
+def _file_stamps(path):
+    """(mtime_ns, size) of the snapshot and of its journal (None if missing)."""
+    stamps = []
+    for p in (path, journal_path(path)):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            stamps.append(None)
+        else:
+            stamps.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamps)
+
+
+def _remember(path, base, entries):
+    """
+    Record base (a private copy of what is now on disk, never handed to
+    callers) and the pending journal entries for path. Journal mode only.
+    """
+    key = _key(path)
+    if base is None or not journal_path(path).exists():
+        _PERSISTED.pop(key, None)
+    else:
+        _PERSISTED[key] = (_file_stamps(path), base, entries)
+
+
+def _last_persisted(path):
+    """
+    (private copy of the state on disk, pending journal entries), from
+    memory unless the snapshot or journal changed since it was recorded.
+    """
+    cached = _PERSISTED.get(_key(path))
+    if cached is not None and cached[0] == _file_stamps(path):
+        return cached[1], cached[2]
+    base, entries = _read_current(path)
+    _remember(path, base, entries)
+    return base, entries
+
+
+def _persist(path, base, new_state, entries, ops=None):
+    """
+    Write new_state: as one journal entry when journaling and the change can
+    be expressed against base (the state last persisted), otherwise as a
+    full snapshot. base is patched to match new_state; ops is
+    diff_state(base, new_state) if the caller already has it.
+
+    Returns:
+        tuple: (base now on disk or None, journal entries pending on top of
+        the snapshot)
+    """
+    path = Path(path)
+    jpath = journal_path(path)
+    if base is None or not jpath.exists():
+        _write_atomic(path, _serialize(new_state))
+        if not jpath.exists():
+            _PERSISTED.pop(_key(path), None)
+            return None, 0
+        _reset_journal(path)
+        base = _json_copy(new_state)
+        _remember(path, base, 0)
+        return base, 0
+
+    if ops is None:
+        ops = diff_state(base, new_state)
+    if not ops:
+        return base, entries
+    if entries == 0:
+        # Start from a header that matches the snapshot on disk
+        try:
+            with open(jpath, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+        except json.JSONDecodeError:
+            header = {}
+        if not _header_matches(header, path):
+            # The snapshot was replaced behind the journal's back
+            _write_atomic(path, _serialize(new_state))
+            _reset_journal(path)
+            base = _json_copy(new_state)
+            _remember(path, base, 0)
+            return base, 0
+
+    line = json.dumps({"ts": datetime.now().isoformat(), "ops": ops}) + "\n"
+    with open(jpath, "a", encoding="utf-8") as f:
+        f.write(line)
+    base = apply_patch(base, ops)
+    entries += 1
+
+    if entries >= COMPACT_ENTRIES or jpath.stat().st_size >= COMPACT_BYTES:
+        compact(path, new_state)
+        entries = 0
+    _remember(path, base, entries)
+    return base, entries
+
+
+def compact(state_path, state=None):
+    """
+    Fold the journal into a new snapshot and restart it.
+
+    The snapshot is written before the journal is reset, so a crash in
+    between leaves a journal that no longer matches and is ignored.
+    """
+    path = Path(state_path)
+    if state is None:
+        state = _read_current(path)[0]
+        if state is None:
+            return
+    _write_atomic(path, _serialize(state))
+    _reset_journal(path)
+
+
+def enable_journal(state_path):
+    """Switch a campaign state file to journal mode."""
+    path = Path(state_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Missing campaign state: {path}")
+    with _path_lock(_key(path)):
+        if not journal_path(path).exists():
+            _reset_journal(path)
+
+
+def disable_journal(state_path):
+    """Compact any pending journal entries and go back to whole-file saves."""
+    path = Path(state_path)
+    with _path_lock(_key(path)):
+        jpath = journal_path(path)
+        if jpath.exists():
+            compact(path)
+            jpath.unlink()
+
+
+class CampaignStateSession:
+    """One open transaction on a campaign state file (per thread)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.depth = 0
+        self.writes = 0
+        # _base is a private copy of what is on disk (None: no file yet)
+        cached = _PERSISTED.get(_key(self.path))
+        if cached is not None and cached[0] == _file_stamps(self.path):
+            _, self._base, self.journal_entries = cached
+            state = _json_copy(self._base)
+        else:
+            state, self.journal_entries = _read_current(self.path)
+            self._base = _json_copy(state) if state is not None else None
+            _remember(self.path, self._base, self.journal_entries)
+        self.exists = state is not None
+        self.state = state if state is not None else {}
+
+    def rollback(self):
+        """Restore the live dict to the state on disk at transaction start."""
+        _replace_contents(self.state, _json_copy(self._base) if self._base is not None else {})
+        self.exists = self._base is not None
+
+    def flush(self):
+        """
+        Write the live dict if it differs from what was loaded.
+
+        Returns:
+            bool: True if the file was written
+        """
+        if not self.exists:
+            return False
+        ops = diff_state(self._base, self.state) if self._base is not None else None
+        if ops == []:
+            return False
+        self._base, self.journal_entries = _persist(self.path, self._base, self.state, self.journal_entries, ops)
+        self.writes += 1
+        return True
+
+
+def active_session(state_path):
+    """Return the open CampaignStateSession for state_path, or None."""
+    return _sessions().get(_key(state_path))
+
+
+@contextmanager
+def campaign_state_transaction(state_path):
+    """
+    Open (or join) a transaction on a campaign state file.
+
+    Yields:
+        dict: The live campaign state. Empty if the file does not exist yet;
+        it is only created if something calls save_state() for it.
+    """
+    key = _key(state_path)
+    sessions = _sessions()
+    session = sessions.get(key)
+    outermost = session is None
+    lock = _path_lock(key)
+
+    if outermost:
+        lock.acquire()
+        try:
+            session = CampaignStateSession(state_path)
+        except BaseException:
+            lock.release()
+            raise
+        sessions[key] = session
+        snapshot = None
+    else:
+        snapshot = (copy.deepcopy(session.state), session.exists)
+
+    session.depth += 1
+    try:
+        yield session.state
+        if outermost:
+            session.flush()
+    except BaseException:
+        if outermost:
+            session.rollback()
+        else:
+            _replace_contents(session.state, snapshot[0])
+            session.exists = snapshot[1]
+        raise
+    finally:
+        session.depth -= 1
+        if outermost:
+            del sessions[key]
+            lock.release()
+
+
+def load_state(state_path):
+    """
+    Load campaign state.
+
+    Inside a transaction this is the shared live dict (None if the file does
+    not exist and nothing has saved it yet); otherwise it is read from disk.
+
+    Returns:
+        dict or None if the file does not exist
+    """
+    session = active_session(state_path)
+    if session is not None:
+        return session.state if session.exists else None
+    return _read_current(Path(state_path))[0]
+
+
+def save_state(state_path, state):
+    """
+    Save campaign state.
+
+    Inside a transaction the write is deferred to the end of the outermost
+    block; a dict other than the live one replaces the live contents.
+    Otherwise the file is written immediately.
+    """
+    session = active_session(state_path)
+    if session is not None:
+        if state is not session.state:
+            _replace_contents(session.state, state)
+        session.exists = True
+        return
+    path = Path(state_path)
+    with _path_lock(_key(path)):
+        if journal_path(path).exists():
+            base, entries = _last_persisted(path)
+            _persist(path, base, state, entries)
+        else:
+            _persist(path, None, state, 0)
+
+
+def main():
+    """Command-line control of campaign state journaling"""
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Manage the campaign state journal.")
+    ap.add_argument("--state", default=str(Path(__file__).resolve().parent.parent / "state" / "campaign_state.json"),
+                    help="Path to campaign_state.json")
+    ap.add_argument("--journal", choices=["on", "off"], help="Enable or disable journal mode")
+    ap.add_argument("--compact", action="store_true", help="Fold pending journal entries into the snapshot")
+    args = ap.parse_args()
+
+    if args.journal == "on":
+        enable_journal(args.state)
+    elif args.journal == "off":
+        disable_journal(args.state)
+    if args.compact and journal_path(args.state).exists():
+        compact(args.state)
+
+    jpath = journal_path(args.state)
+    if jpath.exists():
+        pending = _read_current(Path(args.state))[1]
+        print(f"Journal mode: on ({pending} pending entries, {jpath.stat().st_size} bytes)")
+    else:
+        print("Journal mode: off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Clock Registry for Skyrim TTRPG
+
+One index of every campaign clock, whatever shape it is stored in:
+
+    data/factions.json        major_factions.<f>.clocks[] (progress/segments)
+                              and active_plots[].clock
+    data/clocks/*.json        any "clocks" mapping or list (current/max,
+                              current_progress/total_segments,
+                              current_trust/max_trust)
+    data/thalmor_arcs.json    arc phases (clock_progress/clock_max)
+    campaign_state.json       "clocks" and legacy "campaign_clocks"
+
+Each source is parsed once (through the DataCatalog) into slotted Clock
+records indexed by id:
+
+    factions:<faction>.<clock name slug>     factions:thalmor.<plot id>
+    <file stem>:<clock key>                  thalmor_arcs:<arc id>.phase_<n>
+    campaign_state:<clock key>
+
+A bare clock key ("battle_of_whiterun_stages") also works when only one
+clock has it.
+
+    registry = get_clock_registry("../data", "../state/campaign_state.json")
+    registry.advance_many({"civil_war_clocks:civilian_war_weariness": 1,
+                           "faction_trust_clocks:companions_trust": 2})
+    for clock in registry.nearly_full():
+        print(clock.id, clock.current, clock.maximum)
+
+advance_many() writes each touched file once, whatever the number of
+clocks changed in it. Campaign state goes through campaign_state.save_state,
+so it joins an open campaign_state_transaction.
+
+Usage:
+    python3 clock_registry.py                 # nearly full clocks
+    python3 clock_registry.py --all --match thalmor
+    python3 clock_registry.py --advance civil_war_clocks:civilian_war_weariness=1
+"""
+
+import argparse
+import heapq
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from campaign_state import active_session, journal_path, load_state, save_state
+from data_catalog import copy_record, get_catalog
+
+CURRENT_KEYS = ("current", "current_progress", "progress", "current_trust")
+MAX_KEYS = ("max", "total_segments", "segments", "max_trust")
+
+# Clocks with one of these statuses are listed but not reported as nearly full
+FROZEN_STATUSES = {"inactive", "completed", "resolved", "failed", "thwarted", "exposed", "succeeded"}
+
+STATE_SOURCE = "campaign_state"
+STATE_CLOCK_KEYS = ("clocks", "campaign_clocks")
+
+NEARLY_FULL = 0.75
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9_]+", "_", str(text).lower()).strip("_")
+
+
+def _first_key(obj, keys):
+    """First of keys holding a number in obj, and its value as an int."""
+    for key in keys:
+        value = obj.get(key)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            return key, int(value)
+    return None, None
+
+
+class Clock:
+    """
+    One clock and where it lives.
+
+    Attributes:
+        id: Registry id (see module docstring)
+        key: Short key (clock key, name slug or arc.phase)
+        name: Display name
+        source: factions, thalmor_arcs, campaign_state or the clock file stem
+        path: File the clock is stored in
+        location: Keys from the file's root to the clock's dict
+        current_key / max_key: Field names used by this clock's shape
+        current / maximum: Progress, clamped to [0, maximum]
+        status: Lower-case status ("active" when absent)
+        effect: completion_effect / effect text, if any
+        gate: The clock's "gate" dict, if any
+        requires: Id of the clock that must fill first (arc phases)
+        stamp: Location of the dict whose last_updated is set on writes
+    """
+
+    __slots__ = ("id", "key", "name", "source", "path", "location", "current_key", "max_key",
+                 "current", "maximum", "status", "effect", "gate", "requires", "stamp")
+
+    def __init__(self, clock_id, key, name, source, path, location, current_key, max_key,
+                 current, maximum, status="active", effect=None, gate=None, requires=None, stamp=None):
+        self.id = clock_id
+        self.key = key
+        self.name = name
+        self.source = source
+        self.path = path
+        self.location = location
+        self.current_key = current_key
+        self.max_key = max_key
+        self.maximum = maximum
+        self.current = max(0, min(current, maximum))
+        self.status = status
+        self.effect = effect
+        self.gate = gate
+        self.requires = requires
+        self.stamp = stamp
+
+    @property
+    def frozen(self):
+        return self.status in FROZEN_STATUSES
+
+    @property
+    def ratio(self):
+        return self.current / self.maximum
+
+    @property
+    def remaining(self):
+        return self.maximum - self.current
+
+    @property
+    def filled(self):
+        return self.current >= self.maximum
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "source": self.source,
+            "current": self.current,
+            "max": self.maximum,
+            "status": self.status,
+            "effect": self.effect,
+        }
+
+    def __repr__(self):
+        return f"Clock({self.id!r}, {self.current}/{self.maximum})"
+
+
+def _clock(clock_id, key, raw, source, path, location, name=None, status=None, **extra):
+    """Clock from a raw clock dict, or None if it has no usable progress/max."""
+    current_key, current = _first_key(raw, CURRENT_KEYS)
+    max_key, maximum = _first_key(raw, MAX_KEYS)
+    if current is None or not maximum or maximum <= 0:
+        return None
+    status = status if status is not None else raw.get("status", "active")
+    return Clock(clock_id, key, str(name or raw.get("name") or key), source, path, location,
+                 current_key, max_key, current, maximum, status=str(status).lower(),
+                 effect=raw.get("completion_effect") or raw.get("effect"), gate=raw.get("gate"), **extra)
+
+
+def _faction_clocks(data, path):
+    clocks = []
+    for faction_id, faction in ((data or {}).get("major_factions") or {}).items():
+        if not isinstance(faction, dict):
+            continue
+        for i, raw in enumerate(faction.get("clocks") or []):
+            if isinstance(raw, dict):
+                key = f"{faction_id}.{_slug(raw.get('name'))}"
+                clock = _clock(f"factions:{key}", key, raw, "factions", path,
+                               ("major_factions", faction_id, "clocks", i))
+                if clock:
+                    clocks.append(clock)
+        for i, plot in enumerate(faction.get("active_plots") or []):
+            if isinstance(plot, dict) and isinstance(plot.get("clock"), dict):
+                key = f"{faction_id}.{plot.get('id')}"
+                clock = _clock(f"factions:{key}", key, plot["clock"], "factions", path,
+                               ("major_factions", faction_id, "active_plots", i, "clock"),
+                               name=plot.get("name"), status=plot.get("status", "active"))
+                if clock:
+                    clocks.append(clock)
+    return clocks
+
+
+def _file_clocks(data, source, path):
+    """Every entry of every "clocks" mapping/list in one clock file."""
+    clocks = []
+
+    def walk(obj, location, stamp):
+        if isinstance(obj, dict):
+            if "last_updated" in obj:
+                stamp = location
+            for key, value in obj.items():
+                if key == "clocks":
+                    items = value.items() if isinstance(value, dict) else enumerate(value or [])
+                    for clock_key, raw in items:
+                        if not isinstance(raw, dict):
+                            continue
+                        short = clock_key if isinstance(clock_key, str) else _slug(raw.get("name") or clock_key)
+                        clock = _clock(f"{source}:{short}", short, raw, source, path,
+                                       location + ("clocks", clock_key), stamp=stamp)
+                        if clock:
+                            clocks.append(clock)
+                else:
+                    walk(value, location + (key,), stamp)
+        elif isinstance(obj, list):
+            for i, value in enumerate(obj):
+                walk(value, location + (i,), stamp)
+
+    walk(data, (), None)
+    return clocks
+
+
+def load_clock_file(path, catalog=None):
+    """
+    Clocks in one clock file (the data/clocks/*.json shapes), read through
+    the DataCatalog.
+
+    Raises:
+        IOError / ValueError: The file cannot be read or parsed
+    """
+    path = Path(path)
+    return _file_clocks((catalog or get_catalog()).load_json(path), path.stem, path)
+
+
+def _arc_clocks(data, path):
+    """Thalmor arc phases; each phase requires the one before it."""
+    clocks = []
+    arc_root = (data or {}).get("thalmor_overarching_arc") or {}
+    for a, arc in enumerate(arc_root.get("arcs") or []):
+        previous = None
+        for p, phase in enumerate(arc.get("phases") or []):
+            if not isinstance(phase, dict):
+                continue
+            raw = {
+                "current": phase.get("clock_progress", 0),
+                "max": phase.get("clock_max"),
+                "status": phase.get("status", "active"),
+                "effect": phase.get("completion_effect") or phase.get("effect"),
+            }
+            key = f"{arc.get('arc_id')}.phase_{phase.get('phase')}"
+            clock = _clock(f"thalmor_arcs:{key}", key, raw, "thalmor_arcs", path,
+                           ("thalmor_overarching_arc", "arcs", a, "phases", p),
+                           name=f"{arc.get('name', arc.get('arc_id'))}: {phase.get('name', phase.get('phase'))}",
+                           requires=previous)
+            if clock:
+                clock.current_key, clock.max_key = "clock_progress", "clock_max"
+                clocks.append(clock)
+                previous = clock.id
+    return clocks
+
+
+def _state_clocks(state, path):
+    clocks = []
+    seen = set()
+    for container in STATE_CLOCK_KEYS:
+        entries = (state or {}).get(container)
+        if not isinstance(entries, dict):
+            continue
+        for key, raw in entries.items():
+            if not isinstance(raw, dict) or key in seen:
+                continue
+            clock = _clock(f"{STATE_SOURCE}:{key}", key, raw, STATE_SOURCE, path, (container, key))
+            if clock:
+                seen.add(key)
+                clocks.append(clock)
+    return clocks
+
+
+def _resolve(data, location):
+    for key in location:
+        data = data[key]
+    return data
+
+
+def _write_json(path, data):
+    """Replace a JSON file atomically."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ClockRegistry:
+    """
+    Every clock under a data directory (and optionally a campaign state
+    file), loaded once and reloaded only when a source changes.
+
+    Use ``get_clock_registry()`` for the shared instance per directory.
+    """
+
+    def __init__(self, data_dir="../data", state_path=None, catalog=None):
+        self.data_dir = Path(data_dir)
+        self.state_path = Path(state_path) if state_path else None
+        self.catalog = catalog or get_catalog()
+        self._lock = threading.RLock()
+        self._sources = None
+        self._state_stamp = None
+        self.clocks = []
+        self._by_id = {}
+        self._by_key = {}
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self, path):
+        try:
+            return self.catalog.load_json_or_none(path)
+        except (IOError, ValueError) as e:
+            print(f"Warning: Skipping {Path(path).name}: {e}")
+            return None
+
+    def _state_signature(self):
+        if self.state_path is None:
+            return None
+        session = active_session(self.state_path)
+        if session is not None:
+            # The live transaction dict can change without touching the file
+            return object()
+        return _file_stamp(self.state_path), _file_stamp(journal_path(self.state_path))
+
+    def refresh(self):
+        """
+        Reload if any source changed since the last load.
+
+        Returns:
+            bool: True if the clocks were reloaded
+        """
+        with self._lock:
+            factions_path = self.data_dir / "factions.json"
+            arcs_path = self.data_dir / "thalmor_arcs.json"
+            factions = self._load(factions_path)
+            snapshot = self.catalog.scan(self.data_dir / "clocks")
+            arcs = self._load(arcs_path)
+            state_stamp = self._state_signature()
+            sources = (factions, snapshot, arcs)
+            if (self._sources is not None and all(a is b for a, b in zip(sources, self._sources))
+                    and state_stamp == self._state_stamp):
+                return False
+
+            if self._sources is None or snapshot is not self._sources[1]:
+                for file_path, e in snapshot.errors:
+                    print(f"Warning: Skipping {file_path.name}: {e}")
+            clocks = _faction_clocks(factions, factions_path)
+            for file_path, record in snapshot.records:
+                clocks.extend(_file_clocks(record, file_path.stem, file_path))
+            clocks.extend(_arc_clocks(arcs, arcs_path))
+            if self.state_path is not None:
+                clocks.extend(_state_clocks(load_state(self.state_path), self.state_path))
+
+            by_id = {}
+            by_key = {}
+            for clock in clocks:
+                by_id.setdefault(clock.id, clock)
+                by_key.setdefault(clock.key, []).append(clock)
+            self.clocks = clocks
+            self._by_id = by_id
+            self._by_key = by_key
+            self._sources = sources
+            self._state_stamp = state_stamp
+            return True
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.clocks)
+
+    def __iter__(self):
+        return iter(self.clocks)
+
+    def __contains__(self, clock_id):
+        try:
+            self.get(clock_id)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, clock_id):
+        """
+        Clock by registry id or unambiguous bare key.
+
+        Raises:
+            KeyError: Unknown or ambiguous id (the message lists candidates)
+        """
+        clock = self._by_id.get(clock_id)
+        if clock is not None:
+            return clock
+        matches = self._by_key.get(clock_id) or []
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise KeyError(f"Ambiguous clock {clock_id!r}: {', '.join(c.id for c in matches)}")
+        raise KeyError(f"Unknown clock {clock_id!r}")
+
+    def by_source(self, source):
+        return [clock for clock in self.clocks if clock.source == source]
+
+    def find(self, text):
+        """Clocks whose id or name contains text (case-insensitive)."""
+        text = str(text).lower()
+        return [clock for clock in self.clocks if text in clock.id.lower() or text in clock.name.lower()]
+
+    def nearly_full(self, threshold=NEARLY_FULL, limit=None, include_filled=True, include_frozen=False):
+        """
+        Clocks at or past threshold of their maximum, fullest first (ties:
+        fewest segments left).
+
+        Args:
+            threshold: Minimum current/max ratio
+            limit: Only the first N clocks
+            include_filled: Include clocks that are already full
+            include_frozen: Include inactive/resolved clocks
+        """
+        candidates = [
+            clock for clock in self.clocks
+            if clock.ratio >= threshold
+            and (include_filled or not clock.filled)
+            and (include_frozen or not clock.frozen)
+        ]
+        order = lambda c: (-c.ratio, c.remaining, c.id)
+        if limit is not None:
+            return heapq.nsmallest(limit, candidates, key=order)
+        return sorted(candidates, key=order)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def advance(self, clock_id, segments=1):
+        """Advance one clock; returns (clock, old, new)."""
+        return self.advance_many({clock_id: segments})[0]
+
+    def advance_many(self, changes):
+        """
+        Advance several clocks, writing each touched file once.
+
+        Args:
+            changes: {clock id: segments} or iterable of (clock id, segments);
+                segments may be negative. Progress is clamped to [0, max].
+
+        Returns:
+            list of (clock, old progress, new progress), in the order given
+
+        Raises:
+            KeyError: An id is unknown or ambiguous (nothing is written)
+        """
+        return self._apply(changes, relative=True)
+
+    def set_progress(self, values):
+        """Set several clocks to absolute values ({id: value}); see advance_many."""
+        return self._apply(values, relative=False)
+
+    def _apply(self, changes, relative):
+        items = changes.items() if isinstance(changes, dict) else changes
+        with self._lock:
+            self.refresh()
+            resolved = [(self.get(clock_id), int(value)) for clock_id, value in items]
+            by_path = {}
+            for clock, value in resolved:
+                by_path.setdefault(clock.path, []).append((clock, value))
+
+            stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            results = {}
+            for path, entries in by_path.items():
+                if path == self.state_path:
+                    data = load_state(path)
+                else:
+                    data = copy_record(self.catalog.load_json(path))
+                stamps = set()
+                for clock, value in entries:
+                    raw = _resolve(data, clock.location)
+                    old = raw.get(clock.current_key, 0)
+                    old = old if isinstance(old, (int, float)) and not isinstance(old, bool) else 0
+                    new = max(0, min(clock.maximum, (old + value) if relative else value))
+                    raw[clock.current_key] = new
+                    first = results.get(id(clock))
+                    results[id(clock)] = (clock, first[1] if first else int(old), new)
+                    clock.current = new
+                    if clock.stamp is not None:
+                        stamps.add(clock.stamp)
+                for location in stamps:
+                    _resolve(data, location)["last_updated"] = stamp
+                if path == self.state_path:
+                    save_state(path, data)
+                else:
+                    _write_json(path, data)
+            ordered = []
+            for clock, _ in resolved:
+                result = results.pop(id(clock), None)
+                if result is not None:
+                    ordered.append(result)
+            return ordered
+
+
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_clock_registry(data_dir="../data", state_path=None):
+    """Shared ClockRegistry for a data directory (and state file), refreshed."""
+    key = (str(Path(data_dir).resolve()), str(Path(state_path).resolve()) if state_path else None)
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(key)
+        if registry is None:
+            registry = _REGISTRIES[key] = ClockRegistry(data_dir, state_path)
+            return registry
+    registry.refresh()
+    return registry
+
+
+def _bar(clock):
+    return "\u2588" * clock.current + "\u2591" * clock.remaining
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List and advance campaign clocks")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--state", default="../state/campaign_state.json",
+                        help="campaign_state.json ('' to skip state clocks)")
+    parser.add_argument("--all", action="store_true", help="List every clock, not just nearly full ones")
+    parser.add_argument("--threshold", type=float, default=NEARLY_FULL)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--match", help="Only clocks whose id or name contains this")
+    parser.add_argument("--advance", action="append", default=[], metavar="ID=N",
+                        help="Advance a clock by N segments (repeatable)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    registry = ClockRegistry(args.data_dir, args.state or None)
+    if args.advance:
+        changes = []
+        for item in args.advance:
+            clock_id, _, segments = item.rpartition("=")
+            if not clock_id:
+                parser.error(f"--advance expects ID=N, got {item!r}")
+            changes.append((clock_id, int(segments)))
+        try:
+            results = registry.advance_many(changes)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            return 1
+        for clock, old, new in results:
+            print(f"{clock.id}: {old} -> {new} / {clock.maximum}")
+        return 0
+
+    clocks = registry.find(args.match) if args.match else registry.clocks
+    if not args.all:
+        selected = {id(c) for c in clocks}
+        clocks = [c for c in registry.nearly_full(args.threshold) if id(c) in selected]
+    if args.limit is not None:
+        clocks = clocks[:args.limit]
+    if args.json:
+        print(json.dumps([c.to_dict() for c in clocks], indent=2, ensure_ascii=False))
+        return 0
+    if not clocks:
+        print("No clocks match.")
+        return 0
+    width = max(len(c.id) for c in clocks)
+    for clock in clocks:
+        note = " (filled)" if clock.filled else f" ({clock.status})" if clock.frozen else ""
+        print(f"{clock.id:<{width}}  [{_bar(clock)}] {clock.current}/{clock.maximum}{note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
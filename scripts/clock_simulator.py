@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Clock Simulator for Skyrim TTRPG
+
+Monte Carlo forecasts of when campaign clocks fill.
+
+Clocks come from clock_registry: data/factions.json (faction clocks and
+active Thalmor plots), data/clocks/*.json and data/thalmor_arcs.json (each
+arc phase is a clock that starts once the previous phase is full). Nothing
+is written back: every rollout runs in memory.
+
+Each turn an unfilled clock:
+
+    loses a segment        with probability `setback`
+    holds (interfered)     with probability `interference`
+    advances `advance`     otherwise (1 segment, as simulate_faction_turn does)
+
+Rates can be set globally and overridden per clock or per source, e.g.
+{"thalmor_influence_clocks": {"interference": 0.5}}. The result reports,
+per clock, the chance it fills within the horizon and the distribution of
+the turn it fills on.
+
+With NumPy installed all runs advance together as one array per turn;
+without it the same model runs in pure Python.
+
+Usage:
+    python3 clock_simulator.py --turns 12 --runs 5000 --interference 0.3
+    python3 clock_simulator.py --match thalmor --set thalmor_arcs=0.5 --json
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from clock_registry import ClockRegistry
+
+
+class ClockSpec:
+    """One clock in simulation form."""
+
+    __slots__ = ("id", "name", "source", "current", "maximum", "requires", "frozen")
+
+    def __init__(self, clock_id, name, source, current, maximum, requires=None, frozen=False):
+        self.id = clock_id
+        self.name = name
+        self.source = source
+        self.maximum = maximum
+        self.current = max(0, min(current, maximum))
+        self.requires = requires
+        self.frozen = frozen
+
+    def __repr__(self):
+        return f"ClockSpec({self.id!r}, {self.current}/{self.maximum})"
+
+
+def load_clock_specs(data_dir):
+    """
+    All simulatable clocks under a data directory.
+
+    Returns:
+        list of ClockSpec; a phase's `requires` is the list index of the
+        phase before it
+    """
+    specs = []
+    index = {}
+    for clock in ClockRegistry(data_dir):
+        index[clock.id] = len(specs)
+        specs.append(ClockSpec(clock.id, clock.name, clock.source, clock.current, clock.maximum,
+                               requires=index.get(clock.requires), frozen=clock.frozen))
+    return specs
+
+
+def _rates_for(spec, defaults, overrides):
+    """Rates for one clock: the longest matching override key wins."""
+    rates = dict(defaults)
+    best = None
+    for key in overrides or {}:
+        if spec.id == key or spec.source == key or (
+                spec.id.startswith(key) and spec.id[len(key)] in ":."):
+            if best is None or len(key) > len(best):
+                best = key
+    if best is not None:
+        value = overrides[best]
+        rates.update(value if isinstance(value, dict) else {"interference": value})
+    if rates["interference"] + rates["setback"] > 1:
+        raise ValueError(f"interference + setback exceeds 1 for {spec.id}")
+    return rates
+
+
+class SimulationResult:
+    """Fill-time distributions from simulate()."""
+
+    def __init__(self, specs, turns, runs, histograms):
+        self.turns = turns
+        self.runs = runs
+        self.clocks = []
+        for spec, hist in zip(specs, histograms):
+            filled = sum(hist)
+            self.clocks.append({
+                "id": spec.id,
+                "name": spec.name,
+                "source": spec.source,
+                "current": spec.current,
+                "max": spec.maximum,
+                "fill_probability": filled / runs,
+                "mean_turns": (sum(t * c for t, c in enumerate(hist)) / filled) if filled else None,
+                "p10": self._percentile(hist, 0.10),
+                "median": self._percentile(hist, 0.50),
+                "p90": self._percentile(hist, 0.90),
+                "histogram": list(hist),
+            })
+
+    def _percentile(self, hist, q):
+        """Turn by which a q share of runs had filled, or None past the horizon."""
+        need = q * self.runs
+        seen = 0
+        for turn, count in enumerate(hist):
+            seen += count
+            if seen >= need and seen > 0:
+                return turn
+        return None
+
+    def get(self, clock_id):
+        """Stats for one clock id, or None."""
+        for clock in self.clocks:
+            if clock["id"] == clock_id:
+                return clock
+        return None
+
+    def to_dict(self):
+        return {"turns": self.turns, "runs": self.runs, "clocks": self.clocks}
+
+    def report(self, limit=None):
+        """Text report, likeliest-to-fill clocks first."""
+        def fmt(turn):
+            return f">{self.turns}" if turn is None else str(turn)
+
+        ranked = sorted(self.clocks, key=lambda c: (-c["fill_probability"], c["mean_turns"] or 0))
+        lines = [f"Clock forecast: {self.runs} runs x {self.turns} turns", ""]
+        for clock in ranked[:limit]:
+            lines.append(f"{clock['name']} [{clock['id']}] {clock['current']}/{clock['max']}")
+            lines.append(f"  fills: {clock['fill_probability']:.0%}   "
+                         f"turn p10/median/p90: {fmt(clock['p10'])}/{fmt(clock['median'])}/{fmt(clock['p90'])}")
+        return "\n".join(lines)
+
+
+def _simulate_numpy(specs, rates, turns, runs, seed):
+    n = len(specs)
+    rng = np.random.default_rng(seed)
+    maximum = np.array([s.maximum for s in specs], dtype=np.int64)
+    progress = np.tile(np.array([s.current for s in specs], dtype=np.int64), (runs, 1))
+    setback = np.array([r["setback"] for r in rates])
+    hold = setback + np.array([r["interference"] for r in rates])
+    advance = np.array([r["advance"] for r in rates], dtype=np.int64)
+    movable = np.array([not s.frozen for s in specs])
+    # Index n is an always-filled sentinel for clocks without a prerequisite
+    requires = np.array([n if s.requires is None else s.requires for s in specs])
+
+    filled = np.zeros((runs, n + 1), dtype=bool)
+    filled[:, n] = True
+    filled[:, :n] = progress >= maximum
+    fill_turn = np.where(filled[:, :n], 0, -1)
+
+    for turn in range(1, turns + 1):
+        active = ~filled[:, :n] & filled[:, requires] & movable
+        if not active.any():
+            break
+        u = rng.random((runs, n))
+        delta = np.where(u < setback, -1, np.where(u < hold, 0, advance))
+        progress = np.clip(progress + delta * active, 0, maximum)
+        newly = active & (progress >= maximum)
+        fill_turn[newly] = turn
+        filled[:, :n] |= newly
+
+    histograms = []
+    for j in range(n):
+        turns_j = fill_turn[:, j]
+        histograms.append(np.bincount(turns_j[turns_j >= 0], minlength=turns + 1).tolist())
+    return histograms
+
+
+def _simulate_python(specs, rates, turns, runs, seed):
+    n = len(specs)
+    rng = random.Random(seed)
+    histograms = [[0] * (turns + 1) for _ in range(n)]
+    params = [(s.maximum, r["setback"], r["setback"] + r["interference"], r["advance"],
+               s.requires, not s.frozen) for s, r in zip(specs, rates)]
+    start = [s.current for s in specs]
+    draw = rng.random
+
+    for _ in range(runs):
+        progress = list(start)
+        filled = [progress[j] >= specs[j].maximum for j in range(n)]
+        for j in range(n):
+            if filled[j]:
+                histograms[j][0] += 1
+        for turn in range(1, turns + 1):
+            before = list(filled)
+            for j, (maximum, setback, hold, advance, requires, movable) in enumerate(params):
+                if before[j] or not movable or (requires is not None and not before[requires]):
+                    continue
+                u = draw()
+                if u < setback:
+                    progress[j] = max(0, progress[j] - 1)
+                elif u >= hold:
+                    progress[j] = min(maximum, progress[j] + advance)
+                    if progress[j] >= maximum:
+                        filled[j] = True
+                        histograms[j][turn] += 1
+    return histograms
+
+
+def simulate(specs, turns=20, runs=2000, interference=0.0, setback=0.0, advance=1,
+             overrides=None, seed=None):
+    """
+    Run Monte Carlo rollouts of clocks.
+
+    Args:
+        specs: List of ClockSpec (see load_clock_specs)
+        turns: Turns per rollout
+        runs: Number of rollouts
+        interference: Chance per turn that a clock is held
+        setback: Chance per turn that a clock loses a segment
+        advance: Segments gained on an unhindered turn
+        overrides: {clock id / source / id prefix: interference or rates dict}
+        seed: Seed for reproducible runs
+
+    Returns:
+        SimulationResult
+    """
+    defaults = {"interference": float(interference), "setback": float(setback), "advance": int(advance)}
+    rates = [_rates_for(spec, defaults, overrides) for spec in specs]
+    turns, runs = int(turns), int(runs)
+    if not specs or runs <= 0:
+        return SimulationResult(specs, turns, max(runs, 1), [[0] * (turns + 1) for _ in specs])
+    run = _simulate_numpy if NUMPY_AVAILABLE else _simulate_python
+    return SimulationResult(specs, turns, runs, run(specs, rates, turns, runs, seed))
+
+
+def forecast(data_dir, match=None, **kwargs):
+    """
+    Load the clocks under data_dir and simulate them.
+
+    Args:
+        data_dir: Data directory
+        match: Only clocks whose id or name contains this text
+        **kwargs: Passed to simulate()
+    """
+    specs = load_clock_specs(data_dir)
+    if match:
+        needle = match.lower()
+        wanted = set()
+        for i, spec in enumerate(specs):
+            if needle in spec.id.lower() or needle in spec.name.lower():
+                # Keep earlier arc phases so later ones can still start
+                while i is not None and i not in wanted:
+                    wanted.add(i)
+                    i = specs[i].requires
+        kept = sorted(wanted)
+        new_index = {old: new for new, old in enumerate(kept)}
+        specs = [ClockSpec(specs[i].id, specs[i].name, specs[i].source, specs[i].current, specs[i].maximum,
+                           requires=new_index.get(specs[i].requires), frozen=specs[i].frozen)
+                 for i in kept]
+    return simulate(specs, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast when campaign clocks fill")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parent.parent / "data"))
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--interference", type=float, default=0.0, help="Chance per turn a clock is held")
+    parser.add_argument("--setback", type=float, default=0.0, help="Chance per turn a clock loses a segment")
+    parser.add_argument("--set", action="append", default=[], metavar="ID=P",
+                        help="Interference for one clock id, source or id prefix (repeatable)")
+    parser.add_argument("--match", help="Only clocks whose id or name contains this text")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        try:
+            overrides[key.strip()] = float(value)
+        except ValueError:
+            parser.error(f"--set expects ID=P, got {item!r}")
+
+    try:
+        result = forecast(args.data_dir, match=args.match, turns=args.turns, runs=args.runs,
+                          interference=args.interference, setback=args.setback,
+                          overrides=overrides, seed=args.seed)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.report(limit=args.limit))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,8 @@ Integration:
 from __future__ import annotations
 from typing import Any, Dict, List, Literal, Optional
 
+from location_gazetteer import get_gazetteer
+
 SchismResolution = Literal["reconcile", "reform", "tradition", "civil_war"]
 BreakpointChoice = Literal["reconcile", "reform", "tradition", "civil_war"]
 
@@ -558,22 +560,22 @@ def schism_triggers(loc: str, state: Dict[str, Any]) -> List[str]:
     Main entry point. Call with current location string and campaign state.
     Returns a list of event strings to emit.
     """
-    loc_lower = str(loc).lower()
+    loc_terms = get_gazetteer().mentions(loc)
     events: List[str] = []
 
     cstate = _companions_state(state)
     active_quest = cstate.get("active_quest", "")
 
-    if "underforge" in loc_lower:
+    if "underforge" in loc_terms:
         events.extend(circle_revelation_scene_once(state))
 
-    if any(k in loc_lower for k in ["tundra", "plains", "outside_whiterun", "whiterun_plains"]):
+    if any(k in loc_terms for k in ["tundra", "plains", "outside_whiterun", "whiterun_plains"]):
         events.extend(pack_run_night_scene_once(state))
 
-    if any(k in loc_lower for k in ["harbinger", "kodlak", "harbinger_room"]):
+    if any(k in loc_terms for k in ["harbinger", "kodlak", "harbinger_room"]):
         events.extend(oath_of_purity_scene_once(state))
 
-    if any(k in loc_lower for k in ["jorrvaskr", "grand_hall", "downstairs", "jorrvaskr_downstairs"]):
+    if any(k in loc_terms for k in ["jorrvaskr", "grand_hall", "downstairs", "jorrvaskr_downstairs"]):
         if active_quest == "companions_schism_pressure":
             events.extend(schism_secrecy_argument_scene(state))
             # Gate the elder ultimatum so it fires late in the schism pressure arc
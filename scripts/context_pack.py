@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Context Pack Builder for Skyrim TTRPG
+
+Builds a size-budgeted bundle of the data records that matter for the
+current scene, for pasting or uploading to an AI assistant instead of the
+whole repository export.
+
+The focus is read from campaign_state: the current location (and the places
+around it, through the location gazetteer), active quests, NPCs in the
+scene, active companions and the active PC. Every record under data/ is
+scored by which focus terms it mentions; a record that is *about* a focus
+term (its file name or id names it) scores higher. Records are added
+best-first until the budget is spent.
+
+The bundle is one line of minified JSON:
+
+    {"pack": {"focus": [...], "budget_bytes": N, "generated": "..."},
+     "records": {"state/campaign_state": {...}, "npcs/kodlak_whitemane": {...}, ...}}
+
+- Empty values (null, "", [], {}) are dropped
+- Files larger than SPLIT_BYTES are split into their top-level sections
+  ("quests/main_quests#main_questline.act_1"), so one relevant quest does
+  not drag in a whole questline file
+- A record identical to one already packed is left out, and a long passage
+  already packed elsewhere is replaced by "(see <record id>)"
+
+Parsed files come from the shared DataCatalog, and each file's minified
+sections are cached until the file changes, so repeated builds during a
+session only re-score.
+
+Usage:
+    python3 context_pack.py --tokens 12000 -o ../context_pack.json
+    python3 context_pack.py --bytes 40000 --focus "Dustman's Cairn" --list
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from campaign_state import load_state
+from data_catalog import get_catalog
+from location_gazetteer import get_gazetteer, normalize
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DATA_DIR = REPO_ROOT / "data"
+DEFAULT_STATE_FILE = REPO_ROOT / "state" / "campaign_state.json"
+
+# Rough size of one token of minified JSON
+BYTES_PER_TOKEN = 4
+DEFAULT_BUDGET_TOKENS = 16000
+
+# Records larger than this (minified) are split into sections
+SPLIT_BYTES = 6000
+MAX_SPLIT_DEPTH = 3
+
+# Strings at least this long are deduplicated across records
+DEDUP_MIN_CHARS = 160
+
+# Weights of focus terms by where they came from
+WEIGHT_NPC = 5.0
+WEIGHT_QUEST = 4.0
+WEIGHT_COMPANION = 4.0
+WEIGHT_PLACE = 3.0
+WEIGHT_PC = 3.0
+WEIGHT_HOLD = 1.5
+WEIGHT_FIRST_NAME = 1.5
+WEIGHT_FACTION = 1.0
+
+# A record named after a focus term scores this many times the term's weight
+# on top of its mentions, so records about the scene outrank records that
+# merely mention everyone in it
+ABOUT_BONUS = 10.0
+
+# Records included whenever they fit, before any scored record
+ALWAYS_INCLUDE = ("world_state/current_state",)
+
+STATE_RECORD_ID = "state/campaign_state"
+
+# Focus terms listed in the pack header
+HEADER_FOCUS_TERMS = 12
+
+_LOCATION_SEP_RE = re.compile(r"\s[-–—]\s|[(),/→>]")
+
+# Keys under which list items carry their identity
+_ITEM_ID_KEYS = ("id", "quest_id", "npc_id", "encounter_id", "name")
+
+
+def _prune(value):
+    """Copy of value without empty values (null, "", [], {})."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = _prune(item)
+            if item not in (None, "", [], {}):
+                pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        return [item for item in (_prune(i) for i in value) if item not in (None, "", [], {})]
+    return value
+
+
+def _minify(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _long_strings(value, found=None):
+    """Set of sha1 digests of the long strings inside value."""
+    found = set() if found is None else found
+    if isinstance(value, str):
+        if len(value) >= DEDUP_MIN_CHARS:
+            found.add(hashlib.sha1(value.encode("utf-8")).hexdigest())
+    elif isinstance(value, dict):
+        for item in value.values():
+            _long_strings(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _long_strings(item, found)
+    return found
+
+
+def _replace_strings(value, seen):
+    """Copy of value with long strings already packed replaced by a pointer."""
+    if isinstance(value, str):
+        if len(value) >= DEDUP_MIN_CHARS:
+            owner = seen.get(hashlib.sha1(value.encode("utf-8")).hexdigest())
+            if owner is not None:
+                return f"(see {owner})"
+        return value
+    if isinstance(value, dict):
+        return {key: _replace_strings(item, seen) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_strings(item, seen) for item in value]
+    return value
+
+
+def _item_key(item, index):
+    if isinstance(item, dict):
+        for key in _ITEM_ID_KEYS:
+            if isinstance(item.get(key), str) and item[key]:
+                return item[key]
+    return str(index)
+
+
+class _Part:
+    """One packable record (a whole file or a section of one)."""
+
+    __slots__ = ("id", "value", "text", "size", "words", "name_words", "strings", "digest")
+
+    def __init__(self, record_id, value, text):
+        self.id = record_id
+        self.value = value
+        self.text = text
+        self.size = len(text.encode("utf-8"))
+        self.words = f" {normalize(text)} "
+        self.name_words = f" {normalize(record_id)} "
+        self.strings = _long_strings(value)
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _split(record_id, value, text, depth=0):
+    """Parts of one pruned record, splitting it while it is too large."""
+    if len(text) <= SPLIT_BYTES or depth >= MAX_SPLIT_DEPTH or not isinstance(value, (dict, list)):
+        return [_Part(record_id, value, text)]
+
+    sep = "#" if depth == 0 else "."
+    parts = []
+    if isinstance(value, dict):
+        head = {}
+        for key, item in value.items():
+            item_text = _minify(item)
+            if len(item_text) < DEDUP_MIN_CHARS:
+                head[key] = item
+            else:
+                parts.extend(_split(f"{record_id}{sep}{key}", item, item_text, depth + 1))
+        if head:
+            parts.insert(0, _Part(record_id, head, _minify(head)))
+    else:
+        for index, item in enumerate(value):
+            key = normalize(_item_key(item, index)).replace(" ", "_")
+            parts.extend(_split(f"{record_id}[{key}]", item, _minify(item), depth + 1))
+    return parts
+
+
+def focus_from_state(campaign_state, gazetteer=None):
+    """
+    Focus terms of the current scene.
+
+    Args:
+        campaign_state: Campaign state dict (may be None)
+        gazetteer: LocationGazetteer (default: get_gazetteer())
+
+    Returns:
+        dict: normalized term -> weight
+    """
+    state = campaign_state or {}
+    focus = {}
+
+    def add(term, weight):
+        if isinstance(term, dict):
+            term = term.get("name") or term.get("npc_id") or term.get("id")
+        term = normalize(term)
+        if len(term) >= 3 and weight > focus.get(term, 0):
+            focus[term] = weight
+
+    # NPCs in the scene, by full name and (for longer names) first name
+    for npc in state.get("current_npcs") or []:
+        name = npc.get("name") if isinstance(npc, dict) else npc
+        add(name, WEIGHT_NPC)
+        words = normalize(name).split()
+        if len(words) > 1 and len(words[0]) >= 4:
+            add(words[0], WEIGHT_FIRST_NAME)
+
+    companions = state.get("companions")
+    if isinstance(companions, dict):
+        for companion in companions.get("active_companions") or []:
+            add(companion, WEIGHT_COMPANION)
+
+    # Quests: "companions:companions_proving_honor", quests.active, and the
+    # active_quest of every <questline>_state block
+    quest_ids = list(state.get("active_quests") or [])
+    quests = state.get("quests")
+    if isinstance(quests, dict):
+        quest_ids.extend(quests.get("active") or [])
+    for key, block in state.items():
+        if key.endswith("_state") and isinstance(block, dict) and isinstance(block.get("active_quest"), str):
+            quest_ids.append(block["active_quest"])
+    for quest_id in quest_ids:
+        if isinstance(quest_id, dict):
+            quest_id = quest_id.get("id") or quest_id.get("quest_id") or quest_id.get("name")
+        if not isinstance(quest_id, str):
+            continue
+        line, _, quest = quest_id.rpartition(":")
+        add(quest, WEIGHT_QUEST)
+        if line:
+            add(line, WEIGHT_FACTION)
+
+    # Where the scene is: the pieces of the location string ("Whiterun -
+    # Jorrvaskr (Training Yard)"), the place they resolve to and the places
+    # it sits in
+    gazetteer = gazetteer or get_gazetteer()
+    location = state.get("current_location")
+    if isinstance(location, str):
+        for piece in _LOCATION_SEP_RE.split(location):
+            add(piece, WEIGHT_PLACE)
+    place = gazetteer.resolve(location) if location else None
+    for found in gazetteer.find_all(location) if location else ():
+        add(found.name, WEIGHT_PLACE)
+    while place is not None:
+        add(place.name, WEIGHT_PLACE if place.kind != "hold" else WEIGHT_HOLD)
+        place = gazetteer.get(place.parent) if place.parent else None
+    if state.get("active_hold"):
+        add(state["active_hold"], WEIGHT_HOLD)
+
+    pc_id = state.get("active_pc_id") or state.get("active_pc")
+    if isinstance(pc_id, str):
+        add(pc_id, WEIGHT_PC)
+        for pc in state.get("player_characters") or []:
+            if isinstance(pc, dict) and pc.get("id") == pc_id:
+                add(pc.get("name"), WEIGHT_PC)
+
+    for key in ("neutral_subfaction", "starting_faction"):
+        if isinstance(state.get(key), str):
+            add(state[key], WEIGHT_FACTION)
+    return focus
+
+
+def score(part, focus):
+    """Relevance of one part to the focus terms."""
+    mentions = 0.0
+    about = 0.0
+    for term, weight in focus.items():
+        padded = f" {term} "
+        if padded in part.name_words:
+            about = max(about, weight * ABOUT_BONUS)
+            mentions += weight
+        elif padded in part.words:
+            mentions += weight
+    return about + mentions
+
+
+class ContextPack:
+    """
+    A built bundle.
+
+    Attributes:
+        text: The bundle (minified JSON)
+        size: Size of text in UTF-8 bytes
+        included: List of (record id, score, bytes) in pack order
+        duplicates: Record ids left out because an identical record was packed
+        omitted: Number of relevant records that did not fit
+    """
+
+    __slots__ = ("text", "size", "included", "duplicates", "omitted")
+
+    def __init__(self, text, included, duplicates, omitted):
+        self.text = text
+        self.size = len(text.encode("utf-8"))
+        self.included = included
+        self.duplicates = duplicates
+        self.omitted = omitted
+
+    def summary(self):
+        lines = [f"{self.size} bytes (~{self.size // BYTES_PER_TOKEN} tokens), "
+                 f"{len(self.included)} records, {self.omitted} relevant records did not fit"]
+        for record_id, record_score, size in self.included:
+            lines.append(f"  {record_score:7.1f}  {size:7d}  {record_id}")
+        if self.duplicates:
+            lines.append(f"  duplicates left out: {', '.join(self.duplicates)}")
+        return "\n".join(lines)
+
+
+class ContextPackBuilder:
+    """
+    Ranks data records against a focus and packs them into a budget.
+
+    Keep one builder per session: each data file is pruned, split and
+    minified once, and again only when the file changes.
+
+    Attributes:
+        serialized: Number of files minified so far (for checking the cache)
+    """
+
+    def __init__(self, data_dir=None, catalog=None, gazetteer=None):
+        self.data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+        self.catalog = catalog or get_catalog()
+        self._gazetteer = gazetteer
+        # file path -> (parsed record it was built from, [_Part])
+        self._parts = {}
+        self.serialized = 0
+
+    def _file_parts(self, path, record):
+        cached = self._parts.get(path)
+        if cached is not None and cached[0] is record:
+            return cached[1]
+        record_id = Path(path).relative_to(self.data_dir).with_suffix("").as_posix()
+        pruned = _prune(record)
+        parts = _split(record_id, pruned, _minify(pruned))
+        self._parts[path] = (record, parts)
+        self.serialized += 1
+        return parts
+
+    def parts(self):
+        """Every packable part of the data directory."""
+        snapshot = self.catalog.scan(self.data_dir, "**/*.json")
+        for file_path, e in snapshot.errors:
+            print(f"Warning: Error reading {file_path.name}: {e}")
+        live = set()
+        parts = []
+        for file_path, record in snapshot.records:
+            live.add(str(file_path))
+            parts.extend(self._file_parts(str(file_path), record))
+        for stale in [p for p in self._parts if p not in live]:
+            del self._parts[stale]
+        return parts
+
+    def build(self, campaign_state=None, budget_bytes=None, budget_tokens=None, focus=None):
+        """
+        Pack the records most relevant to campaign_state into the budget.
+
+        Args:
+            campaign_state: Campaign state dict; also packed itself (pruned)
+            budget_bytes: Size limit of the bundle in bytes
+            budget_tokens: Size limit in approximate tokens (used when
+                           budget_bytes is not given; default DEFAULT_BUDGET_TOKENS)
+            focus: Extra focus terms, as a list of strings or {term: weight}
+
+        Returns:
+            ContextPack
+        """
+        if budget_bytes is None:
+            budget_bytes = (budget_tokens or DEFAULT_BUDGET_TOKENS) * BYTES_PER_TOKEN
+
+        terms = focus_from_state(campaign_state, self._gazetteer)
+        if isinstance(focus, dict):
+            extra = focus.items()
+        else:
+            extra = ((term, WEIGHT_NPC) for term in (focus or ()))
+        for term, weight in extra:
+            term = normalize(term)
+            if term:
+                terms[term] = max(weight, terms.get(term, 0))
+
+        forced = []
+        if campaign_state:
+            pruned_state = _prune(campaign_state)
+            forced.append((float("inf"), _Part(STATE_RECORD_ID, pruned_state, _minify(pruned_state))))
+        ranked = []
+        for part in self.parts():
+            if part.id in ALWAYS_INCLUDE:
+                forced.append((float("inf"), part))
+                continue
+            part_score = score(part, terms)
+            if part_score > 0:
+                ranked.append((part_score, part))
+        ranked.sort(key=lambda item: (-item[0], item[1].size, item[1].id))
+        ranked = forced + ranked
+
+        header = _minify({
+            "focus": sorted(terms, key=lambda t: (-terms[t], t))[:HEADER_FOCUS_TERMS],
+            "budget_bytes": budget_bytes,
+            "generated": datetime.now().isoformat(timespec="seconds"),
+        })
+        used = len(f'{{"pack":{header},"records":{{}}}}'.encode("utf-8"))
+
+        entries = []
+        included = []
+        duplicates = []
+        seen_digests = set()
+        seen_strings = {}
+        omitted = 0
+        for part_score, part in ranked:
+            if part.digest in seen_digests:
+                duplicates.append(part.id)
+                continue
+            text, size = part.text, part.size
+            if seen_strings and not part.strings.isdisjoint(seen_strings):
+                text = _minify(_replace_strings(part.value, seen_strings))
+                size = len(text.encode("utf-8"))
+            key = json.dumps(part.id, ensure_ascii=False)
+            cost = len(key.encode("utf-8")) + 1 + size + (1 if entries else 0)
+            if used + cost > budget_bytes:
+                omitted += 1
+                continue
+            used += cost
+            entries.append(f"{key}:{text}")
+            included.append((part.id, part_score, size))
+            seen_digests.add(part.digest)
+            for digest in part.strings:
+                seen_strings.setdefault(digest, part.id)
+
+        text = f'{{"pack":{header},"records":{{{",".join(entries)}}}}}'
+        return ContextPack(text, included, duplicates, omitted)
+
+
+_BUILDERS = {}
+
+
+def get_context_builder(data_dir=None):
+    """Shared ContextPackBuilder for a data directory."""
+    key = str(Path(data_dir).resolve()) if data_dir else str(DEFAULT_DATA_DIR)
+    builder = _BUILDERS.get(key)
+    if builder is None:
+        builder = _BUILDERS[key] = ContextPackBuilder(data_dir)
+    return builder
+
+
+def build_context_pack(campaign_state, budget_tokens=DEFAULT_BUDGET_TOKENS, budget_bytes=None, focus=None, data_dir=None):
+    """Build a context pack with the shared builder (see ContextPackBuilder.build)."""
+    return get_context_builder(data_dir).build(
+        campaign_state, budget_bytes=budget_bytes, budget_tokens=budget_tokens, focus=focus
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a relevance-ranked context pack for the current scene")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--tokens", type=int, help=f"Budget in approximate tokens (default {DEFAULT_BUDGET_TOKENS})")
+    budget.add_argument("--bytes", type=int, help="Budget in bytes")
+    parser.add_argument("--state", default=str(DEFAULT_STATE_FILE), help="Campaign state file")
+    parser.add_argument("--focus", action="append", default=[], help="Extra focus term (repeatable)")
+    parser.add_argument("-o", "--output", help="Write the pack here instead of stdout")
+    parser.add_argument("--list", action="store_true", help="Print what was packed instead of the pack")
+    args = parser.parse_args()
+
+    campaign_state = load_state(args.state)
+    if campaign_state is None:
+        print(f"Warning: {args.state} not found; packing without campaign state", file=sys.stderr)
+    pack = build_context_pack(campaign_state, budget_tokens=args.tokens, budget_bytes=args.bytes, focus=args.focus)
+
+    if args.output:
+        Path(args.output).write_text(pack.text, encoding="utf-8")
+        print(f"Wrote {args.output}: {pack.size} bytes, {len(pack.included)} records")
+    if args.list:
+        print(pack.summary())
+    elif not args.output:
+        print(pack.text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
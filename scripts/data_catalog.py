@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Data Catalog for Skyrim TTRPG
+
+Process-wide, in-memory cache of parsed JSON data files.
+
+Each file is parsed once and kept until its mtime or size changes on disk,
+so repeated queries (scene NPCs, stat sheet lookups, quest searches) only
+pay for a stat() per file instead of a full JSON parse.
+
+Records handed out by the catalog are the cached objects themselves and must
+be treated as read-only. Callers that return records to code that may mutate
+them should copy them first (see ``copy_record``).
+"""
+
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class _CatalogEntry:
+    """Cached parse result for a single file."""
+
+    __slots__ = ("mtime_ns", "size", "record", "error")
+
+    def __init__(self, mtime_ns, size, record=None, error=None):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.record = record
+        self.error = error
+
+
+class DirectorySnapshot:
+    """
+    Parsed contents of one directory at a point in time.
+
+    Attributes:
+        directory: Directory the snapshot was taken from
+        records: Tuple of (Path, record) pairs, sorted by filename
+        errors: Tuple of (Path, exception) pairs for unreadable files
+        version: Token that changes whenever any file in the snapshot changes
+    """
+
+    __slots__ = ("directory", "records", "errors", "version")
+
+    def __init__(self, directory, records, errors, version):
+        self.directory = directory
+        self.records = records
+        self.errors = errors
+        self.version = version
+
+
+class DataCatalog:
+    """
+    Shared cache of parsed JSON files, invalidated by file mtime and size.
+
+    Use the module-level ``get_catalog()`` to obtain the process-wide instance.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._snapshots = {}
+        self._lock = threading.RLock()
+        self._version = 0
+
+    def load_json(self, path):
+        """
+        Return the parsed contents of a JSON file.
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            The parsed (cached, read-only) record
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            IOError / json.JSONDecodeError / UnicodeDecodeError: If the file
+                cannot be read or parsed. The failure is cached until the file
+                changes, so a broken file is not re-parsed on every call.
+        """
+        path = Path(path)
+        st = os.stat(path)
+        return self._load(path, st)
+
+    def load_json_or_none(self, path):
+        """Like ``load_json`` but returns None when the file is missing."""
+        try:
+            return self.load_json(path)
+        except FileNotFoundError:
+            return None
+
+    def _load(self, path, st):
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entry = _CatalogEntry(st.st_mtime_ns, st.st_size, record=json.load(f))
+                except (IOError, json.JSONDecodeError, UnicodeDecodeError) as e:
+                    entry = _CatalogEntry(st.st_mtime_ns, st.st_size, error=e)
+                self._entries[key] = entry
+                self._version += 1
+        if entry.error is not None:
+            raise entry.error
+        return entry.record
+
+    def scan(self, directory, pattern="*.json"):
+        """
+        Return a DirectorySnapshot of every file matching pattern in directory.
+
+        Files are stat()ed on every call; only new or changed files are
+        re-parsed. Files that cannot be read are reported in
+        ``snapshot.errors`` instead of raising.
+
+        Args:
+            directory: Directory to scan (non-recursive)
+            pattern: Glob pattern for files to include (default: "*.json")
+
+        Returns:
+            DirectorySnapshot (empty if the directory does not exist)
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            return DirectorySnapshot(directory, (), (), None)
+
+        stamps = []
+        for file_path in sorted(directory.glob(pattern)):
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            stamps.append((file_path, st))
+
+        snap_key = (str(directory), pattern)
+        signature = tuple((p.name, st.st_mtime_ns, st.st_size) for p, st in stamps)
+
+        with self._lock:
+            cached = self._snapshots.get(snap_key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            records = []
+            errors = []
+            for file_path, st in stamps:
+                try:
+                    records.append((file_path, self._load(file_path, st)))
+                except (IOError, json.JSONDecodeError, UnicodeDecodeError) as e:
+                    errors.append((file_path, e))
+
+            self._version += 1
+            snapshot = DirectorySnapshot(directory, tuple(records), tuple(errors), self._version)
+            self._snapshots[snap_key] = (signature, snapshot)
+            return snapshot
+
+    def records(self, directory, pattern="*.json", warn=True):
+        """
+        Return the parsed records of every matching file in directory.
+
+        Args:
+            directory: Directory to scan
+            pattern: Glob pattern (default: "*.json")
+            warn: Print a warning for each unreadable file (default: True)
+
+        Returns:
+            list: Cached (read-only) records, ordered by filename
+        """
+        snapshot = self.scan(directory, pattern)
+        if warn:
+            for file_path, e in snapshot.errors:
+                print(f"Warning: Error reading {file_path.name}: {e}")
+        return [record for _, record in snapshot.records]
+
+    def invalidate(self, path=None):
+        """
+        Drop cached entries.
+
+        Args:
+            path: File or directory to forget, or None to clear everything
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._snapshots.clear()
+                return
+            key = str(Path(path))
+            self._entries.pop(key, None)
+            for snap_key in [k for k in self._snapshots if k[0] == key]:
+                del self._snapshots[snap_key]
+
+
+def copy_record(record):
+    """Return a deep copy of a cached record that is safe to mutate."""
+    return copy.deepcopy(record)
+
+
+_CATALOG = DataCatalog()
+
+
+def get_catalog():
+    """Return the process-wide DataCatalog instance."""
+    return _CATALOG
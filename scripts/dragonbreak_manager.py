@@ -8,6 +8,9 @@ This script manages:
 - Faction states across timeline branches
 - Quest outcomes across timeline branches
 - Consequences for different in-game paths triggered dynamically
+
+Branches are stored copy-on-write (see timeline_store.py): each branch
+keeps only the records it changed, and reads fall through to its parent.
 """
 
 import json
@@ -15,6 +18,9 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from timeline_merge import merge_branches
+from timeline_store import SECTIONS, TimelineStore
+
 
 class DragonbreakManager:
     def __init__(self, data_dir="../data", state_dir="../state"):
@@ -27,9 +33,17 @@ class DragonbreakManager:
         """Load current dragonbreak state"""
         if self.dragonbreak_state_path.exists():
             with open(self.dragonbreak_state_path, 'r') as f:
-                return json.load(f)
+                state = json.load(f)
+            # Converts branches saved as full copies into diffs
+            self.timeline_store(state)
+            return state
         return self._initialize_dragonbreak_state()
     
+    def timeline_store(self, state):
+        """Copy-on-write view over the branches of a loaded state"""
+        return TimelineStore(state.setdefault('timeline_branches', {}),
+                             state.setdefault('timeline_snapshots', {}))
+    
     def _initialize_dragonbreak_state(self):
         """Initialize a new dragonbreak state"""
         return {
@@ -39,12 +53,10 @@ class DragonbreakManager:
                     "id": "primary",
                     "name": "Primary Timeline",
                     "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "npcs": {},
-                    "factions": {},
-                    "quests": {},
-                    "world_state": {}
+                    "changes": {}
                 }
             },
+            "timeline_snapshots": {},
             "current_timeline": "primary",
             "fracture_points": [],
             "consequences": []
@@ -54,8 +66,10 @@ class DragonbreakManager:
         """Save dragonbreak state"""
         self.state_dir.mkdir(exist_ok=True)
         state['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.dragonbreak_state_path, 'w') as f:
+        tmp_path = self.dragonbreak_state_path.with_name(self.dragonbreak_state_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.dragonbreak_state_path)
     
     def create_timeline_fracture(self, fracture_name, description, trigger_event):
         """
@@ -71,25 +85,17 @@ class DragonbreakManager:
         """
         state = self.load_dragonbreak_state()
         
-        # Create new timeline branch
+        # Create new timeline branch; it starts empty and reads through
+        # to the current timeline until something diverges
         branch_id = f"branch_{len(state['timeline_branches'])}"
-        current_timeline = state['timeline_branches'][state['current_timeline']]
-        
-        # Copy current timeline state to new branch
-        new_branch = {
-            "id": branch_id,
-            "name": fracture_name,
-            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "parent_timeline": state['current_timeline'],
-            "description": description,
-            "trigger_event": trigger_event,
-            "npcs": dict(current_timeline['npcs']),
-            "factions": dict(current_timeline['factions']),
-            "quests": dict(current_timeline['quests']),
-            "world_state": dict(current_timeline['world_state'])
-        }
-        
-        state['timeline_branches'][branch_id] = new_branch
+        self.timeline_store(state).create_branch(
+            branch_id,
+            state['current_timeline'],
+            name=fracture_name,
+            created=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            description=description,
+            trigger_event=trigger_event
+        )
         
         # Record the fracture point
         fracture_point = {
@@ -134,14 +140,15 @@ class DragonbreakManager:
                                  "branch_1": {"alive": False, "location": "Sovngarde"}}
         """
         state = self.load_dragonbreak_state()
+        store = self.timeline_store(state)
         
         for branch_id, npc_state in branch_states.items():
-            if branch_id in state['timeline_branches']:
-                state['timeline_branches'][branch_id]['npcs'][npc_id] = {
+            if branch_id in store:
+                store.set(branch_id, 'npcs', npc_id, {
                     "name": npc_name,
                     "state": npc_state,
                     "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
+                })
         
         self.save_dragonbreak_state(state)
         print(f"NPC '{npc_name}' tracked across {len(branch_states)} timeline branches")
@@ -156,14 +163,15 @@ class DragonbreakManager:
             branch_states: Dict mapping branch_id to faction state in that branch
         """
         state = self.load_dragonbreak_state()
+        store = self.timeline_store(state)
         
         for branch_id, faction_state in branch_states.items():
-            if branch_id in state['timeline_branches']:
-                state['timeline_branches'][branch_id]['factions'][faction_id] = {
+            if branch_id in store:
+                store.set(branch_id, 'factions', faction_id, {
                     "name": faction_name,
                     "state": faction_state,
                     "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
+                })
         
         self.save_dragonbreak_state(state)
         print(f"Faction '{faction_name}' tracked across {len(branch_states)} timeline branches")
@@ -178,14 +186,15 @@ class DragonbreakManager:
             branch_outcomes: Dict mapping branch_id to quest outcome in that branch
         """
         state = self.load_dragonbreak_state()
+        store = self.timeline_store(state)
         
         for branch_id, outcome in branch_outcomes.items():
-            if branch_id in state['timeline_branches']:
-                state['timeline_branches'][branch_id]['quests'][quest_id] = {
+            if branch_id in store:
+                store.set(branch_id, 'quests', quest_id, {
                     "name": quest_name,
                     "outcome": outcome,
                     "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
+                })
         
         self.save_dragonbreak_state(state)
         print(f"Quest '{quest_name}' tracked across {len(branch_outcomes)} timeline branches")
@@ -250,6 +259,8 @@ class DragonbreakManager:
         """
         Switch the active timeline to a different branch
         
+        Only the current_timeline pointer changes; no branch data is copied.
+        
         Args:
             branch_id: The timeline branch to switch to
         """
@@ -270,7 +281,49 @@ class DragonbreakManager:
         
         return True
     
-    def resolve_dragonbreak(self, dragonbreak_id, resolution_type="merge", primary_branch=None):
+    def _merge_dragonbreak_branches(self, state, dragonbreak, merge_policy):
+        """
+        Three-way merge the branches of a dragonbreak into a new branch
+        
+        The branches are folded in order against their shared fracture point;
+        the first branch wins conflicts under the 'manual' and 'ours' policies.
+        
+        Returns:
+            (merged branch ID, list of conflicts)
+        """
+        store = self.timeline_store(state)
+        branch_ids = [b for b in dragonbreak['branch_ids'] if b in store]
+        if not branch_ids:
+            raise ValueError(f"Dragonbreak '{dragonbreak['id']}' has no timeline branches left")
+        ancestor = store.common_ancestor(*branch_ids)
+        
+        merged_id = f"branch_{len(state['timeline_branches'])}"
+        store.create_branch(
+            merged_id,
+            branch_ids[0],
+            base=ancestor,
+            name=f"Merged: {dragonbreak['name']}",
+            created=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            merged_from=branch_ids
+        )
+        
+        conflicts = []
+        ours = branch_ids[0]
+        for theirs in branch_ids[1:]:
+            result = merge_branches(store, ours, theirs, merge_policy, ancestor=ancestor)
+            store.replace_diff(merged_id, result.changes, result.removed)
+            for conflict in result.conflicts:
+                conflict['branches'] = [ours, theirs]
+            conflicts.extend(result.conflicts)
+            ours = merged_id
+        if len(branch_ids) == 1:
+            result = merge_branches(store, ours, ours, merge_policy, ancestor=ancestor)
+            store.replace_diff(merged_id, result.changes, result.removed)
+        
+        return merged_id, conflicts
+    
+    def resolve_dragonbreak(self, dragonbreak_id, resolution_type="merge", primary_branch=None,
+                            merge_policy="manual"):
         """
         Resolve a dragonbreak, bringing timelines back together
         
@@ -278,6 +331,8 @@ class DragonbreakManager:
             dragonbreak_id: ID of the dragonbreak to resolve
             resolution_type: How to resolve ('merge', 'collapse_to_one', 'remain_separate')
             primary_branch: If collapsing, which branch becomes canon
+            merge_policy: If merging, how conflicts are settled ('manual', 'ours',
+                          'theirs', 'base', or a callable; see timeline_merge.py)
         """
         state = self.load_dragonbreak_state()
         
@@ -291,6 +346,20 @@ class DragonbreakManager:
                     dragonbreak['canonical_branch'] = primary_branch
                     state['current_timeline'] = primary_branch
                 
+                conflicts = []
+                if resolution_type == "merge":
+                    try:
+                        merged_id, conflicts = self._merge_dragonbreak_branches(
+                            state, dragonbreak, merge_policy
+                        )
+                    except ValueError as e:
+                        print(f"Error: {e}")
+                        return False
+                    dragonbreak['merged_branch'] = merged_id
+                    dragonbreak['merge_policy'] = merge_policy if isinstance(merge_policy, str) else "custom"
+                    dragonbreak['conflicts'] = json.loads(json.dumps(conflicts, default=str))
+                    state['current_timeline'] = merged_id
+                
                 self.save_dragonbreak_state(state)
                 
                 print(f"\n✨ DRAGONBREAK RESOLVED ✨")
@@ -298,6 +367,12 @@ class DragonbreakManager:
                 print(f"Resolution: {resolution_type}")
                 if primary_branch:
                     print(f"Canonical Branch: {primary_branch}")
+                if resolution_type == "merge":
+                    open_conflicts = [c for c in conflicts if not c['resolved']]
+                    print(f"Merged Branch: {dragonbreak['merged_branch']}")
+                    print(f"Conflicts: {len(conflicts)} ({len(open_conflicts)} need a GM ruling)")
+                    for conflict in open_conflicts:
+                        print(f"  - {conflict['path']}: {conflict.get('ours')} vs {conflict.get('theirs')}")
                 
                 return True
         
@@ -319,7 +394,7 @@ class DragonbreakManager:
         if branch_id not in state['timeline_branches']:
             return None
         
-        branch = state['timeline_branches'][branch_id]
+        branch = self.timeline_store(state).materialize(branch_id)
         
         print(f"\n=== Timeline: {branch['name']} ({branch_id}) ===")
         print(f"Created: {branch['created']}")
@@ -340,6 +415,42 @@ class DragonbreakManager:
         
         return branch
     
+    def get_branch_diff(self, branch_id):
+        """
+        What a branch changed relative to its parent
+        
+        Args:
+            branch_id: The timeline branch to inspect
+        
+        Returns:
+            Dict with 'parent_timeline', 'changes' and 'removed', or None
+        """
+        state = self.load_dragonbreak_state()
+        store = self.timeline_store(state)
+        if branch_id not in store:
+            return None
+        diff = store.diff(branch_id)
+        diff['parent_timeline'] = store.parent(branch_id)
+        return diff
+    
+    def get_record(self, section, record_id, branch_id=None):
+        """
+        Look up one NPC/faction/quest/world_state record as a branch sees it
+        
+        Args:
+            section: One of 'npcs', 'factions', 'quests', 'world_state'
+            record_id: ID of the record
+            branch_id: The timeline branch to query (defaults to current)
+        """
+        if section not in SECTIONS:
+            raise ValueError(f"Unknown timeline section '{section}'")
+        state = self.load_dragonbreak_state()
+        branch_id = branch_id or state['current_timeline']
+        store = self.timeline_store(state)
+        if branch_id not in store:
+            return None
+        return store.get(branch_id, section, record_id)
+    
     def list_active_dragonbreaks(self):
         """List all active dragonbreaks"""
         state = self.load_dragonbreak_state()
@@ -365,11 +476,13 @@ class DragonbreakManager:
         print(f"\n=== Timeline Branches ({len(state['timeline_branches'])}) ===")
         print(f"Current Timeline: {state['current_timeline']}\n")
         
+        store = self.timeline_store(state)
         for branch_id, branch in state['timeline_branches'].items():
             marker = "→ " if branch_id == state['current_timeline'] else "  "
             print(f"{marker}{branch_id}: {branch['name']}")
             print(f"   Created: {branch['created']}")
-            print(f"   NPCs: {len(branch['npcs'])}, Factions: {len(branch['factions'])}, Quests: {len(branch['quests'])}")
+            npcs, factions, quests = (len(store.keys(branch_id, s)) for s in ('npcs', 'factions', 'quests'))
+            print(f"   NPCs: {npcs}, Factions: {factions}, Quests: {quests}")
         
         return state['timeline_branches']
     
@@ -486,7 +599,10 @@ def main():
             db_id = input("Dragonbreak ID: ").strip()
             res_type = input("Resolution type (merge/collapse_to_one/remain_separate): ").strip()
             primary = input("Primary branch (if collapsing): ").strip()
-            manager.resolve_dragonbreak(db_id, res_type, primary if primary else None)
+            policy = "manual"
+            if res_type == "merge":
+                policy = input("Merge policy (manual/ours/theirs/base): ").strip() or "manual"
+            manager.resolve_dragonbreak(db_id, res_type, primary if primary else None, policy)
         
         elif choice == "11":
             print("Goodbye!")
@@ -15,6 +15,8 @@ Integration:
 from __future__ import annotations
 from typing import Any, Dict, List
 
+from location_gazetteer import get_gazetteer
+
 
 def _flags(state: Dict[str, Any]) -> Dict[str, Any]:
     return state.setdefault("scene_flags", {})
@@ -74,30 +76,30 @@ def _companion_bark(partner: str, context: str) -> str:
 
 
 def dustmans_cairn_triggers(loc: str, state: Dict[str, Any]) -> List[str]:
-    loc_lower = str(loc).lower()
-    if "dustman" not in loc_lower:
+    loc_terms = get_gazetteer().mentions(loc)
+    if "dustman" not in loc_terms:
         return []
 
     partner = _partner(state)
     events: List[str] = []
 
     # Entrance
-    if any(k in loc_lower for k in ["entrance", "barrow", "dustmans_entrance"]) and _once(state, "dustmans_entrance_seen"):
+    if any(k in loc_terms for k in ["entrance", "barrow", "dustmans_entrance"]) and _once(state, "dustmans_entrance_seen"):
         events.append("[DUSTMAN’S CAIRN] The grave-mound rises from the tundra like a clenched fist. Wind combs the stones. The door yawns black.")
         bark = _companion_bark(partner, "entrance")
         if bark:
             events.append(bark)
 
     # Trap rooms
-    if any(k in loc_lower for k in ["anteroom", "runes", "hall of axes", "axes"]) and _once(state, "dustmans_trap_rooms_seen"):
+    if any(k in loc_terms for k in ["anteroom", "runes", "hall of axes", "axes"]) and _once(state, "dustmans_trap_rooms_seen"):
         events.append("Runes scratch the stone. Old pressure plates wait like patience. This place was built to punish the careless.")
 
     # Ossuary
-    if any(k in loc_lower for k in ["ossuary", "maze", "bones"]) and _once(state, "dustmans_ossuary_seen"):
+    if any(k in loc_terms for k in ["ossuary", "maze", "bones"]) and _once(state, "dustmans_ossuary_seen"):
         events.append("Bone-dust clings to your boots. The corridors bend like a throat swallowing sound. Something shifts deeper in the dark.")
 
     # Silver Hand camp + named antagonist intro
-    if any(k in loc_lower for k in ["silver hand camp", "camp", "dustmans_silver_hand_camp"]) and _once(state, "dustmans_silver_hand_intro_done"):
+    if any(k in loc_terms for k in ["silver hand camp", "camp", "dustmans_silver_hand_camp"]) and _once(state, "dustmans_silver_hand_intro_done"):
         bark = _companion_bark(partner, "camp")
         if bark:
             events.append(bark)
@@ -112,12 +114,12 @@ def dustmans_cairn_triggers(loc: str, state: Dict[str, Any]) -> List[str]:
         events.extend(_seed_join_offer_if_purity(state))
 
     # Deep crypt (fragment)
-    if any(k in loc_lower for k in ["deep crypt", "fragment", "wuuthrad", "chamber", "dustmans_deep_crypt"]) and _once(state, "dustmans_fragment_chamber_seen"):
+    if any(k in loc_terms for k in ["deep crypt", "fragment", "wuuthrad", "chamber", "dustmans_deep_crypt"]) and _once(state, "dustmans_fragment_chamber_seen"):
         events.append("[FRAGMENT CHAMBER] A heavy stone door gives way to a chamber that feels like a sealed breath. The Wuuthrad fragment waits where the dead wanted it guarded.")
         events.append("GM NOTE: Trigger the guardian fight here (draugr guardian / overlord). Let the partner contribute spotlight support.")
 
     # Word wall (optional)
-    if any(k in loc_lower for k in ["word wall", "wall vault", "dustmans_word_wall"]) and _once(state, "dustmans_word_wall_seen"):
+    if any(k in loc_terms for k in ["word wall", "wall vault", "dustmans_word_wall"]) and _once(state, "dustmans_word_wall_seen"):
         events.append("[WORD WALL] A wall of carved power hums with language older than kings. If the PC can read it, it reads them back.")
 
     return events
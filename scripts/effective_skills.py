@@ -1,8 +1,44 @@
 #!/usr/bin/env python3
+"""
+Effective Skills for Skyrim TTRPG
+
+One engine for a PC's effective skills: the skill pyramid plus racial
+bonuses (from the PC's racial_bonuses, else data/racial_traits.json) plus
+the standing stone bonus (data/standing_stones.json). A PC sheet that
+carries derived.effective_skills is taken as already computed.
+
+The stone and race tables are parsed once (and again only when their file
+changes) into (skill index, bonus) integer pairs. Results are memoized by
+a hash of the PC fields they depend on, and PC files by content hash, so
+repeated calls (the mid-session protocol, a long-running GM process)
+recompute nothing for unchanged sheets. party_matrix() returns a whole
+party as one integer matrix (a NumPy array when NumPy is installed).
+
+    engine = get_skill_engine("data")
+    engine.compute_file("data/pcs/pc_wayn.json")["effective"]["Fight"]
+    names, skills, matrix = engine.party_matrix(["data/pcs/pc_wayn.json", other_pc])
+
+Usage:
+    python3 effective_skills.py --pc data/pcs/pc_wayn.json
+    python3 effective_skills.py --pc data/pcs/pc_wayn.json --pc data/pcs/example_pc.json --matrix
+"""
+
+import hashlib
 import json
+import os
 import re
+import threading
 from pathlib import Path
 
+from data_catalog import get_catalog
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 RANK_TO_VALUE = {
     "Superb (+5)": 5,
     "Great (+4)": 4,
@@ -13,6 +49,16 @@ RANK_TO_VALUE = {
 
 BONUS_RE = re.compile(r"^\s*(.+?)\s*\(\s*([+-]?\d+)\s*\)\s*$")
 
+# Very small parser for the common stone pattern "+1 to Athletics".
+# If you expand stone effects later, upgrade this parser.
+STONE_BONUS_RE = re.compile(r"([+-]?\d+)\s*to\s*([A-Za-z]+)")
+
+# PC fields the result depends on (the memo key hashes only these)
+PC_FIELDS = ("skills", "race", "racial_bonuses", "standing_stone", "derived")
+
+MEMO_LIMIT = 256
+
+
 def parse_bonus_strings(bonus_list):
     """
     Converts ["Fight (+1)", "Athletics (+1)"] into {"Fight": 1, "Athletics": 1}
@@ -31,6 +77,7 @@ def parse_bonus_strings(bonus_list):
         out[skill] = out.get(skill, 0) + val
     return out
 
+
 def pyramid_to_base_skills(pc):
     """
     PC format: pc["skills"] = {"Good (+3)": ["Fight", "Stealth"], ...}
@@ -52,76 +99,275 @@ def pyramid_to_base_skills(pc):
                 base[sk] = v
     return base
 
+
+def stone_bonus_from_mechanic(game_mechanic):
+    """'+1 to Athletics, ...' -> {"Athletics": 1} (first bonus only)"""
+    m = STONE_BONUS_RE.search(game_mechanic or "")
+    return {m.group(2): int(m.group(1))} if m else {}
+
+
+def read_json_any_encoding(path):
+    """Parse a JSON file written in UTF-8, UTF-8 with BOM, cp1252 or Latin-1."""
+    data = Path(path).read_bytes()
+    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
+        try:
+            return json.loads(data.decode(enc))
+        except Exception:
+            continue
+    return json.loads(data.decode("latin-1", errors="replace"))
+
+
+def _pc_key(pc):
+    relevant = {field: pc.get(field) for field in PC_FIELDS}
+    text = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class SkillEngine:
+    """
+    Effective-skill calculator for one data directory.
+
+    Use ``get_skill_engine()`` for the shared instance per directory.
+    """
+
+    def __init__(self, data_dir="data", catalog=None):
+        self.data_dir = Path(data_dir)
+        self.catalog = catalog or get_catalog()
+        self._lock = threading.RLock()
+        self.skill_names = []
+        self._skill_index = {}
+        self._sources = None
+        self._stones = {}
+        self._races = {}
+        self._memo = {}
+        self._file_hashes = {}
+        self._fallback = {}
+
+    # ------------------------------------------------------------------
+    # Tables
+    # ------------------------------------------------------------------
+
+    def _index(self, skill):
+        i = self._skill_index.get(skill)
+        if i is None:
+            i = self._skill_index[skill] = len(self.skill_names)
+            self.skill_names.append(skill)
+        return i
+
+    def _sparse(self, bonuses):
+        """{skill: bonus} -> tuple of (skill index, bonus)"""
+        return tuple((self._index(skill), value) for skill, value in bonuses.items())
+
+    def _load(self, name):
+        path = self.data_dir / name
+        try:
+            return self.catalog.load_json_or_none(path)
+        except UnicodeDecodeError:
+            # Legacy cp1252 / Latin-1 files: parse once per file version
+            stamp = os.stat(path)
+            stamp = (stamp.st_mtime_ns, stamp.st_size)
+            cached = self._fallback.get(name)
+            if cached is None or cached[0] != stamp:
+                cached = self._fallback[name] = (stamp, read_json_any_encoding(path))
+            return cached[1]
+        except (IOError, ValueError) as e:
+            print(f"Warning: Skipping {name}: {e}")
+            return None
+
+    def _refresh_tables(self):
+        stones = self._load("standing_stones.json")
+        races = self._load("racial_traits.json")
+        sources = (stones, races)
+        if self._sources is not None and all(a is b for a, b in zip(sources, self._sources)):
+            return
+        self._stones = {}
+        for stone in (stones or {}).get("standing_stones", []) if isinstance(stones, dict) else []:
+            if isinstance(stone, dict) and stone.get("name"):
+                mechanic = (stone.get("effect") or {}).get("game_mechanic", "")
+                self._stones[stone["name"]] = self._sparse(stone_bonus_from_mechanic(mechanic))
+        self._races = {}
+        for race in (races or {}).get("races", []) if isinstance(races, dict) else []:
+            if isinstance(race, dict) and race.get("name"):
+                self._races[race["name"]] = self._sparse(parse_bonus_strings(race.get("skill_bonuses", [])))
+        self._sources = sources
+        self._memo.clear()
+
+    def stone_bonus(self, stone_name):
+        """{skill: bonus} for a standing stone name ({} if unknown)."""
+        with self._lock:
+            self._refresh_tables()
+            return {self.skill_names[i]: v for i, v in self._stones.get(stone_name, ())}
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+
+    def _compute(self, pc):
+        derived = pc.get("derived")
+        if isinstance(derived, dict) and isinstance(derived.get("effective_skills"), dict):
+            sources = derived.get("bonus_sources") or {}
+            return {
+                "base": pyramid_to_base_skills(pc),
+                "racial_bonus": dict(sources.get("race") or {}),
+                "standing_stone_bonus": dict(sources.get("standing_stone") or {}),
+                "effective": dict(derived["effective_skills"]),
+            }
+
+        base = self._sparse(pyramid_to_base_skills(pc))
+        racial = ()
+        if isinstance(pc.get("racial_bonuses"), dict):
+            racial = self._sparse(parse_bonus_strings(pc["racial_bonuses"].get("skill_bonuses", [])))
+        if not racial and pc.get("race"):
+            racial = self._races.get(pc["race"], ())
+        stone = self._stones.get(pc.get("standing_stone"), ()) if pc.get("standing_stone") else ()
+
+        names = self.skill_names
+        effective = {}
+        for part in (base, racial, stone):
+            for i, value in part:
+                effective[names[i]] = effective.get(names[i], 0) + value
+        return {
+            "base": {names[i]: v for i, v in base},
+            "racial_bonus": {names[i]: v for i, v in racial},
+            "standing_stone_bonus": {names[i]: v for i, v in stone},
+            "effective": effective,
+        }
+
+    @staticmethod
+    def _copy(result):
+        return {key: dict(value) for key, value in result.items()}
+
+    def compute(self, pc, key=None):
+        """
+        Effective skills of one PC sheet.
+
+        Returns:
+            dict with 'base', 'racial_bonus', 'standing_stone_bonus' and
+            'effective' ({skill: int} each)
+        """
+        with self._lock:
+            self._refresh_tables()
+            key = key or _pc_key(pc or {})
+            result = self._memo.get(key)
+            if result is None:
+                if len(self._memo) >= MEMO_LIMIT:
+                    self._memo.clear()
+                result = self._memo[key] = self._compute(pc or {})
+            return self._copy(result)
+
+    def compute_file(self, pc_path):
+        """Effective skills of a PC file; unchanged files are not re-read."""
+        path = Path(pc_path)
+        st = os.stat(path)
+        stamp = (str(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            digest = self._file_hashes.get(stamp)
+            if digest is None:
+                digest = hashlib.sha1(path.read_bytes()).hexdigest()
+                self._file_hashes = {s: d for s, d in self._file_hashes.items() if s[0] != stamp[0]}
+                self._file_hashes[stamp] = digest
+            self._refresh_tables()
+            key = "file:" + digest
+            if key in self._memo:
+                return self._copy(self._memo[key])
+        return self.compute(read_json_any_encoding(path), key=key)
+
+    def compute_party(self, pcs):
+        """
+        Effective skills of a whole party in one call.
+
+        Args:
+            pcs: PC sheets (dicts) and/or paths to PC files
+
+        Returns:
+            list of results, in the order given
+        """
+        with self._lock:
+            return [self.compute(pc) if isinstance(pc, dict) else self.compute_file(pc) for pc in pcs]
+
+    def party_matrix(self, pcs, skills=None):
+        """
+        Party effective skills as one integer matrix.
+
+        Args:
+            pcs: As for compute_party
+            skills: Skill columns (default: every skill any member has)
+
+        Returns:
+            (member names, skill names, matrix): an int NumPy array of shape
+            (members, skills) when NumPy is installed, nested lists
+            otherwise. Missing skills are 0 (Mediocre).
+        """
+        with self._lock:
+            results = self.compute_party(pcs)
+            names = []
+            for pc in pcs:
+                if isinstance(pc, dict):
+                    names.append(pc.get("name") or pc.get("id") or "?")
+                else:
+                    names.append(Path(pc).stem)
+            if skills is None:
+                seen = {}
+                for result in results:
+                    for skill in result["effective"]:
+                        seen.setdefault(skill, None)
+                skills = list(seen)
+            rows = [[result["effective"].get(skill, 0) for skill in skills] for result in results]
+        if NUMPY_AVAILABLE:
+            return names, list(skills), np.asarray(rows, dtype=int).reshape(len(rows), len(skills))
+        return names, list(skills), rows
+
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_skill_engine(data_dir="data"):
+    """Return the process-wide SkillEngine for data_dir."""
+    key = str(Path(data_dir).resolve())
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = _ENGINES[key] = SkillEngine(data_dir)
+        return engine
+
+
 def load_standing_stone_bonus(data_dir, stone_name):
     """
     Reads data/standing_stones.json (effect.game_mechanic contains '+1 to Athletics...')
     Returns {"Athletics": 1} etc.
     """
-    data_dir = Path(data_dir)
-    stones_path = data_dir / "standing_stones.json"
-    if not stones_path.exists() or not stone_name:
+    if not stone_name:
         return {}
+    return get_skill_engine(data_dir).stone_bonus(stone_name)
 
-    # Use Unicode-safe loading
-    data = stones_path.read_bytes()
-    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            stones = json.loads(data.decode(enc))
-            break
-        except Exception:
-            continue
-    else:
-        stones = json.loads(data.decode("latin-1", errors="replace"))
-    
-    for s in stones.get("standing_stones", []):
-        if s.get("name") == stone_name:
-            gm = (s.get("effect") or {}).get("game_mechanic", "")
-            # Very small parser for the common pattern "+1 to Athletics"
-            # If you expand stone effects later, upgrade this parser.
-            m = re.search(r"([+-]?\d+)\s*to\s*([A-Za-z]+)", gm)
-            if m:
-                return {m.group(2): int(m.group(1))}
-    return {}
 
 def compute_effective_skills(pc, data_dir="data"):
-    base = pyramid_to_base_skills(pc)
-
-    racial = pc.get("racial_bonuses", {}) or {}
-    racial_skill_bonus = parse_bonus_strings(racial.get("skill_bonuses", []))
+    return get_skill_engine(data_dir).compute(pc)
 
-    stone_bonus = load_standing_stone_bonus(data_dir, pc.get("standing_stone"))
 
-    effective = dict(base)
-    for sk, b in racial_skill_bonus.items():
-        effective[sk] = effective.get(sk, 0) + b
-    for sk, b in stone_bonus.items():
-        effective[sk] = effective.get(sk, 0) + b
+def compute_party_skills(pcs, data_dir="data"):
+    """compute_effective_skills for every PC (sheet or path) in pcs."""
+    return get_skill_engine(data_dir).compute_party(pcs)
 
-    return {
-        "base": base,
-        "racial_bonus": racial_skill_bonus,
-        "standing_stone_bonus": stone_bonus,
-        "effective": effective
-    }
 
 if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser()
-    ap.add_argument("--pc", required=True, help="Path to PC json (e.g., data/pcs/example_pc.json)")
+    ap.add_argument("--pc", required=True, action="append",
+                    help="Path to PC json (e.g., data/pcs/example_pc.json); repeat for a party")
     ap.add_argument("--data-dir", default="data", help="Data directory containing standing_stones.json")
+    ap.add_argument("--matrix", action="store_true", help="Print the party as one skill table")
     args = ap.parse_args()
 
-    p = Path(args.pc)
-    # Use Unicode-safe loading (matches export_repo.py approach)
-    data = p.read_bytes()
-    for enc in ("utf-8", "utf-8-sig", "cp1252", "latin-1"):
-        try:
-            pc = json.loads(data.decode(enc))
-            break
-        except Exception:
-            continue
+    engine = get_skill_engine(args.data_dir)
+    if args.matrix:
+        names, skills, matrix = engine.party_matrix(args.pc)
+        width = max(len(n) for n in names)
+        print(" " * width + "  " + "  ".join(f"{s[:6]:>6}" for s in skills))
+        for name, row in zip(names, matrix):
+            print(f"{name:<{width}}  " + "  ".join(f"{int(v):>6}" for v in row))
     else:
-        pc = json.loads(data.decode("latin-1", errors="replace"))
-    
-    out = compute_effective_skills(pc, data_dir=args.data_dir)
-    print(json.dumps(out, indent=2, ensure_ascii=False))
+        results = engine.compute_party(args.pc)
+        out = results[0] if len(results) == 1 else dict(zip(args.pc, results))
+        print(json.dumps(out, indent=2, ensure_ascii=False))
@@ -7,11 +7,110 @@ optimized for use with ChatGPT 5.2 for dynamic game simulation
 and narrative integration.
 """
 
+import hashlib
 import json
 import os
+import struct
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from campaign_state import compact, journal_path, load_state
+from context_pack import BYTES_PER_TOKEN, DEFAULT_BUDGET_TOKENS, ContextPackBuilder
+
+# Directories (relative to the repo root) included in the export
+EXPORT_DIRS = ['data', 'scripts', 'docs', 'state', 'logs', 'patches', 'source_material']
+
+# Root-level files included in the export: the README and the module packs
+ROOT_PATTERNS = ['README.md', '*.zip', '*.pdf']
+
+# Per-file content hashes, stored in the archive so the next export can
+# reuse the compressed members of files that did not change
+MANIFEST_NAME = "_export_manifest.json"
+
+# Already-compressed formats; deflating them again only costs time
+STORED_SUFFIXES = {'.pdf', '.zip', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.gz'}
+
+# Below this many changed bytes, compressing in-process beats starting a pool
+PARALLEL_MIN_BYTES = 1 << 20
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+
+def _hash_file(path):
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _compress_file(path, stored):
+    """
+    Read and (unless stored) raw-deflate one file.
+
+    Runs in a worker process, so it takes and returns only plain values.
+
+    Returns:
+        tuple: (crc32, uncompressed size, member bytes)
+    """
+    data = Path(path).read_bytes()
+    crc = zlib.crc32(data)
+    size = len(data)
+    if not stored:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        data = compressor.compress(data) + compressor.flush()
+    return crc, size, data
+
+
+def _read_raw_member(fp, info):
+    """Compressed bytes of one member of an open archive file."""
+    fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    fp.seek(header[9] + header[10], os.SEEK_CUR)
+    return fp.read(info.compress_size)
+
+
+def _write_raw_member(zipf, zinfo, data):
+    """Append an already-compressed member to a ZipFile opened for writing."""
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(data)
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf._didModify = True
+
+
+def _load_previous_export(path):
+    """
+    Manifest and member infos of an earlier export at path.
+
+    Returns:
+        tuple: ({arcname: manifest entry}, {arcname: ZipInfo}); empty dicts
+        when there is no usable previous export
+    """
+    try:
+        with zipfile.ZipFile(path) as previous:
+            manifest = json.loads(previous.read(MANIFEST_NAME).decode('utf-8'))
+            return manifest.get('files', {}), {i.filename: i for i in previous.infolist()}
+    except (IOError, OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return {}, {}
+
+
+def _is_export_archive(path):
+    """True if path is an archive written by export_to_zip."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+    except (IOError, OSError, zipfile.BadZipFile):
+        return False
+    return MANIFEST_NAME in names or "_chatgpt_context.json" in names
 
 
 def load_json_safely(path):
@@ -70,6 +169,9 @@ class RepositoryExporter:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.docs_dir.mkdir(parents=True, exist_ok=True)
         
+        # Built on first use; keeps minified records between packs
+        self._context_builder = None
+        
     def create_context_file(self):
         """Create a context file for ChatGPT with repository overview"""
         context = {
@@ -130,6 +232,34 @@ class RepositoryExporter:
         
         return context
     
+    def create_context_pack(self, output_file="skyrim_context_pack.json", budget_tokens=DEFAULT_BUDGET_TOKENS):
+        """
+        Write a context pack: the data records most relevant to the current
+        scene, minified to fit a token budget (see context_pack.py).
+        
+        Much smaller than the full export, for sessions where the assistant
+        only needs what is in play.
+        
+        Args:
+            output_file: Name of the output file (default: "skyrim_context_pack.json")
+            budget_tokens: Approximate size limit in tokens
+            
+        Returns:
+            str: Path to the created file, or None if it could not be written
+        """
+        campaign_state = load_state(self.repo_dir / "state" / "campaign_state.json")
+        if self._context_builder is None:
+            self._context_builder = ContextPackBuilder(self.data_dir)
+        pack = self._context_builder.build(campaign_state, budget_tokens=budget_tokens)
+        output_path = self.repo_dir / output_file
+        try:
+            output_path.write_text(pack.text, encoding='utf-8')
+        except (IOError, OSError) as e:
+            print(f"Error creating context pack: {e}")
+            return None
+        print(f"Context pack: {len(pack.included)} records, ~{pack.size // BYTES_PER_TOKEN} tokens -> {output_path}")
+        return str(output_path)
+    
     def collect_statistics(self):
         """
         Collect statistics about the campaign.
@@ -153,12 +283,21 @@ class RepositoryExporter:
         
         return stats
     
-    def export_to_zip(self, output_file="skyrim_ttrpg_export.zip"):
+    def export_to_zip(self, output_file="skyrim_ttrpg_export.zip", incremental=True, workers=None):
         """
         Export the entire repository to a .zip file.
         
+        The archive carries a manifest of per-file content hashes. When an
+        earlier export exists at the same path, files whose hash is unchanged
+        are copied over still compressed; only changed files are deflated,
+        spread across a process pool. PDFs, ZIPs and images are stored
+        without recompression.
+        
         Args:
             output_file: Name of the output zip file (default: "skyrim_ttrpg_export.zip")
+            incremental: Reuse unchanged members of the previous export (default: True)
+            workers: Processes used to compress changed files
+                     (default: one per CPU; 1 compresses in-process)
             
         Returns:
             str: Path to the created zip file, or None if export fails
@@ -197,46 +336,36 @@ class RepositoryExporter:
         for key, value in stats.items():
             print(f"  {key}: {value}")
         
-        # Create zip file
+        # Fold any pending campaign state journal into the snapshot so the
+        # exported state/campaign_state.json is current
+        campaign_state_file = self.repo_dir / "state" / "campaign_state.json"
+        if journal_path(campaign_state_file).exists():
+            compact(campaign_state_file)
+        
+        # Create zip file (written beside the old one, so its unchanged
+        # members can be copied over, then swapped in)
+        entries = self._export_entries(output_path, context_file, stats_file)
+        if incremental:
+            previous_files, previous_infos = _load_previous_export(output_path)
+        else:
+            previous_files, previous_infos = {}, {}
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
         try:
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add context files
-                zipf.write(context_file, "_chatgpt_context.json")
-                zipf.write(stats_file, "_statistics.json")
-                
-                # Add README
-                readme_path = self.repo_dir / "README.md"
-                if readme_path.exists():
-                    try:
-                        zipf.write(readme_path, "README.md")
-                    except (IOError, OSError) as e:
-                        print(f"Warning: Could not add README.md: {e}")
-                
-                # Add all data files
-                for directory in ['data', 'scripts', 'docs', 'state', 'logs', 'patches']:
-                    dir_path = self.repo_dir / directory
-                    if dir_path.exists():
-                        try:
-                            for file_path in dir_path.rglob("*"):
-                                if file_path.is_file():
-                                    # Skip __pycache__ and .pyc files
-                                    if '__pycache__' in file_path.parts or file_path.suffix == '.pyc':
-                                        continue
-                                    arcname = file_path.relative_to(self.repo_dir)
-                                    zipf.write(file_path, arcname)
-                                    print(f"  Added: {arcname}")
-                        except (IOError, OSError) as e:
-                            print(f"Warning: Error adding files from {directory}: {e}")
-                            continue
+            added, reused = self._write_archive(
+                tmp_path, output_path, entries, previous_files, previous_infos, workers
+            )
+            os.replace(tmp_path, output_path)
         except (IOError, OSError, zipfile.BadZipFile) as e:
             print(f"Error creating zip file: {e}")
             # Clean up temporary files
-            if context_file.exists():
-                context_file.unlink()
-            if stats_file.exists():
-                stats_file.unlink()
+            for path in (context_file, stats_file, tmp_path):
+                if path.exists():
+                    path.unlink()
             return None
         
+        if reused:
+            print(f"  Reused {reused} unchanged files from the previous export ({added} added)")
+        
         # Clean up temporary files
         try:
             context_file.unlink()
@@ -255,6 +384,136 @@ class RepositoryExporter:
         
         return str(output_path)
     
+    def _export_entries(self, output_path, *generated):
+        """
+        Files to export, in archive order.
+        
+        Args:
+            output_path: The export being written (never included)
+            *generated: Files created for this export, added at the archive root
+            
+        Returns:
+            list: (Path, arcname) pairs
+        """
+        skip = {output_path.resolve(), output_path.with_name(output_path.name + ".tmp").resolve()}
+        entries = [(path, path.name) for path in generated]
+        
+        root_files = set()
+        for pattern in ROOT_PATTERNS:
+            root_files.update(p for p in self.repo_dir.glob(pattern) if p.is_file())
+        for file_path in sorted(root_files):
+            # Earlier exports under another name are not module packs
+            if file_path.resolve() in skip or (file_path.suffix == '.zip' and _is_export_archive(file_path)):
+                continue
+            entries.append((file_path, file_path.name))
+        
+        for directory in EXPORT_DIRS:
+            dir_path = self.repo_dir / directory
+            if not dir_path.exists():
+                continue
+            try:
+                for file_path in sorted(dir_path.rglob("*")):
+                    # Skip __pycache__ and .pyc files
+                    if '__pycache__' in file_path.parts or file_path.suffix == '.pyc':
+                        continue
+                    if file_path.is_file() and file_path.resolve() not in skip:
+                        entries.append((file_path, file_path.relative_to(self.repo_dir).as_posix()))
+            except (IOError, OSError) as e:
+                print(f"Warning: Error adding files from {directory}: {e}")
+        return entries
+    
+    def _write_archive(self, path, previous_path, entries, previous_files, previous_infos, workers=None):
+        """
+        Write entries to a new archive at path.
+        
+        Members whose hash matches previous_files are copied raw from the
+        archive at previous_path; the rest are compressed here or in a pool.
+        
+        Returns:
+            tuple: (files compressed, files reused)
+        """
+        manifest = {}
+        plan = []      # (file_path, arcname, previous ZipInfo or None)
+        changed = []   # (file_path, arcname, stored)
+        for file_path, arcname in entries:
+            try:
+                size = file_path.stat().st_size
+                digest = _hash_file(file_path)
+            except (IOError, OSError) as e:
+                print(f"Warning: Could not add {arcname}: {e}")
+                continue
+            stored = file_path.suffix.lower() in STORED_SUFFIXES
+            compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            manifest[arcname] = {"sha256": digest, "size": size}
+            old = previous_infos.get(arcname)
+            if (old is None or previous_files.get(arcname, {}).get("sha256") != digest
+                    or old.compress_type != compress_type or old.file_size != size):
+                old = None
+                changed.append((file_path, arcname, stored))
+            plan.append((file_path, arcname, old))
+        
+        compressed = self._compress_changed(changed, workers)
+        
+        reused = 0
+        previous_fp = open(previous_path, 'rb') if any(old for _, _, old in plan) else None
+        try:
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for file_path, arcname, old in plan:
+                    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+                    if old is not None:
+                        data = _read_raw_member(previous_fp, old)
+                        zinfo.CRC, zinfo.file_size, zinfo.compress_type = old.CRC, old.file_size, old.compress_type
+                        reused += 1
+                    elif arcname in compressed:
+                        zinfo.CRC, zinfo.file_size, data = compressed[arcname][:3]
+                        zinfo.compress_type = compressed[arcname][3]
+                        print(f"  Added: {arcname}")
+                    else:
+                        continue
+                    zinfo.compress_size = len(data)
+                    _write_raw_member(zipf, zinfo, data)
+                manifest = {arcname: entry for arcname, entry in manifest.items() if arcname in zipf.NameToInfo}
+                zipf.writestr(MANIFEST_NAME, json.dumps({"version": 1, "files": manifest}, indent=2))
+        finally:
+            if previous_fp is not None:
+                previous_fp.close()
+        return len(plan) - reused, reused
+    
+    def _compress_changed(self, changed, workers=None):
+        """
+        Compress changed files, in a process pool when there is enough work.
+        
+        Returns:
+            dict: arcname -> (crc32, size, member bytes, compress_type)
+        """
+        paths = [str(file_path) for file_path, _, _ in changed]
+        stored = [flag for _, _, flag in changed]
+        results = None
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(changed) > 1:
+            total = 0
+            for file_path, _, _ in changed:
+                try:
+                    total += file_path.stat().st_size
+                except (IOError, OSError):
+                    pass
+            if total >= PARALLEL_MIN_BYTES:
+                try:
+                    with ProcessPoolExecutor(max_workers=min(workers, len(changed))) as pool:
+                        results = list(pool.map(_compress_file, paths, stored, chunksize=8))
+                except (OSError, NotImplementedError, BrokenProcessPool) as e:
+                    print(f"Warning: Parallel compression unavailable ({e}); compressing in-process")
+        
+        compressed = {}
+        for i, (file_path, arcname, is_stored) in enumerate(changed):
+            try:
+                crc, size, data = results[i] if results is not None else _compress_file(paths[i], is_stored)
+            except (IOError, OSError) as e:
+                print(f"Warning: Could not add {arcname}: {e}")
+                continue
+            compressed[arcname] = (crc, size, data, zipfile.ZIP_STORED if is_stored else zipfile.ZIP_DEFLATED)
+        return compressed
+    
     def create_quick_reference(self):
         """
         Create a quick reference guide for the current campaign state.
@@ -357,6 +616,10 @@ def main():
     # Export to zip
     export_file = exporter.export_to_zip()
     
+    # Scene-focused pack for sessions that do not need the whole repository
+    print()
+    exporter.create_context_pack()
+    
     if export_file:
         print("\n" + "="*60)
         print("Export package is ready for ChatGPT 5.2 integration!")
@@ -14,6 +14,8 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from clock_simulator import forecast
+
 
 class FactionManager:
     def __init__(self, data_dir="../data"):
@@ -285,6 +287,30 @@ class FactionManager:
         
         return changes_made
     
+    def forecast_clocks(self, turns=20, runs=2000, interference=0.0, overrides=None, match=None, seed=None):
+        """
+        Forecast when clocks fill by simulating many turns, without saving anything
+        
+        Unlike simulate_faction_turn, every clock in factions.json,
+        data/clocks/ and thalmor_arcs.json is advanced over thousands of
+        in-memory rollouts.
+        
+        Args:
+            turns: Turns to simulate
+            runs: Number of rollouts
+            interference: Chance per turn that a clock is held
+            overrides: {clock id / source: interference} (e.g. {"thalmor_arcs": 0.5})
+            match: Only clocks whose id or name contains this text
+            seed: Seed for reproducible forecasts
+        
+        Returns:
+            SimulationResult
+        """
+        result = forecast(self.data_dir, match=match, turns=turns, runs=runs,
+                          interference=interference, overrides=overrides, seed=seed)
+        print(f"\n{result.report()}")
+        return result
+    
     def faction_conflict_resolution(self, faction1_id, faction2_id):
         """
         Resolve conflict between two factions
@@ -624,10 +650,11 @@ def main():
     print("5. Update Faction Resources")
     print("6. Simulate Faction Turn")
     print("7. Faction Conflict Resolution")
-    print("8. Exit")
+    print("8. Forecast Clocks")
+    print("9. Exit")
     
     while True:
-        choice = input("\nEnter choice (1-8): ").strip()
+        choice = input("\nEnter choice (1-9): ").strip()
         
         if choice == "1":
             manager.list_all_factions()
@@ -664,11 +691,18 @@ def main():
             manager.faction_conflict_resolution(faction1, faction2)
         
         elif choice == "8":
+            turns = input("Turns to simulate (default 20): ").strip()
+            interference = input("Interference chance 0-1 (default 0): ").strip()
+            match = input("Only clocks matching (blank for all): ").strip()
+            manager.forecast_clocks(turns=int(turns or 20), interference=float(interference or 0),
+                                    match=match or None)
+        
+        elif choice == "9":
             print("Goodbye!")
             break
         
         else:
-            print("Invalid choice. Please enter 1-8.")
+            print("Invalid choice. Please enter 1-9.")
 
 
 if __name__ == "__main__":
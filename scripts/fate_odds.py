@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Fate Odds for Skyrim TTRPG
+
+Exact outcome probabilities for Fate Core checks rolled on 4dF.
+
+A check compares skill + bonuses + 4dF against a difficulty (passive
+opposition) or against an opponent's skill + 4dF (active opposition). The
+margin decides the outcome:
+
+    margin < 0   fail
+    margin = 0   tie
+    margin 1-2   success
+    margin >= 3  success with style
+
+Invokes add +2 each, stunts add their listed bonus. Probabilities are exact
+(counted over all 81 or 6561 dice combinations), not sampled.
+
+Batch mode scores every party member against every enemy in one call. With
+NumPy installed it is a single table lookup over the whole grid; without
+NumPy the same numbers come back as nested lists.
+"""
+
+import re
+from itertools import product
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+OUTCOMES = ("fail", "tie", "success", "success_with_style")
+
+# Fate Core adjective ladder
+LADDER = {
+    "legendary": 8,
+    "epic": 7,
+    "fantastic": 6,
+    "superb": 5,
+    "great": 4,
+    "good": 3,
+    "fair": 2,
+    "average": 1,
+    "mediocre": 0,
+    "poor": -1,
+    "terrible": -2,
+}
+
+RANK_VALUE_RE = re.compile(r"\(\s*([+-]?\d+)\s*\)")
+STUNT_BONUS_RE = re.compile(r"\+(\d+)\s+to\s+([A-Z][A-Za-z]+)")
+
+
+def _dice_counts(n_dice):
+    """{total: number of ways} for n Fate dice."""
+    counts = {}
+    for faces in product((-1, 0, 1), repeat=n_dice):
+        total = sum(faces)
+        counts[total] = counts.get(total, 0) + 1
+    return counts
+
+
+# 4dF for a passive check; 8dF is the difference of two 4dF rolls (the
+# distribution of a - b equals that of a + b because 4dF is symmetric)
+_PASSIVE = _dice_counts(4)
+_OPPOSED = _dice_counts(8)
+
+
+def _outcome_index(margin):
+    if margin < 0:
+        return 0
+    if margin == 0:
+        return 1
+    if margin < 3:
+        return 2
+    return 3
+
+
+def _outcome_probs(shift, counts):
+    """Outcome probabilities when the margin is shift + dice."""
+    total = float(sum(counts.values()))
+    probs = [0.0, 0.0, 0.0, 0.0]
+    for dice, ways in counts.items():
+        probs[_outcome_index(shift + dice)] += ways / total
+    return probs
+
+
+def _table(counts):
+    """
+    Outcome probabilities for every shift that matters.
+
+    Shifts outside [lo, hi] give the same answer as the nearest bound.
+    """
+    spread = max(counts)
+    lo, hi = -spread - 1, spread + 3
+    return lo, hi, [_outcome_probs(shift, counts) for shift in range(lo, hi + 1)]
+
+
+_PASSIVE_TABLE = _table(_PASSIVE)
+_OPPOSED_TABLE = _table(_OPPOSED)
+
+
+def _lookup(shift, opposed):
+    lo, hi, rows = _OPPOSED_TABLE if opposed else _PASSIVE_TABLE
+    return rows[min(max(shift, lo), hi) - lo]
+
+
+def check_odds(skill, opposition=0, bonus=0, invokes=0, opposed=False):
+    """
+    Exact outcome distribution of one check.
+
+    Args:
+        skill: Skill rating (e.g. 3 for Good)
+        opposition: Difficulty, or the opponent's skill if opposed
+        bonus: Flat bonus (stunts, situational modifiers)
+        invokes: Aspect invokes, +2 each
+        opposed: Opponent also rolls 4dF (active opposition)
+
+    Returns:
+        dict: outcome name -> probability (sums to 1)
+    """
+    shift = int(skill) + int(bonus) + 2 * int(invokes) - int(opposition)
+    return dict(zip(OUTCOMES, _lookup(shift, opposed)))
+
+
+def success_chance(skill, opposition=0, bonus=0, invokes=0, opposed=False, ties_succeed=False):
+    """Probability of succeeding (optionally counting ties) on one check."""
+    odds = check_odds(skill, opposition, bonus, invokes, opposed)
+    p = odds["success"] + odds["success_with_style"]
+    return p + odds["tie"] if ties_succeed else p
+
+
+def tri_check_odds(checks, ties_succeed=False):
+    """
+    Distribution of successes over a Tri-Check (or any series of checks).
+
+    Args:
+        checks: Iterable of dicts with check_odds() keyword arguments,
+                e.g. [{"skill": 3, "opposition": 2}, {"skill": 2, "opposition": 4, "invokes": 1}, ...]
+        ties_succeed: Count ties as successes
+
+    Returns:
+        dict with 'successes' (count -> probability), 'expected' successes
+        and 'per_check' success chances
+    """
+    per_check = [success_chance(ties_succeed=ties_succeed, **check) for check in checks]
+    dist = [1.0]
+    for p in per_check:
+        nxt = [0.0] * (len(dist) + 1)
+        for k, q in enumerate(dist):
+            nxt[k] += q * (1 - p)
+            nxt[k + 1] += q * p
+        dist = nxt
+    return {
+        "successes": dict(enumerate(dist)),
+        "expected": sum(per_check),
+        "per_check": per_check,
+    }
+
+
+# ----------------------------------------------------------------------
+# Stat sheets
+# ----------------------------------------------------------------------
+
+def rank_value(rank):
+    """
+    Ladder value of a skill rank key: "Great", "Good (+3)", "+2" ...
+
+    Returns:
+        int, or None if the rank is not recognised
+    """
+    if not isinstance(rank, str):
+        return None
+    match = RANK_VALUE_RE.search(rank)
+    if match:
+        return int(match.group(1))
+    word = rank.strip().split(" ")[0].lower()
+    if word in LADDER:
+        return LADDER[word]
+    try:
+        return int(word)
+    except ValueError:
+        return None
+
+
+def skill_ratings(sheet):
+    """{skill name: rating} from a stat sheet or PC skill pyramid."""
+    ratings = {}
+    skills = (sheet or {}).get("skills")
+    if not isinstance(skills, dict):
+        return ratings
+    for rank, names in skills.items():
+        value = rank_value(rank)
+        if value is None or not isinstance(names, list):
+            continue
+        for name in names:
+            if isinstance(name, str):
+                ratings[name] = max(value, ratings.get(name, value))
+    return ratings
+
+
+def stunt_bonuses(sheet):
+    """
+    {skill name: [(bonus, stunt text), ...]} for stunts of the form
+    "+2 to Shoot ...". Conditional stunts are included; the GM decides
+    whether they apply.
+    """
+    bonuses = {}
+    for stunt in (sheet or {}).get("stunts") or []:
+        if isinstance(stunt, dict):
+            text = " ".join(str(v) for v in stunt.values() if isinstance(v, str))
+        else:
+            text = str(stunt)
+        for value, skill in STUNT_BONUS_RE.findall(text):
+            bonuses.setdefault(skill, []).append((int(value), text))
+    return bonuses
+
+
+def sheet_rating(sheet, skill, use_stunts=True):
+    """
+    Skill rating from a sheet, plus the best stunt bonus for that skill.
+
+    Missing skills default to Mediocre (+0).
+    """
+    rating = skill_ratings(sheet).get(skill, 0)
+    if use_stunts:
+        stunt = max((b for b, _ in stunt_bonuses(sheet).get(skill, ())), default=0)
+        rating += stunt
+    return rating
+
+
+# ----------------------------------------------------------------------
+# Batch mode
+# ----------------------------------------------------------------------
+
+def batch_odds(skills, oppositions, bonus=0, invokes=0, opposed=False):
+    """
+    Outcome probabilities for every (skill, opposition) pair.
+
+    Args:
+        skills: Sequence of n skill ratings (e.g. the party)
+        oppositions: Sequence of m difficulties / opposing skills (e.g. the encounter)
+        bonus, invokes, opposed: As for check_odds, applied to every pair
+
+    Returns:
+        With NumPy: float array of shape (n, m, 4) in OUTCOMES order.
+        Without NumPy: n x m nested lists of 4-element lists.
+    """
+    lo, hi, rows = _OPPOSED_TABLE if opposed else _PASSIVE_TABLE
+    extra = int(bonus) + 2 * int(invokes)
+
+    if NUMPY_AVAILABLE:
+        table = np.asarray(rows, dtype=float)
+        shifts = (np.asarray(skills, dtype=int)[:, None] + extra
+                  - np.asarray(oppositions, dtype=int)[None, :])
+        return table[np.clip(shifts, lo, hi) - lo]
+
+    return [[list(rows[min(max(s + extra - o, lo), hi) - lo]) for o in oppositions] for s in skills]
+
+
+def party_vs_encounter(party, enemies, skill, opposition_skill=None, invokes=0, use_stunts=True):
+    """
+    Opposed-check odds of every party member against every enemy.
+
+    Args:
+        party: List of PC / NPC sheets
+        enemies: List of enemy stat sheets
+        skill: Skill the party rolls (e.g. "Fight")
+        opposition_skill: Skill the enemies roll (default: same skill)
+        invokes: Invokes assumed for every party roll
+        use_stunts: Add the best "+N to <skill>" stunt on each side
+
+    Returns:
+        dict with 'party' / 'enemies' names, their 'ratings', and 'odds'
+        from batch_odds(..., opposed=True)
+    """
+    opposition_skill = opposition_skill or skill
+    party_ratings = [sheet_rating(s, skill, use_stunts) for s in party]
+    enemy_ratings = [sheet_rating(s, opposition_skill, use_stunts) for s in enemies]
+    return {
+        "party": [s.get("name", s.get("id", "?")) for s in party],
+        "enemies": [s.get("name", s.get("id", "?")) for s in enemies],
+        "party_ratings": party_ratings,
+        "enemy_ratings": enemy_ratings,
+        "odds": batch_odds(party_ratings, enemy_ratings, invokes=invokes, opposed=True),
+    }
@@ -6,6 +6,9 @@ from datetime import datetime
 import argparse
 from typing import Optional, Any, Dict
 from utils import EXAMPLE_PC_FILENAME
+from campaign_state import campaign_state_transaction, load_state, save_state
+from data_catalog import get_catalog
+from keyword_matcher import KeywordMatcher, get_token_cache, normalize
 
 
 def load_json(path):
@@ -95,30 +98,62 @@ def ensure_npc_first_impressions_schema(state: dict) -> None:
         nf[npc_id] = {}
 
 
+def _npc_path(repo_root: Path, npc_id: str) -> Optional[Path]:
+    """NPC file for npc_id: data/npcs first, then data/npc_stat_sheets."""
+    for p in (repo_root / "data" / "npcs" / f"{npc_id}.json",
+              repo_root / "data" / "npc_stat_sheets" / f"{npc_id}.json"):
+        if p.exists():
+            return p
+    return None
+
+
+def _read_npc(path: Path) -> dict:
+    try:
+        return get_catalog().load_json(path)
+    except UnicodeDecodeError:
+        try:
+            return load_json(path)
+        except Exception:
+            pass
+    except Exception:
+        pass
+    return {}
+
+
 def load_npc_metadata(repo_root: Path, npc_id: str) -> dict:
     """
     Best-effort NPC metadata loader.
     Checks data/npcs first, then data/npc_stat_sheets.
+
+    Files are parsed once through the shared DataCatalog (re-read only when
+    they change), so the returned dict is cached and must not be modified.
     """
-    candidates = [
-        repo_root / "data" / "npcs" / f"{npc_id}.json",
-        repo_root / "data" / "npc_stat_sheets" / f"{npc_id}.json"
-    ]
-    for p in candidates:
-        if p.exists():
-            try:
-                return load_json(p)
-            except Exception:
-                pass
-    return {}
+    path = _npc_path(repo_root, npc_id)
+    return _read_npc(path) if path is not None else {}
+
+
+def _npc_blob_of_file(path):
+    return build_npc_blob(_read_npc(path))
+
+
+def npc_tokens(repo_root: Path, npc_id: str) -> str:
+    """
+    normalize(build_npc_blob(npc)) for npc_id, cached by the NPC file's
+    stamp; the blob is only rebuilt when the file changes.
+    """
+    path = _npc_path(repo_root, npc_id)
+    if path is None:
+        return ""
+    return get_token_cache().file(path, _npc_blob_of_file)
 
 
-def infer_disposition(repo_root: Path, npc_id: str, state: dict) -> str:
+def infer_disposition(repo_root: Path, npc_id: str, state: dict, npc: Optional[dict] = None) -> str:
     """
     Determine default disposition bucket: neutral | positive | negative
     based on civil war alignment + obvious faction tags.
     """
-    npc = load_npc_metadata(repo_root, npc_id)
+    if npc is None:
+        npc = load_npc_metadata(repo_root, npc_id)
     player_alliance = (state.get("civil_war_state") or {}).get("player_alliance", "")
     player_alliance = (player_alliance or "").lower()
 
@@ -173,22 +208,72 @@ def build_npc_blob(npc: dict) -> str:
     return " ".join(parts).lower()
 
 
-def select_impression_lines(appearance: dict, disposition: str, npc_id: str, npc_blob: str) -> tuple[list, str]:
-    conds = appearance.get("conditional_first_impression_lines") or []
+def _compile_conditions(conds):
+    """
+    (matcher, [(condition, any_keys, all_keys)]) for an appearance's
+    conditional lines; every blob keyword across all conditions goes into
+    one matcher.
+    """
+    keywords, rules = set(), []
     for c in conds:
         if not isinstance(c, dict):
             continue
+        any_kw = [normalize(x) for x in (c.get("if_npc_blob_any") or [])]
+        all_kw = [normalize(x) for x in (c.get("if_npc_blob_all") or [])]
+        keywords.update(any_kw)
+        keywords.update(all_kw)
+        rules.append((c, any_kw, all_kw))
+    return KeywordMatcher(keywords), rules
+
+
+# appearance path -> ((mtime_ns, size), appearance, compiled conditions)
+_APPEARANCES = {}
+
 
+def _load_appearance(path):
+    """
+    (appearance, compiled conditions) for an appearance file, parsed and
+    compiled once per file version (mtime + size). The appearance dict is
+    shared and must not be modified.
+    """
+    path = Path(path)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(path.resolve())
+    cached = _APPEARANCES.get(key)
+    if cached is None or cached[0] != stamp:
+        appearance = load_json(path)
+        compiled = _compile_conditions(appearance.get("conditional_first_impression_lines") or [])
+        cached = _APPEARANCES[key] = (stamp, appearance, compiled)
+    return cached[1], cached[2]
+
+
+def select_impression_lines(appearance: dict, disposition: str, npc_id: str, npc_blob: Optional[str],
+                            compiled: Optional[tuple] = None, tokens: Optional[str] = None) -> tuple[list, str]:
+    """
+    Lines for disposition from the first conditional block that matches the
+    NPC, else the appearance's default lines. compiled is the appearance's
+    conditions as _load_appearance() returns them (compiled here if omitted);
+    tokens is the already normalized blob (npc_tokens()), used instead of
+    npc_blob.
+    """
+    if compiled is None:
+        compiled = _compile_conditions(appearance.get("conditional_first_impression_lines") or [])
+    matcher, rules = compiled
+    hits = None
+    for c, any_kw, all_kw in rules:
         id_list = c.get("if_npc_id_in") or []
         if id_list and npc_id not in id_list:
             continue
 
-        any_kw = [str(x).lower() for x in (c.get("if_npc_blob_any") or [])]
-        all_kw = [str(x).lower() for x in (c.get("if_npc_blob_all") or [])]
-
-        if any_kw and not any(k in npc_blob for k in any_kw):
+        # Blob keywords match whole words; the blob is scanned at most once.
+        if (any_kw or all_kw) and hits is None:
+            if tokens is None:
+                tokens = get_token_cache().text(npc_blob)
+            hits = matcher.match_normalized(tokens)
+        if any_kw and not any(k in hits for k in any_kw):
             continue
-        if all_kw and not all(k in npc_blob for k in all_kw):
+        if all_kw and not all(k in hits for k in all_kw):
             continue
 
         lines_dict = c.get("lines") or {}
@@ -201,14 +286,54 @@ def select_impression_lines(appearance: dict, disposition: str, npc_id: str, npc
     return lines, "default"
 
 
-def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neutral", force=False):
-    state = load_json(state_path)
-    appearance = load_json(appearance_path)
+def _require_state(state_path):
+    state = load_state(state_path)
+    if state is None:
+        raise FileNotFoundError(f"Missing campaign state: {state_path}")
+    return state
 
-    ensure_npc_first_impressions_schema(state)
 
-    state.setdefault("npc_first_impressions", {})
+def _needs_impression(state, appearance, pc_id, npc_id, force):
+    """False if npc_id already has an impression of pc_id for the current look."""
+    existing = (state["npc_first_impressions"].get(npc_id) or {}).get(pc_id)
+    if not existing or force:
+        return True
+    # If a record exists, allow auto-refresh if appearance_revision changed.
+    current_rev = appearance.get("appearance_revision")
+    old_rev = existing.get("appearance_revision")
+    return bool(current_rev and old_rev and (old_rev != current_rev))
+
+
+def _record_impression(state, appearance, compiled, pc_id, npc_id, disposition, repo_root):
+    """Pick and store npc_id's first impression of pc_id; returns the line."""
+    lines, source_id = select_impression_lines(appearance, disposition, npc_id, None, compiled,
+                                               tokens=npc_tokens(repo_root, npc_id))
+    line = random.choice(lines) if lines else None
+
     state["npc_first_impressions"].setdefault(npc_id, {})
+    state["npc_first_impressions"][npc_id][pc_id] = {
+        "timestamp": datetime.now().isoformat(),
+        "disposition": disposition,
+        "line": line,
+        "source": source_id,
+        "recognition_tags": appearance.get("recognition_tags", []),
+        "appearance_revision": appearance.get("appearance_revision")
+    }
+    return line
+
+
+def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neutral", force=False):
+    """
+    Record (and return) a first-impression bark for npc_id meeting the
+    active PC. Inside a campaign_state_transaction the save is deferred to
+    the end of the transaction.
+
+    For several NPCs at once use impressions_for_scene().
+    """
+    state = _require_state(state_path)
+    appearance, compiled = _load_appearance(appearance_path)
+
+    ensure_npc_first_impressions_schema(state)
 
     # Determine which PC key to store under
     resolved_pc_id = resolve_active_pc_id(state)
@@ -218,43 +343,71 @@ def maybe_first_impression(state_path, appearance_path, npc_id, disposition="neu
     if not isinstance(resolved_pc_id, str):
         return None
 
-    # If a record exists, allow auto-refresh if appearance_revision changed.
-    existing = state["npc_first_impressions"][npc_id].get(resolved_pc_id)
-    current_rev = appearance.get("appearance_revision")
-    if existing and not force:
-        old_rev = existing.get("appearance_revision")
-        if current_rev and old_rev and (old_rev != current_rev):
-            pass  # re-roll a new bark because the PC's look changed
-        else:
-            return None
+    state["npc_first_impressions"].setdefault(npc_id, {})
+    if not _needs_impression(state, appearance, resolved_pc_id, npc_id, force):
+        return None
 
     repo_root = Path(state_path).resolve().parent.parent
-    npc_meta = load_npc_metadata(repo_root, npc_id)
-    npc_blob = build_npc_blob(npc_meta)
+    line = _record_impression(state, appearance, compiled, resolved_pc_id, npc_id, disposition, repo_root)
 
-    lines, source_id = select_impression_lines(appearance, disposition, npc_id, npc_blob)
-    line = random.choice(lines) if lines else None
+    save_state(state_path, state)
+    return line
 
-    state["npc_first_impressions"][npc_id][resolved_pc_id] = {
-        "timestamp": datetime.now().isoformat(),
-        "disposition": disposition,
-        "line": line,
-        "source": source_id,
-        "recognition_tags": appearance.get("recognition_tags", []),
-        "appearance_revision": current_rev
-    }
 
-    save_json(state_path, state)
-    return line
+def impressions_for_scene(state_path, appearance_path, npc_ids, dispositions=None, force=False):
+    """
+    First impressions for every NPC in a scene with one state load, one
+    appearance load and one write.
+
+    Args:
+        state_path: campaign_state.json
+        appearance_path: The active PC's appearance file
+        npc_ids: NPC ids in the scene (repeats are ignored)
+        dispositions: {npc_id: disposition} and/or a default bucket string;
+            NPCs without one get infer_disposition()
+        force: Re-roll impressions that are already recorded
+
+    Returns:
+        dict {npc_id: line} for the NPCs that got a new impression (line may
+        be None when the appearance file has no lines for them)
+    """
+    if isinstance(dispositions, str):
+        default, dispositions = dispositions, {}
+    else:
+        default, dispositions = None, dispositions or {}
+
+    with campaign_state_transaction(state_path):
+        state = _require_state(state_path)
+        appearance, compiled = _load_appearance(appearance_path)
+
+        ensure_npc_first_impressions_schema(state)
+        pc_id = resolve_active_pc_id(state)
+        if not pc_id or not isinstance(pc_id, str):
+            return {}
+
+        repo_root = Path(state_path).resolve().parent.parent
+        recorded = {}
+        for npc_id in dict.fromkeys(npc_ids):
+            state["npc_first_impressions"].setdefault(npc_id, {})
+            if not _needs_impression(state, appearance, pc_id, npc_id, force):
+                continue
+            disposition = dispositions.get(npc_id) or default or infer_disposition(repo_root, npc_id, state)
+            recorded[npc_id] = _record_impression(state, appearance, compiled, pc_id, npc_id, disposition, repo_root)
+
+        if recorded:
+            save_state(state_path, state)
+        return recorded
 
 
 def auto_first_impression(repo_root, npc_id, disposition=None, force=False, quiet=False, trigger=None):
     repo_root = Path(repo_root).resolve()
     state_path = repo_root / "state" / "campaign_state.json"
-    if not state_path.exists():
-        raise FileNotFoundError(f"Missing campaign state: {state_path}")
+    with campaign_state_transaction(state_path):
+        return _auto_first_impression(repo_root, state_path, npc_id, disposition, force, quiet)
+
 
-    state = load_json(state_path)
+def _auto_first_impression(repo_root, state_path, npc_id, disposition, force, quiet):
+    state = _require_state(state_path)
     pc_id = resolve_active_pc_id(state)
     if not pc_id:
         if not quiet:
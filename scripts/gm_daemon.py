@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+GM Daemon for Skyrim TTRPG
+
+A long-lived process that keeps GMTools, StoryManager and DataQueryManager
+loaded, so mid-session lookups skip the interpreter start, the imports and
+the first parse of quests, clocks and stat sheets. The process-wide caches
+(DataCatalog, quest graph, text index, loot tables) stay warm between
+requests and still reload any file that changes on disk.
+
+Requests are JSON-RPC 2.0, one JSON object per line, served over a
+Unix-domain socket or over stdin/stdout:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "query.query_npcs", "params": {"location": "Whiterun"}}
+
+Methods are "<service>.<method>" for the public methods of
+    gm     GMTools
+    story  StoryManager
+    query  DataQueryManager
+plus daemon.ping, daemon.methods, daemon.reload and daemon.shutdown.
+Anything a method prints is returned in the result's "output" field next
+to its "value". Methods that ask for keyboard input fail instead of
+blocking the daemon.
+
+Usage:
+    python3 gm_daemon.py serve                      # socket at state/gm_daemon.sock
+    python3 gm_daemon.py serve --stdio              # JSON-RPC on stdin/stdout
+    python3 gm_daemon.py call daemon.methods
+    python3 gm_daemon.py call query.query_npcs location=Whiterun
+    python3 gm_daemon.py call gm.tri_check_result 2
+"""
+
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOCKET = REPO_ROOT / "state" / "gm_daemon.sock"
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RPCError(Exception):
+    """An error reported to the client as a JSON-RPC error object."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _to_json(value):
+    """Make a method's return value JSON-safe."""
+    return json.loads(json.dumps(value, default=lambda o: sorted(o) if isinstance(o, (set, frozenset)) else str(o)))
+
+
+class GMDaemon:
+    """
+    Dispatches JSON-RPC requests to resident manager instances.
+
+    Requests run one at a time: the managers are not thread-safe and
+    printed output is captured per request.
+    """
+
+    def __init__(self, data_dir=None, state_dir=None):
+        self.data_dir = Path(data_dir or REPO_ROOT / "data")
+        self.state_dir = Path(state_dir or REPO_ROOT / "state")
+        self.started = time.time()
+        self.requests = 0
+        self.shutdown_requested = False
+        self._lock = threading.Lock()
+        self.services = {}
+        self.reload()
+
+    def reload(self):
+        """(Re)create the manager instances."""
+        # Imported here so `gm_daemon.py call` stays a thin, fast client
+        from gm_tools import GMTools
+        from query_data import DataQueryManager
+        from story_manager import StoryManager
+
+        # Keep stdout clean for the stdio transport
+        with contextlib.redirect_stdout(sys.stderr):
+            self.services = {
+                "gm": GMTools(str(self.data_dir), str(self.state_dir)),
+                "story": StoryManager(str(self.data_dir), str(self.state_dir)),
+                "query": DataQueryManager(str(self.data_dir)),
+            }
+        return sorted(self.services)
+
+    def warm(self):
+        """Parse the commonly used data up front."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            query = self.services["query"]
+            query.query_npcs()
+            query.query_quests()
+            query.list_all_stat_sheets()
+            query.text_index()
+
+    def methods(self):
+        """Every callable method name."""
+        names = ["daemon.methods", "daemon.ping", "daemon.reload", "daemon.shutdown"]
+        for service, obj in sorted(self.services.items()):
+            for name, _ in inspect.getmembers(obj, callable):
+                if not name.startswith("_"):
+                    names.append(f"{service}.{name}")
+        return names
+
+    def _resolve(self, method):
+        if not isinstance(method, str) or "." not in method:
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method!r}")
+        service, name = method.split(".", 1)
+        if service == "daemon":
+            builtin = {
+                "ping": lambda: {"pid": os.getpid(), "uptime": round(time.time() - self.started, 3),
+                                 "requests": self.requests},
+                "methods": self.methods,
+                "reload": self.reload,
+                "shutdown": self._request_shutdown,
+            }.get(name)
+            if builtin is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return builtin
+        obj = self.services.get(service)
+        if obj is None or name.startswith("_") or not callable(getattr(obj, name, None)):
+            raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        return getattr(obj, name)
+
+    def _request_shutdown(self):
+        self.shutdown_requested = True
+        return True
+
+    def call(self, method, params=None):
+        """
+        Run one method.
+
+        Returns:
+            dict with the method's return 'value' and printed 'output'
+
+        Raises:
+            RPCError: Unknown method, bad params, or the method failed
+        """
+        fn = self._resolve(method)
+        args, kwargs = ([], params or {}) if isinstance(params, dict) else (params or [], {})
+        if not isinstance(args, list):
+            raise RPCError(INVALID_PARAMS, "params must be an array or an object")
+        try:
+            inspect.signature(fn).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RPCError(INVALID_PARAMS, str(e))
+
+        with self._lock:
+            self.requests += 1
+            output = io.StringIO()
+            real_stdin = sys.stdin
+            # No keyboard here: input() raises EOFError instead of blocking
+            sys.stdin = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(output):
+                    value = fn(*args, **kwargs)
+            except EOFError:
+                raise RPCError(SERVER_ERROR, f"{method} needs interactive input; run it from its own script")
+            except Exception as e:
+                raise RPCError(SERVER_ERROR, f"{type(e).__name__}: {e}")
+            finally:
+                sys.stdin = real_stdin
+        return {"value": _to_json(value), "output": output.getvalue()}
+
+    def handle(self, line):
+        """
+        Answer one request line.
+
+        Returns:
+            The response line, or None for a notification (no "id")
+        """
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise RPCError(PARSE_ERROR, f"Parse error: {e}")
+            if not isinstance(request, dict) or "method" not in request:
+                raise RPCError(INVALID_REQUEST, "Invalid request")
+            request_id = request.get("id")
+            result = self.call(request["method"], request.get("params"))
+            if "id" not in request:
+                return None
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RPCError as e:
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+        return json.dumps(response)
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+
+def serve_stdio(daemon, stdin=None, stdout=None):
+    """Answer requests line by line from stdin until EOF or daemon.shutdown."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        response = daemon.handle(line)
+        if response is not None:
+            stdout.write(response + "\n")
+            stdout.flush()
+        if daemon.shutdown_requested:
+            break
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace")
+            if not line.strip():
+                continue
+            response = self.server.gm_daemon.handle(line)
+            if response is not None:
+                self.wfile.write((response + "\n").encode("utf-8"))
+                self.wfile.flush()
+            if self.server.gm_daemon.shutdown_requested:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _socket_in_use(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serve_socket(daemon, socket_path=DEFAULT_SOCKET):
+    """
+    Serve requests on a Unix-domain socket until daemon.shutdown.
+
+    Raises:
+        RuntimeError: If another daemon already owns the socket
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if _socket_in_use(socket_path):
+            raise RuntimeError(f"A GM daemon is already listening on {socket_path}")
+        socket_path.unlink()
+
+    server = _SocketServer(str(socket_path), _Handler)
+    server.gm_daemon = daemon
+    os.chmod(socket_path, 0o600)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+def request(method, params=None, socket_path=DEFAULT_SOCKET, timeout=30.0):
+    """
+    Send one request to a running daemon.
+
+    Returns:
+        The result dict ({'value': ..., 'output': ...})
+
+    Raises:
+        ConnectionError: If no daemon is listening
+        RPCError: If the daemon reports an error
+    """
+    message = {"jsonrpc": "2.0", "id": 1, "method": method}
+    if params is not None:
+        message["params"] = params
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except AttributeError:
+        raise ConnectionError("Unix sockets are not available here; use `gm_daemon.py serve --stdio`")
+    with conn:
+        conn.settimeout(timeout)
+        try:
+            conn.connect(str(socket_path))
+        except OSError as e:
+            raise ConnectionError(f"No GM daemon at {socket_path} ({e}); start one with `gm_daemon.py serve`")
+        conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with conn.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("GM daemon closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RPCError(response["error"].get("code", SERVER_ERROR), response["error"].get("message", ""))
+    return response.get("result")
+
+
+def _parse_cli_params(items):
+    """`key=value` pairs become an object, bare values an array; values are JSON if they parse."""
+    def value(text):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
+
+    if not items:
+        return None
+    if all("=" in item and not item.startswith(("{", "[", '"')) for item in items):
+        return {k: value(v) for k, v in (item.split("=", 1) for item in items)}
+    return [value(item) for item in items]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident GM server and client")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run the daemon")
+    serve.add_argument("--socket", default=str(DEFAULT_SOCKET), help="Unix socket path")
+    serve.add_argument("--stdio", action="store_true", help="Serve JSON-RPC on stdin/stdout instead")
+    serve.add_argument("--data-dir", default=str(REPO_ROOT / "data"))
+    serve.add_argument("--state-dir", default=str(REPO_ROOT / "state"))
+    serve.add_argument("--no-warm", action="store_true", help="Skip parsing data at startup")
+
+    call = sub.add_parser("call", help="Send one request to a running daemon")
+    call.add_argument("method", help="e.g. query.query_npcs, gm.view_all_clocks, daemon.methods")
+    call.add_argument("params", nargs="*", help="key=value pairs or positional values (JSON or text)")
+    call.add_argument("--socket", default=str(DEFAULT_SOCKET))
+    call.add_argument("--json", action="store_true", help="Print the raw result as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        daemon = GMDaemon(args.data_dir, args.state_dir)
+        if not args.no_warm:
+            daemon.warm()
+        if args.stdio:
+            serve_stdio(daemon)
+            return 0
+        if not hasattr(socket, "AF_UNIX"):
+            print("Unix sockets are not available here; use --stdio", file=sys.stderr)
+            return 1
+        print(f"GM daemon listening on {args.socket} (pid {os.getpid()})", file=sys.stderr)
+        try:
+            serve_socket(daemon, args.socket)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    try:
+        result = request(args.method, _parse_cli_params(args.params), args.socket)
+    except (ConnectionError, RPCError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    if result.get("output"):
+        print(result["output"], end="" if result["output"].endswith("\n") else "\n")
+    if result.get("value") is not None:
+        value = result["value"]
+        print(value if isinstance(value, str) else json.dumps(value, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,10 @@ from pathlib import Path
 from datetime import datetime
 from utils import location_matches
 from story_manager import StoryManager
+from query_data import DataQueryManager
+from campaign_state import load_state
+from clock_registry import get_clock_registry
+import fate_odds
 
 
 class GMTools:
@@ -30,6 +34,10 @@ class GMTools:
             with open(filepath, 'r') as f:
                 return json.load(f)
         return None
+
+    def load_campaign_state(self):
+        """Load campaign state (the shared live dict inside a transaction)"""
+        return load_state(self.state_dir / "campaign_state.json")
     
     def view_all_clocks(self):
         """Display all active clocks in the campaign"""
@@ -37,48 +45,70 @@ class GMTools:
         print("ACTIVE CLOCKS OVERVIEW")
         print("="*70)
         
+        registry = get_clock_registry(self.data_dir, self.state_dir / "campaign_state.json")
+        
+        # Clocks about to fill, from every source
+        nearly_full = registry.nearly_full(include_filled=False)
+        if nearly_full:
+            print("\n=== NEARLY FULL ===\n")
+            for clock in nearly_full:
+                print(f"  {clock.name}: {self._clock_bar(clock)} - {clock.remaining} segments remaining ({clock.id})")
+        
         # Faction clocks
         factions_data = self.load_json(self.data_dir / "factions.json")
         if factions_data:
             print("\n=== FACTION CLOCKS ===\n")
             
+            faction_clocks = {}
+            for clock in registry.by_source("factions"):
+                if clock.location[2] == "clocks":
+                    faction_clocks.setdefault(clock.location[1], []).append(clock)
             for faction_id, faction in factions_data.get('major_factions', {}).items():
-                if 'clocks' in faction:
+                if faction_id in faction_clocks:
                     print(f"{faction['name']}:")
-                    for clock in faction['clocks']:
-                        progress = clock['progress']
-                        segments = clock['segments']
-                        bar = '█' * progress + '░' * (segments - progress)
-                        percentage = (progress / segments * 100) if segments > 0 else 0
-                        
-                        print(f"  {clock['name']}: [{bar}] {progress}/{segments} ({percentage:.0f}%)")
-                        print(f"    Effect: {clock['effect']}")
+                    for clock in faction_clocks[faction_id]:
+                        print(f"  {clock.name}: {self._clock_bar(clock)}")
+                        print(f"    Effect: {clock.effect}")
                         
                         # Warnings
-                        if progress >= segments:
+                        if clock.filled:
                             print(f"    ⚠️  CLOCK FILLED!")
-                        elif progress >= segments * 0.75:
-                            print(f"    ⚠️  Almost full - {segments - progress} segments remaining")
+                        elif clock.ratio >= 0.75:
+                            print(f"    ⚠️  Almost full - {clock.remaining} segments remaining")
                     print()
         
         # Thalmor arcs
-        thalmor_data = self.load_json(self.data_dir / "thalmor_arcs.json")
-        if thalmor_data:
+        arc_clocks = registry.by_source("thalmor_arcs")
+        if arc_clocks:
             print("\n=== THALMOR PLOTS ===\n")
             
-            for arc in thalmor_data.get('thalmor_overarching_arc', {}).get('arcs', []):
-                print(f"{arc['name']}:")
-                for phase in arc.get('phases', []):
-                    progress = phase.get('clock_progress', 0)
-                    segments = phase.get('clock_max', 10)
-                    bar = '█' * progress + '░' * (segments - progress)
-                    
-                    print(f"  Phase {phase['phase']}: {phase['name']}")
-                    print(f"    [{bar}] {progress}/{segments}")
-                print()
+            arc = None
+            for clock in arc_clocks:
+                if clock.location[2] != arc:
+                    if arc is not None:
+                        print()
+                    arc = clock.location[2]
+                    print(f"{clock.name.split(': ', 1)[0]}:")
+                print(f"  Phase {clock.key.rsplit('phase_', 1)[-1]}: {clock.name.split(': ', 1)[-1]}")
+                print(f"    {self._clock_bar(clock)}")
+            print()
+        
+        # Clock files and campaign state clocks
+        other = [c for c in registry if c.source not in ("factions", "thalmor_arcs")]
+        if other:
+            print("\n=== STORY CLOCKS ===\n")
+            
+            source = None
+            for clock in other:
+                if clock.source != source:
+                    source = clock.source
+                    print(f"{source}:")
+                status = f" [{clock.status}]" if clock.frozen else ""
+                print(f"  {clock.name}: {self._clock_bar(clock)}{status}")
+            print()
         
         # Campaign state arcs
-        campaign_state = self.load_json(self.state_dir / "campaign_state.json")
+        campaign_state = self.load_campaign_state()
         if campaign_state:
             print("\n=== STORY ARCS ===\n")
             
@@ -88,6 +118,11 @@ class GMTools:
                 print(f"  Next: {arc['next_milestone']}")
                 print()
     
+    @staticmethod
+    def _clock_bar(clock):
+        bar = '█' * clock.current + '░' * clock.remaining
+        return f"[{bar}] {clock.current}/{clock.maximum} ({clock.ratio * 100:.0f}%)"
+    
     def get_faction_hooks(self, faction_id=None):
         """Get plot hooks and current objectives for factions"""
         factions_data = self.load_json(self.data_dir / "factions.json")
@@ -168,7 +203,7 @@ class GMTools:
         print("CAMPAIGN OVERVIEW")
         print("="*70)
         
-        campaign_state = self.load_json(self.state_dir / "campaign_state.json")
+        campaign_state = self.load_campaign_state()
         if not campaign_state:
             print("Campaign state not found")
             return
@@ -232,7 +267,7 @@ class GMTools:
         print("NEXT SESSION SUGGESTIONS")
         print("="*70)
         
-        campaign_state = self.load_json(self.state_dir / "campaign_state.json")
+        campaign_state = self.load_campaign_state()
         if not campaign_state:
             print("Campaign state not found")
             return
@@ -640,11 +675,84 @@ NPC attitudes:
             print("✘ **Failure (0/3)**: You do not succeed, but the story moves forward with consequences.")
             print("Narrative: The attempt fails or causes a serious setback. The party must deal with fallout, but the GM should ensure this propels the story (not a dead end).")
     
+    def tri_check_odds(self, checks, ties_succeed=False):
+        """
+        Show the odds of each Tri-Check outcome before the dice are rolled.
+        
+        Args:
+            checks: Three dicts of check_odds() arguments, e.g.
+                    [{"skill": 3, "opposition": 2}, {"skill": 2, "opposition": 4, "invokes": 1}, ...]
+            ties_succeed: Count ties as successes
+        
+        Returns:
+            Dict from fate_odds.tri_check_odds()
+        """
+        result = fate_odds.tri_check_odds(checks, ties_succeed=ties_succeed)
+        labels = {
+            3: "★ Full Success (3/3)",
+            2: "✓ Major Success (2/3)",
+            1: "≈ Partial Success (1/3)",
+            0: "✘ Failure (0/3)",
+        }
+        print("\n" + "="*70)
+        print("TRI-CHECK ODDS")
+        print("="*70)
+        for i, (check, p) in enumerate(zip(checks, result["per_check"]), 1):
+            print(f"  Check {i}: skill {check.get('skill', 0):+d} vs {check.get('opposition', 0):+d}"
+                  f" → {p:.0%} success")
+        for successes in sorted(result["successes"], reverse=True):
+            label = labels.get(successes, f"{successes} successes")
+            print(f"  {label}: {result['successes'][successes]:.1%}")
+        print(f"  Expected successes: {result['expected']:.2f}")
+        return result
+    
+    def _load_sheet(self, sheet_id):
+        """Load a PC or NPC/enemy sheet by id (file name or 'id' field)."""
+        for path in (self.data_dir / "pcs" / f"{sheet_id}.json",
+                     self.npc_stat_sheets_dir / f"{sheet_id}.json"):
+            sheet = self.load_json(path)
+            if sheet:
+                return sheet
+        return DataQueryManager(str(self.data_dir)).get_npc_enemy_stat_by_id(sheet_id)
+    
+    def encounter_odds(self, party_ids, enemy_ids, skill="Fight", opposition_skill=None, invokes=0):
+        """
+        Show opposed-check odds for every party member against every enemy.
+        
+        Args:
+            party_ids: PC or NPC ids rolling `skill`
+            enemy_ids: Enemy stat sheet ids rolling `opposition_skill`
+            skill: Party skill (default Fight)
+            opposition_skill: Enemy skill (default: same as skill)
+            invokes: Invokes assumed for every party roll
+        
+        Returns:
+            Dict from fate_odds.party_vs_encounter(), or None if nothing loaded
+        """
+        party = [sheet for sheet in map(self._load_sheet, party_ids) if sheet]
+        enemies = [sheet for sheet in map(self._load_sheet, enemy_ids) if sheet]
+        if not party or not enemies:
+            print("Could not load the party or the enemies.")
+            return None
+        
+        report = fate_odds.party_vs_encounter(party, enemies, skill, opposition_skill, invokes=invokes)
+        odds = report["odds"]
+        print("\n" + "="*70)
+        print(f"ENCOUNTER ODDS: {skill} vs {opposition_skill or skill}")
+        print("="*70)
+        for i, name in enumerate(report["party"]):
+            print(f"\n{name} ({report['party_ratings'][i]:+d}):")
+            for j, enemy in enumerate(report["enemies"]):
+                fail, tie, success, style = (float(x) for x in odds[i][j])
+                print(f"  vs {enemy} ({report['enemy_ratings'][j]:+d}): "
+                      f"win {success + style:.0%} (style {style:.0%}), tie {tie:.0%}, lose {fail:.0%}")
+        return report
+    
     def review_companion_loyalty(self):
         """
         Review active companions' loyalty and suggest narrative consequences or unlocks.
         """
-        campaign_state = self.load_json(self.state_dir / "campaign_state.json")
+        campaign_state = self.load_campaign_state()
         if not campaign_state or "companions" not in campaign_state:
             print("No companions data found in campaign state.")
             return
@@ -13,6 +13,8 @@ Integration:
 from __future__ import annotations
 from typing import Any, Dict, List, Literal, Optional
 
+from location_gazetteer import get_gazetteer
+
 ActNumber = Literal[1, 2, 3]
 AssaultOutcome = Literal[
     "hall_holds_kodlak_lives",
@@ -390,16 +392,16 @@ def jorrvaskr_assault_triggers(loc: str, state: Dict[str, Any]) -> List[str]:
             "Proceeding to companions_funeral_rites."
         ]
 
-    loc_lower = str(loc).lower()
+    loc_terms = get_gazetteer().mentions(loc)
     events: List[str] = []
 
-    if any(k in loc_lower for k in ["jorrvaskr_yard", "outer_yard", "training_yard"]):
+    if any(k in loc_terms for k in ["jorrvaskr_yard", "outer_yard", "training_yard"]):
         events.extend(assault_act1_outer_yard(state))
 
-    if any(k in loc_lower for k in ["jorrvaskr_grand_hall", "grand_hall", "jorrvaskr_downstairs"]):
+    if any(k in loc_terms for k in ["jorrvaskr_grand_hall", "grand_hall", "jorrvaskr_downstairs"]):
         events.extend(assault_act2_grand_hall(state))
 
-    if any(k in loc_lower for k in ["harbinger", "kodlak", "harbinger_room", "jorrvaskr_harbinger"]):
+    if any(k in loc_terms for k in ["harbinger", "kodlak", "harbinger_room", "jorrvaskr_harbinger"]):
         events.extend(assault_act3_commanders_gambit(state))
 
     return events
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher for Skyrim TTRPG
+
+Whole-word keyword matching shared by first impressions
+(if_npc_blob_any / if_npc_blob_all) and relationship inference
+(backstory keywords).
+
+A rule set is compiled once into an Aho-Corasick automaton (the same one
+the location gazetteer uses), and one pass over a normalized text reports
+every keyword or phrase ("Great War") it contains. Only whole words count:
+"Whiterun's" and "Stormcloaks" still hit "Whiterun" and "Stormcloak", but
+"Nord" no longer hits "Nordic" or "Talos" hits "Talosian".
+
+Normalized texts are cached by content hash (sha1 of the text, or of the
+file bytes for files), and each matcher memoizes its results, so
+re-checking an unchanged NPC blob or PC backstory is a dict lookup.
+"""
+
+import hashlib
+import os
+import re
+from pathlib import Path
+
+CACHE_LIMIT = 4096  # entries kept per cache before it is cleared
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lower-case words of text separated by single spaces."""
+    if not isinstance(text, str):
+        text = "" if text is None else str(text)
+    text = text.lower().replace("'", "").replace("’", "")
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+class Automaton:
+    """Aho-Corasick automaton over a fixed set of patterns."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        for pattern in patterns:
+            if pattern:
+                self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+                self.goto[state][ch] = nxt
+            state = nxt
+        self.out[state] = self.out[state] + (pattern,)
+
+    def _link(self):
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text):
+        """(end index, pattern) for every occurrence of every pattern."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in out[state]:
+                yield i, pattern
+
+
+class KeywordMatcher:
+    """
+    A compiled set of keywords, matched on whole words in one pass.
+
+    Keywords are compared in normalize() form; a keyword with no word
+    characters at all matches every text (as the old substring test did).
+    """
+
+    def __init__(self, keywords):
+        self.keywords = frozenset(normalize(k) for k in keywords)
+        self._always = frozenset(k for k in self.keywords if not k)
+        self._automaton = Automaton(sorted(self.keywords))
+        self._memo = {}
+
+    def match(self, text):
+        """Set of (normalized) keywords found in text."""
+        return self.match_normalized(normalize(text))
+
+    def match_normalized(self, norm):
+        """match() for a text already in normalize() form (e.g. from TokenCache)."""
+        found = self._memo.get(norm)
+        if found is None:
+            hits = set(self._always)
+            n = len(norm)
+            for end, pattern in self._automaton.finditer(norm):
+                start = end - len(pattern) + 1
+                if start and norm[start - 1] != " ":
+                    continue
+                # Whole word, or the word plus "s" ("stormcloaks", "ulfric's")
+                after = end + 1
+                if after < n and norm[after] == "s":
+                    after += 1
+                if after == n or norm[after] == " ":
+                    hits.add(pattern)
+            if len(self._memo) >= CACHE_LIMIT:
+                self._memo.clear()
+            found = self._memo[norm] = frozenset(hits)
+        return found
+
+
+class TokenCache:
+    """
+    Normalized texts (as KeywordMatcher.match takes them) keyed by content
+    hash of the string or file they came from.
+    """
+
+    def __init__(self, limit=CACHE_LIMIT):
+        self.limit = limit
+        self._texts = {}
+        self._stamps = {}
+
+    def _store(self, key, make_text):
+        norm = self._texts.get(key)
+        if norm is None:
+            if len(self._texts) >= self.limit:
+                self._texts.clear()
+            norm = self._texts[key] = normalize(make_text())
+        return norm
+
+    def text(self, text):
+        """normalize(text), cached by the sha1 of text."""
+        text = str(text)
+        return self._store(hashlib.sha1(text.encode("utf-8")).hexdigest(), lambda: text)
+
+    def file(self, path, to_text):
+        """
+        normalize(to_text(path)), cached by the sha1 of the file's bytes.
+
+        to_text receives the path and returns the text to match against
+        (e.g. a PC's backstory); it only runs when the file's content is new.
+        A file whose stat is unchanged is not read at all.
+        """
+        path = Path(path)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        name = getattr(to_text, "__qualname__", repr(to_text))
+        seen = self._stamps.get((path, name))
+        if seen and seen[0] == stamp and seen[1] in self._texts:
+            return self._texts[seen[1]]
+        key = hashlib.sha1(path.read_bytes()).hexdigest() + ":" + name
+        norm = self._store(key, lambda: to_text(path))
+        self._stamps[(path, name)] = (stamp, key)
+        return norm
+
+
+_CACHE = TokenCache()
+
+
+def get_token_cache():
+    """The per-process text cache shared by all matchers."""
+    return _CACHE
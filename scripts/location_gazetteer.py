@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Location Gazetteer for Skyrim TTRPG
+
+Canonical places compiled from the hold and location data:
+- data/holds/*.json: holds, capitals, districts, major_settlements and
+  major_locations
+- location_string_aliases / areas in data/locations/*.json and
+  data/holds/whiterun_jorvaskr_map.json
+
+Every name and alias is compiled into one Aho-Corasick automaton, so any
+free-text location ("Whiterun - Plains District", "jorrvaskr_grand_hall",
+"Dustman's Cairn") is resolved in a single pass over the string:
+
+    >>> get_gazetteer().resolve("Jarl's Longhouse, Falkreath").id
+    'falkreath_jarls_longhouse'
+
+Text is normalized before matching (lower case, apostrophes dropped, any
+other punctuation or underscores read as a space). Place names only match
+whole words. The most specific place wins (area > district > settlement or
+site > hold); a name shared by several holds is settled by the other places
+named in the same string.
+
+Trigger modules ask about plain keywords through mentions(). Keywords match
+anywhere in the text, like the `in loc_lower` tests they replace. A keyword
+asked about for the first time is answered from the normalized text and
+queued; the next scan compiles every queued keyword into the same automaton
+in one rebuild. Keyword lists known up front can be added at import with
+register_keywords(). Results are memoized per string until the data files
+or the keywords change.
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from data_catalog import get_catalog
+from keyword_matcher import Automaton as _Automaton, normalize
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Higher is more specific
+KIND_RANK = {
+    "hold": 0,
+    "settlement": 1,
+    "site": 1,
+    "district": 2,
+    "area": 3,
+}
+
+# major_locations types that count as somewhere people live
+SETTLEMENT_TYPES = {"city", "town", "village", "settlement", "mining camp"}
+
+# Upper bound on memoized strings per gazetteer
+_MEMO_LIMIT = 4096
+
+# Seconds get_gazetteer() trusts its last look at the data files
+CHECK_INTERVAL = 1.0
+
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+
+# Keywords asked about through mentions(), shared by every gazetteer so a
+# reload keeps them
+_KEYWORDS = set()
+_KEYWORDS_LOCK = threading.Lock()
+
+
+def slugify(text):
+    """Identifier form of a name: "The Jarl's Longhouse" -> "jarls_longhouse"."""
+    norm = normalize(text)
+    if norm.startswith("the ") and len(norm) > 4:
+        norm = norm[4:]
+    return norm.replace(" ", "_")
+
+
+def _split_name(name):
+    """("Whiterun", "city") from "Whiterun (City)"."""
+    qualifier = _PAREN_RE.search(name)
+    base = _PAREN_RE.sub("", name).strip()
+    return base, (qualifier.group(1).strip().lower() if qualifier else "")
+
+
+class Location:
+    """One canonical place."""
+
+    __slots__ = ("id", "name", "kind", "hold", "parent", "tags")
+
+    def __init__(self, id, name, kind, hold=None, parent=None, tags=()):
+        self.id = id
+        self.name = name
+        self.kind = kind
+        self.hold = hold
+        self.parent = parent
+        self.tags = frozenset(tags)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "kind": self.kind,
+            "hold": self.hold,
+            "parent": self.parent,
+            "tags": sorted(self.tags),
+        }
+
+    def __repr__(self):
+        return f"Location({self.id!r}, kind={self.kind!r}, hold={self.hold!r})"
+
+
+class _Scan:
+    """Everything one pass of the automaton found in one string."""
+
+    __slots__ = ("norm", "places", "keywords", "known", "location")
+
+    def __init__(self, norm, places, keywords, known, location):
+        self.norm = norm
+        self.places = places
+        self.keywords = keywords
+        self.known = known        # the keywords the automaton was compiled with
+        self.location = location
+
+
+class LocationMentions:
+    """
+    What a location string mentions, for trigger checks.
+
+    `"market" in mentions` is true when "market" occurs anywhere in the
+    normalized text (like `"market" in loc.lower()`); `location` is the
+    resolved place and `places` every place named.
+    """
+
+    __slots__ = ("_gazetteer", "text", "_scan")
+
+    def __init__(self, gazetteer, text):
+        self._gazetteer = gazetteer
+        self.text = text
+        self._scan = None
+
+    def __contains__(self, keyword):
+        key = normalize(keyword)
+        if not key:
+            return False
+        scan = self._get_scan()
+        if key in scan.known:
+            return key in scan.keywords
+        # New keyword: answer from the text and queue it, so the next scan
+        # compiles it together with any others first seen since the last one
+        register_keywords([key])
+        return key in scan.norm
+
+    def _get_scan(self):
+        if self._scan is None:
+            self._scan = self._gazetteer._scan(self.text)
+        return self._scan
+
+    @property
+    def location(self):
+        return self._get_scan().location
+
+    @property
+    def places(self):
+        return self._get_scan().places
+
+    @property
+    def keywords(self):
+        """Every compiled keyword that occurs in the text."""
+        return self._get_scan().keywords
+
+    def __repr__(self):
+        return f"LocationMentions({self.text!r})"
+
+
+def register_keywords(keywords):
+    """Add trigger keywords to every gazetteer's automaton (at its next scan)."""
+    added = {normalize(k) for k in keywords}
+    added.discard("")
+    with _KEYWORDS_LOCK:
+        _KEYWORDS.update(added)
+
+
+class LocationGazetteer:
+    """
+    Canonical places and the compiled resolver over their names.
+
+    Usage:
+        gazetteer = get_gazetteer()
+        place = gazetteer.resolve("Whiterun - Plains District")
+        place.id, place.hold             # 'whiterun_plains_district', 'whiterun_hold'
+        "market" in gazetteer.mentions("Riften Marketplace")   # True
+    """
+
+    def __init__(self, places, terms):
+        """
+        Args:
+            places: {location id: Location}
+            terms: {normalized name or alias: [location id, ...]}
+        """
+        self.places = places
+        self.terms = {term: tuple(ids) for term, ids in terms.items() if term}
+        self.version = None   # data version it was built from (get_gazetteer)
+        self._lock = threading.RLock()
+        self._memo = {}
+        self._same_memo = {}
+        self._automaton = None
+        self._keyword_count = -1
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_data(cls, data_dir=None, catalog=None):
+        """Compile the gazetteer from data/holds and data/locations."""
+        data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+        catalog = catalog or get_catalog()
+        builder = _Builder()
+        layouts = []
+        for sub in ("holds", "locations"):
+            for path, record in catalog.scan(data_dir / sub).records:
+                if not isinstance(record, dict):
+                    continue
+                if isinstance(record.get("location_string_aliases"), dict) or isinstance(record.get("areas"), list):
+                    layouts.append(record)
+                elif record.get("hold"):
+                    builder.add_hold(record)
+        # Layouts hang off districts and holds, so add them last
+        for record in layouts:
+            builder.add_layout(record)
+        return cls(builder.places, builder.terms)
+
+    def _current(self):
+        with _KEYWORDS_LOCK:
+            count = len(_KEYWORDS)
+        return self._automaton is not None and self._keyword_count == count
+
+    def _compile(self):
+        with _KEYWORDS_LOCK:
+            keywords = frozenset(_KEYWORDS)
+        self._automaton = _Automaton(sorted(set(self.terms) | keywords))
+        self._keywords = keywords
+        self._keyword_count = len(keywords)
+        self._memo.clear()
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _scan(self, text):
+        norm = normalize(text)
+        with self._lock:
+            if not self._current():
+                self._compile()
+            scan = self._memo.get(norm)
+            if scan is not None:
+                return scan
+
+            spans = []
+            keywords = set()
+            for end, pattern in self._automaton.finditer(norm):
+                if pattern in self._keywords:
+                    keywords.add(pattern)
+                if pattern in self.terms:
+                    start = end - len(pattern) + 1
+                    # Place names match whole words only
+                    if (start == 0 or norm[start - 1] == " ") and (end + 1 == len(norm) or norm[end + 1] == " "):
+                        spans.append((start, end, pattern))
+
+            places = []
+            for _, _, term in spans:
+                for location_id in self.terms[term]:
+                    place = self.places[location_id]
+                    if place not in places:
+                        places.append(place)
+            scan = _Scan(norm, tuple(places), frozenset(keywords), self._keywords, self._pick(spans))
+
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[norm] = scan
+            return scan
+
+    def _pick(self, spans):
+        """The most specific place among the names found."""
+        # A name inside a longer name ("whiterun" in "whiterun hold") does not count
+        outer = [s for s in spans
+                 if not any(o[0] <= s[0] and s[1] <= o[1] and (o[1] - o[0]) > (s[1] - s[0]) for o in spans)]
+        if not outer:
+            return None
+        # How many names point into each hold, to settle shared names
+        support = {}
+        for term in {s[2] for s in outer}:
+            for hold in {self.places[i].hold for i in self.terms[term]}:
+                support[hold] = support.get(hold, 0) + 1
+        candidates = []
+        for _, _, term in outer:
+            for location_id in self.terms[term]:
+                place = self.places[location_id]
+                candidates.append((-KIND_RANK.get(place.kind, 0), -support.get(place.hold, 0), -len(term), place.id))
+        return self.places[min(candidates)[3]]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, location_id):
+        """Location by canonical id, or None."""
+        return self.places.get(location_id)
+
+    def resolve(self, text):
+        """The canonical Location a free-text location refers to, or None."""
+        return self._scan(text).location
+
+    def find_all(self, text):
+        """Every Location named in text (including names inside longer names)."""
+        return list(self._scan(text).places)
+
+    def mentions(self, text):
+        """LocationMentions for trigger keyword checks on text."""
+        return LocationMentions(self, text)
+
+    def hold_of(self, text):
+        """Canonical hold id of a free-text location, or None."""
+        place = self.resolve(text)
+        return place.hold if place is not None else None
+
+    def is_settlement(self, text):
+        """True if text names a settlement or somewhere inside one."""
+        return any("settlement" in place.tags for place in self._scan(text).places)
+
+    def same_place(self, a, b):
+        """True if two free-text locations resolve to the same canonical place."""
+        key = (a, b)
+        same = self._same_memo.get(key)
+        if same is None:
+            place_a = self.resolve(a)
+            same = place_a is not None and place_a is self.resolve(b)
+            if len(self._same_memo) >= _MEMO_LIMIT:
+                self._same_memo.clear()
+            self._same_memo[key] = same
+        return same
+
+
+class _Builder:
+    """Collects places and names while reading the data files."""
+
+    def __init__(self):
+        self.places = {}
+        self.terms = {}
+        self._holds = {}
+
+    def _add(self, place, *names):
+        if place.id in self.places:
+            return self.places[place.id]
+        self.places[place.id] = place
+        for name in (place.id,) + names:
+            term = normalize(name)
+            if term.startswith("the ") and len(term) > 4:
+                self._term(term[4:], place.id)
+            self._term(term, place.id)
+        return place
+
+    def _term(self, term, location_id):
+        ids = self.terms.setdefault(term, [])
+        if location_id not in ids:
+            ids.append(location_id)
+
+    def _hold_id(self, name):
+        norm = normalize(name)
+        if norm in self._holds:
+            return self._holds[norm]
+        base = norm[4:] if norm.startswith("the ") else norm
+        if base.endswith(" hold"):
+            base = base[:-5]
+        return base.replace(" ", "_") + "_hold"
+
+    def add_hold(self, record):
+        hold_name = record["hold"]
+        hold_id = self._hold_id(hold_name)
+        self._holds[normalize(hold_name)] = hold_id
+        names = [hold_name]
+        # "Eastmarch Hold" is also just "Eastmarch"; "Whiterun Hold" is not "Whiterun"
+        short = normalize(hold_name)
+        if short.endswith(" hold"):
+            short = short[:-5]
+            if short != normalize(record.get("capital") or ""):
+                names.append(short)
+        self._add(Location(hold_id, hold_name, "hold", hold_id, None, ("hold",)), *names)
+
+        capital = record.get("capital")
+        capital_id = slugify(capital) if capital else None
+
+        settlements = []
+        for entry in record.get("major_settlements") or []:
+            if isinstance(entry, str):
+                settlements.append(_split_name(entry))
+        for entry in record.get("major_locations") or []:
+            if isinstance(entry, dict) and entry.get("name"):
+                base, qualifier = _split_name(entry["name"])
+                settlements.append((base, (entry.get("type") or qualifier).lower()))
+        if capital and not any(normalize(base) == normalize(capital) for base, _ in settlements):
+            settlements.append((capital, "city"))
+
+        for base, kind_text in settlements:
+            is_settlement = not kind_text or kind_text in SETTLEMENT_TYPES or kind_text.split(" ")[0] in SETTLEMENT_TYPES
+            tags = {"settlement"} if is_settlement else {"site"}
+            if kind_text:
+                tags.add(slugify(kind_text.split(" on ")[0]))
+            location_id = slugify(base)
+            if location_id == capital_id:
+                tags.add("capital")
+            self._add(Location(location_id, base, "settlement" if is_settlement else "site", hold_id, hold_id, tags), base)
+
+        for entry in record.get("districts") or []:
+            name = entry.get("name") if isinstance(entry, dict) else entry
+            if not isinstance(name, str):
+                continue
+            slug = slugify(name)
+            location_id = slug if not capital_id or slug.startswith(capital_id) else f"{capital_id}_{slug}"
+            place = Location(location_id, name, "district", hold_id, capital_id or hold_id,
+                             ("district", "settlement"))
+            self._add(place, name, f"{capital} {name}" if capital else name)
+            # Shared names ("Jarl's Longhouse") point at every hold's district
+            self._term(normalize(name), location_id)
+
+    def add_layout(self, record):
+        hold_text = str(record.get("hold") or "").split("/")[0].strip()
+        hold_id = self._hold_id(hold_text) if hold_text else None
+        group = record.get("location_group") or ""
+        parent = hold_id
+        in_settlement = False
+        district = record.get("district")
+        if district:
+            for place in self.places.values():
+                if place.kind == "district" and place.hold == hold_id and normalize(place.name) == normalize(district):
+                    parent = place.id
+                    in_settlement = True
+                    break
+
+        for area in record.get("areas") or []:
+            if not isinstance(area, dict) or not area.get("id"):
+                continue
+            tags = {"area"} | {t for t in area.get("tags") or [] if isinstance(t, str)}
+            if group:
+                tags.add(slugify(group))
+            if in_settlement:
+                tags.add("settlement")
+            name = area.get("name") or area["id"]
+            base, _ = _split_name(name)
+            names = [part.strip() for part in base.split("/") if part.strip()]
+            self._add(Location(area["id"], base or name, "area", hold_id, parent, tags), *names)
+
+        for alias, target in (record.get("location_string_aliases") or {}).items():
+            if alias.startswith("_") or not isinstance(target, str) or target not in self.places:
+                continue
+            self._term(normalize(alias), target)
+
+
+_GAZETTEERS = {}
+_GAZETTEERS_LOCK = threading.Lock()
+
+
+def get_gazetteer(data_dir=None, max_age=CHECK_INTERVAL):
+    """
+    Return the process-wide gazetteer for data_dir, recompiled when any
+    hold or location file changes.
+
+    The data files are stat()ed at most once every max_age seconds, so
+    callers in a loop (utils.location_matches) can ask for it per call;
+    pass max_age=0 to check right away.
+    """
+    data_dir = Path(data_dir) if data_dir else DEFAULT_DATA_DIR
+    key = str(data_dir)
+    now = time.monotonic()
+    cached = _GAZETTEERS.get(key)
+    if cached is not None and now - cached[2] < max_age:
+        return cached[1]
+
+    catalog = get_catalog()
+    version = tuple(catalog.scan(data_dir / sub).version for sub in ("holds", "locations"))
+    with _GAZETTEERS_LOCK:
+        cached = _GAZETTEERS.get(key)
+        if cached is not None and cached[0] == version:
+            gazetteer = cached[1]
+        else:
+            gazetteer = LocationGazetteer.from_data(data_dir, catalog)
+            gazetteer.version = version
+        _GAZETTEERS[key] = (version, gazetteer, now)
+        return gazetteer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve free-text locations to canonical places")
+    parser.add_argument("locations", nargs="*", help="Location strings to resolve")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--list", action="store_true", help="List every canonical place")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    gazetteer = get_gazetteer(args.data_dir)
+    if args.list:
+        places = sorted(gazetteer.places.values(), key=lambda p: (p.hold or "", KIND_RANK.get(p.kind, 0), p.id))
+        if args.json:
+            print(json.dumps([p.to_dict() for p in places], indent=2))
+        else:
+            for place in places:
+                print(f"{place.id:40} {place.kind:10} {place.hold or '-':18} {place.name}")
+        return 0
+
+    if not args.locations:
+        parser.error("give at least one location, or --list")
+
+    results = {}
+    for text in args.locations:
+        place = gazetteer.resolve(text)
+        results[text] = place.to_dict() if place else None
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for text, place in results.items():
+            if place is None:
+                print(f"{text!r}: (unknown)")
+            else:
+                print(f"{text!r}: {place['id']} ({place['kind']}, {place['hold']}) tags={','.join(place['tags'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
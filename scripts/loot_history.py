@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Loot History for Skyrim TTRPG
+
+Append-only record of loot rolls in state/loot_history/.
+
+Each roll is one JSON line appended to the active segment file
+(segment_000001.jsonl, segment_000002.jsonl, ...), so recording a roll costs
+the same on day one and after a year of play. Once the active segment
+reaches SEGMENT_MAX_BYTES it is closed and summarized in index.json: how
+many records it holds per table id and per session. Queries read only the
+closed segments whose summary mentions the table/session asked for, plus
+the active segment.
+
+The old state/loot_history.json array, if present, is imported once when
+the history directory is first created.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+INDEX_FORMAT_VERSION = 1
+
+# Close the active segment once it reaches this size
+SEGMENT_MAX_BYTES = 512 * 1024
+
+SEGMENT_RE = re.compile(r"^segment_(\d+)\.jsonl$")
+
+_LOCKS = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(directory):
+    key = str(Path(directory).resolve())
+    with _LOCKS_GUARD:
+        lock = _LOCKS.get(key)
+        if lock is None:
+            lock = _LOCKS[key] = threading.RLock()
+        return lock
+
+
+def _segment_name(number):
+    return f"segment_{number:06d}.jsonl"
+
+
+def _read_records(path):
+    """Records of one segment, skipping a torn or corrupt line."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _summarize(name, records):
+    tables = {}
+    sessions = {}
+    for record in records:
+        table_id = str(record.get("table"))
+        tables[table_id] = tables.get(table_id, 0) + 1
+        session = record.get("session")
+        if session is not None:
+            sessions[str(session)] = sessions.get(str(session), 0) + 1
+    return {"name": name, "records": len(records), "tables": tables, "sessions": sessions}
+
+
+class LootHistory:
+    """
+    Segmented, append-only loot history with a per-segment index.
+
+    Usage:
+        history = LootHistory("state/loot_history")
+        history.append("nordic_tomb_minor", ["Pouch of ancient coins"], session=4)
+        for record in history.query(table_id="nordic_tomb_minor", session=4):
+            print(record["timestamp"], record["results"])
+    """
+
+    def __init__(self, directory, legacy_path=None):
+        """
+        Args:
+            directory: Directory holding the segments and index.json
+            legacy_path: Old single-file JSON array to import on first use
+        """
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._lock = _lock_for(self.directory)
+
+    # ------------------------------------------------------------------
+    # Segments and index
+    # ------------------------------------------------------------------
+
+    def segment_paths(self):
+        """All segment files, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        numbered = []
+        for path in self.directory.iterdir():
+            match = SEGMENT_RE.match(path.name)
+            if match:
+                numbered.append((int(match.group(1)), path))
+        return [path for _, path in sorted(numbered)]
+
+    def _load_index(self, closed):
+        """Index entries for the closed segments, rebuilt if stale."""
+        index = None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: Rebuilding unreadable loot history index: {e}")
+
+        entries = {}
+        if isinstance(index, dict) and index.get("version") == INDEX_FORMAT_VERSION:
+            entries = {e.get("name"): e for e in index.get("segments", []) if isinstance(e, dict)}
+
+        names = [path.name for path in closed]
+        if all(name in entries for name in names):
+            return [entries[name] for name in names]
+
+        rebuilt = [entries.get(path.name) or _summarize(path.name, _read_records(path)) for path in closed]
+        self._save_index(rebuilt)
+        return rebuilt
+
+    def _save_index(self, segments):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_FORMAT_VERSION, "segments": segments}, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _import_legacy(self):
+        if not self.legacy_path or not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f) or []
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not import {self.legacy_path.name}: {e}")
+            return
+        if not isinstance(legacy, list):
+            return
+        with open(self.directory / _segment_name(1), "a", encoding="utf-8") as f:
+            for record in legacy:
+                if isinstance(record, dict):
+                    f.write(json.dumps(record) + "\n")
+
+    def _rotate(self, active):
+        closed = self.segment_paths()[:-1]
+        segments = self._load_index(closed)
+        segments.append(_summarize(active.name, _read_records(active)))
+        self._save_index(segments)
+        number = int(SEGMENT_RE.match(active.name).group(1)) + 1
+        (self.directory / _segment_name(number)).touch()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, table_id, results, session=None, timestamp=None):
+        """
+        Append one roll to the history.
+
+        Returns:
+            dict: The record written
+
+        Raises:
+            OSError: If the history cannot be written
+        """
+        record = {
+            "timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "table": table_id,
+            "results": list(results),
+        }
+        if session is not None:
+            record["session"] = session
+        line = json.dumps(record) + "\n"
+
+        with self._lock:
+            if not self.directory.is_dir():
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._import_legacy()
+            paths = self.segment_paths()
+            active = paths[-1] if paths else self.directory / _segment_name(1)
+            with open(active, "a", encoding="utf-8") as f:
+                f.write(line)
+                size = f.tell()
+            if size >= SEGMENT_MAX_BYTES:
+                self._rotate(active)
+        return record
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def query(self, table_id=None, session=None, limit=None):
+        """
+        Records matching table_id and/or session, oldest first.
+
+        Args:
+            table_id: Only rolls of this table
+            session: Only rolls recorded for this session
+            limit: Return only the most recent `limit` matches
+
+        Returns:
+            list of record dicts
+        """
+        with self._lock:
+            paths = self.segment_paths()
+            if not paths:
+                return []
+            closed, active = paths[:-1], paths[-1]
+            summaries = self._load_index(closed)
+
+        candidates = []
+        for path, summary in zip(closed, summaries):
+            if table_id is not None and str(table_id) not in summary.get("tables", {}):
+                continue
+            if session is not None and str(session) not in summary.get("sessions", {}):
+                continue
+            candidates.append(path)
+        candidates.append(active)
+
+        matches = []
+        for path in candidates:
+            for record in _read_records(path):
+                if table_id is not None and record.get("table") != table_id:
+                    continue
+                if session is not None and str(record.get("session")) != str(session):
+                    continue
+                matches.append(record)
+        if limit is not None:
+            matches = matches[-limit:] if limit > 0 else []
+        return matches
+
+    def drops(self, table_id, session=None):
+        """Every result string table_id produced (optionally in one session)."""
+        return [item for record in self.query(table_id=table_id, session=session)
+                for item in record.get("results", [])]
+
+    def summary(self):
+        """
+        Roll counts per table and per session across the whole history.
+
+        Closed segments are counted from the index; only the active segment
+        is read.
+        """
+        with self._lock:
+            paths = self.segment_paths()
+            if not paths:
+                return {"records": 0, "tables": {}, "sessions": {}}
+            summaries = self._load_index(paths[:-1])
+        summaries = summaries + [_summarize(paths[-1].name, _read_records(paths[-1]))]
+
+        total = {"records": 0, "tables": {}, "sessions": {}}
+        for summary in summaries:
+            total["records"] += summary.get("records", 0)
+            for key in ("tables", "sessions"):
+                for name, count in summary.get(key, {}).items():
+                    total[key][name] = total[key].get(name, 0) + count
+        return total
@@ -1,76 +1,102 @@
 #!/usr/bin/env python3
 """
 Loot Manager for Skyrim TTRPG (Fate-friendly)
+
+Tables are compiled once into alias tables (see loot_sampler.py), so rolls
+cost O(1) per draw regardless of entry weights. Rolls are recorded in the
+append-only history in state/loot_history/ (see loot_history.py).
 """
 
-import json
 import random
+import sys
 from pathlib import Path
-from datetime import datetime
+
+from campaign_state import load_state
+from loot_history import LootHistory
+from loot_sampler import get_loot_table_cache
 
 
 class LootManager:
-    def __init__(self, data_dir: str = "../data", state_dir: str = "../state"):
+    def __init__(self, data_dir: str = "../data", state_dir: str = "../state", session=None):
         self.data_dir = Path(data_dir)
         self.state_dir = Path(state_dir)
         self.tables_path = self.data_dir / "loot" / "loot_tables.json"
-        self.history_path = self.state_dir / "loot_history.json"
+        self.history = LootHistory(self.state_dir / "loot_history",
+                                   legacy_path=self.state_dir / "loot_history.json")
+        self.session = session
+        self._session_resolved = session is not None
 
-    def _load_tables(self):
-        if self.tables_path.exists():
-            with open(self.tables_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {"tables": {}}
+    def current_session(self):
+        """Session number rolls are filed under (campaign state 'session_count')."""
+        if not self._session_resolved:
+            self._session_resolved = True
+            try:
+                state = load_state(self.state_dir / "campaign_state.json") or {}
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read campaign state for loot history: {e}", file=sys.stderr)
+                state = {}
+            self.session = state.get("session_count")
+        return self.session
 
     def _append_history(self, table_id: str, results: list):
         try:
-            self.state_dir.mkdir(parents=True, exist_ok=True)
-            payload = {
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "table": table_id,
-                "results": results,
-            }
-            history = []
-            if self.history_path.exists():
-                with open(self.history_path, "r", encoding="utf-8") as f:
-                    history = json.load(f) or []
-            history.append(payload)
-            with open(self.history_path, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2)
-        except Exception:
-            pass
+            self.history.append(table_id, results, session=self.current_session())
+        except OSError as e:
+            print(f"Warning: Could not record loot roll for '{table_id}': {e}", file=sys.stderr)
 
-    def roll_table(self, table_id: str, rolls: int = None, *, seed=None) -> list:
-        tables = self._load_tables().get("tables", {})
-        table = tables.get(table_id)
-        if not table:
-            return []
+    def session_drops(self, table_id: str, session=None) -> list:
+        """
+        What did table_id drop this session?
 
-        if rolls is None:
-            rolls = int(table.get("rolls", 1))
+        Args:
+            table_id: Loot table id
+            session: Session number (default: the current session)
 
-        rng = random.Random(seed)
-        entries = table.get("entries", [])
-        if not entries:
-            return []
+        Returns:
+            list of history records, oldest first
+        """
+        if session is None:
+            session = self.current_session()
+        return self.history.query(table_id=table_id, session=session)
 
-        population = []
-        for e in entries:
-            try:
-                w = int(e.get("weight", 1))
-            except (TypeError, ValueError):
-                w = 1
-            if w <= 0:
-                continue
-            population.extend([e] * w)
-
-        if not population:
+    def compiled_tables(self):
+        """Compiled loot tables for this manager's loot_tables.json."""
+        return get_loot_table_cache().tables(self.tables_path)
+
+    def roll_table(self, table_id: str, rolls: int = None, *, seed=None) -> list:
+        compiled = self.compiled_tables()
+        if compiled.get(table_id) is None:
             return []
 
-        results = []
-        for _ in range(max(1, int(rolls))):
-            pick = rng.choice(population)
-            results.append(str(pick.get("text") or pick))
+        results = compiled.roll(table_id, random.Random(seed), rolls)
+        if not results:
+            return []
 
         self._append_history(table_id, results)
         return results
+
+    def roll_many(self, table_id: str, n: int, seed=None, *, rolls: int = None, record: bool = False) -> list:
+        """
+        Roll a table n times (e.g. a batch of hoards for dungeon prep).
+
+        Args:
+            table_id: Table to roll
+            n: Number of hoards to generate
+            seed: Seed for a reproducible batch
+            rolls: Draws per hoard (default: the table's 'rolls')
+            record: Also write each hoard to the loot history
+
+        Returns:
+            list of n result lists (empty if the table is unknown or empty)
+        """
+        compiled = self.compiled_tables()
+        if compiled.get(table_id) is None:
+            return []
+
+        rng = random.Random(seed)
+        hoards = [compiled.roll(table_id, rng, rolls) for _ in range(max(0, int(n)))]
+        if record:
+            for results in hoards:
+                if results:
+                    self._append_history(table_id, results)
+        return hoards
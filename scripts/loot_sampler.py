@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Loot Sampler for Skyrim TTRPG
+
+Compiled, constant-time sampling for data/loot/loot_tables.json.
+
+Each table is compiled once into a Walker/Vose alias table, so a draw costs
+two random numbers no matter how many entries a table has or how large the
+weights are. Compiled tables are cached per file and rebuilt only when the
+DataCatalog sees the file change.
+
+Entries may point at another table instead of carrying text:
+
+    {"table": "nordic_tomb_minor", "weight": 1, "rolls": 1}
+
+Drawing such an entry rolls the sub-table ('rolls' times, default 1) and
+splices its results in place. Cycles are cut off: a table never recurses
+into itself through its own sub-tables.
+"""
+
+import threading
+
+from data_catalog import get_catalog
+
+
+def _weight(entry):
+    try:
+        return int(entry.get("weight", 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def build_alias(weights):
+    """
+    Build Vose alias arrays for positive weights.
+
+    Returns:
+        tuple: (prob, alias) lists of len(weights)
+    """
+    n = len(weights)
+    total = float(sum(weights))
+    scaled = [w * n / total for w in weights]
+    prob = [0.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    # Leftovers are 1.0 up to floating-point error
+    for i in large + small:
+        prob[i] = 1.0
+    return prob, alias
+
+
+class CompiledLootTable:
+    """One loot table compiled for O(1) weighted draws."""
+
+    __slots__ = ("table_id", "rolls", "results", "subtables", "prob", "alias")
+
+    def __init__(self, table_id, table):
+        self.table_id = table_id
+        try:
+            self.rolls = int(table.get("rolls", 1))
+        except (TypeError, ValueError):
+            self.rolls = 1
+
+        self.results = []
+        self.subtables = []
+        weights = []
+        for entry in table.get("entries") or []:
+            if not isinstance(entry, dict):
+                continue
+            w = _weight(entry)
+            if w <= 0:
+                continue
+            sub_id = entry.get("table")
+            if isinstance(sub_id, str) and sub_id:
+                try:
+                    sub_rolls = int(entry.get("rolls", 1))
+                except (TypeError, ValueError):
+                    sub_rolls = 1
+                self.results.append(None)
+                self.subtables.append((sub_id, max(1, sub_rolls)))
+            else:
+                self.results.append(str(entry.get("text") or entry))
+                self.subtables.append(None)
+            weights.append(w)
+
+        if weights:
+            self.prob, self.alias = build_alias(weights)
+        else:
+            self.prob, self.alias = [], []
+
+    def draw(self, rng):
+        """Index of one weighted draw."""
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class CompiledLootTables:
+    """Every table of one loot_tables.json, compiled."""
+
+    def __init__(self, data):
+        self.source = data
+        tables = (data or {}).get("tables", {}) if isinstance(data, dict) else {}
+        self.tables = {
+            table_id: CompiledLootTable(table_id, table)
+            for table_id, table in tables.items()
+            if isinstance(table, dict)
+        }
+
+    def get(self, table_id):
+        """Compiled table for table_id, or None."""
+        return self.tables.get(table_id)
+
+    def roll(self, table_id, rng, rolls=None, _stack=()):
+        """
+        Roll a table.
+
+        Args:
+            table_id: Table to roll
+            rng: random.Random instance
+            rolls: Number of draws (default: the table's 'rolls'); at least 1
+
+        Returns:
+            list of result strings (sub-table results spliced in)
+        """
+        table = self.tables.get(table_id)
+        if table is None or not table.prob:
+            return []
+        if rolls is None:
+            rolls = table.rolls
+        stack = _stack + (table_id,)
+
+        results = []
+        prob, alias, n = table.prob, table.alias, len(table.prob)
+        random = rng.random
+        for _ in range(max(1, int(rolls))):
+            i = int(random() * n)
+            if random() >= prob[i]:
+                i = alias[i]
+            sub = table.subtables[i]
+            if sub is None:
+                results.append(table.results[i])
+            elif sub[0] not in stack:
+                results.extend(self.roll(sub[0], rng, sub[1], stack))
+        return results
+
+
+class LootTableCache:
+    """
+    Process-wide cache of compiled loot table files.
+
+    Use ``get_loot_table_cache()`` to obtain the shared instance.
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or get_catalog()
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def tables(self, tables_path):
+        """
+        Compiled tables for a loot_tables.json, recompiled only when the
+        file changes. A missing file compiles to no tables.
+        """
+        data = self.catalog.load_json_or_none(tables_path)
+        key = str(tables_path)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is None or compiled.source is not data:
+                compiled = CompiledLootTables(data)
+                self._compiled[key] = compiled
+            return compiled
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_loot_table_cache():
+    """Return the process-wide LootTableCache."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LootTableCache()
+        return _CACHE
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import os
 import re
@@ -10,6 +11,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from utils import EXAMPLE_PC_FILENAME
+from campaign_state import load_state
+from clock_registry import FROZEN_STATUSES, load_clock_file
+from effective_skills import get_skill_engine
 # Utilities
 # ---------------------------
 
@@ -43,7 +47,7 @@ def slug(s: str) -> str:
     return re.sub(r"[^a-z0-9_]+", "_", s.lower()).strip("_")
 
 # ---------------------------
-# Clock extraction (schema-agnostic)
+# Clock views
 # ---------------------------
 
 @dataclass
@@ -53,160 +57,16 @@ class ClockView:
     maximum: int
     ratio: float
     source: str
-
-def _as_int(x: Any, default: int = 0) -> int:
-    try:
-        return int(x)
-    except Exception:
-        return default
-
-def extract_clocks(obj: Any, source: str, prefix: str = "") -> List[ClockView]:
-    clocks: List[ClockView] = []
-
-    # Common patterns:
-    # { "clocks": { "<id>": { "name": "...", "current": 2, "max": 8 } } }
-    # { "clock": { "current": 1, "max": 4 } }
-    # { "current_progress": 4, "max_progress": 8 }
-    # etc.
-    if isinstance(obj, dict):
-        # direct clock-like dict
-        has_current = any(k in obj for k in ("current", "current_progress", "filled", "progress"))
-        has_max = any(k in obj for k in ("max", "maximum", "max_progress", "max_segments", "total_segments"))
-        has_name = "name" in obj or "title" in obj
-
-        if has_current and has_max and has_name:
-            name = str(obj.get("name") or obj.get("title") or prefix or "Unnamed Clock")
-            cur = _as_int(obj.get("current", obj.get("current_progress", obj.get("filled", obj.get("progress", 0)))), 0)
-            mx = _as_int(obj.get("max", obj.get("maximum", obj.get("max_progress", obj.get("max_segments", obj.get("total_segments", 0))))), 0)
-            if mx > 0:
-                clocks.append(ClockView(
-                    name=name,
-                    current=cur,
-                    maximum=mx,
-                    ratio=cur / mx,
-                    source=source
-                ))
-
-        # recurse
-        for k, v in obj.items():
-            new_prefix = f"{prefix}.{k}" if prefix else str(k)
-            clocks.extend(extract_clocks(v, source, new_prefix))
-
-    elif isinstance(obj, list):
-        for i, v in enumerate(obj):
-            clocks.extend(extract_clocks(v, source, f"{prefix}[{i}]"))
-
-    return clocks
+    id: str = ""
+    status: str = "active"
 
 # ---------------------------
 # PC parsing helpers
 # ---------------------------
 
-RANK_TO_VALUE = {
-    "Superb (+5)": 5,
-    "Great (+4)": 4,
-    "Good (+3)": 3,
-    "Fair (+2)": 2,
-    "Average (+1)": 1
-}
-
-BONUS_RE = re.compile(r"^\s*(.+?)\s*\(\s*([+-]?\d+)\s*\)\s*$")
-
-def parse_bonus_list(bonus_list: Any) -> Dict[str, int]:
-    out: Dict[str, int] = {}
-    if not isinstance(bonus_list, list):
-        return out
-    for s in bonus_list:
-        if not isinstance(s, str):
-            continue
-        m = BONUS_RE.match(s)
-        if not m:
-            continue
-        sk = m.group(1).strip()
-        val = int(m.group(2))
-        out[sk] = out.get(sk, 0) + val
-    return out
-
-def pyramid_base_skills(pc: Dict[str, Any]) -> Dict[str, int]:
-    base: Dict[str, int] = {}
-    skills = pc.get("skills", {})
-    if not isinstance(skills, dict):
-        return base
-    for rank, sks in skills.items():
-        v = RANK_TO_VALUE.get(rank)
-        if v is None or not isinstance(sks, list):
-            continue
-        for sk in sks:
-            if isinstance(sk, str):
-                base[sk] = v
-    return base
-
 def compute_effective_skills(repo: Path, pc: Dict[str, Any]) -> Dict[str, Any]:
-    # Prefer precomputed derived.effective_skills if present
-    derived = pc.get("derived", {})
-    if isinstance(derived, dict) and isinstance(derived.get("effective_skills"), dict):
-        return {
-            "base": pyramid_base_skills(pc),
-            "racial_bonus": derived.get("bonus_sources", {}).get("race", {}),
-            "standing_stone_bonus": derived.get("bonus_sources", {}).get("standing_stone", {}),
-            "effective": derived.get("effective_skills", {})
-        }
-
-    base = pyramid_base_skills(pc)
-
-    # Race bonuses: try embedded on PC, else try data/racial_traits.json or data/races.json
-    race_name = pc.get("race")
-    racial_bonus: Dict[str, int] = {}
-
-    # 1) direct on pc if it exists
-    if isinstance(pc.get("racial_bonuses"), dict):
-        racial_bonus = parse_bonus_list(pc["racial_bonuses"].get("skill_bonuses", []))
-
-    # 2) look up from repo data files
-    if not racial_bonus and race_name:
-        for candidate in (repo / "data" / "races.json", repo / "data" / "racial_traits.json"):
-            if candidate.exists():
-                try:
-                    data = read_json_safely(candidate)
-                    races = data.get("races") if isinstance(data, dict) else None
-                    if isinstance(races, list):
-                        for r in races:
-                            if isinstance(r, dict) and r.get("name") == race_name:
-                                racial_bonus = parse_bonus_list(r.get("skill_bonuses", []))
-                                break
-                except Exception:
-                    pass
-            if racial_bonus:
-                break
-
-    # Standing stone bonus: simple parser from data/standing_stones.json for "+1 to Athletics" patterns
-    stone_bonus: Dict[str, int] = {}
-    stone_name = pc.get("standing_stone")
-    stones_path = repo / "data" / "standing_stones.json"
-    if stone_name and stones_path.exists():
-        try:
-            stones = read_json_safely(stones_path)
-            for s in stones.get("standing_stones", []):
-                if isinstance(s, dict) and s.get("name") == stone_name:
-                    gm = ((s.get("effect") or {}).get("game_mechanic")) or ""
-                    m = re.search(r"([+-]?\d+)\s*to\s*([A-Za-z]+)", gm)
-                    if m:
-                        stone_bonus[m.group(2)] = int(m.group(1))
-        except Exception:
-            pass
-
-    eff = dict(base)
-    for sk, b in racial_bonus.items():
-        eff[sk] = eff.get(sk, 0) + b
-    for sk, b in stone_bonus.items():
-        eff[sk] = eff.get(sk, 0) + b
-
-    return {
-        "base": base,
-        "racial_bonus": racial_bonus,
-        "standing_stone_bonus": stone_bonus,
-        "effective": eff
-    }
+    # Shared, memoized engine (see effective_skills.py)
+    return get_skill_engine(repo / "data").compute(pc)
 
 # ---------------------------
 # Mid-session protocol
@@ -242,39 +102,128 @@ def summarize_relationships(state: Dict[str, Any]) -> List[Tuple[str, Any]]:
         return items[:6]
     return []
 
-def top_clocks(repo: Path) -> List[ClockView]:
-    clock_sources: List[Tuple[str, Path]] = []
-
-    for folder in ("clocks",):
-        d = repo / folder
-        if d.exists():
-            for p in d.rglob("*.json"):
-                clock_sources.append((str(p.relative_to(repo)), p))
-
-    # Some repos keep clocks under data/clocks
-    d2 = repo / "data" / "clocks"
-    if d2.exists():
-        for p in d2.rglob("*.json"):
-            clock_sources.append((str(p.relative_to(repo)), p))
+# ---------------------------
+# Clock index (persistent, incremental)
+# ---------------------------
 
-    all_clocks: List[ClockView] = []
-    for label, p in clock_sources:
+CLOCK_DIRS = ("clocks", "data/clocks")
+CLOCK_INDEX_VERSION = 2
+
+class ClockIndex:
+    """
+    Clock registry records (clock_registry.load_clock_file) for every file
+    under clocks/ and data/clocks/, cached in state/clock_index.json by file
+    path + mtime + size.
+
+    refresh() stats every file but only parses the ones that changed; the
+    ranking is rebuilt (heapq) only when something did.
+    """
+
+    def __init__(self, repo: Path, index_path: Optional[Path] = None):
+        self.repo = Path(repo)
+        self.index_path = Path(index_path) if index_path else self.repo / "state" / "clock_index.json"
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._ranked: Optional[List[ClockView]] = None
+
+    def _load(self) -> None:
+        self._loaded = True
+        if not self.index_path.exists():
+            return
         try:
-            obj = read_json_safely(p)
-            all_clocks.extend(extract_clocks(obj, source=label))
-        except Exception:
-            continue
-
-    # De-dup loosely by (name, source)
-    uniq: Dict[Tuple[str, str], ClockView] = {}
-    for c in all_clocks:
-        key = (c.name, c.source)
-        if key not in uniq or uniq[key].ratio < c.ratio:
-            uniq[key] = c
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (IOError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable clock index {self.index_path}: {e}")
+            return
+        if isinstance(data, dict) and data.get("version") == CLOCK_INDEX_VERSION:
+            self.files = data.get("files", {})
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"version": CLOCK_INDEX_VERSION, "files": self.files},
+                                       separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.index_path)
+
+    def _source_files(self) -> List[Path]:
+        paths: List[Path] = []
+        for folder in CLOCK_DIRS:
+            d = self.repo / folder
+            if d.is_dir():
+                paths.extend(sorted(d.rglob("*.json")))
+        return paths
+
+    def refresh(self) -> Dict[str, int]:
+        """Re-read changed files; returns counts of added/updated/removed/unchanged."""
+        if not self._loaded:
+            self._load()
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        present = set()
+        for p in self._source_files():
+            label = p.relative_to(self.repo).as_posix()
+            present.add(label)
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entry = self.files.get(label)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                stats["unchanged"] += 1
+                continue
+            try:
+                clocks = load_clock_file(p)
+            except (IOError, ValueError):
+                clocks = []
+            # First record per id wins, as in ClockRegistry
+            rows: Dict[str, List[Any]] = {}
+            for c in clocks:
+                rows.setdefault(c.id, [c.id, c.name, c.current, c.maximum, c.status])
+            self.files[label] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "clocks": list(rows.values()),
+            }
+            stats["updated" if entry else "added"] += 1
+        for label in [l for l in self.files if l not in present]:
+            del self.files[label]
+            stats["removed"] += 1
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            self._ranked = None
+            self._save()
+        return stats
+
+    def clocks(self) -> List[ClockView]:
+        out: List[ClockView] = []
+        for label, entry in self.files.items():
+            for clock_id, name, cur, mx, status in entry["clocks"]:
+                out.append(ClockView(name=name, current=cur, maximum=mx, ratio=cur / mx, source=label,
+                                     id=clock_id, status=status))
+        return out
 
-    clocks = list(uniq.values())
-    clocks.sort(key=lambda c: (c.ratio, c.current), reverse=True)
-    return clocks[:10]
+    def top(self, limit: int = 10) -> List[ClockView]:
+        """
+        The fullest clocks that are still running, ordered like
+        ClockRegistry.nearly_full (ties: fewest segments left), after a refresh().
+        """
+        if self._ranked is None or len(self._ranked) < limit:
+            running = [c for c in self.clocks() if c.status not in FROZEN_STATUSES]
+            self._ranked = heapq.nsmallest(max(limit, 10), running,
+                                           key=lambda c: (-c.ratio, c.maximum - c.current, c.id))
+        return self._ranked[:limit]
+
+_CLOCK_INDEXES: Dict[Tuple[str, Optional[str]], ClockIndex] = {}
+
+def get_clock_index(repo: Path, index_path: Optional[Path] = None) -> ClockIndex:
+    key = (str(Path(repo).resolve()), str(index_path) if index_path else None)
+    index = _CLOCK_INDEXES.get(key)
+    if index is None:
+        index = _CLOCK_INDEXES[key] = ClockIndex(repo, index_path)
+    return index
+
+def top_clocks(repo: Path, limit: int = 10, index_path: Optional[Path] = None) -> List[ClockView]:
+    index = get_clock_index(repo, index_path)
+    index.refresh()
+    return index.top(limit)
 
 def latest_log(repo: Path) -> Optional[Path]:
     logs_dir = repo / "logs"
@@ -399,7 +348,7 @@ def main() -> int:
     state: Dict[str, Any] = {}
     if state_path.exists():
         try:
-            state = read_json_safely(state_path)
+            state = load_state(state_path) or {}
         except Exception as e:
             print(f"[WARN] Could not parse {state_path}: {e}")
     else:
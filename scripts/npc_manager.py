@@ -19,6 +19,8 @@ _scripts_dir = Path(__file__).resolve().parent
 if str(_scripts_dir) not in sys.path:
     sys.path.insert(0, str(_scripts_dir))
 from first_impression import auto_first_impression
+from campaign_state import campaign_state_transaction, load_state, save_state
+from fate_odds import check_odds, sheet_rating
 
 
 class NPCManager:
@@ -277,13 +279,15 @@ class NPCManager:
         
         return npcs
     
-    def companion_loyalty_check(self, npc_id, situation):
+    def companion_loyalty_check(self, npc_id, situation, difficulty=None):
         """
         Check if companion will follow through in a difficult situation
         
         Args:
             npc_id: ID of the companion
             situation: Description of the situation
+            difficulty: Optional Will difficulty; when given, the exact odds
+                        of the companion's Will roll against it are shown
         
         Returns:
             Boolean indicating if companion will comply
@@ -316,21 +320,32 @@ class NPCManager:
             will_comply = False
         
         print(f"Result: {result}")
+        
+        if difficulty is not None:
+            sheet_path = self.data_dir / "npc_stat_sheets" / f"{npc_id}.json"
+            sheet = npc
+            if sheet_path.exists():
+                with open(sheet_path, 'r') as f:
+                    sheet = json.load(f)
+            will = sheet_rating(sheet, "Will")
+            odds = check_odds(will, difficulty)
+            print(f"Will ({will:+d}) vs difficulty {difficulty:+d}: "
+                  f"succeed {odds['success'] + odds['success_with_style']:.0%}, "
+                  f"tie {odds['tie']:.0%}, fail {odds['fail']:.0%}")
         return will_comply
     
     def load_campaign_state(self):
         """Load campaign state data"""
-        if self.campaign_state_path.exists():
-            with open(self.campaign_state_path, 'r') as f:
-                return json.load(f)
-        return None
+        return load_state(self.campaign_state_path)
     
     def save_campaign_state(self, state):
-        """Save campaign state data"""
-        self.state_dir.mkdir(exist_ok=True)
-        with open(self.campaign_state_path, 'w') as f:
-            json.dump(state, f, indent=2)
+        """Save campaign state data (deferred while a transaction is open)"""
+        save_state(self.campaign_state_path, state)
         return True
+
+    def transaction(self):
+        """Open a campaign state transaction on this manager's state file."""
+        return campaign_state_transaction(self.campaign_state_path)
     
     def get_active_companions(self):
         """Get list of currently active companions"""
@@ -13,19 +13,25 @@ This script provides querying capabilities for:
 import json
 import os
 from pathlib import Path
-from utils import location_matches
+from data_catalog import get_catalog, copy_record
+from stat_sheet_index import get_stat_sheet_index
+from text_index import get_text_index
 
 
 class DataQueryManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", text_index_path=None):
         """
         Initialize the DataQueryManager.
         
         Args:
             data_dir: Path to the data directory (default: "data")
+            text_index_path: Where to persist the full-text index
+                             (default: <repo>/state/text_index.json)
         """
         self.data_dir = Path(data_dir)
         self.npc_stat_sheets_dir = self.data_dir / "npc_stat_sheets"
+        self.catalog = get_catalog()
+        self.text_index_path = text_index_path
         
         # Ensure directories exist
         (self.data_dir / "npcs").mkdir(parents=True, exist_ok=True)
@@ -36,6 +42,14 @@ class DataQueryManager:
         (self.data_dir / "world_state").mkdir(parents=True, exist_ok=True)
         (self.data_dir / "rules").mkdir(parents=True, exist_ok=True)
         
+    def _records(self, directory):
+        """Return cached records for every JSON file in directory (read-only)."""
+        return self.catalog.records(directory)
+
+    def _load_json(self, path):
+        """Return the cached record for a single JSON file (read-only)."""
+        return self.catalog.load_json(path)
+
     def query_npcs(self, name=None, location=None, faction=None):
         """
         Query NPCs based on filters.
@@ -54,14 +68,7 @@ class DataQueryManager:
             
         results = []
         
-        for npc_file in npcs_dir.glob("*.json"):
-            try:
-                with open(npc_file, 'r', encoding='utf-8') as f:
-                    npc = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {npc_file.name}: {e}")
-                continue
-            
+        for npc in self._records(npcs_dir):
             match = True
             if name and isinstance(name, str):
                 npc_name = npc.get('name', '')
@@ -77,7 +84,7 @@ class DataQueryManager:
                     match = False
             
             if match:
-                results.append(npc)
+                results.append(copy_record(npc))
         
         return results
     
@@ -98,14 +105,7 @@ class DataQueryManager:
             
         results = []
         
-        for pc_file in pcs_dir.glob("*.json"):
-            try:
-                with open(pc_file, 'r', encoding='utf-8') as f:
-                    pc = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {pc_file.name}: {e}")
-                continue
-            
+        for pc in self._records(pcs_dir):
             match = True
             if name and isinstance(name, str):
                 pc_name = pc.get('name', '')
@@ -117,7 +117,7 @@ class DataQueryManager:
                     match = False
             
             if match:
-                results.append(pc)
+                results.append(copy_record(pc))
         
         return results
     
@@ -139,14 +139,7 @@ class DataQueryManager:
             
         results = []
         
-        for quest_file in quests_dir.glob("*.json"):
-            try:
-                with open(quest_file, 'r', encoding='utf-8') as f:
-                    quest = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {quest_file.name}: {e}")
-                continue
-            
+        for quest in self._records(quests_dir):
             match = True
             if status and isinstance(status, str):
                 quest_status = quest.get('status', '')
@@ -162,7 +155,7 @@ class DataQueryManager:
                     match = False
             
             if match:
-                results.append(quest)
+                results.append(copy_record(quest))
         
         return results
     
@@ -183,14 +176,7 @@ class DataQueryManager:
             
         results = []
         
-        for faction_file in factions_dir.glob("*.json"):
-            try:
-                with open(faction_file, 'r', encoding='utf-8') as f:
-                    faction = json.load(f)
-            except (IOError, json.JSONDecodeError) as e:
-                print(f"Warning: Error reading {faction_file.name}: {e}")
-                continue
-            
+        for faction in self._records(factions_dir):
             match = True
             if name and isinstance(name, str):
                 faction_name = faction.get('name', '')
@@ -202,7 +188,7 @@ class DataQueryManager:
                     match = False
             
             if match:
-                results.append(faction)
+                results.append(copy_record(faction))
         
         return results
     
@@ -224,8 +210,7 @@ class DataQueryManager:
             return {"error": "Factions file not found"}
         
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self._load_json(factions_file)
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
@@ -256,11 +241,11 @@ class DataQueryManager:
                 filtered_quests.append(quest)
             
             if filtered_quests or not quest_id:
-                results[faction] = {
+                results[faction] = copy_record({
                     'questline': quest_data.get('questline'),
                     'quests': filtered_quests,
                     'side_quests': quest_data.get('side_quests', [])
-                }
+                })
         
         return results
     
@@ -277,12 +262,11 @@ class DataQueryManager:
             return {"error": "Factions file not found"}
         
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self._load_json(factions_file)
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
-        return factions_data.get('trust_mechanics', {})
+        return copy_record(factions_data.get('trust_mechanics', {}))
     
     def get_main_story_integration(self):
         """
@@ -297,12 +281,11 @@ class DataQueryManager:
             return {"error": "Factions file not found"}
         
         try:
-            with open(factions_file, 'r', encoding='utf-8') as f:
-                factions_data = json.load(f)
+            factions_data = self._load_json(factions_file)
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading factions file: {e}"}
         
-        return factions_data.get('main_story_integration', {})
+        return copy_record(factions_data.get('main_story_integration', {}))
     
     def get_world_state(self):
         """
@@ -314,22 +297,46 @@ class DataQueryManager:
         world_state_file = self.data_dir / "world_state" / "current_state.json"
         if world_state_file.exists():
             try:
-                with open(world_state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return copy_record(self._load_json(world_state_file))
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error reading world state: {e}")
                 return None
         return None
     
-    def search_rules(self, keyword):
+    def text_index(self):
+        """Return the persistent full-text index over rules, converted PDFs, docs and logs."""
+        return get_text_index(self.data_dir.parent, self.text_index_path)
+    
+    def search_text(self, query, limit=10, scope=None):
+        """
+        Ranked full-text search over rules, converted PDFs, docs and logs.
+        
+        Args:
+            query: Free-text query
+            limit: Maximum number of section hits to return
+            scope: Optional root or file to restrict to (e.g. "docs")
+            
+        Returns:
+            list: Section hits with 'file', 'section', 'line', 'score' and 'snippet'
+        """
+        if not query or not isinstance(query, str):
+            print("Error: query must be a non-empty string")
+            return []
+        return self.text_index().search(query, limit=limit, scope=scope)
+    
+    def search_rules(self, keyword, limit=10):
         """
         Search rules documentation for keyword.
         
+        Results are ranked by relevance (BM25), one entry per matching section.
+        
         Args:
             keyword: Search term to look for in rules files
+            limit: Maximum number of sections to return
             
         Returns:
-            list: List of dicts containing file name and matching lines
+            list: List of dicts containing file name, section heading, score
+                  and the matching lines
         """
         if not keyword or not isinstance(keyword, str):
             print("Error: keyword must be a non-empty string")
@@ -338,32 +345,17 @@ class DataQueryManager:
         rules_dir = self.data_dir / "rules"
         if not rules_dir.exists():
             return []
-            
-        results = []
         
-        for rules_file in rules_dir.glob("*.md"):
-            try:
-                with open(rules_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except (IOError, UnicodeDecodeError) as e:
-                print(f"Warning: Error reading {rules_file.name}: {e}")
-                continue
-            
-            if keyword.lower() in content.lower():
-                # Find relevant sections
-                lines = content.split('\n')
-                relevant_lines = []
-                for line_index, line in enumerate(lines):
-                    if keyword.lower() in line.lower():
-                        # Get context (2 lines before and after)
-                        context_start = max(0, line_index - 2)
-                        context_end = min(len(lines), line_index + 3)
-                        relevant_lines.extend(lines[context_start:context_end])
-                
-                results.append({
-                    'file': rules_file.name,
-                    'matches': relevant_lines
-                })
+        scope = rules_dir.relative_to(self.data_dir.parent).as_posix()
+        results = []
+        for hit in self.text_index().search(keyword, limit=limit, scope=scope):
+            results.append({
+                'file': Path(hit['file']).name,
+                'section': hit['section'],
+                'line': hit['line'],
+                'score': hit['score'],
+                'matches': hit['snippet']
+            })
         
         return results
     
@@ -391,20 +383,14 @@ class DataQueryManager:
             session_file = sessions_dir / f"session_{session_number:03d}.json"
             if session_file.exists():
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        return [json.load(f)]
+                    return [copy_record(self._load_json(session_file))]
                 except (IOError, json.JSONDecodeError) as e:
                     print(f"Error reading session file: {e}")
                     return []
         else:
             # Return all sessions
-            for session_file in sorted(sessions_dir.glob("session_*.json")):
-                try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        results.append(json.load(f))
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Warning: Error reading {session_file.name}: {e}")
-                    continue
+            for session in self.catalog.records(sessions_dir, "session_*.json"):
+                results.append(copy_record(session))
         
         return results
     
@@ -422,24 +408,15 @@ class DataQueryManager:
             print("Error: character_id must be a non-empty string")
             return {}
             
-        # Check NPCs
-        npcs = self.query_npcs()
-        pcs = self.query_pcs()
-        
+        # Check NPCs, then PCs
         target = None
-        for npc in npcs:
-            if npc.get('id') == character_id:
-                target = npc
+        for record in self._records(self.data_dir / "npcs") + self._records(self.data_dir / "pcs"):
+            if record.get('id') == character_id:
+                target = record
                 break
         
-        if not target:
-            for pc in pcs:
-                if pc.get('id') == character_id:
-                    target = pc
-                    break
-        
         if target and 'relationships' in target:
-            return target['relationships']
+            return copy_record(target['relationships'])
         
         return {}
     
@@ -462,8 +439,7 @@ class DataQueryManager:
             return {"error": "PDF index not found", "files": [], "details": []}
         
         try:
-            with open(pdf_index_file, 'r', encoding='utf-8') as f:
-                pdf_index = json.load(f)
+            pdf_index = self._load_json(pdf_index_file)
         except (IOError, json.JSONDecodeError) as e:
             return {"error": f"Error reading PDF index: {e}", "files": [], "details": []}
         
@@ -474,7 +450,7 @@ class DataQueryManager:
         # Find matching files
         matching_files = []
         if topic_lower in query_mappings:
-            matching_files = query_mappings[topic_lower]
+            matching_files = list(query_mappings[topic_lower])
         
         # Search in topics structure for more detailed info
         results = []
@@ -501,12 +477,17 @@ class DataQueryManager:
             'details': results
         }
     
-    def get_pdf_content(self, topic):
+    def get_pdf_content(self, topic, full_text=False, max_sections=3):
         """
         Get actual content from PDF-converted files for a topic.
         
+        Markdown files return only their best-matching sections for the topic
+        unless full_text is True.
+        
         Args:
             topic: Topic to retrieve content for
+            full_text: Return whole markdown files instead of ranked sections
+            max_sections: Maximum sections per markdown file
             
         Returns:
             dict: Dictionary with query and list of content results
@@ -529,23 +510,29 @@ class DataQueryManager:
                 detail_format = detail.get('format', '')
                 try:
                     if detail_format == 'json':
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            content.append({
-                                'file': str(file_path),
-                                'type': 'json',
-                                'content': data,
-                                'description': detail.get('description', '')
-                            })
+                        data = copy_record(self._load_json(file_path))
+                        content.append({
+                            'file': str(file_path),
+                            'type': 'json',
+                            'content': data,
+                            'description': detail.get('description', '')
+                        })
                     elif detail_format == 'markdown':
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            text = f.read()
-                            content.append({
-                                'file': str(file_path),
-                                'type': 'markdown',
-                                'content': text,
-                                'description': detail.get('description', '')
-                            })
+                        sections = None if full_text else self._pdf_sections(file_path, topic, max_sections)
+                        if sections is None:
+                            with open(file_path, 'r', encoding='utf-8') as f:
+                                text = f.read()
+                        else:
+                            text = '\n\n'.join(section['text'] for section in sections)
+                        result = {
+                            'file': str(file_path),
+                            'type': 'markdown',
+                            'content': text,
+                            'description': detail.get('description', '')
+                        }
+                        if sections is not None:
+                            result['sections'] = sections
+                        content.append(result)
                 except (IOError, json.JSONDecodeError, UnicodeDecodeError) as e:
                     print(f"Warning: Error reading {file_path}: {e}")
                     continue
@@ -555,6 +542,45 @@ class DataQueryManager:
             'results': content
         }
     
+    def _pdf_sections(self, file_path, topic, max_sections):
+        """
+        Return the top-ranked sections of an indexed markdown file for topic.
+        
+        Returns:
+            list of dicts with 'section', 'line', 'score' and 'text', or None
+            if the file is not covered by the text index
+        """
+        index = self.text_index()
+        try:
+            rel = file_path.resolve().relative_to(index.repo_root.resolve()).as_posix()
+        except ValueError:
+            return None
+        index.refresh()
+        if rel not in index.files:
+            return None
+        
+        hits = index.search(topic, limit=max_sections, scope=rel)
+        if not hits:
+            # Nothing matched inside the file: fall back to its opening section
+            hits = [{'section': s['heading'], 'line': s['start'] + 1, 'score': 0.0}
+                    for s in index.files[rel]['sections'][:1]]
+        return [
+            {
+                'section': hit['section'],
+                'line': hit['line'],
+                'score': hit['score'],
+                'text': index.section_text(rel, hit['line']) or ''
+            }
+            for hit in hits
+        ]
+    
+    def _stat_index(self):
+        """Return the StatSheetIndex for the current stat sheet directory contents."""
+        snapshot = self.catalog.scan(self.npc_stat_sheets_dir)
+        for stat_file, e in snapshot.errors:
+            print(f"Warning: Error reading {stat_file.name}: {e}")
+        return get_stat_sheet_index(snapshot)
+    
     def query_npc_enemy_stats(self, name=None, entity_type=None, category=None, location=None):
         """
         Query NPC/enemy stat sheets based on filters
@@ -568,63 +594,37 @@ class DataQueryManager:
         Returns:
             List of matching stat sheets
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return []
+        index = self._stat_index()
+        candidates = index.all
         
-        results = []
+        # Type filter (exact match, case-insensitive)
+        if entity_type:
+            candidates = candidates & index.entity_type(entity_type)
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                match = True
-                
-                # Name filter (partial, case-insensitive)
-                if name and name.lower() not in stat_sheet.get('name', '').lower():
-                    match = False
-                
-                # Type filter (exact match, case-insensitive)
-                if entity_type and entity_type.lower() != stat_sheet.get('type', '').lower():
-                    match = False
-                
-                # Category filter (exact match, case-insensitive)
-                if category and category.lower() != stat_sheet.get('category', '').lower():
-                    match = False
-                
-                # Location filter (partial match in either direction, case-insensitive)
-                if location:
-                    sheet_location = stat_sheet.get('location', '')
-                    if not location_matches(location, sheet_location):
-                        match = False
-                
-                if match:
-                    results.append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
+        # Category filter (exact match, case-insensitive)
+        if category:
+            candidates = candidates & index.category(category)
+        
+        # Location filter (partial match in either direction, case-insensitive)
+        if location:
+            candidates = candidates & index.location(location)
+        
+        results = []
+        for stat_sheet in index.select(candidates):
+            # Name filter (partial, case-insensitive)
+            if name and name.lower() not in stat_sheet.get('name', '').lower():
                 continue
+            results.append(copy_record(stat_sheet))
         
         return results
     
     def get_npc_enemy_stat_by_id(self, stat_id):
         """Get a specific NPC/enemy stat sheet by ID"""
-        if not self.npc_stat_sheets_dir.exists():
+        index = self._stat_index()
+        position = index.by_id.get(stat_id)
+        if position is None:
             return None
-        
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                if stat_sheet.get('id') == stat_id:
-                    return stat_sheet
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
-        
-        return None
+        return copy_record(index.sheets[position])
     
     def get_enemies_by_location(self, location):
         """Get all enemies that can appear in a specific location"""
@@ -640,46 +640,12 @@ class DataQueryManager:
         Returns:
             Dict with primary, contested, and rare enemies for the hold
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return {"primary": [], "contested": [], "rare": []}
-        
-        results = {
-            "primary": [],
-            "contested": [],
-            "rare": []
+        index = self._stat_index()
+        tiers = index.enemies_by_hold(hold_name)
+        return {
+            tier: [copy_record(sheet) for sheet in index.select(indices)]
+            for tier, indices in tiers.items()
         }
-        
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Only consider enemies
-                if stat_sheet.get('category') != 'Enemy':
-                    continue
-                
-                hold_context = stat_sheet.get('hold_context', {})
-                
-                # Check if hold is in primary list
-                if hold_name in hold_context.get('primary', []):
-                    results['primary'].append(stat_sheet)
-                # Check if hold is in contested list
-                elif hold_name in hold_context.get('contested', []):
-                    results['contested'].append(stat_sheet)
-                # Check if hold is in rare list
-                elif hold_name in hold_context.get('rare', []):
-                    results['rare'].append(stat_sheet)
-                # Also check location field for general matches
-                elif location_matches(hold_name, stat_sheet.get('location', '')):
-                    # Add to primary if no hold_context specified
-                    if not hold_context:
-                        results['primary'].append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
-        
-        return results
     
     def get_enemies_by_act(self, act):
         """
@@ -691,29 +657,27 @@ class DataQueryManager:
         Returns:
             List of enemy stat sheets appropriate for the act
         """
-        if not self.npc_stat_sheets_dir.exists():
-            return []
-        
-        results = []
+        index = self._stat_index()
+        matches = index.act(act) & index.category("Enemy")
+        return [copy_record(sheet) for sheet in index.select(matches)]
+    
+    def get_enemies_by_hold_and_act(self, hold_name, act):
+        """
+        Get enemies for a hold, split by rarity tier, restricted to an act
         
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Only consider enemies
-                if stat_sheet.get('category') != 'Enemy':
-                    continue
-                
-                # Check if act is in act_context
-                if act in stat_sheet.get('act_context', []):
-                    results.append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+        Args:
+            hold_name: Name of the hold (e.g., 'Eastmarch', 'The Rift')
+            act: Act identifier (e.g., 'Act 1')
         
-        return results
+        Returns:
+            Dict with primary, contested, and rare enemies valid in both
+        """
+        index = self._stat_index()
+        in_act = index.act(act)
+        return {
+            tier: [copy_record(sheet) for sheet in index.select(indices & in_act)]
+            for tier, indices in index.enemies_by_hold(hold_name).items()
+        }
     
     def get_npcs_for_scene(self, location=None, scene_type=None):
         """
@@ -733,45 +697,31 @@ class DataQueryManager:
         }
         
         if location:
-            # Get friendly NPCs at location
-            result['friendly'] = self.query_npc_enemy_stats(
-                location=location, 
-                category="Friendly NPC"
-            )
-            
-            # Get hostile NPCs at location
-            result['hostile'] = self.query_npc_enemy_stats(
-                location=location, 
-                category="Hostile NPC"
-            )
-            
-            # Get enemies at location
-            result['enemies'] = self.query_npc_enemy_stats(
-                location=location, 
-                category="Enemy"
-            )
+            index = self._stat_index()
+            at_location = index.location(location)
+            for key, category in (
+                ('friendly', "Friendly NPC"),
+                ('hostile', "Hostile NPC"),
+                ('enemies', "Enemy"),
+            ):
+                result[key] = [
+                    copy_record(sheet)
+                    for sheet in index.select(at_location & index.category(category))
+                ]
         
         return result
     
     def list_all_stat_sheets(self):
         """List all available NPC/enemy stat sheets"""
-        if not self.npc_stat_sheets_dir.exists():
-            return []
-        
         results = []
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                    results.append({
-                        'id': stat_sheet.get('id'),
-                        'name': stat_sheet.get('name'),
-                        'type': stat_sheet.get('type'),
-                        'category': stat_sheet.get('category'),
-                        'location': stat_sheet.get('location')
-                    })
-            except (json.JSONDecodeError, IOError):
-                continue
+        for stat_sheet in self.catalog.records(self.npc_stat_sheets_dir, warn=False):
+            results.append({
+                'id': stat_sheet.get('id'),
+                'name': stat_sheet.get('name'),
+                'type': stat_sheet.get('type'),
+                'category': stat_sheet.get('category'),
+                'location': stat_sheet.get('location')
+            })
         
         return results
 
@@ -863,7 +813,7 @@ def main():
     print("\n3. Searching rules for 'magic'...")
     rule_results = manager.search_rules("magic")
     for result in rule_results:
-        print(f"\nFound in {result['file']}:")
+        print(f"\nFound in {result['file']} - {result['section']} (score {result['score']}):")
         for line in result['matches'][:5]:  # Show first 5 lines
             print(f"  {line}")
     
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Quest Graph for Skyrim TTRPG
+
+Compiled, process-wide view of the quest files in data/quests.
+
+Each questline file is parsed once and compiled into:
+- an id -> quest record map (live references into the parsed file)
+- successor edges from 'next_quest' / 'next_quests'
+- predecessor edges (inverse successors plus 'prerequisites')
+- status buckets (status -> set of quest ids)
+- act buckets (act -> list of quest records, in file order)
+
+Status changes go through the graph so the buckets stay in sync, and the
+file is written back once per change. A questline is recompiled only when
+its file's mtime or size changes behind the graph's back.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+# Statuses that a completed predecessor may promote to 'available'
+UNLOCKABLE_STATUSES = (None, "locked", "stub", "conditional")
+
+
+def iter_quest_records(quests_data):
+    """
+    Recursively yield quest record dicts from arbitrary quest trees.
+
+    A "quest record" is any dict that has at least an 'id' and a 'name'
+    and is not explicitly marked as a non-quest reference.
+
+    Yields:
+        dict: Quest record dictionaries (live references, safe to mutate)
+    """
+    if isinstance(quests_data, dict):
+        if (
+            "id" in quests_data
+            and "name" in quests_data
+            and quests_data.get("record_type") != "reference"
+        ):
+            yield quests_data
+
+        for v in quests_data.values():
+            yield from iter_quest_records(v)
+
+    elif isinstance(quests_data, list):
+        for item in quests_data:
+            yield from iter_quest_records(item)
+
+
+def successor_ids(record):
+    """Return the quest ids a record unlocks on completion, in declared order."""
+    next_ids = []
+    if isinstance(record.get("next_quest"), str):
+        next_ids.append(record["next_quest"])
+    if isinstance(record.get("next_quests"), list):
+        next_ids.extend(x for x in record["next_quests"] if isinstance(x, str))
+    return next_ids
+
+
+class CompiledQuestline:
+    """One quest file (or one subtree of it) compiled for O(1) lookups."""
+
+    def __init__(self, path, data, root_keys, mtime_ns, size):
+        self.path = Path(path)
+        self.data = data
+        self.root_keys = tuple(root_keys)
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.graph = None   # owning QuestGraph, told when a save fails
+
+        self.records = []
+        self._order = {}
+        self.by_id = {}
+        self.successors = {}
+        self.predecessors = {}
+        self.by_status = {}
+        self.by_act = {}
+
+        root = self.root
+        if root is None:
+            return
+        for record in iter_quest_records(root):
+            quest_id = record.get("id")
+            self._order[id(record)] = len(self.records)
+            self.records.append(record)
+            self.by_id.setdefault(quest_id, []).append(record)
+            self.by_status.setdefault(record.get("status"), set()).add(quest_id)
+            self.by_act.setdefault(record.get("act"), []).append(record)
+
+            for next_id in successor_ids(record):
+                self.successors.setdefault(quest_id, []).append(next_id)
+                self.predecessors.setdefault(next_id, set()).add(quest_id)
+            prerequisites = record.get("prerequisites")
+            if isinstance(prerequisites, list):
+                for prereq in prerequisites:
+                    if isinstance(prereq, str):
+                        self.predecessors.setdefault(quest_id, set()).add(prereq)
+
+    @property
+    def root(self):
+        """The subtree quests are compiled from, or None if it is missing."""
+        node = self.data
+        for key in self.root_keys:
+            if not isinstance(node, dict) or key not in node:
+                return None
+            node = node[key]
+        return node
+
+    def get(self, quest_id):
+        """First quest record with quest_id, or None."""
+        records = self.by_id.get(quest_id)
+        return records[0] if records else None
+
+    def with_status(self, status):
+        """Quest records with the given status, in file order."""
+        matches = [
+            record
+            for quest_id in self.by_status.get(status, ())
+            for record in self.by_id.get(quest_id, ())
+            if record.get("status") == status
+        ]
+        matches.sort(key=lambda record: self._order[id(record)])
+        return matches
+
+    def in_act(self, act):
+        """Quest records whose 'act' equals act, in file order."""
+        return list(self.by_act.get(act, ()))
+
+    def set_status(self, quest_id, new_status):
+        """
+        Set the status of the first record with quest_id.
+
+        Returns:
+            tuple: (record, old_status), or (None, None) if not found
+        """
+        record = self.get(quest_id)
+        if record is None:
+            return None, None
+        old_status = record.get("status", "locked")
+        self._move(record, new_status)
+        return record, old_status
+
+    def unlock_successors(self, record):
+        """
+        Promote every locked/stub/conditional successor of a completed quest
+        record to 'available'.
+
+        Returns:
+            list: Records that were unlocked
+        """
+        unlocked = []
+        for next_id in successor_ids(record):
+            for successor in self.by_id.get(next_id, ()):
+                if successor.get("status") in UNLOCKABLE_STATUSES:
+                    self._move(successor, "available")
+                    unlocked.append(successor)
+        return unlocked
+
+    def _move(self, record, new_status):
+        quest_id = record.get("id")
+        old_status = record.get("status")
+        record["status"] = new_status
+        # Another record with the same id may still hold the old status
+        if not any(r.get("status") == old_status for r in self.by_id.get(quest_id, ())):
+            self.by_status.get(old_status, set()).discard(quest_id)
+        self.by_status.setdefault(new_status, set()).add(quest_id)
+
+    def save(self):
+        """
+        Atomically write the quest file back and remember its new mtime/size.
+
+        If the write fails the in-memory statuses no longer match the file,
+        so this questline is dropped from its graph (the next lookup reloads
+        the file) before the error propagates.
+        """
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+            st = os.stat(self.path)
+        except BaseException:
+            self.mtime_ns = self.size = None
+            if self.graph is not None:
+                self.graph.discard(self)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.mtime_ns, self.size = st.st_mtime_ns, st.st_size
+
+
+class QuestGraph:
+    """
+    Process-wide cache of compiled questlines.
+
+    Use ``get_quest_graph()`` to obtain the shared instance.
+    """
+
+    def __init__(self):
+        self._questlines = {}
+        self._lock = threading.RLock()
+
+    def questline(self, path, root_keys=()):
+        """
+        Return the compiled questline for a file, recompiling only if the
+        file changed on disk.
+
+        Args:
+            path: Quest JSON file
+            root_keys: Keys leading to the quest subtree (e.g.
+                       ("main_questline", "quests")); empty for the whole file
+
+        Returns:
+            CompiledQuestline, or None if the file does not exist
+        """
+        path = Path(path)
+        key = (str(path), tuple(root_keys))
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._questlines.pop(key, None)
+            return None
+
+        with self._lock:
+            compiled = self._questlines.get(key)
+            if compiled is None or compiled.mtime_ns != st.st_mtime_ns or compiled.size != st.st_size:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                compiled = CompiledQuestline(path, data, root_keys, st.st_mtime_ns, st.st_size)
+                compiled.graph = self
+                self._questlines[key] = compiled
+            return compiled
+
+    def all_questlines(self, quests_dir):
+        """
+        Compile every *.json quest file in quests_dir (whole-file scope).
+
+        Returns:
+            dict: filename stem -> CompiledQuestline
+        """
+        compiled = {}
+        for path in sorted(Path(quests_dir).glob("*.json")):
+            try:
+                questline = self.questline(path)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Warning: Error reading {path.name}: {e}")
+                continue
+            if questline is not None:
+                compiled[path.stem] = questline
+        return compiled
+
+    def find(self, quests_dir, quest_id):
+        """
+        Locate quest_id across every quest file in quests_dir.
+
+        Returns:
+            list of (filename stem, record) pairs
+        """
+        return [
+            (stem, record)
+            for stem, questline in self.all_questlines(quests_dir).items()
+            for record in questline.by_id.get(quest_id, ())
+        ]
+
+    def discard(self, questline):
+        """Forget a compiled questline (e.g. one whose save failed)."""
+        with self._lock:
+            key = (str(questline.path), questline.root_keys)
+            if self._questlines.get(key) is questline:
+                del self._questlines[key]
+
+    def invalidate(self, path=None):
+        """Forget compiled questlines for path, or everything if path is None."""
+        with self._lock:
+            if path is None:
+                self._questlines.clear()
+                return
+            for key in [k for k in self._questlines if k[0] == str(Path(path))]:
+                del self._questlines[key]
+
+
+_GRAPH = QuestGraph()
+
+
+def get_quest_graph():
+    """Return the process-wide QuestGraph instance."""
+    return _GRAPH
@@ -7,12 +7,23 @@ Checks player character backstory keywords against NPC-specific resonance patter
 to infer a starting favor bonus without overriding existing relationship data.
 
 Supported NPCs include Ulfric Stormcloak kinship/familiarity inference.
+
+Keywords match whole words (see keyword_matcher). All rules are compiled
+into one matcher, so a backstory is scanned once no matter how many NPCs
+are checked; infer_all runs every PC against every NPC stat sheet in one
+pass for onboarding.
 """
 
 import json
 import os
 from pathlib import Path
 
+from campaign_state import load_state, save_state
+from data_catalog import get_catalog
+from keyword_matcher import KeywordMatcher, get_token_cache, normalize
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
 
 # ---------------------------------------------------------------------------
 # NPC inference rules
@@ -116,6 +127,58 @@ def _extract_backstory_text(pc_data):
     return " ".join(fragments).lower()
 
 
+_COMPILED = {}
+
+
+def _compiled_rules():
+    """(matcher, {npc_id: [(rule, keyword keys)]}) for _INFERENCE_RULES."""
+    key = id(_INFERENCE_RULES)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        keywords, by_npc = set(), {}
+        for npc_id, rules in _INFERENCE_RULES.items():
+            for rule in rules:
+                keys = [normalize(kw) for kw in rule["keywords"]]
+                keywords.update(keys)
+                by_npc.setdefault(npc_id, []).append((rule, keys))
+        _COMPILED.clear()
+        compiled = _COMPILED[key] = (KeywordMatcher(keywords), by_npc)
+    return compiled
+
+
+def _backstory_hits(pc_data):
+    """Rule keywords found in a PC's backstory (one scan for all NPCs)."""
+    matcher, _ = _compiled_rules()
+    cache = get_token_cache()
+    if isinstance(pc_data, (str, Path)):
+        tokens = cache.file(pc_data, _backstory_of_file)
+    else:
+        tokens = cache.text(_extract_backstory_text(pc_data))
+    return matcher.match_normalized(tokens)
+
+
+def _backstory_of_file(path):
+    return _extract_backstory_text(_read_pc(path))
+
+
+def _read_pc(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _triggered(hits, npc_id):
+    _, by_npc = _compiled_rules()
+    return [
+        {
+            "flag": rule["flag"],
+            "bonus_text": rule["bonus_text"],
+            "bonus_value": rule["bonus_value"],
+        }
+        for rule, keys in by_npc.get(npc_id, ())
+        if any(k in hits for k in keys)
+    ]
+
+
 def infer_for_npc(pc_data, npc_id):
     """
     Infer backstory-based favor bonuses for a single NPC.
@@ -131,22 +194,75 @@ def infer_for_npc(pc_data, npc_id):
             'bonus_value' - numeric bonus value
         Returns empty list if no inference rules match.
     """
-    rules = _INFERENCE_RULES.get(npc_id, [])
-    if not rules:
+    if npc_id not in _INFERENCE_RULES:
         return []
+    return _triggered(_backstory_hits(pc_data), npc_id)
+
 
-    backstory = _extract_backstory_text(pc_data)
-    triggered = []
+def stat_sheet_npc_ids(data_dir=None):
+    """Ids of every NPC stat sheet under data/npc_stat_sheets, sorted."""
+    snapshot = get_catalog().scan(Path(data_dir or DATA_DIR) / "npc_stat_sheets")
+    ids = set()
+    for file_path, record in snapshot.records:
+        npc_id = record.get("id") if isinstance(record, dict) else None
+        ids.add(npc_id if isinstance(npc_id, str) and npc_id else file_path.stem)
+    return sorted(ids)
 
-    for rule in rules:
-        if any(kw.lower() in backstory for kw in rule["keywords"]):
-            triggered.append({
-                "flag": rule["flag"],
-                "bonus_text": rule["bonus_text"],
-                "bonus_value": rule["bonus_value"],
-            })
 
-    return triggered
+def infer_all(pcs, npc_ids=None, data_dir=None):
+    """
+    Infer bonuses for every PC against every NPC in one pass.
+
+    Args:
+        pcs      (list): PC file paths and/or parsed PC dicts.
+        npc_ids  (list[str] | None): NPCs to check; defaults to every
+                 sheet in data/npc_stat_sheets.
+        data_dir (str | None): Data directory holding npc_stat_sheets.
+
+    Returns:
+        dict: pc_id -> {npc_id: [triggered results]}; NPCs with no hits
+              are left out. Each backstory is tokenized and scanned once.
+    """
+    if npc_ids is None:
+        npc_ids = stat_sheet_npc_ids(data_dir)
+    npc_ids = [n for n in dict.fromkeys(npc_ids) if n in _INFERENCE_RULES]
+
+    inferred = {}
+    for pc in pcs:
+        if isinstance(pc, (str, Path)):
+            pc_id = _read_pc(pc).get("id") or Path(pc).stem
+        else:
+            pc_id = pc.get("id") or pc.get("name") or "pc"
+        hits = _backstory_hits(pc)
+        per_npc = inferred.setdefault(pc_id, {})
+        for npc_id in npc_ids:
+            results = _triggered(hits, npc_id)
+            if results:
+                per_npc[npc_id] = results
+    return inferred
+
+
+def _write_inference(state, pc_id, inferred):
+    """setdefault inferred flags into state; returns what was new."""
+    ri = state.setdefault("relationship_inference", {})
+    pc_ri = ri.setdefault(pc_id, {})
+
+    written = {}
+    for npc_id, results in inferred.items():
+        new_results = []
+        for result in results:
+            flag = result["flag"]
+            if flag not in pc_ri:
+                pc_ri[flag] = {
+                    "npc_id": npc_id,
+                    "bonus_text": result["bonus_text"],
+                    "bonus_value": result["bonus_value"],
+                    "consumed": False,
+                }
+                new_results.append(result)
+        if new_results:
+            written[npc_id] = new_results
+    return written
 
 
 def apply_inference_to_state(state_path, pc_path, npc_ids):
@@ -174,36 +290,41 @@ def apply_inference_to_state(state_path, pc_path, npc_ids):
     if not pc_path.exists():
         raise FileNotFoundError(f"PC file not found: {pc_path}")
 
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
+    state = load_state(state_path)
+    pc_data = _read_pc(pc_path)
+    pc_id = pc_data.get("id") or pc_path.stem
 
-    with open(pc_path, "r", encoding="utf-8") as f:
-        pc_data = json.load(f)
+    hits = _backstory_hits(pc_data)
+    inferred = {npc_id: _triggered(hits, npc_id) for npc_id in npc_ids}
+    written = _write_inference(state, pc_id, inferred)
 
-    pc_id = pc_data.get("id") or pc_path.stem
-    ri = state.setdefault("relationship_inference", {})
-    pc_ri = ri.setdefault(pc_id, {})
+    save_state(state_path, state)
 
-    written = {}
+    return written
 
-    for npc_id in npc_ids:
-        results = infer_for_npc(pc_data, npc_id)
-        new_results = []
-        for result in results:
-            flag = result["flag"]
-            if flag not in pc_ri:
-                pc_ri[flag] = {
-                    "npc_id": npc_id,
-                    "bonus_text": result["bonus_text"],
-                    "bonus_value": result["bonus_value"],
-                    "consumed": False,
-                }
-                new_results.append(result)
-        if new_results:
-            written[npc_id] = new_results
 
-    with open(state_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+def apply_inference_for_party(state_path, pc_paths, npc_ids=None, data_dir=None):
+    """
+    Onboarding variant of apply_inference_to_state for a whole party.
+
+    Runs infer_all over every PC file (against every NPC stat sheet unless
+    npc_ids is given) and saves the state once.
+
+    Returns:
+        dict: pc_id -> {npc_id: [results written]}.
+    """
+    state_path = Path(state_path)
+    if not state_path.exists():
+        raise FileNotFoundError(f"State file not found: {state_path}")
+    for pc_path in pc_paths:
+        if not Path(pc_path).exists():
+            raise FileNotFoundError(f"PC file not found: {pc_path}")
+
+    state = load_state(state_path)
+    inferred = infer_all(pc_paths, npc_ids, data_dir)
+    written = {pc_id: _write_inference(state, pc_id, per_npc) for pc_id, per_npc in inferred.items()}
+
+    save_state(state_path, state)
 
     return written
 
@@ -16,6 +16,7 @@ import os
 from pathlib import Path
 from datetime import datetime
 from character_creation import get_backstory_tags
+from campaign_state import load_state, save_state
 
 
 # Faction name mapping for consistency
@@ -739,10 +740,8 @@ class SessionZeroManager:
         campaign_state_file = self.state_dir / "campaign_state.json"
         
         # Load existing campaign state
-        if campaign_state_file.exists():
-            with open(campaign_state_file, 'r') as f:
-                campaign_state = json.load(f)
-        else:
+        campaign_state = load_state(campaign_state_file)
+        if campaign_state is None:
             # Create default campaign state if it doesn't exist
             campaign_state = {
                 "campaign_id": "skyrim_fate_core_001",
@@ -1110,9 +1109,7 @@ class SessionZeroManager:
         campaign_state["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Save updated campaign state
-        campaign_state_file.parent.mkdir(exist_ok=True)
-        with open(campaign_state_file, 'w') as f:
-            json.dump(campaign_state, f, indent=2)
+        save_state(campaign_state_file, campaign_state)
         
         print(f"\nCampaign state updated: {campaign_state_file}")
         print(f"Starting location: {campaign_state.get('starting_location_detail') or campaign_state.get('starting_location')}")
@@ -1696,16 +1693,9 @@ def reset_dynamic_campaign_state(state_path) -> dict:
     Load the campaign state at state_path, reset all dynamic fields to Session 0
     baseline, write it back, and return the new state.
     """
-    import json
-    from pathlib import Path
-    p = Path(state_path)
-    existing = {}
-    if p.exists():
-        with open(p) as f:
-            existing = json.load(f)
+    existing = load_state(state_path) or {}
     new_state = build_clean_campaign_state(existing)
-    with open(p, "w") as f:
-        json.dump(new_state, f, indent=2)
+    save_state(state_path, new_state)
     return new_state
 
 
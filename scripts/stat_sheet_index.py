@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Stat Sheet Index for Skyrim TTRPG
+
+Secondary indexes over the NPC/enemy stat sheets in data/npc_stat_sheets.
+
+The index is built from a DataCatalog DirectorySnapshot and rebuilt only
+when the snapshot version changes. Sheets are addressed by their position
+in the snapshot (filename order), so every lookup is a set operation and
+results come back in the same order a directory scan would produce.
+
+Indexed keys:
+- category and type (case-insensitive exact match)
+- act_context entries
+- hold_context primary / contested / rare holds
+- location strings (lower-cased), with bidirectional substring matches
+  resolved once per distinct query and memoized
+"""
+
+import threading
+
+from location_gazetteer import get_gazetteer
+from utils import location_matches
+
+HOLD_TIERS = ("primary", "contested", "rare")
+
+# Upper bound on memoized location queries per index
+_LOCATION_MEMO_LIMIT = 1024
+
+
+class StatSheetIndex:
+    """Set-based lookups over one snapshot of stat sheets."""
+
+    def __init__(self, snapshot):
+        """
+        Build indexes for every sheet in a DirectorySnapshot.
+
+        Args:
+            snapshot: DirectorySnapshot from DataCatalog.scan()
+        """
+        self.version = snapshot.version
+        self.sheets = [record for _, record in snapshot.records if isinstance(record, dict)]
+        self.all = frozenset(range(len(self.sheets)))
+
+        self.by_id = {}
+        self.by_category = {}
+        self.by_type = {}
+        self.by_act = {}
+        self.by_hold = {tier: {} for tier in HOLD_TIERS}
+        self.without_hold_context = set()
+        self.by_location = {}
+        self._location_memo = {}
+        self._location_memo_version = None
+
+        for i, sheet in enumerate(self.sheets):
+            sheet_id = sheet.get('id')
+            if sheet_id is not None:
+                self.by_id.setdefault(sheet_id, i)
+
+            self.by_category.setdefault(str(sheet.get('category', '')).lower(), set()).add(i)
+            self.by_type.setdefault(str(sheet.get('type', '')).lower(), set()).add(i)
+
+            for act in sheet.get('act_context') or []:
+                if isinstance(act, str):
+                    self.by_act.setdefault(act, set()).add(i)
+
+            hold_context = sheet.get('hold_context') or {}
+            if not hold_context:
+                self.without_hold_context.add(i)
+            elif isinstance(hold_context, dict):
+                for tier in HOLD_TIERS:
+                    for hold in hold_context.get(tier) or []:
+                        if isinstance(hold, str):
+                            self.by_hold[tier].setdefault(hold, set()).add(i)
+
+            location = sheet.get('location')
+            if isinstance(location, str) and location:
+                self.by_location.setdefault(location.lower(), set()).add(i)
+
+    def category(self, category):
+        """Indices of sheets whose category matches (case-insensitive)."""
+        return self.by_category.get(str(category).lower(), set())
+
+    def entity_type(self, entity_type):
+        """Indices of sheets whose type matches (case-insensitive)."""
+        return self.by_type.get(str(entity_type).lower(), set())
+
+    def act(self, act):
+        """Indices of sheets listing act in act_context."""
+        return self.by_act.get(act, set())
+
+    def hold(self, tier, hold_name):
+        """Indices of sheets listing hold_name in hold_context[tier]."""
+        return self.by_hold[tier].get(hold_name, set())
+
+    def location(self, search_location):
+        """
+        Indices of sheets whose location matches per utils.location_matches.
+
+        Each distinct location string is tested once per distinct query; the
+        answer is memoized until this index or the gazetteer's hold/location
+        data changes.
+        """
+        if not search_location or not isinstance(search_location, str):
+            return set()
+        gazetteer_version = get_gazetteer().version
+        if gazetteer_version != self._location_memo_version:
+            self._location_memo.clear()
+            self._location_memo_version = gazetteer_version
+        key = search_location.lower()
+        hit = self._location_memo.get(key)
+        if hit is not None:
+            return hit
+
+        matched = set()
+        for sheet_location, indices in self.by_location.items():
+            if location_matches(key, sheet_location):
+                matched |= indices
+        matched = frozenset(matched)
+
+        if len(self._location_memo) >= _LOCATION_MEMO_LIMIT:
+            self._location_memo.clear()
+        self._location_memo[key] = matched
+        return matched
+
+    def enemies_by_hold(self, hold_name):
+        """
+        Split enemy sheets for a hold into primary / contested / rare tiers.
+
+        A sheet lands in the first tier that lists the hold. Enemies with no
+        hold_context fall back to primary when their location matches.
+
+        Returns:
+            dict: tier -> set of indices
+        """
+        enemies = self.category("Enemy")
+        primary = self.hold("primary", hold_name) & enemies
+        contested = (self.hold("contested", hold_name) & enemies) - primary
+        rare = (self.hold("rare", hold_name) & enemies) - primary - contested
+        fallback = self.without_hold_context & enemies & self.location(hold_name)
+        return {
+            "primary": primary | fallback,
+            "contested": contested,
+            "rare": rare,
+        }
+
+    def select(self, indices):
+        """Return the sheets for indices, in snapshot (filename) order."""
+        return [self.sheets[i] for i in sorted(indices)]
+
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+def get_stat_sheet_index(snapshot):
+    """
+    Return the StatSheetIndex for a snapshot, reusing the cached one if the
+    snapshot has not changed since it was built.
+    """
+    key = str(snapshot.directory)
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is None or index.version != snapshot.version:
+            index = StatSheetIndex(snapshot)
+            _INDEXES[key] = index
+        return index
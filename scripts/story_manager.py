@@ -16,9 +16,12 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
-from utils import location_matches
 from query_data import DataQueryManager
-from first_impression import maybe_first_impression
+from quest_graph import get_quest_graph, iter_quest_records
+from data_catalog import copy_record
+from first_impression import impressions_for_scene
+from campaign_state import campaign_state_transaction, load_state, save_state
+from clock_registry import get_clock_registry
 
 # Import LootManager if available
 try:
@@ -82,6 +85,7 @@ class StoryManager:
         self.thalmor_path = self.data_dir / "thalmor_arcs.json"
         self.npc_stat_sheets_dir = self.data_dir / "npc_stat_sheets"
         self.query_manager = DataQueryManager(str(self.data_dir))
+        self.quest_graph = get_quest_graph()
         self.college_quests = self.load_college_quests()
         self.companions_quests = self.load_companions_quests()
         self.silver_hand_quests = self.load_silver_hand_quests()
@@ -94,17 +98,23 @@ class StoryManager:
         
     def load_campaign_state(self):
         """Load current campaign state"""
-        if self.campaign_state_path.exists():
-            with open(self.campaign_state_path, 'r') as f:
-                return json.load(f)
-        return None
+        return load_state(self.campaign_state_path)
     
     def save_campaign_state(self, state):
-        """Save campaign state"""
-        self.state_dir.mkdir(exist_ok=True)
+        """Save campaign state (deferred while a transaction is open)"""
         state['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.campaign_state_path, 'w') as f:
-            json.dump(state, f, indent=2)
+        save_state(self.campaign_state_path, state)
+
+    def transaction(self):
+        """
+        Open a campaign state transaction on this manager's state file.
+
+        Usage:
+            with sm.transaction() as state:
+                sm.advance_questline("main", "battle_of_whiterun", "completed")
+                sm.apply_combat_consequences("dragon", "victory")
+        """
+        return campaign_state_transaction(self.campaign_state_path)
     
     def load_main_quests(self):
         """Load main quest data"""
@@ -360,67 +370,69 @@ class StoryManager:
         """
         Update civil war state and (optionally) advance questlines.
         """
-        state = self.load_campaign_state()
-        if not state:
-            return False
-
-        cw_state = state.setdefault("civil_war_state", {})
-        cw_state.setdefault("imperial_victories", 0)
-        cw_state.setdefault("stormcloak_victories", 0)
-        cw_state.setdefault("key_battles_completed", [])
-
-        if alliance:
-            alliance = str(alliance).lower().strip()
-            cw_state["player_alliance"] = alliance
-            print(f"Player alliance set to: {alliance}")
-
-        if battle_result:
-            battle_name = str(battle_result.get("battle_name") or "")
-            winner = str(battle_result.get("winner") or "").lower().strip()
-            quest_id = battle_result.get("quest_id")
-
-            if winner == "imperial":
-                cw_state["imperial_victories"] += 1
-            elif winner == "stormcloak":
-                cw_state["stormcloak_victories"] += 1
-
-            if battle_name and battle_name not in cw_state["key_battles_completed"]:
-                cw_state["key_battles_completed"].append(battle_name)
-
-            if not quest_id:
-                bn = battle_name.lower()
-                if "whiterun" in bn:
-                    if winner == "imperial":
-                        quest_id = "battle_for_whiterun_imperial"
-                    elif winner == "stormcloak":
-                        quest_id = "battle_for_whiterun_stormcloak"
-                    else:
-                        pal = (cw_state.get("player_alliance") or "").lower()
-                        if pal == "imperial":
+        # One transaction so the questline syncs below share this state
+        with self.transaction():
+            state = self.load_campaign_state()
+            if not state:
+                return False
+
+            cw_state = state.setdefault("civil_war_state", {})
+            cw_state.setdefault("imperial_victories", 0)
+            cw_state.setdefault("stormcloak_victories", 0)
+            cw_state.setdefault("key_battles_completed", [])
+
+            if alliance:
+                alliance = str(alliance).lower().strip()
+                cw_state["player_alliance"] = alliance
+                print(f"Player alliance set to: {alliance}")
+
+            if battle_result:
+                battle_name = str(battle_result.get("battle_name") or "")
+                winner = str(battle_result.get("winner") or "").lower().strip()
+                quest_id = battle_result.get("quest_id")
+
+                if winner == "imperial":
+                    cw_state["imperial_victories"] += 1
+                elif winner == "stormcloak":
+                    cw_state["stormcloak_victories"] += 1
+
+                if battle_name and battle_name not in cw_state["key_battles_completed"]:
+                    cw_state["key_battles_completed"].append(battle_name)
+
+                if not quest_id:
+                    bn = battle_name.lower()
+                    if "whiterun" in bn:
+                        if winner == "imperial":
                             quest_id = "battle_for_whiterun_imperial"
-                        elif pal == "stormcloak":
+                        elif winner == "stormcloak":
                             quest_id = "battle_for_whiterun_stormcloak"
-                elif "windhelm" in bn:
-                    quest_id = "battle_for_windhelm"
-                elif "solitude" in bn:
-                    quest_id = "battle_for_solitude"
-
-            if battle_name and "whiterun" in battle_name.lower():
-                cw_state["battle_of_whiterun_status"] = "completed"
-                if winner:
-                    cw_state["whiterun_control"] = winner
-                    cw_state["battle_of_whiterun_faction"] = winner
-                print(f"Battle of Whiterun completed - Winner: {winner or 'unknown'}")
-                self.advance_questline("main", "battle_of_whiterun", "completed")
+                        else:
+                            pal = (cw_state.get("player_alliance") or "").lower()
+                            if pal == "imperial":
+                                quest_id = "battle_for_whiterun_imperial"
+                            elif pal == "stormcloak":
+                                quest_id = "battle_for_whiterun_stormcloak"
+                    elif "windhelm" in bn:
+                        quest_id = "battle_for_windhelm"
+                    elif "solitude" in bn:
+                        quest_id = "battle_for_solitude"
+
+                if battle_name and "whiterun" in battle_name.lower():
+                    cw_state["battle_of_whiterun_status"] = "completed"
+                    if winner:
+                        cw_state["whiterun_control"] = winner
+                        cw_state["battle_of_whiterun_faction"] = winner
+                    print(f"Battle of Whiterun completed - Winner: {winner or 'unknown'}")
+                    self.advance_questline("main", "battle_of_whiterun", "completed")
+
+                if battle_name and ("windhelm" in battle_name.lower() or "solitude" in battle_name.lower()):
+                    self.advance_questline("main", "siege_of_windhelm_or_solitude", "completed")
+
+                if quest_id:
+                    self.advance_questline("civil_war", quest_id, "completed")
 
-            if battle_name and ("windhelm" in battle_name.lower() or "solitude" in battle_name.lower()):
-                self.advance_questline("main", "siege_of_windhelm_or_solitude", "completed")
-
-            if quest_id:
-                self.advance_questline("civil_war", quest_id, "completed")
-
-        self.save_campaign_state(state)
-        return True
+            self.save_campaign_state(state)
+            return True
     
     def update_main_quest_state(self, **kwargs):
         """
@@ -492,40 +504,9 @@ class StoryManager:
         """
         Recursively yield quest record dicts from arbitrary quest trees.
 
-        A "quest record" is any dict that has at least an 'id' and a 'name'
-        and is not explicitly marked as a non-quest reference.
-
-        Args:
-            quests_data: Any nested structure containing quest records.
-
-        Yields:
-            dict: Quest record dictionaries (live references, safe to mutate)
+        See quest_graph.iter_quest_records.
         """
-        if isinstance(quests_data, dict):
-            if (
-                "id" in quests_data
-                and "name" in quests_data
-                and quests_data.get("record_type") != "reference"
-            ):
-                yield quests_data
-
-            for v in quests_data.values():
-                yield from self._iter_quest_records(v)
-
-        elif isinstance(quests_data, list):
-            for item in quests_data:
-                yield from self._iter_quest_records(item)
-
-    def _load_json(self, path):
-        if path and Path(path).exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return None
-
-    def _save_json(self, path, data: dict):
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        return iter_quest_records(quests_data)
 
     def _questline_config(self, questline_type: str):
         """Resolve questline type -> (path, root_key, quests_key)."""
@@ -557,39 +538,20 @@ class StoryManager:
             return False
 
         quest_path, root_key, quests_key = self._questline_config(questline_type)
-        data = self._load_json(quest_path)
-        if not data or root_key not in data or quests_key not in data[root_key]:
+        questline = self.quest_graph.questline(quest_path, (root_key, quests_key))
+        if questline is None or not questline.data or questline.root is None:
             return False
 
-        quests_root = data[root_key][quests_key]
-
-        target = None
-        for q in self._iter_quest_records(quests_root):
-            if q.get("id") == quest_id:
-                target = q
-                break
-
+        target, old_status = questline.set_status(quest_id, new_status)
         if not target:
             return False
 
-        old_status = target.get("status", "locked")
-        target["status"] = new_status
-
         # Unlock next quests
         if new_status == "completed":
-            next_ids = []
-            if isinstance(target.get("next_quest"), str):
-                next_ids.append(target["next_quest"])
-            if isinstance(target.get("next_quests"), list):
-                next_ids.extend([x for x in target["next_quests"] if isinstance(x, str)])
+            for nq in questline.unlock_successors(target):
+                print(f"Unlocked quest: {nq.get('name', nq.get('id'))}")
 
-            for nid in next_ids:
-                for nq in self._iter_quest_records(quests_root):
-                    if nq.get("id") == nid and nq.get("status") in (None, "locked", "stub", "conditional"):
-                        nq["status"] = "available"
-                        print(f"Unlocked quest: {nq.get('name', nid)}")
-
-        self._save_json(quest_path, data)
+        questline.save()
 
         # Best-effort sync into campaign_state.json
         try:
@@ -651,23 +613,19 @@ class StoryManager:
         available = []
 
         # Main campaign questline
-        main_data = self.load_main_quests()
-        if main_data:
-            for quest in self._iter_quest_records(main_data.get("main_questline", {}).get("quests", [])):
-                if quest.get("status") == "available":
-                    available.append({"type": "main", "quest": quest})
+        main_line = self.quest_graph.questline(self.main_quests_path, ("main_questline", "quests"))
+        if main_line:
+            for quest in main_line.with_status("available"):
+                available.append({"type": "main", "quest": copy_record(quest)})
 
         # Civil War questline (filtered by alliance)
-        cw_data = self.load_civil_war_quests()
+        cw_line = self.quest_graph.questline(self.civil_war_path, ("civil_war_questline", "quests"))
         alliance = (state.get("civil_war_state", {}) or {}).get("player_alliance")
         alliance = (alliance or "").lower().strip()
         civil_war_eligible = self.check_civil_war_eligibility(state)
 
-        if cw_data:
-            for quest in self._iter_quest_records(cw_data.get("civil_war_questline", {}).get("quests", {})):
-                if quest.get("status") != "available":
-                    continue
-
+        if cw_line:
+            for quest in cw_line.with_status("available"):
                 q_faction = (quest.get("faction") or "").lower().strip()
                 qid = (quest.get("id") or "").lower()
 
@@ -683,7 +641,7 @@ class StoryManager:
                     if not civil_war_eligible:
                         continue
 
-                available.append({"type": "civil_war", "quest": quest})
+                available.append({"type": "civil_war", "quest": copy_record(quest)})
 
         # College questline (state-driven active quest)
         college_state = state.get("college_state", {}) or {}
@@ -812,28 +770,8 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
         if not self.npc_stat_sheets_dir.exists():
             return result
         
-        # Load all stat sheets and filter by location
-        for stat_file in self.npc_stat_sheets_dir.glob("*.json"):
-            try:
-                with open(stat_file, 'r') as f:
-                    stat_sheet = json.load(f)
-                
-                # Check if location matches (case-insensitive partial match)
-                sheet_location = stat_sheet.get('location', '')
-                
-                if location_matches(location, sheet_location):
-                    category = stat_sheet.get('category', '')
-                    
-                    if category == "Friendly NPC":
-                        result['friendly'].append(stat_sheet)
-                    elif category == "Hostile NPC":
-                        result['hostile'].append(stat_sheet)
-                    elif category == "Enemy":
-                        result['enemies'].append(stat_sheet)
-            
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Error reading {stat_file.name}: {e}")
-                continue
+        # Indexed location/category lookup (returns copies, safe to annotate)
+        result.update(self.query_manager.get_npcs_for_scene(location, scene_type))
         
         # Add scene-specific suggestions
         if scene_type == "combat":
@@ -948,27 +886,51 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
         # Get NPCs for scene
         scene_npcs = self.get_scene_npcs(location, scene_type)
         
-        # Add first impression hook for NPCs
-        # Dynamically determine PC appearance path based on active PC
+        # Add first impression hook for NPCs. Every impression shares one
+        # campaign state transaction, so the scene costs a single write.
         state_path = str(self.campaign_state_path)
+        try:
+            with self.transaction():
+                self._add_first_impressions(scene_npcs, state_path)
+        except json.JSONDecodeError:
+            pass  # Invalid state, skip first impressions
+        
+        # Build scene response
+        scene_setup = {
+            'location': location,
+            'type': scene_type,
+            'npcs': scene_npcs,
+            'description': self._generate_scene_description(location, scene_type),
+            'mechanical_notes': self._get_mechanical_notes(scene_type)
+        }
+        
+        pc_compels = self._get_pc_compel_hooks(max_items=5)
+        if pc_compels:
+            scene_setup["pc_compel_hooks"] = pc_compels
+        
+        return scene_setup
+    
+    def _add_first_impressions(self, scene_npcs, state_path):
+        """Append first-impression barks for the active PC to scene NPCs."""
+        # Dynamically determine PC appearance path based on active PC
         appearance_path = None
         
         # Try to determine PC ID from campaign state
         try:
-            with open(self.campaign_state_path, 'r') as f:
-                state = json.load(f)
-                pc_id = state.get("active_pc_id") or state.get("active_pc")
-                # Do not fall back to player_characters[0]; only proceed with explicit active PC
-                if pc_id:
-                    # Convert pc_id to appearance file slug
-                    slug = pc_id.replace("pc_", "")
-                    appearance_path = str(self.data_dir / "pcs" / "appearances" / f"{slug}_appearance.json")
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            pass  # No state or invalid state, skip first impressions
+            state = self.load_campaign_state() or {}
+            pc_id = state.get("active_pc_id") or state.get("active_pc")
+            # Do not fall back to player_characters[0]; only proceed with explicit active PC
+            if pc_id:
+                # Convert pc_id to appearance file slug
+                slug = pc_id.replace("pc_", "")
+                appearance_path = str(self.data_dir / "pcs" / "appearances" / f"{slug}_appearance.json")
+        except (json.JSONDecodeError, KeyError):
+            pass  # Invalid state, skip first impressions
         
         # Only attempt first impressions if appearance file exists
         if appearance_path and Path(appearance_path).exists():
             # scene_npcs is a dict of buckets -> list[dict]
+            scene = []
             for bucket_name, bucket_disposition in (
                 ("friendly", "positive"),
                 ("hostile", "negative"),
@@ -986,38 +948,31 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
                     # Normalize stat-sheet ids (e.g., 'npc_stat_mallus_maccius' -> 'mallus_maccius')
                     if isinstance(npc_id, str) and npc_id.startswith("npc_stat_"):
                         npc_id = npc_id.replace("npc_stat_", "", 1)
+                    scene.append((npc, npc_id, bucket_disposition))
+            if not scene:
+                return
+
+            # One state load, one appearance load and one write for the scene;
+            # an NPC listed in two buckets keeps its first bucket's disposition
+            dispositions = {}
+            for _, npc_id, disposition in scene:
+                dispositions.setdefault(npc_id, disposition)
+            try:
+                lines = impressions_for_scene(state_path, appearance_path, list(dispositions), dispositions)
+            except Exception as e:
+                # Log full error for debugging, show simple message to users
+                print(f"First impression error for {', '.join(dispositions)}: {e}", file=sys.stderr)
+                for npc, _, _ in scene:
+                    npc.setdefault("gm_barks", [])
+                    npc["gm_barks"].append("(First impression unavailable)")
+                return
+
+            for npc, npc_id, _ in scene:
+                line = lines.pop(npc_id, None)
+                if line:
+                    npc.setdefault("gm_barks", [])
+                    npc["gm_barks"].append(line)
 
-                    try:
-                        line = maybe_first_impression(
-                            state_path,
-                            appearance_path,
-                            npc_id,
-                            disposition=bucket_disposition
-                        )
-                        if line:
-                            npc.setdefault("gm_barks", [])
-                            npc["gm_barks"].append(line)
-                    except Exception as e:
-                        # Log full error for debugging, show simple message to users
-                        print(f"First impression error for {npc_id} in {bucket_name}: {e}", file=sys.stderr)
-                        npc.setdefault("gm_barks", [])
-                        npc["gm_barks"].append("(First impression unavailable)")
-        
-        # Build scene response
-        scene_setup = {
-            'location': location,
-            'type': scene_type,
-            'npcs': scene_npcs,
-            'description': self._generate_scene_description(location, scene_type),
-            'mechanical_notes': self._get_mechanical_notes(scene_type)
-        }
-        
-        pc_compels = self._get_pc_compel_hooks(max_items=5)
-        if pc_compels:
-            scene_setup["pc_compel_hooks"] = pc_compels
-        
-        return scene_setup
-    
     def _generate_scene_description(self, location, scene_type):
         """Generate a description for the scene"""
         descriptions = {
@@ -1598,27 +1553,13 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
         """
         import random
         
-        # Get enemies appropriate for this hold
-        hold_enemies = self.query_manager.get_enemies_by_hold(hold_name)
+        # Enemies that fit both hold and act (indexed set intersection)
+        hold_enemies = self.query_manager.get_enemies_by_hold_and_act(hold_name, act)
         
-        # Get enemies appropriate for this act
-        act_enemies = self.query_manager.get_enemies_by_act(act)
-        
-        # Find overlap (enemies that fit both hold and act)
         suitable_enemies = []
-        act_enemy_ids = [e.get('id') for e in act_enemies]
-        
-        for enemy in hold_enemies.get('primary', []):
-            if enemy.get('id') in act_enemy_ids:
-                suitable_enemies.append({'enemy': enemy, 'rarity': 'common'})
-        
-        for enemy in hold_enemies.get('contested', []):
-            if enemy.get('id') in act_enemy_ids:
-                suitable_enemies.append({'enemy': enemy, 'rarity': 'uncommon'})
-        
-        for enemy in hold_enemies.get('rare', []):
-            if enemy.get('id') in act_enemy_ids:
-                suitable_enemies.append({'enemy': enemy, 'rarity': 'rare'})
+        for tier, rarity in (("primary", "common"), ("contested", "uncommon"), ("rare", "rare")):
+            for enemy in hold_enemies.get(tier, []):
+                suitable_enemies.append({'enemy': enemy, 'rarity': rarity})
         
         if not suitable_enemies:
             return {"error": f"No suitable enemies found for {hold_name} in {act}"}
@@ -1782,17 +1723,11 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             act_number = self.get_current_act_number()
             act = f"Act {['I', 'II', 'III'][act_number - 1]}"
         
-        main_quests_data = self.load_main_quests()
-        if not main_quests_data:
+        main_line = self.quest_graph.questline(self.main_quests_path, ("main_questline", "quests"))
+        if not main_line:
             return []
         
-        quests_raw = main_quests_data.get('main_questline', {}).get('quests', [])
-        act_quests = [
-            q for q in self._iter_quest_records(quests_raw)
-            if q.get('act') == act
-        ]
-        
-        return act_quests
+        return [copy_record(q) for q in main_line.in_act(act)]
     
     def load_clocks(self, clock_type="all"):
         """
@@ -1833,8 +1768,6 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             clock_name: Name of the specific clock
             segments: Number of segments to advance (can be negative for setbacks)
         """
-        clocks_dir = self.data_dir / "clocks"
-        
         # Map category to file
         file_map = {
             "civil_war": "civil_war_clocks.json",
@@ -1846,56 +1779,30 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             print(f"Error: Unknown clock category: {clock_category}")
             return False
         
-        file_path = clocks_dir / file_map[clock_category]
+        file_path = self.data_dir / "clocks" / file_map[clock_category]
         if not file_path.exists():
             print(f"Error: Clock file not found: {file_path}")
             return False
         
-        # Load clocks
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Find and update the clock
-        if clock_category == "civil_war":
-            clocks = data.get('civil_war_clocks', {}).get('clocks', {})
-        elif clock_category == "thalmor":
-            clocks = data.get('thalmor_influence_clocks', {}).get('clocks', {})
-        elif clock_category == "faction_trust":
-            clocks = data.get('faction_trust_clocks', {}).get('clocks', {})
-        
-        if clock_name not in clocks:
+        registry = get_clock_registry(self.data_dir)
+        source = file_path.stem
+        clock_id = f"{source}:{clock_name}"
+        if clock_id not in registry:
             print(f"Error: Clock not found: {clock_name}")
-            print(f"Available clocks: {', '.join(clocks.keys())}")
+            print(f"Available clocks: {', '.join(c.key for c in registry.by_source(source))}")
             return False
         
-        clock = clocks[clock_name]
-        old_progress = clock['current_progress'] if 'current_progress' in clock else clock.get('current_trust', 0)
-        max_value = clock['total_segments'] if 'total_segments' in clock else clock.get('max_trust', 10)
-        
-        # Update progress
-        if 'current_progress' in clock:
-            clock['current_progress'] = max(0, min(max_value, clock['current_progress'] + segments))
-            new_progress = clock['current_progress']
-        elif 'current_trust' in clock:
-            clock['current_trust'] = max(0, min(max_value, clock['current_trust'] + segments))
-            new_progress = clock['current_trust']
-        
-        # Update last_updated timestamp
-        if clock_category in ["civil_war", "thalmor"]:
-            data[f'{clock_category}_clocks']['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Save updated clocks
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        
+        clock, old_progress, new_progress = registry.advance(clock_id, segments)
+        self._print_clock_update(clock_name, clock, old_progress, new_progress)
+        return True
+    
+    def _print_clock_update(self, clock_name, clock, old_progress, new_progress):
         print(f"\n{'='*50}")
         print(f"Clock Updated: {clock_name}")
-        print(f"Progress: {old_progress} -> {new_progress} / {max_value}")
-        if new_progress >= max_value:
-            print(f"⚠️  CLOCK FILLED! Effect: {clock.get('completion_effect', 'See clock data')}")
+        print(f"Progress: {old_progress} -> {new_progress} / {clock.maximum}")
+        if new_progress >= clock.maximum:
+            print(f"⚠️  CLOCK FILLED! Effect: {clock.effect or 'See clock data'}")
         print(f"{'='*50}\n")
-        
-        return True
     
     def advance_whiterun_jobs_clock(self, clock_name, segments=1):
         """
@@ -1905,31 +1812,26 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
             clock_name: Name of the specific clock (e.g., 'guild_foothold_whiterun')
             segments: Number of segments to advance
         """
-        clocks_dir = self.data_dir / "clocks"
-        file_path = clocks_dir / "whiterun_jobs.json"
+        file_path = self.data_dir / "clocks" / "whiterun_jobs.json"
         
         if not file_path.exists():
             print(f"Error: whiterun_jobs.json not found at {file_path}")
             return False
         
-        # Load clocks
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        clocks = data.get('whiterun_jobs', {}).get('clocks', {})
-        
-        if clock_name not in clocks:
+        registry = get_clock_registry(self.data_dir)
+        clock_id = f"whiterun_jobs:{clock_name}"
+        if clock_id not in registry:
             print(f"Error: Clock not found: {clock_name}")
             return False
         
-        clock = clocks[clock_name]
-        old_progress = clock.get('current', 0)
-        max_value = clock.get('max', 10)
+        clock = registry.get(clock_id)
+        old_progress = clock.current
+        max_value = clock.maximum
         new_progress = old_progress + segments
         
         # Check for gating
-        if 'gate' in clock:
-            gate = clock['gate']
+        if clock.gate:
+            gate = clock.gate
             cap = gate.get('cap_until_condition_met', max_value)
             
             if new_progress >= cap:
@@ -1959,44 +1861,30 @@ Schemes Discovered: {len(state['thalmor_arc']['thalmor_schemes_discovered'])}
                     # Don't advance beyond cap
                     new_progress = min(new_progress, cap)
         
-        # Update progress
-        clock['current'] = max(0, min(max_value, new_progress))
-        
-        # Update timestamp
-        data['whiterun_jobs']['last_updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Save updated clocks
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"\n{'='*50}")
-        print(f"Clock Updated: {clock_name}")
-        print(f"Progress: {old_progress} -> {clock['current']} / {max_value}")
-        if clock['current'] >= max_value:
-            print(f"⚠️  CLOCK FILLED! Effect: {clock.get('completion_effect', 'See clock data')}")
-        print(f"{'='*50}\n")
+        # Update progress (stamps whiterun_jobs.last_updated)
+        clock, _, new_progress = registry.set_progress({clock_id: new_progress})[0]
+        self._print_clock_update(clock_name, clock, old_progress, new_progress)
         
         return True
     
     def get_story_hooks_for_quest(self, quest_id):
         """Get story hooks and GM notes for a specific quest"""
-        main_quests_data = self.load_main_quests()
-        if not main_quests_data:
+        main_line = self.quest_graph.questline(self.main_quests_path, ("main_questline", "quests"))
+        if not main_line:
             return None
         
-        quests_raw = main_quests_data.get('main_questline', {}).get('quests', [])
-        for quest in self._iter_quest_records(quests_raw):
-            if quest.get('id') == quest_id:
-                return {
-                    'quest_name': quest.get('name'),
-                    'act': quest.get('act'),
-                    'story_hooks': quest.get('story_hooks', []),
-                    'gm_notes': quest.get('gm_notes', ''),
-                    'faction_dynamics': quest.get('faction_dynamics', {}),
-                    'act_transition': quest.get('act_transition')
-                }
+        quest = main_line.get(quest_id)
+        if quest is None:
+            return None
         
-        return None
+        return copy_record({
+            'quest_name': quest.get('name'),
+            'act': quest.get('act'),
+            'story_hooks': quest.get('story_hooks', []),
+            'gm_notes': quest.get('gm_notes', ''),
+            'faction_dynamics': quest.get('faction_dynamics', {}),
+            'act_transition': quest.get('act_transition')
+        })
     
     def integrate_quest_with_clocks(self, quest_id):
         """
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Full-Text Index for Skyrim TTRPG
+
+Persistent inverted index over the campaign's prose material:
+- data/rules (rules write-ups)
+- source_material/converted_pdfs (converted PDF chapters)
+- docs/ (GM guides and references)
+- logs/ (session and dragonbreak logs)
+
+Markdown files are split into sections at their headings. Each section is
+scored with BM25, and results carry a short snippet around the best-matching
+lines instead of the whole file.
+
+The index lives in state/text_index.json. On refresh, files whose mtime and
+size are unchanged are skipped; changed files are re-hashed and only
+re-tokenized when their content hash actually differs. search() refreshes
+at most once every REFRESH_INTERVAL seconds, so a burst of queries walks
+the indexed directories once.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from pathlib import Path
+
+INDEX_FORMAT_VERSION = 1
+
+# Directories indexed by default, relative to the repository root
+DEFAULT_ROOTS = (
+    "data/rules",
+    "source_material/converted_pdfs",
+    "docs",
+    "logs",
+)
+
+DEFAULT_PATTERNS = ("*.md", "*.txt")
+
+# Seconds a search may reuse the last refresh before statting files again
+REFRESH_INTERVAL = 2.0
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def tokenize(text):
+    """Lower-case word tokens of text."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def split_sections(lines):
+    """
+    Split markdown lines into sections at headings.
+
+    Returns:
+        list of (heading, start_line, end_line) with 0-based, end-exclusive
+        line ranges. Text before the first heading forms a section with an
+        empty heading.
+    """
+    sections = []
+    heading = ""
+    start = 0
+    for i, line in enumerate(lines):
+        match = HEADING_RE.match(line)
+        if match and i > start:
+            sections.append((heading, start, i))
+            heading, start = match.group(1), i
+        elif match:
+            heading = match.group(1)
+    if start < len(lines) or not sections:
+        sections.append((heading, start, len(lines)))
+    return sections
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_lines(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read().split('\n')
+
+
+class TextIndex:
+    """
+    Incrementally maintained BM25 index over markdown/text files.
+
+    Usage:
+        index = TextIndex("/path/to/repo")
+        for hit in index.search("stress consequences"):
+            print(hit['file'], hit['section'], hit['score'])
+    """
+
+    def __init__(self, repo_root, index_path=None, roots=DEFAULT_ROOTS, patterns=DEFAULT_PATTERNS,
+                 refresh_interval=REFRESH_INTERVAL):
+        """
+        Args:
+            repo_root: Repository root; indexed paths are stored relative to it
+            index_path: Where to persist the index (default: state/text_index.json)
+            roots: Directories (relative to repo_root) to index
+            patterns: Glob patterns of files to index within each root
+            refresh_interval: Seconds search() trusts the last refresh
+        """
+        self.repo_root = Path(repo_root)
+        self.index_path = Path(index_path) if index_path else self.repo_root / "state" / "text_index.json"
+        self.roots = tuple(roots)
+        self.patterns = tuple(patterns)
+        self.files = {}
+        self._postings = None
+        self._loaded = False
+        self.refresh_interval = refresh_interval
+        self._refreshed_at = None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        self._loaded = True
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable text index {self.index_path}: {e}")
+            return
+        if data.get("version") == INDEX_FORMAT_VERSION:
+            self.files = data.get("files", {})
+
+    def _save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_FORMAT_VERSION, "files": self.files}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _iter_source_files(self):
+        for root in self.roots:
+            root_dir = self.repo_root / root
+            if not root_dir.is_dir():
+                continue
+            seen = set()
+            for pattern in self.patterns:
+                for path in sorted(root_dir.rglob(pattern)):
+                    if path not in seen and path.is_file():
+                        seen.add(path)
+                        yield path
+
+    def _index_file(self, path, sha1, st):
+        lines = _read_lines(path)
+        sections = []
+        for heading, start, end in split_sections(lines):
+            tf = {}
+            for token in tokenize('\n'.join(lines[start:end])):
+                tf[token] = tf.get(token, 0) + 1
+            if not tf:
+                continue
+            sections.append({
+                "heading": heading,
+                "start": start,
+                "end": end,
+                "length": sum(tf.values()),
+                "tf": tf,
+            })
+        return {"sha1": sha1, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "sections": sections}
+
+    def refresh(self):
+        """
+        Bring the index up to date with the files on disk.
+
+        Returns:
+            dict: Counts of 'added', 'updated', 'removed' and 'unchanged' files
+        """
+        if not self._loaded:
+            self._load()
+        self._refreshed_at = time.monotonic()
+
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        dirty = False
+        present = set()
+
+        for path in self._iter_source_files():
+            rel = path.relative_to(self.repo_root).as_posix()
+            present.add(rel)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entry = self.files.get(rel)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                stats["unchanged"] += 1
+                continue
+
+            try:
+                sha1 = _file_sha1(path)
+                if entry and entry["sha1"] == sha1:
+                    entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+                    stats["unchanged"] += 1
+                else:
+                    self.files[rel] = self._index_file(path, sha1, st)
+                    stats["updated" if entry else "added"] += 1
+                    self._postings = None
+            except IOError as e:
+                print(f"Warning: Error indexing {rel}: {e}")
+                continue
+            dirty = True
+
+        for rel in [r for r in self.files if r not in present]:
+            del self.files[rel]
+            stats["removed"] += 1
+            self._postings = None
+            dirty = True
+
+        if dirty:
+            self._save()
+        return stats
+
+    def _build_postings(self):
+        postings = {}
+        docs = []
+        total_length = 0
+        for rel in sorted(self.files):
+            for section in self.files[rel]["sections"]:
+                doc_id = len(docs)
+                docs.append((rel, section))
+                total_length += section["length"]
+                for term, count in section["tf"].items():
+                    postings.setdefault(term, []).append((doc_id, count))
+        avg_length = (total_length / len(docs)) if docs else 0.0
+        self._postings = (postings, docs, avg_length)
+        return self._postings
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _expand(self, term, postings):
+        """Exact term if indexed, otherwise every indexed term with that prefix."""
+        if term in postings:
+            return [term]
+        return [t for t in postings if t.startswith(term)]
+
+    def _stale(self):
+        return (self._refreshed_at is None
+                or time.monotonic() - self._refreshed_at >= self.refresh_interval)
+
+    def search(self, query, limit=10, scope=None, snippet_lines=5, refresh=None):
+        """
+        Rank indexed sections against a free-text query with BM25.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits to return
+            scope: Optional root or file (e.g. "data/rules"), or a tuple of
+                them, to restrict results to
+            snippet_lines: Number of lines to include in each snippet
+            refresh: True to refresh first, False to use the index as is;
+                by default refresh only if the last one is older than
+                refresh_interval
+
+        Returns:
+            list of dicts with 'file', 'section', 'line', 'score' and 'snippet'
+        """
+        terms = tokenize(query or "")
+        if not terms:
+            return []
+
+        if refresh or (refresh is None and self._stale()):
+            self.refresh()
+        postings, docs, avg_length = self._postings or self._build_postings()
+        if not docs:
+            return []
+
+        if isinstance(scope, str):
+            scope = (scope,)
+        scope = tuple(s.rstrip('/') for s in scope) if scope else None
+        prefixes = tuple(s + '/' for s in scope) if scope else None
+
+        n_docs = len(docs)
+        scores = {}
+        matched_terms = set()
+        for term in dict.fromkeys(terms):
+            for indexed_term in self._expand(term, postings):
+                matched_terms.add(indexed_term)
+                plist = postings[indexed_term]
+                idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+                for doc_id, tf in plist:
+                    length = docs[doc_id][1]["length"]
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        hits = []
+        line_cache = {}
+        for doc_id, score in ranked:
+            rel, section = docs[doc_id]
+            if scope and rel not in scope and not rel.startswith(prefixes):
+                continue
+            if rel not in line_cache:
+                try:
+                    line_cache[rel] = _read_lines(self.repo_root / rel)
+                except IOError:
+                    continue
+            snippet, line_no = self._snippet(line_cache[rel], section, matched_terms, snippet_lines)
+            hits.append({
+                "file": rel,
+                "section": section["heading"],
+                "line": line_no + 1,
+                "score": round(score, 4),
+                "snippet": snippet,
+            })
+            if len(hits) >= limit:
+                break
+        return hits
+
+    @staticmethod
+    def _snippet(lines, section, terms, width):
+        """Pick the window of lines in a section with the most query-term hits."""
+        start, end = section["start"], min(section["end"], len(lines))
+        if start >= end:
+            return [], start
+        hits_per_line = [
+            sum(1 for t in tokenize(lines[i]) if t in terms) for i in range(start, end)
+        ]
+        width = max(1, min(width, end - start))
+        best_start, best_hits = start, -1
+        window = sum(hits_per_line[:width])
+        for offset in range(0, end - start - width + 1):
+            if offset:
+                window += hits_per_line[offset + width - 1] - hits_per_line[offset - 1]
+            if window > best_hits:
+                best_start, best_hits = start + offset, window
+        return lines[best_start:best_start + width], best_start
+
+    def section_text(self, rel, line):
+        """
+        Return the full text of the section containing a 1-based line.
+
+        Args:
+            rel: File path relative to the repository root
+            line: 1-based line number (as returned in search hits)
+        """
+        if not self._loaded:
+            self._load()
+        entry = self.files.get(rel)
+        if not entry:
+            return None
+        lines = _read_lines(self.repo_root / rel)
+        for section in entry["sections"]:
+            if section["start"] <= line - 1 < section["end"]:
+                return '\n'.join(lines[section["start"]:section["end"]])
+        return None
+
+
+_INDEXES = {}
+
+
+def get_text_index(repo_root, index_path=None):
+    """Return a process-wide TextIndex for repo_root (and index_path)."""
+    key = (str(Path(repo_root).resolve()), str(index_path) if index_path else None)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = _INDEXES[key] = TextIndex(repo_root, index_path=index_path)
+    return index
+
+
+def main():
+    """Command-line search over the campaign text index"""
+    import sys
+
+    repo_root = Path(__file__).resolve().parent.parent
+    index = TextIndex(repo_root)
+    stats = index.refresh()
+    print(f"Index: {stats['added']} added, {stats['updated']} updated, "
+          f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+    query = ' '.join(sys.argv[1:]) or input("Search: ").strip()
+    for hit in index.search(query):
+        print(f"\n[{hit['score']:.2f}] {hit['file']}:{hit['line']} — {hit['section'] or '(top)'}")
+        for line in hit['snippet']:
+            print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
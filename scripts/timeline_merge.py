@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Timeline Merge for Skyrim TTRPG
+
+Three-way merge of Dragonbreak timeline branches.
+
+Two branches are merged against their common ancestor (the fracture
+point). Only records that either branch changed since the ancestor are
+looked at — the copy-on-write store already knows which those are — and
+identical subtrees are skipped by comparing content hashes before
+descending into them. Within a record, fields are merged one by one:
+
+    changed on one side only       that side wins
+    changed the same way on both   taken once
+    changed differently on both    a conflict
+
+Every conflict is listed explicitly (e.g. an NPC alive in one branch and
+dead in the other) and handed to a resolution policy:
+
+    "manual"   keep the first branch's value, leave the conflict open
+    "ours"     first branch wins
+    "theirs"   second branch wins
+    "base"     revert to the fracture-point value
+
+A policy may also be any callable taking the conflict dict and returning
+the value to keep (or MISSING to drop the field). register_policy() adds
+named policies.
+
+Iteration is in sorted key order, so a merge always gives the same result.
+"""
+
+import hashlib
+import json
+
+from timeline_store import SECTIONS
+
+
+class _Missing:
+    """Marker for a field or record that does not exist on one side."""
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# Fields merged automatically instead of conflicting (e.g. timestamps)
+AUTO_FIELDS = {
+    "last_updated": max,
+}
+
+
+def _take_ours(conflict):
+    return conflict.get("ours", MISSING)
+
+
+def _take_theirs(conflict):
+    return conflict.get("theirs", MISSING)
+
+
+def _take_base(conflict):
+    return conflict.get("base", MISSING)
+
+
+POLICIES = {
+    "manual": _take_ours,
+    "ours": _take_ours,
+    "theirs": _take_theirs,
+    "base": _take_base,
+}
+
+
+def register_policy(name, policy):
+    """Make a conflict policy available by name."""
+    POLICIES[name] = policy
+
+
+class _Hasher:
+    """Content hashes of JSON subtrees, memoized for one merge."""
+
+    def __init__(self):
+        self._memo = {}
+
+    def __call__(self, value):
+        if value is MISSING:
+            return None
+        key = id(value)
+        cached = self._memo.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        digest = hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        self._memo[key] = (value, digest)
+        return digest
+
+
+class MergeResult:
+    """Outcome of a three-way merge."""
+
+    def __init__(self):
+        # {section: {key: record}} changed relative to the ancestor
+        self.changes = {}
+        # {section: [key, ...]} records dropped relative to the ancestor
+        self.removed = {}
+        self.conflicts = []
+
+    @property
+    def unresolved(self):
+        """Conflicts the policy left open."""
+        return [c for c in self.conflicts if not c["resolved"]]
+
+
+def _conflict(path, base, ours, theirs):
+    conflict = {"path": "/".join(str(p) for p in path)}
+    for name, value in (("base", base), ("ours", ours), ("theirs", theirs)):
+        if value is not MISSING:
+            conflict[name] = value
+    return conflict
+
+
+def merge_values(base, ours, theirs, policy, conflicts, path=(), hasher=None):
+    """
+    Three-way merge of one JSON value.
+
+    Returns:
+        The merged value, or MISSING if it should not exist
+    """
+    hasher = hasher or _Hasher()
+    h_base, h_ours, h_theirs = hasher(base), hasher(ours), hasher(theirs)
+    if h_ours == h_theirs:
+        return ours
+    if h_ours == h_base:
+        return theirs
+    if h_theirs == h_base:
+        return ours
+
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base_dict = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in sorted(set(ours) | set(theirs) | set(base_dict), key=str):
+            value = merge_values(base_dict.get(key, MISSING), ours.get(key, MISSING),
+                                 theirs.get(key, MISSING), policy, conflicts, path + (key,), hasher)
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+
+    if path and path[-1] in AUTO_FIELDS and ours is not MISSING and theirs is not MISSING:
+        try:
+            return AUTO_FIELDS[path[-1]]([ours, theirs])
+        except TypeError:
+            pass
+
+    conflict = _conflict(path, base, ours, theirs)
+    resolve = POLICIES[policy] if isinstance(policy, str) else policy
+    value = resolve(conflict)
+    conflict["resolved"] = policy != "manual"
+    conflict["value"] = None if value is MISSING else value
+    conflicts.append(conflict)
+    return value
+
+
+def merge_branches(store, ours, theirs, policy="manual", ancestor=None):
+    """
+    Three-way merge of two branches of a TimelineStore.
+
+    Args:
+        store: TimelineStore holding both branches
+        ours: First branch id (wins under the "ours"/"manual" policies)
+        theirs: Second branch id
+        policy: Policy name or callable for conflicts
+        ancestor: Common ancestor (default: nearest shared branch)
+
+    Returns:
+        MergeResult whose changes/removed are relative to the ancestor
+    """
+    if isinstance(policy, str) and policy not in POLICIES:
+        raise ValueError(f"Unknown merge policy '{policy}'")
+    if ancestor is None:
+        ancestor = store.common_ancestor(ours, theirs)
+
+    result = MergeResult()
+    hasher = _Hasher()
+    for section in SECTIONS:
+        changed = store.changed_keys(ours, ancestor, section) | store.changed_keys(theirs, ancestor, section)
+        if not changed:
+            continue
+        base_view = store.view(ancestor, section) if ancestor is not None else {}
+        ours_view = store.view(ours, section)
+        theirs_view = store.view(theirs, section)
+        for key in sorted(changed, key=str):
+            base = base_view.get(key, MISSING)
+            value = merge_values(base, ours_view.get(key, MISSING), theirs_view.get(key, MISSING),
+                                 policy, result.conflicts, (section, key), hasher)
+            if value is MISSING:
+                if base is not MISSING:
+                    result.removed.setdefault(section, []).append(key)
+            elif hasher(value) != hasher(base):
+                result.changes.setdefault(section, {})[key] = value
+    return result
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Timeline Store for Skyrim TTRPG
+
+Copy-on-write storage for Dragonbreak timeline branches.
+
+A branch stores only what changed since its parent:
+
+    "branch_1": {
+        "id": "branch_1",
+        "parent_timeline": "primary",
+        "base": "primary@1",
+        "changes": {"npcs": {"ulfric": {...}}},
+        "removed": {"quests": ["battle_of_whiterun"]}
+    }
+
+Reads walk the ancestor chain (branch, parent, grandparent, ...) and take
+the first branch that set or removed the key. Creating a branch is O(1)
+and a state file grows with how far the timelines diverge, not with the
+number of branches times the size of the world.
+
+Forking freezes the parent's diff into a snapshot ("primary@1") that both
+the parent and the new branch build on, so later writes to the parent do
+not leak into the fork. The snapshot is the fracture point a merge
+compares against. A branch's "base" names the snapshot it builds on;
+"parent_timeline" stays the branch it was forked from.
+
+Branches written by older versions (full "npcs"/"factions"/"quests"/
+"world_state" copies) are converted to diffs when loaded.
+"""
+
+import copy
+
+SECTIONS = ("npcs", "factions", "quests", "world_state")
+
+
+class TimelineStore:
+    """
+    Structurally shared timeline branches over the persisted branch dicts.
+
+    The store edits the `branches` and `snapshots` mappings in place, so
+    saving the owning state saves the store.
+
+    Usage:
+        store = TimelineStore(state["timeline_branches"], state["timeline_snapshots"])
+        store.create_branch("branch_1", "primary", name="Ulfric Falls")
+        store.set("branch_1", "npcs", "ulfric", {"alive": False})
+        store.get("primary", "npcs", "ulfric")      # unchanged in primary
+        store.section("branch_1", "npcs")           # merged view
+    """
+
+    def __init__(self, branches, snapshots=None):
+        """
+        Args:
+            branches: The persisted {branch_id: branch} mapping
+            snapshots: The persisted {snapshot_id: snapshot} mapping
+        """
+        self.branches = branches
+        self.snapshots = snapshots if snapshots is not None else {}
+        self._views = {}
+        self._upgrade_legacy()
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+
+    def __contains__(self, branch_id):
+        return branch_id in self.branches
+
+    def _node(self, node_id):
+        node = self.branches.get(node_id)
+        return node if node is not None else self.snapshots.get(node_id)
+
+    def parent(self, branch_id):
+        """Branch id this branch was forked from, or None for a root."""
+        return self.branches[branch_id].get("parent_timeline")
+
+    def base(self, node_id):
+        """Node whose records this branch or snapshot reads through to."""
+        node = self._node(node_id)
+        if "base" in node:
+            return node["base"]
+        return node.get("parent_timeline")
+
+    def ancestors(self, branch_id):
+        """[branch_id, its base, the base's base, ..., root] (snapshots included)."""
+        chain = []
+        seen = set()
+        while branch_id is not None and self._node(branch_id) is not None and branch_id not in seen:
+            chain.append(branch_id)
+            seen.add(branch_id)
+            branch_id = self.base(branch_id)
+        return chain
+
+    def common_ancestor(self, *branch_ids):
+        """Nearest snapshot or branch all of branch_ids build on, or None."""
+        if not branch_ids:
+            return None
+        others = [set(self.ancestors(b)) for b in branch_ids[1:]]
+        for node_id in self.ancestors(branch_ids[0]):
+            if all(node_id in chain for chain in others):
+                return node_id
+        return None
+
+    def changed_keys(self, branch_id, since, section):
+        """Keys of `section` set or removed on the way from `since` to branch_id."""
+        keys = set()
+        for node_id in self.ancestors(branch_id):
+            if node_id == since:
+                break
+            node = self._node(node_id)
+            keys.update(node.get("changes", {}).get(section, {}))
+            keys.update(node.get("removed", {}).get(section, ()))
+        return keys
+
+    def _freeze(self, branch_id):
+        """Move a branch's diff into a snapshot both it and a fork build on."""
+        branch = self.branches[branch_id]
+        if not branch.get("changes") and not branch.get("removed"):
+            return self.base(branch_id)
+        snapshot_id = f"{branch_id}@{len(self.snapshots) + 1}"
+        while snapshot_id in self.snapshots:
+            snapshot_id += "'"
+        self.snapshots[snapshot_id] = {
+            "id": snapshot_id,
+            "base": self.base(branch_id),
+            "changes": branch.pop("changes", {}),
+            "removed": branch.pop("removed", {}),
+        }
+        branch["changes"] = {}
+        branch["base"] = snapshot_id
+        return snapshot_id
+
+    def create_branch(self, branch_id, parent_id=None, base=None, **fields):
+        """
+        Add an empty branch on top of parent_id. Nothing is copied: the
+        parent's diff is frozen into a snapshot shared by both.
+
+        Args:
+            branch_id: New branch id
+            parent_id: Branch it forks from (None for a root)
+            base: Snapshot to build on instead of freezing parent_id
+                  (e.g. the fracture point of a merge)
+            **fields: Extra metadata (name, created, description, ...)
+
+        Raises:
+            KeyError: If the parent does not exist
+            ValueError: If branch_id is already taken
+        """
+        if branch_id in self.branches:
+            raise ValueError(f"Timeline branch '{branch_id}' already exists")
+        if parent_id is not None and parent_id not in self.branches:
+            raise KeyError(parent_id)
+        branch = {"id": branch_id}
+        branch.update(fields)
+        if parent_id is not None:
+            branch["parent_timeline"] = parent_id
+            branch["base"] = base if base is not None else self._freeze(parent_id)
+        elif base is not None:
+            branch["base"] = base
+        branch["changes"] = {}
+        self.branches[branch_id] = branch
+        return branch
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _lookup(self, branch_id, section, key):
+        """(found, value) without copying."""
+        for ancestor in self.ancestors(branch_id):
+            branch = self._node(ancestor)
+            changes = branch.get("changes", {}).get(section, {})
+            if key in changes:
+                return True, changes[key]
+            if key in branch.get("removed", {}).get(section, ()):
+                return False, None
+        return False, None
+
+    def get(self, branch_id, section, key, default=None):
+        """One record as seen from branch_id (a copy that is safe to mutate)."""
+        found, value = self._lookup(branch_id, section, key)
+        return copy.deepcopy(value) if found else default
+
+    def view(self, branch_id, section):
+        """
+        Merged view of one section, shared and cached: do not mutate it
+        (use section() for a copy).
+        """
+        cache_key = (branch_id, section)
+        view = self._views.get(cache_key)
+        if view is None:
+            view = {}
+            for ancestor in reversed(self.ancestors(branch_id)):
+                branch = self._node(ancestor)
+                for key in branch.get("removed", {}).get(section, ()):
+                    view.pop(key, None)
+                view.update(branch.get("changes", {}).get(section, {}))
+            self._views[cache_key] = view
+        return view
+
+    def section(self, branch_id, section):
+        """Every record of one section as seen from branch_id (a copy)."""
+        return copy.deepcopy(self.view(branch_id, section))
+
+    def keys(self, branch_id, section):
+        """Record ids of one section as seen from branch_id."""
+        return list(self.view(branch_id, section))
+
+    def materialize(self, branch_id):
+        """Branch metadata plus every section, fully resolved."""
+        branch = self.branches[branch_id]
+        view = {k: copy.deepcopy(v) for k, v in branch.items() if k not in ("changes", "removed", "base")}
+        for section in SECTIONS:
+            view[section] = self.section(branch_id, section)
+        return view
+
+    def diff(self, branch_id):
+        """
+        What branch_id changed since it was forked (or last forked from):
+        {'changes': {...}, 'removed': {...}}.
+        """
+        branch = self.branches[branch_id]
+        return {
+            "changes": copy.deepcopy(branch.get("changes", {})),
+            "removed": copy.deepcopy(branch.get("removed", {})),
+        }
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _invalidate(self, branch_id, section=None):
+        # Only snapshots are shared, so a branch's writes affect its own views
+        for cache_key in list(self._views):
+            if cache_key[0] == branch_id and section in (None, cache_key[1]):
+                del self._views[cache_key]
+
+    def set(self, branch_id, section, key, value):
+        """Set a record in branch_id only; ancestors are untouched."""
+        branch = self.branches[branch_id]
+        branch.setdefault("changes", {}).setdefault(section, {})[key] = copy.deepcopy(value)
+        removed = branch.get("removed", {}).get(section)
+        if removed and key in removed:
+            removed.remove(key)
+        self._invalidate(branch_id, section)
+
+    def delete(self, branch_id, section, key):
+        """Remove a record from branch_id's view; ancestors are untouched."""
+        branch = self.branches[branch_id]
+        branch.get("changes", {}).get(section, {}).pop(key, None)
+        base = self.base(branch_id)
+        if base is not None and self._lookup(base, section, key)[0]:
+            removed = branch.setdefault("removed", {}).setdefault(section, [])
+            if key not in removed:
+                removed.append(key)
+        self._invalidate(branch_id, section)
+
+    def replace_diff(self, branch_id, changes, removed=None):
+        """Replace everything branch_id changed with the given diff."""
+        branch = self.branches[branch_id]
+        branch["changes"] = copy.deepcopy(changes)
+        if removed:
+            branch["removed"] = copy.deepcopy(removed)
+        else:
+            branch.pop("removed", None)
+        self._invalidate(branch_id)
+
+    # ------------------------------------------------------------------
+    # Legacy full-copy branches
+    # ------------------------------------------------------------------
+
+    def _upgrade_legacy(self):
+        """Turn full-copy branches into diffs against their parents."""
+        pending = [b for b, branch in self.branches.items()
+                   if isinstance(branch, dict) and any(s in branch for s in SECTIONS)]
+        # Parents before children so each diff is taken against a converted parent
+        pending.sort(key=lambda b: len(self.ancestors(b)))
+        for branch_id in pending:
+            branch = self.branches[branch_id]
+            full = {s: branch.pop(s, None) or {} for s in SECTIONS}
+            parent = self.base(branch_id)
+            branch.setdefault("changes", {})
+            for section, records in full.items():
+                inherited = self.view(parent, section) if self._node(parent) is not None else {}
+                changes = {k: v for k, v in records.items() if inherited.get(k, object()) != v}
+                removed = [k for k in inherited if k not in records]
+                if changes:
+                    branch["changes"][section] = changes
+                if removed:
+                    branch.setdefault("removed", {})[section] = removed
+            self._views.clear()
+        # Rebase converted branches onto snapshots of their parents
+        for branch_id in pending:
+            branch = self.branches[branch_id]
+            parent = branch.get("parent_timeline")
+            if "base" not in branch and parent in self.branches:
+                branch["base"] = self._freeze(parent)
@@ -3,13 +3,36 @@
 Triggers Module
 
 This module contains location-based triggers for various regions in Skyrim.
+
+Hold modules are imported the first time one of their functions is used, so
+importing the package (or the router) does not load every hold.
 """
 
-from .whiterun_triggers import whiterun_location_triggers
-from .windhelm_triggers import windhelm_location_triggers
-from .markarth_triggers import markarth_location_triggers
-from .winterhold_triggers import winterhold_location_triggers
-from .solitude_triggers import solitude_location_triggers
-from .global_story_triggers import global_story_triggers
+import importlib
+
+# exported name -> submodule that defines it
+_EXPORTS = {
+    'whiterun_location_triggers': 'whiterun_triggers',
+    'windhelm_location_triggers': 'windhelm_triggers',
+    'markarth_location_triggers': 'markarth_triggers',
+    'winterhold_location_triggers': 'winterhold_triggers',
+    'solitude_location_triggers': 'solitude_triggers',
+    'rift_location_triggers': 'rift_triggers',
+    'hjaalmarch_location_triggers': 'hjaalmarch_triggers',
+    'pale_location_triggers': 'pale_triggers',
+    'falkreath_location_triggers': 'falkreath_triggers',
+    'global_story_triggers': 'global_story_triggers',
+    'dispatch_location_triggers': 'router',
+    'resolve_hold': 'router',
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = ['whiterun_location_triggers', 'windhelm_location_triggers', 'markarth_location_triggers', 'winterhold_location_triggers', 'solitude_location_triggers', 'global_story_triggers']
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
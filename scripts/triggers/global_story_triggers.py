@@ -12,10 +12,16 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
+from location_gazetteer import register_keywords
+
+from .trigger_utils import location_mentions
+
+# Generic words that mark a settlement the gazetteer has no entry for.
+# Named cities, towns and districts come from data/holds via the gazetteer.
 SETTLEMENT_KEYWORDS = [
-    "whiterun", "windhelm", "riften", "solitude", "markarth", "winterhold", "morthal", "falkreath", "dawnstar",
     "city", "town", "village", "district", "gate", "market", "inn", "keep", "dragonsreach"
 ]
+register_keywords(SETTLEMENT_KEYWORDS)
 
 
 def _flags(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,13 +60,15 @@ def _active_quests(state: Dict[str, Any]) -> List[Any]:
     return []
 
 
-def _is_settlement(loc_lower: str) -> bool:
-    return any(k in loc_lower for k in SETTLEMENT_KEYWORDS)
+def _is_settlement(loc: str) -> bool:
+    terms = location_mentions(loc)
+    if any("settlement" in place.tags for place in terms.places):
+        return True
+    return any(k in terms for k in SETTLEMENT_KEYWORDS)
 
 
 def global_story_triggers(loc: str, campaign_state: Dict[str, Any]) -> List[str]:
     events: List[str] = []
-    loc_lower = str(loc).lower()
     flags = _flags(campaign_state)
 
     clocks = _clocks(campaign_state)
@@ -68,7 +76,7 @@ def global_story_triggers(loc: str, campaign_state: Dict[str, Any]) -> List[str]
     cur = int(bow.get("current_progress", bow.get("current", 0)) or 0)
 
     if cur >= 6 and not flags.get("battle_of_whiterun_march_announcement_done"):
-        if _is_settlement(loc_lower):
+        if _is_settlement(loc):
             events.append(
                 "[TOWN CRIER] Hear ye! Hear ye! Word from the roads: Stormcloak banners move in force. "
                 "Whiterun Hold braces for war. Civilians begin evacuating; gates tighten; patrols double."
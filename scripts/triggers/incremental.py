@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Incremental Trigger Evaluation
+
+The GM often re-polls triggers after every small state tweak inside the
+same scene. Most triggers have nothing new to say, yet each call re-derives
+everything from campaign_state.
+
+TriggerCache runs each trigger on a recording view of campaign_state that
+notes every path the trigger reads (scene_flags.jorvaskr_athis_spar_resolved,
+clocks.battle_of_whiterun_countdown.current_progress, companions.
+active_companions, ...) and the value it saw. When a trigger returns no
+events, the next call for the same location first compares those paths with
+the live state, and skips the trigger if none of them changed.
+
+    cache = TriggerCache()
+    events = cache.dispatch("Riften Marketplace", campaign_state)
+    campaign_state["time_of_day"] = "evening"      # not read by the Rift triggers
+    events = cache.dispatch("Riften Marketplace", campaign_state)   # skipped
+
+Writes go straight through to campaign_state. A trigger that returned events
+always runs again; so does one whose own writes changed what it reads.
+Triggers must depend only on their location, the state they read and a
+version the caller passes in (no clocks, randomness or module globals).
+Triggers driven by rule files (see rule_engine.py) are run with their
+compiled RuleEngine as the version, so editing a rule file re-runs them.
+"""
+
+import copy
+
+_MISSING = object()
+
+# How a recorded path is compared on the next call
+_VALUE = "value"      # the whole value at the path
+_KEYS = "keys"        # only the set of keys of a dict
+_IS_DICT = "dict"     # only that a dict is there
+_PRESENT = "present"  # only whether the key exists
+
+
+def _unwrap(value):
+    return value._data if isinstance(value, TrackedDict) else value
+
+
+class _Reads:
+    """Paths one trigger run read, with what it saw the first time."""
+
+    __slots__ = ("paths",)
+
+    def __init__(self):
+        self.paths = {}
+
+    def record(self, path, kind, value):
+        if (path, kind) in self.paths:
+            return
+        if kind == _VALUE:
+            snapshot = value if value is _MISSING else copy.deepcopy(value)
+        elif kind == _KEYS:
+            snapshot = frozenset(value)
+        else:
+            snapshot = value
+        self.paths[(path, kind)] = snapshot
+
+    def unchanged(self, state):
+        """True if every recorded path still reads the same in state."""
+        for (path, kind), snapshot in self.paths.items():
+            value = state
+            for part in path[:-1] if kind == _PRESENT else path:
+                if not isinstance(value, dict) or part not in value:
+                    value = _MISSING
+                    break
+                value = value[part]
+            if kind == _VALUE:
+                if value is _MISSING or snapshot is _MISSING:
+                    if value is not snapshot:
+                        return False
+                elif value != snapshot:
+                    return False
+            elif kind == _KEYS:
+                if not isinstance(value, dict) or frozenset(value) != snapshot:
+                    return False
+            elif kind == _IS_DICT:
+                if isinstance(value, dict) is not snapshot:
+                    return False
+            elif kind == _PRESENT:
+                if (isinstance(value, dict) and path[-1] in value) is not snapshot:
+                    return False
+        return True
+
+
+class TrackedDict(dict):
+    """
+    View of a dict inside campaign_state that records reads.
+
+    Reads and writes go to the wrapped dict; the view's own dict storage
+    stays empty. Nested dicts come back as TrackedDicts so their reads are
+    recorded at the full path.
+    """
+
+    __slots__ = ("_data", "_path", "_reads")
+
+    def __init__(self, data, path, reads):
+        dict.__init__(self)
+        self._data = data
+        self._path = path
+        self._reads = reads
+
+    def _child(self, key, value):
+        path = self._path + (key,)
+        if isinstance(value, dict):
+            self._reads.record(path, _IS_DICT, True)
+            return TrackedDict(value, path, self._reads)
+        self._reads.record(path, _VALUE, value)
+        return value
+
+    def _whole(self):
+        self._reads.record(self._path, _VALUE, self._data)
+        return self._data
+
+    # Reads ------------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key not in self._data:
+            self._reads.record(self._path + (key,), _VALUE, _MISSING)
+        return self._child(key, self._data[key])
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            self._reads.record(self._path + (key,), _VALUE, _MISSING)
+            return default
+        return self._child(key, self._data[key])
+
+    def __contains__(self, key):
+        present = key in self._data
+        self._reads.record(self._path + (key,), _PRESENT, present)
+        return present
+
+    def __iter__(self):
+        self._reads.record(self._path, _KEYS, self._data)
+        return iter(list(self._data))
+
+    def __len__(self):
+        self._reads.record(self._path, _KEYS, self._data)
+        return len(self._data)
+
+    def keys(self):
+        self._reads.record(self._path, _KEYS, self._data)
+        return self._data.keys()
+
+    def values(self):
+        return self._whole().values()
+
+    def items(self):
+        return self._whole().items()
+
+    def copy(self):
+        return self._whole().copy()
+
+    def __eq__(self, other):
+        return self._whole() == _unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._whole())
+
+    # Writes -----------------------------------------------------------
+
+    def __setitem__(self, key, value):
+        self._data[key] = _unwrap(value)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def setdefault(self, key, default=None):
+        if key not in self._data:
+            self._reads.record(self._path + (key,), _VALUE, _MISSING)
+            self._data[key] = _unwrap(default)
+        return self._child(key, self._data[key])
+
+    def pop(self, key, *default):
+        if key not in self._data:
+            self._reads.record(self._path + (key,), _VALUE, _MISSING)
+        else:
+            self._child(key, self._data[key])
+        return self._data.pop(key, *default)
+
+    def update(self, *args, **kwargs):
+        other = dict(*[_unwrap(a) for a in args], **kwargs)
+        self._data.update({k: _unwrap(v) for k, v in other.items()})
+
+    def clear(self):
+        self._data.clear()
+
+
+class TriggerCache:
+    """
+    Remembers, per trigger, what its last empty run depended on.
+
+    Attributes:
+        runs: Trigger calls actually made
+        skipped: Trigger calls answered from the cache
+    """
+
+    def __init__(self):
+        # trigger name -> (location, version, _Reads) of its last run that returned nothing
+        self._quiet = {}
+        self.runs = 0
+        self.skipped = 0
+
+    def run(self, name, func, loc, campaign_state, version=None):
+        """
+        Call func(loc, campaign_state) unless its last run for loc (and
+        version) returned nothing and nothing it read has changed since.
+
+        Args:
+            version: Anything else the trigger's output depends on, e.g. the
+                RuleEngine compiled from its rule files; a different version
+                always runs the trigger
+
+        Returns:
+            The trigger's events ([] when skipped)
+        """
+        quiet = self._quiet.get(name)
+        if (quiet is not None and quiet[0] == loc and quiet[1] is version
+                and quiet[2].unchanged(campaign_state)):
+            self.skipped += 1
+            return []
+
+        reads = _Reads()
+        self.runs += 1
+        events = func(loc, TrackedDict(campaign_state, (), reads))
+        if events:
+            self._quiet.pop(name, None)
+        else:
+            self._quiet[name] = (loc, version, reads)
+        return events
+
+    def reads(self, name):
+        """Dotted paths the trigger's last quiet run read (for debugging)."""
+        quiet = self._quiet.get(name)
+        if quiet is None:
+            return []
+        return sorted({".".join(str(p) for p in path) for path, _ in quiet[2].paths})
+
+    def invalidate(self, name=None):
+        """Forget one trigger's (or every trigger's) last quiet run."""
+        if name is None:
+            self._quiet.clear()
+        else:
+            self._quiet.pop(name, None)
+
+    def dispatch(self, loc, campaign_state, hold=None):
+        """router.dispatch_location_triggers() through this cache."""
+        from .router import dispatch_location_triggers
+        return dispatch_location_triggers(loc, campaign_state, hold=hold, cache=self)
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Trigger Profiler
+
+Opt-in instrumentation for the location trigger modules and the event
+modules they call (jorvaskr_events, companions_schism_events,
+dustmans_cairn_events, jorvaskr_assault_events). For every trigger function
+it records:
+
+    calls      times it was called
+    fires      calls that returned events
+    total/max  wall time (inclusive: a hold trigger's time includes the
+               global and event triggers it calls)
+    flags_set  scene_flags the trigger set or changed, with counts
+
+Nothing is wrapped until enable() is called, so normal play pays nothing.
+
+    from triggers import profiler
+    profiler.enable()
+    ... play ...
+    print(profiler.report())
+    profiler.export_jsonl("state/trigger_profile.jsonl")
+
+Setting TRIGGER_PROFILE=<path> in the environment enables profiling when
+the router is imported and appends the stats to <path> at exit.
+
+From the scripts directory:
+
+    python3 -m triggers.profiler run --state ../state/campaign_state.json whiterun "Riften Marketplace"
+    python3 -m triggers.profiler report ../state/trigger_profile.jsonl
+
+Triggers that are called but never fire show up as "dead" in the report.
+"""
+
+import argparse
+import atexit
+import copy
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from .incremental import TrackedDict
+
+ENV_VAR = "TRIGGER_PROFILE"
+
+TRIGGER_MODULES = (
+    "triggers.global_story_triggers",
+    "triggers.whiterun_triggers",
+    "triggers.windhelm_triggers",
+    "triggers.markarth_triggers",
+    "triggers.solitude_triggers",
+    "triggers.rift_triggers",
+    "triggers.hjaalmarch_triggers",
+    "triggers.winterhold_triggers",
+    "triggers.pale_triggers",
+    "triggers.falkreath_triggers",
+)
+
+EVENT_MODULES = (
+    "jorvaskr_events",
+    "companions_schism_events",
+    "dustmans_cairn_events",
+    "jorvaskr_assault_events",
+)
+
+# Modules whose references to trigger functions are rebound while profiling
+_REBIND_MODULES = ("triggers", "triggers.router")
+
+# Methods profiled as triggers: (module, class, method)
+TRIGGER_METHODS = (
+    ("triggers.rule_engine", "RuleEngine", "evaluate"),
+)
+
+
+class TriggerStats:
+    """Counters for one trigger function."""
+
+    __slots__ = ("name", "calls", "fires", "total", "max", "flags_set")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.fires = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.flags_set = {}
+
+    def to_dict(self):
+        return {
+            "trigger": self.name,
+            "calls": self.calls,
+            "fires": self.fires,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "flags_set": dict(sorted(self.flags_set.items())),
+        }
+
+
+_stats = {}
+_lock = threading.Lock()
+_originals = {}   # (module name, dotted attribute) -> original function
+_wrappers = {}    # id(original) -> wrapper
+
+
+def _campaign_state(args, kwargs):
+    state = kwargs.get("campaign_state", kwargs.get("state"))
+    if not isinstance(state, dict):
+        state = next((arg for arg in args if isinstance(arg, dict)), None)
+    # Look through TriggerCache's recording view so profiling adds no reads
+    return state._data if isinstance(state, TrackedDict) else state
+
+
+def _flags_snapshot(state):
+    flags = state.get("scene_flags") if state is not None else None
+    return dict(flags) if isinstance(flags, dict) else {}
+
+
+def _wrap(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        state = _campaign_state(args, kwargs)
+        before = _flags_snapshot(state)
+        start = time.perf_counter()
+        try:
+            return_value = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+        after = _flags_snapshot(state)
+        newly_set = [k for k, v in after.items() if v and before.get(k) != v]
+        with _lock:
+            stats = _stats.get(name)
+            if stats is None:
+                stats = _stats[name] = TriggerStats(name)
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            if return_value:
+                stats.fires += 1
+            for flag in newly_set:
+                stats.flags_set[flag] = stats.flags_set.get(flag, 0) + 1
+        return return_value
+    wrapper._profiled = True
+    return wrapper
+
+
+def _trigger_functions(module):
+    """Public functions defined in module."""
+    for attr, value in vars(module).items():
+        if (callable(value) and not attr.startswith("_") and getattr(value, "__module__", None) == module.__name__
+                and not isinstance(value, type)):
+            yield attr, value
+
+
+def _owner(module, dotted):
+    """Object holding the last part of a dotted attribute, and that part."""
+    *path, attr = dotted.split(".")
+    for part in path:
+        module = getattr(module, part)
+    return module, attr
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def enable():
+    """Wrap every trigger and event function (importing their modules)."""
+    with _lock:
+        if _originals:
+            return
+        modules = []
+        for module_name in TRIGGER_MODULES + EVENT_MODULES:
+            try:
+                modules.append(importlib.import_module(module_name))
+            except ImportError as e:
+                print(f"Warning: cannot profile {module_name}: {e}")
+        for module in modules:
+            short = module.__name__.split(".")[-1]
+            for attr, func in list(_trigger_functions(module)):
+                wrapper = _wrappers.get(id(func))
+                if wrapper is None:
+                    wrapper = _wrappers[id(func)] = _wrap(f"{short}.{attr}", func)
+                _originals[(module.__name__, attr)] = func
+                setattr(module, attr, wrapper)
+        for module_name, class_name, method in TRIGGER_METHODS:
+            module = importlib.import_module(module_name)
+            cls = getattr(module, class_name)
+            func = vars(cls)[method]
+            _originals[(module_name, f"{class_name}.{method}")] = func
+            setattr(cls, method, _wrap(f"{module_name.split('.')[-1]}.{method}", func))
+        # Rebind functions other modules imported by name (hold modules import
+        # global_story_triggers; the package and router cache hold functions)
+        targets = modules + [sys.modules[m] for m in _REBIND_MODULES if m in sys.modules]
+        for module in targets:
+            for attr, value in list(vars(module).items()):
+                wrapper = _wrappers.get(id(value))
+                if wrapper is not None and (module.__name__, attr) not in _originals:
+                    _originals[(module.__name__, attr)] = value
+                    setattr(module, attr, wrapper)
+        router = sys.modules.get("triggers.router")
+        if router is not None:
+            router._LOADED.clear()
+
+
+def disable():
+    """Restore the original functions. Collected stats are kept."""
+    with _lock:
+        for (module_name, attr), func in _originals.items():
+            module = sys.modules.get(module_name)
+            if module is not None:
+                setattr(*_owner(module, attr), func)
+        _originals.clear()
+        _wrappers.clear()
+        router = sys.modules.get("triggers.router")
+        if router is not None:
+            router._LOADED.clear()
+
+
+def reset():
+    """Forget every collected stat."""
+    with _lock:
+        _stats.clear()
+
+
+def stats():
+    """{trigger name: stats dict} collected so far."""
+    with _lock:
+        return {name: s.to_dict() for name, s in _stats.items()}
+
+
+def export_jsonl(path, session=None):
+    """
+    Append one JSON line per trigger to path.
+
+    Returns:
+        Number of lines written
+    """
+    exported_at = datetime.now().isoformat(timespec="seconds")
+    rows = list(stats().values())
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            row["exported_at"] = exported_at
+            if session is not None:
+                row["session"] = session
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return len(rows)
+
+
+def load_jsonl(paths):
+    """Stats rows from JSONL exports, summed per trigger."""
+    merged = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                total = merged.setdefault(row["trigger"], {
+                    "trigger": row["trigger"], "calls": 0, "fires": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "flags_set": {},
+                })
+                total["calls"] += row.get("calls", 0)
+                total["fires"] += row.get("fires", 0)
+                total["total_ms"] += row.get("total_ms", 0.0)
+                total["max_ms"] = max(total["max_ms"], row.get("max_ms", 0.0))
+                for flag, count in (row.get("flags_set") or {}).items():
+                    total["flags_set"][flag] = total["flags_set"].get(flag, 0) + count
+    for row in merged.values():
+        row["mean_ms"] = round(row["total_ms"] / row["calls"], 3) if row["calls"] else 0.0
+    return merged
+
+
+def report(rows=None, sort="total_ms", limit=None):
+    """
+    Text table of trigger stats, slowest first.
+
+    Args:
+        rows: {name: stats dict} (default: the live stats)
+        sort: Column to sort by (total_ms, mean_ms, max_ms, calls, fires)
+        limit: Only the first N rows
+    """
+    rows = stats() if rows is None else rows
+    if not rows:
+        return "No trigger calls recorded."
+    ordered = sorted(rows.values(), key=lambda r: (-r.get(sort, 0), r["trigger"]))
+    if limit:
+        ordered = ordered[:limit]
+    width = max(len("trigger"), max(len(r["trigger"]) for r in ordered))
+    lines = [f"{'trigger':<{width}}  {'calls':>6}  {'fires':>6}  {'hit%':>5}  {'total ms':>9}  {'mean ms':>8}  {'max ms':>8}  flags set"]
+    for r in ordered:
+        hit = 100.0 * r["fires"] / r["calls"] if r["calls"] else 0.0
+        flags = ", ".join(f"{k}x{v}" if v > 1 else k for k, v in sorted(r["flags_set"].items()))
+        lines.append(f"{r['trigger']:<{width}}  {r['calls']:>6}  {r['fires']:>6}  {hit:>5.0f}  "
+                     f"{r['total_ms']:>9.2f}  {r['mean_ms']:>8.3f}  {r['max_ms']:>8.3f}  {flags}")
+    dead = sorted(r["trigger"] for r in rows.values() if r["calls"] and not r["fires"])
+    if dead:
+        lines.append("")
+        lines.append(f"Never fired ({len(dead)}): " + ", ".join(dead))
+    return "\n".join(lines)
+
+
+def enable_from_env():
+    """Enable profiling if TRIGGER_PROFILE is set; export to it at exit."""
+    path = os.environ.get(ENV_VAR)
+    if not path or is_enabled():
+        return False
+    enable()
+    atexit.register(export_jsonl, path)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile location triggers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Dispatch triggers for locations and report")
+    run_p.add_argument("locations", nargs="+")
+    run_p.add_argument("--state", help="campaign_state.json to start from (not modified)")
+    run_p.add_argument("--repeat", type=int, default=1, help="Dispatch each location this many times")
+    run_p.add_argument("--export", help="Append the stats to this JSONL file")
+
+    report_p = sub.add_parser("report", help="Summarize JSONL exports")
+    report_p.add_argument("files", nargs="+")
+
+    for p in (run_p, report_p):
+        p.add_argument("--sort", default="total_ms", choices=["total_ms", "mean_ms", "max_ms", "calls", "fires"])
+        p.add_argument("--limit", type=int, default=None)
+        p.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        from .router import dispatch_location_triggers
+        state = {}
+        if args.state:
+            with open(args.state, "r", encoding="utf-8") as f:
+                state = copy.deepcopy(json.load(f))
+        enable()
+        for _ in range(args.repeat):
+            for loc in args.locations:
+                dispatch_location_triggers(loc, state)
+        rows = stats()
+        if args.export:
+            export_jsonl(args.export)
+    else:
+        rows = load_jsonl(args.files)
+
+    if args.json:
+        print(json.dumps(sorted(rows.values(), key=lambda r: r["trigger"]), indent=2))
+    else:
+        print(report(rows, sort=args.sort, limit=args.limit))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
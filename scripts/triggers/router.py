@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Trigger Router
+
+One entry point for location triggers: the caller passes a location string
+and the router works out which hold it belongs to.
+
+    from triggers.router import dispatch_location_triggers
+    events = dispatch_location_triggers("Riften Marketplace", campaign_state)
+
+The location is resolved to a hold once, through the location gazetteer.
+Only that hold's trigger module is imported, on first use, and it imports
+its own event modules (Jorrvaskr, Dustman's Cairn, ...) only when one of
+its locations needs them. Every hold module finishes with
+global_story_triggers; locations outside any hold get the global triggers
+alone. Homebrew rules in data/triggers/*.json (see rule_engine.py) run last,
+wherever the location is.
+"""
+
+import importlib
+import os
+
+from location_gazetteer import register_keywords
+
+from .global_story_triggers import global_story_triggers
+from .rule_engine import get_rule_engine
+from .trigger_utils import location_mentions
+
+# hold id (see location_gazetteer) -> (module, trigger function)
+HOLD_MODULES = {
+    "whiterun_hold": ("whiterun_triggers", "whiterun_location_triggers"),
+    "eastmarch_hold": ("windhelm_triggers", "windhelm_location_triggers"),
+    "reach_hold": ("markarth_triggers", "markarth_location_triggers"),
+    "haafingar_hold": ("solitude_triggers", "solitude_location_triggers"),
+    "rift_hold": ("rift_triggers", "rift_location_triggers"),
+    "hjaalmarch_hold": ("hjaalmarch_triggers", "hjaalmarch_location_triggers"),
+    "winterhold_hold": ("winterhold_triggers", "winterhold_location_triggers"),
+    "pale_hold": ("pale_triggers", "pale_location_triggers"),
+    "falkreath_hold": ("falkreath_triggers", "falkreath_location_triggers"),
+}
+
+# Places the trigger modules handle that are not in the hold data, checked
+# when the gazetteer does not know the location
+ROUTE_KEYWORDS = {
+    "whiterun_hold": ["dragonsreach", "bannered mare", "gildergreen"],
+    "eastmarch_hold": ["candlehearth", "dunmeth"],
+    "reach_hold": ["karthspire", "druadach", "nchuand-zel", "cidhna", "lost valley", "nepos"],
+    "haafingar_hold": ["winking skeever"],
+    "rift_hold": ["honrich", "ragged flagon"],
+    "hjaalmarch_hold": ["movarth"],
+    "winterhold_hold": ["college", "hall of attainment", "arch mage"],
+}
+register_keywords(k for keywords in ROUTE_KEYWORDS.values() for k in keywords)
+
+_LOADED = {}
+# hold id -> the module's RULES_FILE, for hold modules driven by rule files
+_RULE_FILES = {}
+
+
+def resolve_hold(loc):
+    """
+    Hold id whose triggers handle a location, or None.
+
+    Args:
+        loc: Free-text location (e.g. "whiterun_plains_district")
+    """
+    terms = location_mentions(loc)
+    place = terms.location
+    if place is not None and place.hold in HOLD_MODULES:
+        return place.hold
+    for hold_id, keywords in ROUTE_KEYWORDS.items():
+        if any(k in terms for k in keywords):
+            return hold_id
+    return None
+
+
+def load_hold_triggers(hold_id):
+    """
+    Trigger function for a hold, importing its module on first use.
+
+    Raises:
+        KeyError: If the hold has no trigger module
+    """
+    func = _LOADED.get(hold_id)
+    if func is None:
+        module_name, func_name = HOLD_MODULES[hold_id]
+        module = importlib.import_module(f".{module_name}", __package__)
+        _RULE_FILES[hold_id] = getattr(module, "RULES_FILE", None)
+        func = _LOADED[hold_id] = getattr(module, func_name)
+    return func
+
+
+def dispatch_location_triggers(loc, campaign_state, hold=None, cache=None):
+    """
+    Run the triggers for a location.
+
+    Args:
+        loc: Current location string
+        campaign_state: Campaign state dict (scene flags are updated in place)
+        hold: Hold id to use instead of resolving it from loc
+        cache: Optional incremental.TriggerCache; triggers that had nothing
+               to say last time and whose inputs are unchanged are skipped
+
+    Returns:
+        List of event strings to be narrated to players
+    """
+    def run(name, func, version=None):
+        if cache is None:
+            return func(loc, campaign_state)
+        return cache.run(name, func, loc, campaign_state, version)
+
+    hold = hold or resolve_hold(loc)
+    if hold in HOLD_MODULES:
+        # Hold modules run global_story_triggers themselves
+        func = load_hold_triggers(hold)
+        rules_file = _RULE_FILES.get(hold) if cache is not None else None
+        events = run(hold, func, get_rule_engine(rules_file) if rules_file else None)
+    else:
+        events = run("global", global_story_triggers)
+    engine = get_rule_engine()
+    events.extend(run("rules", engine.evaluate, engine))
+    return events
+
+
+# Opt-in profiling for a whole process (see profiler.py)
+if os.environ.get("TRIGGER_PROFILE"):
+    from . import profiler
+    profiler.enable_from_env()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Trigger Rule Engine
+
+Location triggers declared as data instead of code. A rule file is a JSON
+object with a "rules" list, read from data/triggers/:
+
+    {
+      "rules": [
+        {
+          "id": "riften_brynjolf_pitch",
+          "location": {"places": ["riften_marketplace"]},
+          "requires": {
+            "flags_unset": ["brynjolf_met"],
+            "clocks": {"thieves_guild_heat": {"min": 2}},
+            "quests": {"a_chance_arrangement": "absent"},
+            "companions": ["iona"],
+            "state": {"player.thieves_guild_member": false},
+            "night": true
+          },
+          "once": true,
+          "events": ["A red-haired man catches your eye..."],
+          "set_flags": ["brynjolf_met"]
+        }
+      ]
+    }
+
+location (all parts optional; a rule without one fires anywhere):
+    places        canonical place ids (see location_gazetteer); a place also
+                  covers everything inside it ("whiterun" covers its districts)
+    holds         hold ids ("rift_hold")
+    keywords      any of these occurs in the location text
+    all_keywords  every one of these occurs
+    not_keywords  none of these occurs
+
+requires (all must hold):
+    flags_set / flags_unset   scene_flags entries that must be truthy / falsy
+    clocks        {clock id: {"min": n, "max": n}} on current progress
+                  (the "clocks" namespace, falling back to "campaign_clocks")
+    quests        {quest id: status or [statuses]}; statuses are "active",
+                  "completed", "started" (either) and "absent"
+    companions    every one of these is in the active party
+    state         {"dotted.path": value} equality checks
+    night         is_night_time() must equal this
+
+once: true fires the rule only once (tracked as scene flag "rule:<id>");
+a string names the flag to use instead.
+
+Rules are compiled into a discrimination network. Rules are indexed by the
+places, holds and keywords their location names, so a call only looks at
+rules whose location can match, found from the single gazetteer pass over
+the location string. Rules without a location are indexed by a guard on
+the state keys they read instead: a required scene flag (flags_set) or a
+clock minimum. Only rules whose flag is set, or whose clock has reached the
+minimum, become candidates. Conditions shared between rules are compiled
+once and evaluated at most once per call. Every rule also records the
+campaign_state keys it reads (rules_reading()). Matching rules fire in file
+order.
+"""
+
+import bisect
+import threading
+from pathlib import Path
+
+from data_catalog import get_catalog
+from location_gazetteer import get_gazetteer, normalize, register_keywords
+
+from .trigger_utils import is_companion_present, is_night_time, location_mentions
+
+TRIGGER_DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "triggers"
+
+LOCATION_KEYS = {"places", "holds", "keywords", "all_keywords", "not_keywords"}
+REQUIRE_KEYS = {"flags_set", "flags_unset", "clocks", "quests", "companions", "state", "night"}
+RULE_KEYS = {"id", "location", "requires", "once", "events", "set_flags", "description"}
+QUEST_STATUSES = {"active", "completed", "started", "absent"}
+
+
+# ----------------------------------------------------------------------
+# State readers shared by conditions
+# ----------------------------------------------------------------------
+
+def _clocks(state):
+    clocks = state.get("clocks")
+    if isinstance(clocks, dict):
+        return clocks
+    return state.get("campaign_clocks", {}) or {}
+
+
+def _clock_progress(state, clock_id):
+    clock = _clocks(state).get(clock_id)
+    if not isinstance(clock, dict):
+        return None
+    try:
+        return int(clock.get("current_progress", clock.get("current", 0)) or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _quest_ids(entries):
+    ids = set()
+    for entry in entries or []:
+        if isinstance(entry, dict):
+            ids.add(entry.get("id"))
+        else:
+            ids.add(entry)
+    return ids
+
+
+def _quest_status(state, quest_id):
+    """'completed', 'active' or None."""
+    quests = state.get("quests", {}) or {}
+    if isinstance(quests, dict):
+        if quest_id in _quest_ids(quests.get("completed")):
+            return "completed"
+        if quest_id in _quest_ids(quests.get("active")):
+            return "active"
+    active = state.get("active_quests", [])
+    entries = active.values() if isinstance(active, dict) else active
+    for entry in entries or []:
+        if entry == quest_id or (isinstance(entry, dict) and entry.get("id") == quest_id):
+            status = entry.get("status", "active") if isinstance(entry, dict) else "active"
+            return "completed" if status == "completed" else "active"
+    return None
+
+
+def _path_value(state, path):
+    value = state
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _active_companions(state):
+    return (state.get("companions", {}) or {}).get("active_companions", []) or []
+
+
+# ----------------------------------------------------------------------
+# Compilation
+# ----------------------------------------------------------------------
+
+class Condition:
+    """
+    One test on campaign_state, shared by every rule that uses it.
+
+    Attributes:
+        key: Hashable identity; equal keys are compiled to one Condition
+        reads: Top-level campaign_state keys the test looks at
+    """
+
+    __slots__ = ("key", "reads", "test")
+
+    def __init__(self, key, reads, test):
+        self.key = key
+        self.reads = frozenset(reads)
+        self.test = test
+
+
+def _flag_condition(flag, expected):
+    def test(state):
+        return bool((state.get("scene_flags", {}) or {}).get(flag)) is expected
+    return Condition(("flag", flag, expected), ("scene_flags",), test)
+
+
+def _clock_condition(clock_id, bounds):
+    low, high = bounds.get("min"), bounds.get("max")
+
+    def test(state):
+        progress = _clock_progress(state, clock_id)
+        if progress is None:
+            return False
+        return (low is None or progress >= low) and (high is None or progress <= high)
+    return Condition(("clock", clock_id, low, high), ("clocks", "campaign_clocks"), test)
+
+
+def _quest_condition(quest_id, statuses):
+    wanted = frozenset(statuses)
+
+    def test(state):
+        status = _quest_status(state, quest_id)
+        if status is None:
+            return "absent" in wanted
+        return status in wanted or "started" in wanted
+    return Condition(("quest", quest_id, wanted), ("quests", "active_quests"), test)
+
+
+def _companion_condition(name):
+    def test(state):
+        return is_companion_present(_active_companions(state), name)
+    return Condition(("companion", name.lower()), ("companions",), test)
+
+
+def _state_condition(path, expected):
+    def test(state):
+        return _path_value(state, path) == expected
+    key_value = expected if isinstance(expected, (str, int, float, bool, type(None))) else repr(expected)
+    return Condition(("state", path, key_value), (path.split(".")[0],), test)
+
+
+def _night_condition(expected):
+    def test(state):
+        return is_night_time(state) is bool(expected)
+    return Condition(("night", bool(expected)), ("time_of_day",), test)
+
+
+def _as_list(value, what):
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{what} must be a string or a list of strings")
+    return value
+
+
+class Rule:
+    """A compiled trigger rule."""
+
+    __slots__ = ("id", "order", "places", "holds", "keywords", "all_keywords", "not_keywords",
+                 "conditions", "once_flag", "events", "set_flags", "source", "guard")
+
+    def __init__(self, spec, order, source=None):
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"unknown rule keys {sorted(unknown)}")
+        if not spec.get("id"):
+            raise ValueError("rule has no id")
+        self.id = spec["id"]
+        self.order = order
+        self.source = source
+
+        location = spec.get("location") or {}
+        unknown = set(location) - LOCATION_KEYS
+        if unknown:
+            raise ValueError(f"unknown location keys {sorted(unknown)}")
+        self.places = frozenset(_as_list(location.get("places", []), "location.places"))
+        self.holds = frozenset(_as_list(location.get("holds", []), "location.holds"))
+        self.keywords = tuple(normalize(k) for k in _as_list(location.get("keywords", []), "location.keywords"))
+        self.all_keywords = tuple(normalize(k) for k in _as_list(location.get("all_keywords", []), "location.all_keywords"))
+        self.not_keywords = tuple(normalize(k) for k in _as_list(location.get("not_keywords", []), "location.not_keywords"))
+
+        once = spec.get("once", False)
+        self.once_flag = (once if isinstance(once, str) else f"rule:{self.id}") if once else None
+        self.events = tuple(_as_list(spec.get("events", []), "events"))
+        self.set_flags = tuple(_as_list(spec.get("set_flags", []), "set_flags"))
+        self.guard = None
+        self.conditions = self._compile_requires(spec.get("requires") or {})
+
+    def _compile_requires(self, requires):
+        unknown = set(requires) - REQUIRE_KEYS
+        if unknown:
+            raise ValueError(f"unknown requires keys {sorted(unknown)}")
+        # Cheap flag checks first: once-only rules are usually already spent
+        conditions = []
+        if self.once_flag:
+            conditions.append(_flag_condition(self.once_flag, False))
+        conditions += [_flag_condition(f, False) for f in _as_list(requires.get("flags_unset", []), "flags_unset")]
+        flags_set = _as_list(requires.get("flags_set", []), "flags_set")
+        conditions += [_flag_condition(f, True) for f in flags_set]
+        if flags_set:
+            self.guard = ("flag", flags_set[0])
+        for clock_id, bounds in (requires.get("clocks") or {}).items():
+            if not isinstance(bounds, dict):
+                bounds = {"min": bounds}
+            conditions.append(_clock_condition(clock_id, bounds))
+            if self.guard is None and isinstance(bounds.get("min"), (int, float)):
+                self.guard = ("clock", clock_id, bounds["min"])
+        for quest_id, statuses in (requires.get("quests") or {}).items():
+            statuses = _as_list(statuses, f"quests.{quest_id}")
+            bad = set(statuses) - QUEST_STATUSES
+            if bad:
+                raise ValueError(f"unknown quest status {sorted(bad)} for {quest_id}")
+            conditions.append(_quest_condition(quest_id, statuses))
+        conditions += [_companion_condition(c) for c in _as_list(requires.get("companions", []), "companions")]
+        for path, expected in (requires.get("state") or {}).items():
+            conditions.append(_state_condition(path, expected))
+        if "night" in requires:
+            conditions.append(_night_condition(requires["night"]))
+        return conditions
+
+    @property
+    def anywhere(self):
+        return not (self.places or self.holds or self.keywords or self.all_keywords)
+
+    @property
+    def reads(self):
+        """Top-level campaign_state keys this rule looks at."""
+        keys = set()
+        for condition in self.conditions:
+            keys |= condition.reads
+        return keys
+
+    def location_matches(self, terms, scope):
+        """Full location test, given the mentions and the places in scope."""
+        if self.places and not (self.places & scope["places"]):
+            return False
+        if self.holds and not (self.holds & scope["holds"]):
+            return False
+        if self.keywords and not any(k in terms for k in self.keywords):
+            return False
+        if any(k not in terms for k in self.all_keywords):
+            return False
+        return not any(k in terms for k in self.not_keywords)
+
+
+class RuleEngine:
+    """
+    Compiled trigger rules.
+
+    Usage:
+        engine = get_rule_engine()                  # data/triggers/*.json
+        events = engine.evaluate("Riften Marketplace", campaign_state)
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self._conditions = {}
+        self.by_place = {}
+        self.by_hold = {}
+        self.by_keyword = {}
+        self.by_state_key = {}
+        self.anywhere = []
+        # Location-less rules by guard: flag -> rules, clock -> [(min, order, rule)]
+        self.anywhere_by_flag = {}
+        self.anywhere_by_clock = {}
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Compile (source, record) pairs. Invalid rules are skipped with a
+        warning so one bad homebrew file does not silence the rest.
+        """
+        engine = cls()
+        for source, record in records:
+            specs = record.get("rules") if isinstance(record, dict) else record
+            if not isinstance(specs, list):
+                print(f"Warning: {source}: no 'rules' list")
+                continue
+            for spec in specs:
+                try:
+                    engine.add(Rule(spec, len(engine.rules), source))
+                except (ValueError, TypeError, AttributeError) as e:
+                    rule_id = spec.get("id", "?") if isinstance(spec, dict) else "?"
+                    print(f"Warning: {source}: skipping trigger rule '{rule_id}': {e}")
+        return engine
+
+    def add(self, rule):
+        """Index one compiled Rule."""
+        rule.order = len(self.rules)
+        rule.conditions = [self._conditions.setdefault(c.key, c) for c in rule.conditions]
+        self.rules.append(rule)
+
+        # Index on the most selective location part only
+        if rule.places:
+            for place in rule.places:
+                self.by_place.setdefault(place, []).append(rule)
+        elif rule.holds:
+            for hold in rule.holds:
+                self.by_hold.setdefault(hold, []).append(rule)
+        elif rule.keywords or rule.all_keywords:
+            for keyword in (rule.keywords or rule.all_keywords[:1]):
+                self.by_keyword.setdefault(keyword, []).append(rule)
+        elif rule.guard and rule.guard[0] == "flag":
+            self.anywhere_by_flag.setdefault(rule.guard[1], []).append(rule)
+        elif rule.guard:
+            _, clock_id, low = rule.guard
+            bisect.insort(self.anywhere_by_clock.setdefault(clock_id, []), (low, rule.order, rule))
+        else:
+            self.anywhere.append(rule)
+        register_keywords(rule.keywords + rule.all_keywords + rule.not_keywords)
+
+        for key in rule.reads:
+            self.by_state_key.setdefault(key, []).append(rule)
+
+    def rules_reading(self, key):
+        """Rules whose conditions read campaign_state[key]."""
+        return list(self.by_state_key.get(key, ()))
+
+    def _scope(self, terms):
+        """Place ids (with everything they sit inside) and holds the text names."""
+        gazetteer = get_gazetteer()
+        places, holds = set(), set()
+        for place in terms.places:
+            node = place
+            while node is not None and node.id not in places:
+                places.add(node.id)
+                if node.hold:
+                    holds.add(node.hold)
+                node = gazetteer.get(node.parent) if node.parent else None
+        return {"places": places, "holds": holds}
+
+    def _guarded(self, campaign_state):
+        """Location-less guarded rules whose guard holds in campaign_state."""
+        found = []
+        if campaign_state is None:
+            for rules in self.anywhere_by_flag.values():
+                found.extend(rules)
+            for entries in self.anywhere_by_clock.values():
+                found.extend(rule for _, _, rule in entries)
+            return found
+
+        flags = campaign_state.get("scene_flags", {}) or {}
+        if len(flags) < len(self.anywhere_by_flag):
+            for flag, value in flags.items():
+                if value:
+                    found.extend(self.anywhere_by_flag.get(flag, ()))
+        else:
+            for flag, rules in self.anywhere_by_flag.items():
+                if flags.get(flag):
+                    found.extend(rules)
+        for clock_id, entries in self.anywhere_by_clock.items():
+            progress = _clock_progress(campaign_state, clock_id)
+            if progress is not None:
+                reached = bisect.bisect_right(entries, (progress, float("inf")))
+                found.extend(rule for _, _, rule in entries[:reached])
+        return found
+
+    def candidates(self, loc, campaign_state=None):
+        """
+        Rules whose location index entry matches loc, in file order.
+
+        With campaign_state, location-less rules whose guard (required flag
+        or clock minimum) does not hold are left out.
+        """
+        terms = location_mentions(loc)
+        scope = self._scope(terms)
+        found = {id(r): r for r in self.anywhere}
+        for rule in self._guarded(campaign_state):
+            found[id(rule)] = rule
+        for place in scope["places"]:
+            for rule in self.by_place.get(place, ()):
+                found[id(rule)] = rule
+        for hold in scope["holds"]:
+            for rule in self.by_hold.get(hold, ()):
+                found[id(rule)] = rule
+        for keyword in terms.keywords:
+            for rule in self.by_keyword.get(keyword, ()):
+                found[id(rule)] = rule
+        ordered = sorted(found.values(), key=lambda r: r.order)
+        return [r for r in ordered if r.location_matches(terms, scope)]
+
+    def matching(self, loc, campaign_state):
+        """Rules that would fire for loc, without firing them."""
+        results = {}
+        matched = []
+        for rule in self.candidates(loc, campaign_state):
+            for condition in rule.conditions:
+                ok = results.get(condition.key)
+                if ok is None:
+                    ok = results[condition.key] = condition.test(campaign_state)
+                if not ok:
+                    break
+            else:
+                matched.append(rule)
+        return matched
+
+    def evaluate(self, loc, campaign_state):
+        """
+        Fire every matching rule.
+
+        Returns:
+            List of event strings, in rule order
+        """
+        matched = self.matching(loc, campaign_state)
+        if not matched:
+            return []
+        flags = campaign_state.setdefault("scene_flags", {})
+        events = []
+        for rule in matched:
+            events.extend(rule.events)
+            for flag in rule.set_flags:
+                flags[flag] = True
+            if rule.once_flag:
+                flags[rule.once_flag] = True
+        return events
+
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_rule_engine(path=None):
+    """
+    Compiled rules from a rule file or every *.json in a directory
+    (default: data/triggers), recompiled when the files change.
+    """
+    path = Path(path) if path else TRIGGER_DATA_DIR
+    directory, pattern = (path.parent, path.name) if path.suffix == ".json" else (path, "*.json")
+    snapshot = get_catalog().scan(directory, pattern)
+    key = (str(directory), pattern)
+    with _ENGINES_LOCK:
+        cached = _ENGINES.get(key)
+        if cached is not None and cached[0] == snapshot.version:
+            return cached[1]
+        for file_path, e in snapshot.errors:
+            print(f"Warning: Error reading {file_path.name}: {e}")
+        engine = RuleEngine.from_records((p.name, record) for p, record in snapshot.records)
+        _ENGINES[key] = (snapshot.version, engine)
+        return engine
@@ -6,6 +6,14 @@ This module provides common helper functions used by location trigger modules
 to reduce code duplication and improve maintainability.
 """
 
+import importlib
+import warnings
+
+from location_gazetteer import get_gazetteer
+
+# Optional event modules imported so far (None if the import failed)
+_OPTIONAL_MODULES = {}
+
 
 def is_companion_present(active_companions, companion_name):
     """
@@ -114,3 +122,53 @@ def is_night_time(campaign_state):
         return time_of_day >= 20 or time_of_day < 6
     
     return False
+
+
+def location_mentions(loc):
+    """
+    Keyword and place lookups for a location string, resolved through the
+    location gazetteer.
+    
+    `"market" in location_mentions(loc)` answers the same question as
+    `"market" in loc.lower()` (ignoring case, underscores and punctuation)
+    from one memoized pass over the string; `.location` is the canonical
+    place, if any.
+    
+    Args:
+        loc: Free-text location (e.g. "Riften Marketplace", "whiterun_plains")
+    
+    Returns:
+        LocationMentions
+    
+    Examples:
+        >>> "market" in location_mentions("Riften Marketplace")
+        True
+        >>> location_mentions("Riften Marketplace").location.id
+        'riften_marketplace'
+    """
+    return get_gazetteer().mentions(loc)
+
+
+def optional_module(name):
+    """
+    Import an optional event module (e.g. "jorvaskr_events") on first use.
+    
+    Hold trigger modules call this where the events are needed instead of
+    importing every event module up front, so loading a hold only pays for
+    what its locations actually use.
+    
+    Args:
+        name: Top-level module name in scripts/
+    
+    Returns:
+        The module, or None if it cannot be imported (warned once)
+    """
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except ImportError as e:
+            warnings.warn(
+                f"Optional module '{name}' could not be imported; related features will be disabled: {e!r}"
+            )
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
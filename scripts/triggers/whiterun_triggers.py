@@ -8,43 +8,9 @@ specific to Whiterun Hold.  When the Battle of Whiterun is active, district
 text and companion barks switch to siege context keyed to the current stage.
 """
 
-import warnings
-
-from .trigger_utils import is_companion_present
+from .trigger_utils import is_companion_present, location_mentions, optional_module
 from .global_story_triggers import global_story_triggers
 
-try:
-    import jorvaskr_events
-except (ImportError, ModuleNotFoundError) as e:
-    warnings.warn(
-        f"Optional module 'jorvaskr_events' could not be imported; related features will be disabled: {e!r}"
-    )
-    jorvaskr_events = None
-
-try:
-    import dustmans_cairn_events
-except (ImportError, ModuleNotFoundError) as e:
-    warnings.warn(
-        f"Optional module 'dustmans_cairn_events' could not be imported; related features will be disabled: {e!r}"
-    )
-    dustmans_cairn_events = None
-
-try:
-    import companions_schism_events
-except (ImportError, ModuleNotFoundError) as e:
-    warnings.warn(
-        f"Optional module 'companions_schism_events' could not be imported; related features will be disabled: {e!r}"
-    )
-    companions_schism_events = None
-
-try:
-    import jorvaskr_assault_events
-except (ImportError, ModuleNotFoundError) as e:
-    warnings.warn(
-        f"Optional module 'jorvaskr_assault_events' could not be imported; related features will be disabled: {e!r}"
-    )
-    jorvaskr_assault_events = None
-
 
 def whiterun_location_triggers(loc, campaign_state):
     """
@@ -61,6 +27,10 @@ def whiterun_location_triggers(loc, campaign_state):
     
     # Normalize location for case-insensitive matching
     loc_lower = str(loc).lower()
+    loc_terms = location_mentions(loc)
+    in_jorrvaskr = "jorrvaskr" in loc_terms or "jorvaskr" in loc_terms
+    # Event modules are imported the first time a location needs them
+    jorvaskr_events = optional_module("jorvaskr_events") if in_jorrvaskr else None
 
     flags = campaign_state.setdefault("scene_flags", {})
 
@@ -107,7 +77,7 @@ def whiterun_location_triggers(loc, campaign_state):
     # ------------------------------------------------------------------
     # District-specific triggers - siege vs. peacetime text
     # ------------------------------------------------------------------
-    if "plains" in loc_lower and "whiterun" in loc_lower:
+    if "plains" in loc_terms and "whiterun" in loc_terms:
         if siege_active:
             if battle_stage >= 3:
                 events.append(
@@ -127,7 +97,7 @@ def whiterun_location_triggers(loc, campaign_state):
                 "and the smell of fresh bread wafts from the Bannered Mare."
             )
 
-    elif "jorrvaskr" in loc_lower or "jorvaskr" in loc_lower:
+    elif in_jorrvaskr:
         # Normalize entry + one-time hall description
         # Detect "entered from Wind District" by last_location bookkeeping
         entered_from_wind = "wind" in last_loc and "whiterun" in last_loc
@@ -186,7 +156,7 @@ def whiterun_location_triggers(loc, campaign_state):
             )
             flags["jorvaskr_aela_followup_done"] = True
 
-    elif "wind" in loc_lower and "whiterun" in loc_lower:
+    elif "wind" in loc_terms and "whiterun" in loc_terms:
         if siege_active:
             if battle_stage >= 4:
                 events.append(
@@ -206,7 +176,7 @@ def whiterun_location_triggers(loc, campaign_state):
                 "gently, and Jorrvaskr's mead hall stands proud among the homes."
             )
 
-    elif "cloud" in loc_lower and "whiterun" in loc_lower:
+    elif "cloud" in loc_terms and "whiterun" in loc_terms:
         if siege_active:
             if battle_stage >= 1:
                 events.append(
@@ -245,7 +215,7 @@ def whiterun_location_triggers(loc, campaign_state):
     active_companions = campaign_state.get("companions", {}).get("active_companions", [])
 
     if siege_active:
-        if is_companion_present(active_companions, "hadvar") and "whiterun" in loc_lower:
+        if is_companion_present(active_companions, "hadvar") and "whiterun" in loc_terms:
             if battle_faction == "imperial":
                 events.append(
                     'Hadvar scans the street and nods grimly. '
@@ -257,7 +227,7 @@ def whiterun_location_triggers(loc, campaign_state):
                     'leaves his sword hilt.'
                 )
 
-        if is_companion_present(active_companions, "ralof") and "whiterun" in loc_lower:
+        if is_companion_present(active_companions, "ralof") and "whiterun" in loc_terms:
             if battle_faction == "stormcloak":
                 events.append(
                     'Ralof grips your arm. "Push forward! Skyrim is watching what we do here."'
@@ -286,7 +256,7 @@ def whiterun_location_triggers(loc, campaign_state):
     if (
         starting_faction == "college_of_winterhold"
         and not farengar_mission_done
-        and "whiterun" in loc_lower
+        and "whiterun" in loc_terms
     ):
         if not flags.get("college_farengar_tie_in_triggered"):
             events.append(
@@ -316,9 +286,9 @@ def whiterun_location_triggers(loc, campaign_state):
     # ------------------------------------------------------------------
     # PHASE 2: Jorrvaskr downstairs + Vignar/Eorlund overhear + Harbinger room foreshadow
     # ------------------------------------------------------------------
-    if jorvaskr_events is not None and ("jorrvaskr" in loc_lower or "jorvaskr" in loc_lower):
+    if jorvaskr_events is not None:
         # Downstairs living area detection (accept any of these substrings)
-        downstairs_hit = any(k in loc_lower for k in ["grand hall", "grand_hall", "downstairs", "whelps", "harbinger", "jorrvaskr_grand_hall", "jorrvaskr_whelps_quarters", "jorrvaskr_harbinger_room", "jorvaskr_grand_hall", "jorvaskr_whelps_quarters", "jorvaskr_harbinger_room"])
+        downstairs_hit = any(k in loc_terms for k in ["grand hall", "grand_hall", "downstairs", "whelps", "harbinger", "jorrvaskr_grand_hall", "jorrvaskr_whelps_quarters", "jorrvaskr_harbinger_room", "jorvaskr_grand_hall", "jorvaskr_whelps_quarters", "jorvaskr_harbinger_room"])
 
         if downstairs_hit and not flags.get("jorvaskr_downstairs_description_done"):
             events.extend(jorvaskr_events.downstairs_living_area_description_once(campaign_state))
@@ -336,13 +306,13 @@ def whiterun_location_triggers(loc, campaign_state):
             flags["jorvaskr_vignar_approach_prompted"] = True
 
         # Harbinger room first entry (description + foreshadow scene)
-        if any(k in loc_lower for k in ["harbinger", "kodlak", "jorrvaskr_harbinger_room", "jorvaskr_harbinger_room"]):
+        if any(k in loc_terms for k in ["harbinger", "kodlak", "jorrvaskr_harbinger_room", "jorvaskr_harbinger_room"]):
             events.extend(jorvaskr_events.harbinger_room_description_once(campaign_state))
             events.extend(jorvaskr_events.kodlak_vilkas_foreshadow_scene_once(campaign_state))
             events.extend(jorvaskr_events.dustmans_cairn_briefing_scene_once(campaign_state))
 
         # Training yard Vilkas trial (offer once after Proving Honor becomes active)
-        if any(k in loc_lower for k in ["training yard", "training_yard", "jorrvaskr_training_yard", "jorvaskr_training_yard"]):
+        if any(k in loc_terms for k in ["training yard", "training_yard", "jorrvaskr_training_yard", "jorvaskr_training_yard"]):
             events.extend(jorvaskr_events.offer_vilkas_trial_once(campaign_state))
 
         # Escort scene fires once after Vilkas duel resolves (regardless of location string)
@@ -350,7 +320,7 @@ def whiterun_location_triggers(loc, campaign_state):
             events.extend(jorvaskr_events.escort_to_whelps_quarters_scene(campaign_state))
 
         # Whelps quarters banter (first entry after Vilkas duel)
-        if any(k in loc_lower for k in ["whelps quarters", "whelps_quarters", "jorrvaskr_whelps_quarters", "jorvaskr_whelps_quarters"]):
+        if any(k in loc_terms for k in ["whelps quarters", "whelps_quarters", "jorrvaskr_whelps_quarters", "jorvaskr_whelps_quarters"]):
             events.extend(jorvaskr_events.whelps_quarters_first_entry_banter(campaign_state))
 
         # Dustman’s Cairn summon trigger when contracts clock hits 2/2
@@ -359,12 +329,12 @@ def whiterun_location_triggers(loc, campaign_state):
         # --- Phase 3: Dustman’s Cairn briefing trigger (Harbinger Room only) ---
         if (
             hasattr(jorvaskr_events, "dustmans_cairn_briefing_scene_once")
-            and any(k in loc_lower for k in ["harbinger", "kodlak", "jorrvaskr_harbinger_room", "jorvaskr_harbinger_room"])
+            and any(k in loc_terms for k in ["harbinger", "kodlak", "jorrvaskr_harbinger_room", "jorvaskr_harbinger_room"])
         ):
             # Ensure clock exists in state, then fire once it reaches max.
             events.extend(jorvaskr_events.dustmans_cairn_briefing_scene_once(campaign_state))
 
-    if "jorrvaskr" in loc_lower or "jorvaskr" in loc_lower or ("wind" in loc_lower and "whiterun" in loc_lower):
+    if in_jorrvaskr or ("wind" in loc_terms and "whiterun" in loc_terms):
         if active_companions_quest == "companions_proving_honor":
             if not flags.get("jorrvaskr_proving_honor_briefing_done"):
                 events.append(
@@ -419,14 +389,18 @@ def whiterun_location_triggers(loc, campaign_state):
         flags["companions_whiterun_deployment_triggered"] = True
 
     # --- Phase 3: Dustman’s Cairn dungeon triggers ---
-    if dustmans_cairn_events is not None and "dustman" in loc_lower:
-        events.extend(dustmans_cairn_events.dustmans_cairn_triggers(loc, campaign_state))
+    if "dustman" in loc_terms:
+        dustmans_cairn_events = optional_module("dustmans_cairn_events")
+        if dustmans_cairn_events is not None:
+            events.extend(dustmans_cairn_events.dustmans_cairn_triggers(loc, campaign_state))
 
     # --- Phase 4: Schism arc triggers (Underforge, tundra, Jorrvaskr locations) ---
+    companions_schism_events = optional_module("companions_schism_events")
     if companions_schism_events is not None:
         events.extend(companions_schism_events.schism_triggers(loc, campaign_state))
 
     # --- Phase 4: Jorrvaskr assault triggers (active only during companions_jorvaskr_assault) ---
+    jorvaskr_assault_events = optional_module("jorvaskr_assault_events")
     if jorvaskr_assault_events is not None:
         events.extend(jorvaskr_assault_events.jorrvaskr_assault_triggers(loc, campaign_state))
 
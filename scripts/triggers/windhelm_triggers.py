@@ -8,7 +8,7 @@ specific to Windhelm Hold, including quest hooks for Blood on the Ice
 and The White Phial.
 """
 
-from .trigger_utils import is_companion_present, is_quest_active, is_night_time
+from .trigger_utils import is_companion_present, is_quest_active, is_night_time, location_mentions
 from .global_story_triggers import global_story_triggers
 
 
@@ -27,15 +27,16 @@ def windhelm_location_triggers(loc, campaign_state):
     
     # Normalize location for case-insensitive matching
     loc_lower = str(loc).lower()
+    loc_terms = location_mentions(loc)
     
     # Get active companions
     active_companions = campaign_state.get("companions", {}).get("active_companions", [])
     
     # District/area-specific triggers
-    if ("gray_quarter" in loc_lower or "grey_quarter" in loc_lower) and "windhelm" in loc_lower:
+    if ("gray_quarter" in loc_terms or "grey_quarter" in loc_terms) and "windhelm" in loc_terms:
         events.append("You enter the Gray Quarter, home to Windhelm's Dark Elf population. The air is thick with incense and the sounds of foreign tongues. Dilapidated buildings and suspicious glances speak to the Dunmer's treatment in this city.")
     
-    elif "graveyard" in loc_lower and "windhelm" in loc_lower:
+    elif "graveyard" in loc_terms and "windhelm" in loc_terms:
         events.append("The cold wind whistles through Windhelm's graveyard. Stone markers stand as silent witnesses to the city's dead, their names weathered by Skyrim's harsh winters.")
         
         # Blood on the Ice quest hook - nighttime graveyard visit
@@ -46,21 +47,21 @@ def windhelm_location_triggers(loc, campaign_state):
                 # Daytime hint
                 events.append("A guard stationed nearby mutters to his companion: 'Three murders in as many weeks. The Butcher strikes again, they say. Keep your eyes open after dark.'")
     
-    elif "market" in loc_lower and "windhelm" in loc_lower:
+    elif "market" in loc_terms and "windhelm" in loc_terms:
         events.append("The marketplace of Windhelm bustles with activity. Vendors hawk their wares while Nord shoppers barter loudly. The imposing Palace of the Kings looms over the district.")
         
         # White Phial shop hint
         if not is_quest_active(campaign_state, "the_white_phial"):
             events.append("As you pass by the White Phial alchemy shop, you hear raised voices inside. An elderly voice rasps: 'I don't have much time, Quintus! The Phial must be found!' followed by a younger man's worried reply.")
     
-    elif ("palace_of_the_kings" in loc_lower and "windhelm" in loc_lower) or ("palace" in loc_lower and "windhelm" in loc_lower):
+    elif ("palace_of_the_kings" in loc_terms and "windhelm" in loc_terms) or ("palace" in loc_terms and "windhelm" in loc_terms):
         events.append("You stand before the Palace of the Kings, seat of Jarl Ulfric Stormcloak. The ancient stone fortress radiates power and defiance, a symbol of Nordic tradition and the Stormcloak cause.")
     
-    elif ("candlehearth_hall" in loc_lower and "windhelm" in loc_lower) or ("candlehearth" in loc_lower and "windhelm" in loc_lower):
+    elif ("candlehearth_hall" in loc_terms and "windhelm" in loc_terms) or ("candlehearth" in loc_terms and "windhelm" in loc_terms):
         events.append("Candlehearth Hall's warmth is a welcome respite from Windhelm's bitter cold. The inn is filled with the smell of roasting meat and the sound of travelers sharing tales.")
     
     # General Windhelm entrance
-    elif loc_lower.startswith("windhelm") or "windhelm" in loc_lower:
+    elif loc_lower.startswith("windhelm") or "windhelm" in loc_terms:
         events.append("The ancient stone walls of Windhelm rise before you, weathered by countless winters. Known as the City of Kings, Windhelm stands as a bastion of Nordic tradition and the current seat of Ulfric Stormcloak's rebellion.")
         
         # General quest hooks when entering the city
@@ -78,7 +79,7 @@ def windhelm_location_triggers(loc, campaign_state):
             events.append('Uthgerd looks around appreciatively. "Windhelm... the oldest city in Skyrim. Built by Ysgramor himself. Whatever you think of Ulfric, you can\'t deny this place has history."')
     
     # Civil War tie-ins for Windhelm
-    if "windhelm" in loc_lower:
+    if "windhelm" in loc_terms:
         # After Battle of Whiterun outcomes
         if campaign_state.get("whiterun_control") == "stormcloak" and not campaign_state.get("windhelm_heard_whiterun_win"):
             events.append("Word of Whiterun's fall to the Stormcloaks has reached Windhelm. The city is alive with celebration – you see blue Stormcloak banners hung from windows and hear a smith shouting, \"Victory for Ulfric!\" in between hammer strikes. In the Palace courtyard, a crowd cheers as a messenger announces Balgruuf's surrender. Windhelm basks in this triumph, however brief it may be.")
@@ -2,6 +2,8 @@
 Utility functions for Skyrim TTRPG scripts
 """
 
+from location_gazetteer import get_gazetteer
+
 # Filename of the template/example PC file that should never be treated as a live character
 EXAMPLE_PC_FILENAME = "example_pc.json"
 
@@ -14,6 +16,8 @@ def location_matches(search_location, sheet_location):
     - Returns True if search term is in sheet location
     - Returns True if sheet location is in search term
     - Case-insensitive comparison
+    Falls back to the location gazetteer, so two spellings of the same
+    canonical place ("Jorrvaskr", "jorvaskr_mead_hall") also match.
     
     Args:
         search_location: Location to search for (e.g., "Whiterun", "ruins")
@@ -33,6 +37,8 @@ def location_matches(search_location, sheet_location):
         True
         >>> location_matches("Solitude", "Whiterun")
         False
+        >>> location_matches("Dustman's Cairn", "dustmans_entrance")
+        True
         >>> location_matches(None, "Whiterun")
         False
         >>> location_matches("", "Whiterun")
@@ -50,4 +56,7 @@ def location_matches(search_location, sheet_location):
     sheet_lower = sheet_location.lower()
     
     # Bidirectional partial match
-    return search_lower in sheet_lower or sheet_lower in search_lower
+    if search_lower in sheet_lower or sheet_lower in search_lower:
+        return True
+    
+    return get_gazetteer().same_place(search_location, sheet_location)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tests for campaign state transactions.
+
+Covers:
+- All managers see the same live dict inside a transaction.
+- Several saves inside one transaction produce a single write.
+- Unchanged state is not rewritten.
+- Exceptions roll back the live dict and leave the file untouched.
+- Nested transactions join the outer one and roll back independently.
+- update_civil_war_state keeps the questline sync done by advance_questline.
+- Journal mode: JSON-patch entries, replay, compaction, stale journals and
+  torn tails.
+- Journaled saves diff against the remembered state instead of re-reading
+  and never serialize the whole state.
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+import campaign_state
+from campaign_state import campaign_state_transaction, load_state, save_state
+from npc_manager import NPCManager
+from story_manager import StoryManager
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    path = tmp_path / "state" / "campaign_state.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps({
+        "scene_flags": {},
+        "main_quest_state": {"dragon_souls_absorbed": 0},
+        "civil_war_state": {"player_alliance": "imperial"},
+        "active_quests": [],
+        "completed_quests": [],
+    }, indent=2), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def write_count(monkeypatch):
+    calls = []
+    real_write = campaign_state._write_atomic
+
+    def counting_write(path, text):
+        calls.append(path)
+        real_write(path, text)
+
+    monkeypatch.setattr(campaign_state, "_write_atomic", counting_write)
+    return calls
+
+
+def _read(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def test_managers_share_live_dict_and_flush_once(tmp_path, state_path, write_count):
+    sm = StoryManager(data_dir=str(_REPO_ROOT / "data"), state_dir=str(state_path.parent))
+    nm = NPCManager(data_dir=str(_REPO_ROOT / "data"), state_dir=str(state_path.parent))
+
+    with campaign_state_transaction(state_path) as state:
+        assert sm.load_campaign_state() is state
+        assert nm.load_campaign_state() is state
+
+        sm.apply_combat_consequences("dragon", "victory")
+        sm.apply_combat_consequences("dragon", "victory")
+        state["scene_flags"]["gate_opened"] = True
+        nm.save_campaign_state(nm.load_campaign_state())
+
+        assert write_count == []
+        assert _read(state_path)["main_quest_state"]["dragon_souls_absorbed"] == 0
+
+    assert len(write_count) == 1
+    saved = _read(state_path)
+    assert saved["main_quest_state"]["dragon_souls_absorbed"] == 2
+    assert saved["scene_flags"]["gate_opened"] is True
+
+
+def test_unchanged_state_is_not_written(state_path, write_count):
+    with campaign_state_transaction(state_path) as state:
+        save_state(state_path, state)
+    assert write_count == []
+
+
+def test_exception_rolls_back(state_path, write_count):
+    with pytest.raises(RuntimeError):
+        with campaign_state_transaction(state_path) as state:
+            state["scene_flags"]["half_applied"] = True
+            raise RuntimeError("boom")
+
+    assert write_count == []
+    assert state["scene_flags"] == {}
+    assert "half_applied" not in _read(state_path)["scene_flags"]
+
+
+def test_nested_transaction_rolls_back_only_inner(state_path, write_count):
+    with campaign_state_transaction(state_path) as outer:
+        outer["scene_flags"]["outer"] = True
+        with pytest.raises(ValueError):
+            with campaign_state_transaction(state_path) as inner:
+                assert inner is outer
+                inner["scene_flags"]["inner"] = True
+                raise ValueError("inner failure")
+        assert outer["scene_flags"] == {"outer": True}
+
+    assert len(write_count) == 1
+    assert _read(state_path)["scene_flags"] == {"outer": True}
+
+
+def test_missing_file_is_only_created_when_saved(tmp_path):
+    path = tmp_path / "state" / "campaign_state.json"
+    with campaign_state_transaction(path) as state:
+        assert load_state(path) is None
+    assert not path.exists()
+
+    with campaign_state_transaction(path):
+        save_state(path, {"scene_flags": {"new": True}})
+        assert load_state(path)["scene_flags"] == {"new": True}
+    assert _read(path)["scene_flags"] == {"new": True}
+
+
+def test_update_civil_war_state_keeps_questline_sync(tmp_path, state_path, write_count):
+    data_dir = tmp_path / "data"
+    shutil.copytree(_REPO_ROOT / "data" / "quests", data_dir / "quests")
+    sm = StoryManager(data_dir=str(data_dir), state_dir=str(state_path.parent))
+
+    assert sm.update_civil_war_state(battle_result={"battle_name": "Battle of Whiterun", "winner": "imperial"})
+
+    saved = _read(state_path)
+    assert saved["civil_war_state"]["imperial_victories"] == 1
+    assert "main:battle_of_whiterun" in saved["completed_quests"]
+    assert len(write_count) == 1
+
+
+# ---------------------------------------------------------------------------
+# Journal mode
+# ---------------------------------------------------------------------------
+
+def _journal_lines(path):
+    return campaign_state.journal_path(path).read_text(encoding="utf-8").splitlines()
+
+
+def test_diff_and_apply_round_trip():
+    old = {"a": 1, "flags": {"x": True, "a/b": 1}, "log": [1, 2], "gone": 0}
+    new = {"a": 2, "flags": {"x": True, "a/b": 2, "y": None}, "log": [1, 2, 3], "list": [3, 1]}
+    ops = campaign_state.diff_state(old, new)
+    assert {"op": "add", "path": "/log/2", "value": 3} in ops
+    assert {"op": "remove", "path": "/gone"} in ops
+    assert campaign_state.apply_patch(json.loads(json.dumps(old)), ops) == new
+    assert campaign_state.diff_state(new, new) == []
+
+
+def test_journal_appends_changes_and_replays(state_path, write_count):
+    campaign_state.enable_journal(state_path)
+    snapshot_before = state_path.read_text(encoding="utf-8")
+
+    with campaign_state_transaction(state_path) as state:
+        state["scene_flags"]["gate_opened"] = True
+    state = load_state(state_path)
+    state["completed_quests"].append("main:battle_of_whiterun")
+    save_state(state_path, state)
+
+    # Snapshot untouched; two patch lines after the header
+    assert state_path.read_text(encoding="utf-8") == snapshot_before
+    lines = _journal_lines(state_path)
+    assert len(lines) == 3
+    assert json.loads(lines[2])["ops"] == [
+        {"op": "add", "path": "/completed_quests/0", "value": "main:battle_of_whiterun"}
+    ]
+
+    current = load_state(state_path)
+    assert current["scene_flags"] == {"gate_opened": True}
+    assert current["completed_quests"] == ["main:battle_of_whiterun"]
+
+
+def test_journal_compacts_past_threshold(state_path, monkeypatch):
+    monkeypatch.setattr(campaign_state, "COMPACT_ENTRIES", 3)
+    campaign_state.enable_journal(state_path)
+
+    for i in range(4):
+        with campaign_state_transaction(state_path) as state:
+            state["scene_flags"][f"flag_{i}"] = True
+
+    # Third entry triggered compaction; the fourth is the only pending one
+    assert len(_journal_lines(state_path)) == 2
+    assert _read(state_path)["scene_flags"] == {"flag_0": True, "flag_1": True, "flag_2": True}
+    assert len(load_state(state_path)["scene_flags"]) == 4
+
+
+def test_external_snapshot_write_wins_over_journal(state_path):
+    campaign_state.enable_journal(state_path)
+    with campaign_state_transaction(state_path) as state:
+        state["scene_flags"]["journaled"] = True
+
+    state_path.write_text(json.dumps({"scene_flags": {"manual": True}}), encoding="utf-8")
+    assert load_state(state_path) == {"scene_flags": {"manual": True}}
+
+    # The next save starts a fresh journal against the new snapshot
+    save_state(state_path, {"scene_flags": {"manual": True, "after": 1}})
+    assert load_state(state_path)["scene_flags"] == {"manual": True, "after": 1}
+
+
+def test_torn_journal_tail_is_ignored(state_path):
+    campaign_state.enable_journal(state_path)
+    with campaign_state_transaction(state_path) as state:
+        state["scene_flags"]["kept"] = True
+    with open(campaign_state.journal_path(state_path), "a", encoding="utf-8") as f:
+        f.write('{"ts": "x", "ops": [{"op": "add", "path": "/scene')
+
+    assert load_state(state_path)["scene_flags"] == {"kept": True}
+
+
+def test_disable_journal_compacts(state_path):
+    campaign_state.enable_journal(state_path)
+    with campaign_state_transaction(state_path) as state:
+        state["scene_flags"]["kept"] = True
+    campaign_state.disable_journal(state_path)
+
+    assert not campaign_state.journal_path(state_path).exists()
+    assert _read(state_path)["scene_flags"] == {"kept": True}
+
+
+def test_journaled_saves_do_not_reread_or_serialize(state_path, monkeypatch):
+    campaign_state.enable_journal(state_path)
+    state = load_state(state_path)
+
+    reads, serialized = [], []
+    real_read, real_serialize = campaign_state._read_current, campaign_state._serialize
+    monkeypatch.setattr(campaign_state, "_read_current", lambda p: (reads.append(p), real_read(p))[1])
+    monkeypatch.setattr(campaign_state, "_serialize", lambda s: (serialized.append(1), real_serialize(s))[1])
+
+    for i in range(3):
+        state["scene_flags"][f"flag_{i}"] = True
+        save_state(state_path, state)
+    assert len(reads) == 1          # first save only: nothing remembered yet
+    assert serialized == []
+
+    # Type-only changes are still journaled
+    state["scene_flags"]["flag_0"] = 1
+    save_state(state_path, state)
+    assert json.loads(_journal_lines(state_path)[-1])["ops"] == [
+        {"op": "replace", "path": "/scene_flags/flag_0", "value": 1}
+    ]
+
+    # An external edit is noticed through the files' mtime/size
+    state_path.write_text(json.dumps({"scene_flags": {"manual": True}}), encoding="utf-8")
+    save_state(state_path, {"scene_flags": {"manual": True, "after": 1}})
+    assert load_state(state_path)["scene_flags"] == {"manual": True, "after": 1}
+    assert len(reads) == 3
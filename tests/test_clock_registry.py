@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the unified clock registry.
+
+Covers:
+- Every clock shape (faction, clock files, arc phases, campaign state) loads
+  into one id index; bare keys resolve when unambiguous.
+- advance_many() clamps, stamps last_updated and writes each file once.
+- The nearly-full view ranks clocks and skips frozen ones.
+- Edits on disk are picked up by refresh().
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import clock_registry
+from campaign_state import campaign_state_transaction
+from clock_registry import ClockRegistry
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    data = tmp_path / "data"
+    _write(data / "factions.json", {"major_factions": {"companions": {
+        "name": "The Companions",
+        "clocks": [{"name": "Beast Blood Curse", "progress": 7, "segments": 10, "effect": "Irreversible"}],
+        "active_plots": [{"id": "schism", "name": "Schism", "status": "active",
+                          "clock": {"current": 1, "max": 4}}],
+    }}})
+    _write(data / "clocks" / "civil_war_clocks.json", {"civil_war_clocks": {
+        "last_updated": "never",
+        "clocks": {
+            "weariness": {"name": "War Weariness", "current_progress": 5, "total_segments": 6},
+            "momentum": {"name": "Momentum", "current_progress": 2, "total_segments": 10},
+        },
+    }})
+    _write(data / "clocks" / "trust.json", {"trust_clocks": {"clocks": {
+        "weariness": {"name": "Trust", "current_trust": 9, "max_trust": 10, "status": "inactive"},
+    }}})
+    _write(data / "thalmor_arcs.json", {"thalmor_overarching_arc": {"arcs": [{
+        "arc_id": "perpetual_war", "name": "Perpetual War",
+        "phases": [{"phase": 1, "name": "Spies", "clock_progress": 3, "clock_max": 4},
+                   {"phase": 2, "name": "Strike", "clock_max": 6}],
+    }]}})
+    state_path = tmp_path / "state" / "campaign_state.json"
+    _write(state_path, {"clocks": {"guard_connects_dots": {
+        "name": "Guard Connects the Dots", "current_progress": 3, "total_segments": 4,
+        "segments": ["a", "b", "c", "d"]}}})
+    return data, state_path
+
+
+def test_loads_every_shape_into_one_index(repo):
+    data, state_path = repo
+    registry = ClockRegistry(data, state_path)
+
+    assert [c.id for c in registry] == [
+        "factions:companions.beast_blood_curse",
+        "factions:companions.schism",
+        "civil_war_clocks:weariness",
+        "civil_war_clocks:momentum",
+        "trust:weariness",
+        "thalmor_arcs:perpetual_war.phase_1",
+        "thalmor_arcs:perpetual_war.phase_2",
+        "campaign_state:guard_connects_dots",
+    ]
+    curse = registry.get("factions:companions.beast_blood_curse")
+    assert (curse.current, curse.maximum, curse.effect) == (7, 10, "Irreversible")
+    assert registry.get("guard_connects_dots").maximum == 4
+    assert registry.get("perpetual_war.phase_2").requires == "thalmor_arcs:perpetual_war.phase_1"
+    assert registry.get("trust:weariness").frozen
+    with pytest.raises(KeyError, match="Ambiguous"):
+        registry.get("weariness")
+    assert "nope" not in registry
+
+    # The real data loads too, with unique ids
+    real = ClockRegistry(DATA_DIR)
+    assert len(real) == len({c.id for c in real}) > 40
+
+
+def test_advance_many_writes_each_file_once(repo, monkeypatch):
+    data, state_path = repo
+    registry = ClockRegistry(data, state_path)
+    writes = []
+    real_write = clock_registry._write_json
+    monkeypatch.setattr(clock_registry, "_write_json", lambda path, d: (writes.append(path.name), real_write(path, d)))
+
+    results = registry.advance_many([
+        ("civil_war_clocks:weariness", 3),
+        ("civil_war_clocks:momentum", -5),
+        ("factions:companions.schism", 2),
+        ("thalmor_arcs:perpetual_war.phase_2", 1),
+        ("guard_connects_dots", 1),
+    ])
+
+    assert sorted(writes) == ["civil_war_clocks.json", "factions.json", "thalmor_arcs.json"]
+    assert [(c.key, old, new) for c, old, new in results] == [
+        ("weariness", 5, 6), ("momentum", 2, 0), ("companions.schism", 1, 3),
+        ("perpetual_war.phase_2", 0, 1), ("guard_connects_dots", 3, 4)]
+
+    civil_war = json.loads((data / "clocks" / "civil_war_clocks.json").read_text(encoding="utf-8"))["civil_war_clocks"]
+    assert civil_war["clocks"]["weariness"]["current_progress"] == 6
+    assert civil_war["clocks"]["momentum"]["current_progress"] == 0
+    assert civil_war["last_updated"] != "never"
+    arcs = json.loads((data / "thalmor_arcs.json").read_text(encoding="utf-8"))
+    assert arcs["thalmor_overarching_arc"]["arcs"][0]["phases"][1]["clock_progress"] == 1
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert state["clocks"]["guard_connects_dots"]["current_progress"] == 4
+    assert state["clocks"]["guard_connects_dots"]["segments"] == ["a", "b", "c", "d"]
+
+    # Unknown ids fail before anything is written
+    writes.clear()
+    with pytest.raises(KeyError):
+        registry.advance_many({"civil_war_clocks:momentum": 1, "missing": 1})
+    assert writes == []
+
+
+def test_state_clocks_join_open_transaction(repo):
+    data, state_path = repo
+    registry = ClockRegistry(data, state_path)
+    with campaign_state_transaction(state_path) as state:
+        registry.advance("campaign_state:guard_connects_dots", -2)
+        assert state["clocks"]["guard_connects_dots"]["current_progress"] == 1
+        assert json.loads(state_path.read_text())["clocks"]["guard_connects_dots"]["current_progress"] == 3
+    assert json.loads(state_path.read_text())["clocks"]["guard_connects_dots"]["current_progress"] == 1
+
+
+def test_nearly_full_ranks_and_refreshes(repo):
+    data, state_path = repo
+    registry = ClockRegistry(data, state_path)
+
+    assert [c.id for c in registry.nearly_full()] == [
+        "civil_war_clocks:weariness",            # 5/6
+        "campaign_state:guard_connects_dots",    # 3/4, 1 left
+        "thalmor_arcs:perpetual_war.phase_1",    # 3/4, 1 left
+    ]
+    assert [c.id for c in registry.nearly_full(0.7, limit=4)][-1] == "factions:companions.beast_blood_curse"
+    assert "trust:weariness" in [c.id for c in registry.nearly_full(include_frozen=True)]
+
+    assert registry.refresh() is False
+    path = data / "clocks" / "civil_war_clocks.json"
+    record = json.loads(path.read_text(encoding="utf-8"))
+    record["civil_war_clocks"]["clocks"]["momentum"]["current_progress"] = 10
+    _write(path, record)
+    os.utime(path, ns=(1, 1))
+    assert registry.refresh() is True
+    top = registry.nearly_full(include_filled=False)
+    assert "civil_war_clocks:momentum" not in [c.id for c in top]
+    assert registry.nearly_full(limit=1)[0].id == "civil_war_clocks:momentum"
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the Monte Carlo clock simulator.
+
+Covers:
+- Clocks are loaded from factions.json, data/clocks/ and thalmor_arcs.json.
+- Unhindered clocks fill on the expected turn; arc phases run in order.
+- Interference rates, per-source overrides and frozen clocks.
+- Forecasts never write to the data files.
+"""
+
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import clock_simulator
+from clock_simulator import ClockSpec, forecast, load_clock_specs, simulate
+from faction_logic import FactionManager
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param and not clock_simulator.NUMPY_AVAILABLE:
+        pytest.skip("NumPy not installed")
+    monkeypatch.setattr(clock_simulator, "NUMPY_AVAILABLE", request.param)
+
+
+def test_loads_every_clock_source():
+    specs = load_clock_specs(DATA_DIR)
+    sources = {spec.source for spec in specs}
+    assert {"factions", "thalmor_influence_clocks", "civil_war_clocks", "thalmor_arcs"} <= sources
+    ids = [spec.id for spec in specs]
+    assert len(ids) == len(set(ids))
+
+    battle = next(s for s in specs if s.id == "civil_war_clocks:battle_of_whiterun_stages")
+    assert battle.maximum == 5
+    phase_2 = next(s for s in specs if s.id == "thalmor_arcs:perpetual_war.phase_2")
+    assert specs[phase_2.requires].id == "thalmor_arcs:perpetual_war.phase_1"
+
+
+def test_unhindered_clocks_and_phases_fill_on_schedule(backend):
+    specs = [
+        ClockSpec("a:one", "One", "a", 3, 8),
+        ClockSpec("a:two", "Two", "a", 0, 10, requires=0),
+        ClockSpec("a:full", "Full", "a", 4, 4),
+    ]
+    result = simulate(specs, turns=20, runs=50, seed=1)
+    assert result.get("a:one")["median"] == 5
+    assert result.get("a:two")["median"] == 15
+    assert result.get("a:full")["histogram"][0] == 50
+    assert result.get("a:two")["fill_probability"] == 1.0
+
+    short = simulate(specs, turns=10, runs=50, seed=1)
+    assert short.get("a:two")["fill_probability"] == 0.0
+    assert short.get("a:two")["median"] is None
+
+
+def test_interference_overrides_and_frozen_clocks(backend):
+    specs = [
+        ClockSpec("x:slow", "Slow", "x", 0, 4),
+        ClockSpec("y:blocked", "Blocked", "y", 0, 4),
+        ClockSpec("y:frozen", "Frozen", "y", 0, 2, frozen=True),
+    ]
+    result = simulate(specs, turns=60, runs=4000, interference=0.5, overrides={"y": 1.0}, seed=3)
+    # Negative binomial: 4 successes at p=0.5 take 8 turns on average
+    assert result.get("x:slow")["mean_turns"] == pytest.approx(8.0, abs=0.3)
+    assert result.get("y:blocked")["fill_probability"] == 0.0
+    assert result.get("y:frozen")["fill_probability"] == 0.0
+
+    with pytest.raises(ValueError):
+        simulate(specs, interference=0.7, setback=0.5)
+
+
+def test_forecast_is_read_only(tmp_path, capsys):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns("*.md"))
+    before = {p: p.read_bytes() for p in [data_dir / "factions.json", data_dir / "thalmor_arcs.json"]}
+
+    result = FactionManager(str(data_dir)).forecast_clocks(turns=30, runs=200, match="talos", seed=5)
+    assert "Clock forecast" in capsys.readouterr().out
+    # Matching a later phase keeps the phases it depends on
+    ids = [c["id"] for c in result.clocks]
+    assert "thalmor_arcs:talos_eradication.phase_1" in ids
+    assert all(p.read_bytes() == data for p, data in before.items())
+
+    assert json.loads(json.dumps(result.to_dict()))["runs"] == 200
+    assert forecast(str(data_dir), match="no such clock", runs=10).clocks == []
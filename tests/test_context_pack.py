@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the relevance-ranked context pack builder.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import context_pack
+from context_pack import ContextPackBuilder, build_context_pack, focus_from_state
+from data_catalog import DataCatalog
+
+SHARED_LORE = "The Circle of Jorrvaskr has kept its secret for generations, " * 4
+
+STATE = {
+    "current_location": "Whiterun - Jorrvaskr",
+    "current_npcs": ["Kodlak Whitemane"],
+    "active_quests": ["companions:companions_proving_honor"],
+    "companions": {"active_companions": [], "dismissed_companions": []},
+    "notes": None,
+}
+
+
+def make_data(root):
+    records = {
+        "npcs/kodlak_whitemane.json": {"id": "kodlak_whitemane", "name": "Kodlak Whitemane", "lore": SHARED_LORE, "empty": []},
+        "npc_stat_sheets/kodlak_whitemane.json": {"id": "kodlak_whitemane", "name": "Kodlak Whitemane", "lore": SHARED_LORE, "skills": {"Fight": 4}},
+        "npcs/vilkas.json": {"id": "vilkas", "name": "Vilkas", "notes": "Sworn to Kodlak Whitemane."},
+        "npcs/brynjolf.json": {"id": "brynjolf", "name": "Brynjolf", "notes": "Works the Riften market."},
+        "npcs/brynjolf_copy.json": {"id": "brynjolf", "name": "Brynjolf", "notes": "Works the Riften market."},
+        "quests/companions_questline.json": {"companions_questline": {
+            "quests": [{"id": "companions_proving_honor", "name": "Proving Honor", "text": "x" * 4000},
+                       {"id": "companions_blood_kin", "name": "Blood's Honor", "text": "y" * 4000}],
+        }},
+        "world_state/current_state.json": {"game_date": "17th of Last Seed"},
+    }
+    for rel, record in records.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    return ContextPackBuilder(root, catalog=DataCatalog())
+
+
+def test_focus_from_state():
+    focus = focus_from_state(STATE)
+    assert focus["kodlak whitemane"] == context_pack.WEIGHT_NPC
+    assert focus["companions proving honor"] == context_pack.WEIGHT_QUEST
+    assert "jorrvaskr" in focus and "whiterun" in focus and "whiterun hold" in focus
+
+
+def test_pack_is_ranked_minified_and_deduplicated(tmp_path):
+    builder = make_data(tmp_path)
+    pack = builder.build(STATE, budget_bytes=100000)
+    data = json.loads(pack.text)
+    records = data["records"]
+    ids = list(records)
+
+    assert ids[:2] == ["state/campaign_state", "world_state/current_state"]
+    assert "notes" not in records["state/campaign_state"]
+    assert ids.index("npcs/kodlak_whitemane") < ids.index("npcs/vilkas")
+    assert "npcs/brynjolf" not in records
+    # Split questline file: the quest in play ranks above its neighbours
+    quest = "quests/companions_questline#companions_questline.quests[companions_proving_honor]"
+    other = "quests/companions_questline#companions_questline.quests[companions_blood_kin]"
+    assert ids.index(quest) < ids.index(other)
+    # Long text shared by two records is packed once
+    lore = [r["lore"] for r in records.values() if "lore" in r]
+    assert sorted(lore) == sorted([SHARED_LORE, "(see npcs/kodlak_whitemane)"])
+    assert "empty" not in records["npcs/kodlak_whitemane"]
+    assert pack.text == json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    assert pack.size == len(pack.text.encode("utf-8"))
+
+
+def test_budget_is_respected(tmp_path):
+    builder = make_data(tmp_path)
+    full = builder.build(STATE, budget_bytes=90000)
+    sizes = []
+    for budget in (300, 800, 5000):
+        pack = builder.build(STATE, budget_bytes=budget)
+        assert pack.size <= budget
+        assert [i for i, _, _ in pack.included] == [i for i, _, _ in full.included if i in pack.text]
+        sizes.append(len(pack.included))
+    assert sizes == sorted(sizes) and sizes[-1] < len(full.included)
+    assert builder.build(STATE, budget_tokens=100).size <= 100 * context_pack.BYTES_PER_TOKEN
+
+    # Exact duplicates are reported, not packed
+    brynjolf = builder.build(STATE, budget_bytes=90000, focus=["Brynjolf"])
+    assert [i for i, _, _ in brynjolf.included if "brynjolf" in i] == ["npcs/brynjolf"]
+    assert brynjolf.duplicates == ["npcs/brynjolf_copy"]
+
+
+def test_unchanged_records_are_not_reserialized(tmp_path):
+    builder = make_data(tmp_path)
+    first = builder.build(STATE, budget_bytes=100000)
+    serialized = builder.serialized
+    assert serialized == 7
+    builder.build(STATE, budget_bytes=100000)
+    assert builder.serialized == serialized
+
+    time.sleep(0.01)
+    path = tmp_path / "npcs" / "vilkas.json"
+    path.write_text(json.dumps({"id": "vilkas", "name": "Vilkas", "notes": "Kodlak Whitemane's shield-brother."}), encoding="utf-8")
+    second = builder.build(STATE, budget_bytes=100000)
+    assert builder.serialized == serialized + 1
+    assert "shield-brother" in second.text and "shield-brother" not in first.text
+
+
+def test_shared_builder_and_repo_data():
+    pack = build_context_pack(STATE, budget_tokens=4000)
+    assert pack.size <= 4000 * context_pack.BYTES_PER_TOKEN
+    ids = [record_id for record_id, _, _ in pack.included]
+    assert any(record_id.endswith("kodlak_whitemane") for record_id in ids)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared DataCatalog and DataQueryManager caching.
+
+Covers:
+- Files are parsed once and served from cache while unchanged.
+- A changed mtime/size refreshes only that file's entry.
+- New and removed files are picked up by directory scans.
+- Broken files are reported as warnings, not raised.
+- DataQueryManager hands out copies, so caller mutations never leak
+  into the shared cache.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+from data_catalog import DataCatalog, get_catalog
+from query_data import DataQueryManager
+
+
+def _write(path, data, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_json_is_cached_until_file_changes(tmp_path):
+    catalog = DataCatalog()
+    path = tmp_path / "sheet.json"
+    _write(path, {"id": "a", "name": "Alpha"}, mtime_ns=1_000_000_000)
+
+    first = catalog.load_json(path)
+    assert catalog.load_json(path) is first
+
+    # Same size, different mtime -> refreshed
+    _write(path, {"id": "b", "name": "Bravo"}, mtime_ns=2_000_000_000)
+    second = catalog.load_json(path)
+    assert second is not first
+    assert second["name"] == "Bravo"
+
+
+def test_scan_reuses_unchanged_records_and_tracks_membership(tmp_path):
+    catalog = DataCatalog()
+    _write(tmp_path / "a.json", {"id": "a"})
+    _write(tmp_path / "b.json", {"id": "b"})
+
+    snap1 = catalog.scan(tmp_path)
+    assert [r["id"] for _, r in snap1.records] == ["a", "b"]
+    assert catalog.scan(tmp_path) is snap1
+
+    _write(tmp_path / "c.json", {"id": "c"})
+    (tmp_path / "a.json").unlink()
+    snap2 = catalog.scan(tmp_path)
+    assert [r["id"] for _, r in snap2.records] == ["b", "c"]
+    assert snap2.version != snap1.version
+    # Untouched file keeps its cached parse
+    assert snap2.records[0][1] is snap1.records[1][1]
+
+
+def test_scan_reports_broken_files(tmp_path, capsys):
+    catalog = DataCatalog()
+    _write(tmp_path / "good.json", {"id": "good"})
+    (tmp_path / "bad.json").write_text("{not json", encoding="utf-8")
+
+    records = catalog.records(tmp_path)
+    assert [r["id"] for r in records] == ["good"]
+    assert "Warning: Error reading bad.json" in capsys.readouterr().out
+
+
+def test_missing_directory_yields_empty_snapshot(tmp_path):
+    catalog = DataCatalog()
+    assert catalog.records(tmp_path / "nope") == []
+    assert catalog.load_json_or_none(tmp_path / "nope.json") is None
+
+
+def test_query_manager_returns_copies(tmp_path):
+    data_dir = tmp_path / "data"
+    _write(data_dir / "npc_stat_sheets" / "guard.json", {
+        "id": "npc_stat_guard",
+        "name": "Guard",
+        "category": "Friendly NPC",
+        "location": "Whiterun",
+    })
+    manager = DataQueryManager(str(data_dir))
+
+    scene = manager.get_npcs_for_scene(location="Whiterun")
+    assert [n["id"] for n in scene["friendly"]] == ["npc_stat_guard"]
+    scene["friendly"][0]["gm_barks"] = ["Halt!"]
+
+    again = manager.query_npc_enemy_stats(location="Whiterun")
+    assert "gm_barks" not in again[0]
+
+
+def test_query_manager_sees_edits_without_restart(tmp_path):
+    data_dir = tmp_path / "data"
+    sheet = data_dir / "npc_stat_sheets" / "wolf.json"
+    _write(sheet, {"id": "wolf", "name": "Wolf", "category": "Enemy", "act_context": ["Act 1"]},
+           mtime_ns=1_000_000_000)
+    manager = DataQueryManager(str(data_dir))
+    assert len(manager.get_enemies_by_act("Act 1")) == 1
+
+    _write(sheet, {"id": "wolf", "name": "Wolf", "category": "Enemy", "act_context": ["Act 2"]},
+           mtime_ns=2_000_000_000)
+    assert manager.get_enemies_by_act("Act 1") == []
+    assert len(manager.get_enemies_by_act("Act 2")) == 1
+
+
+def test_catalog_is_process_wide():
+    assert get_catalog() is get_catalog()
+    assert DataQueryManager(str(_REPO_ROOT / "data")).catalog is get_catalog()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared effective-skills engine.
+
+Covers:
+- Pyramid + racial + standing stone bonuses, and the racial_traits.json
+  fallback used by the mid-session protocol.
+- Results are memoized per PC content; stone/race tables reload on change.
+- The batch party API and integer matrix.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import mid_session_protocol
+from effective_skills import SkillEngine, compute_effective_skills
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+PC = {
+    "name": "Wayn",
+    "race": "Redguard",
+    "standing_stone": "The Steed Stone",
+    "skills": {"Great (+4)": ["Fight"], "Fair (+2)": ["Athletics", "Physique"]},
+    "racial_bonuses": {"skill_bonuses": ["Fight (+1)", "Physique (+1)"]},
+}
+
+
+def _data(tmp_path, stone_mechanic="+1 to Athletics, ignore armor penalties"):
+    data = tmp_path / "data"
+    data.mkdir(exist_ok=True)
+    (data / "standing_stones.json").write_text(json.dumps({"standing_stones": [
+        {"name": "The Steed Stone", "effect": {"game_mechanic": stone_mechanic}}]}), encoding="utf-8")
+    (data / "racial_traits.json").write_text(json.dumps({"races": [
+        {"name": "Orc", "skill_bonuses": ["Physique (+2)"]}]}), encoding="utf-8")
+    return data
+
+
+def test_compute_matches_sources():
+    result = compute_effective_skills(PC, data_dir=DATA_DIR)
+    assert result["base"] == {"Fight": 4, "Athletics": 2, "Physique": 2}
+    assert result["racial_bonus"] == {"Fight": 1, "Physique": 1}
+    assert result["standing_stone_bonus"] == {"Athletics": 1}
+    assert result["effective"] == {"Fight": 5, "Athletics": 3, "Physique": 3}
+
+    # Callers may mutate what they get back
+    result["effective"]["Fight"] = 99
+    assert compute_effective_skills(PC, data_dir=DATA_DIR)["effective"]["Fight"] == 5
+
+    derived = dict(PC, derived={"effective_skills": {"Fight": 7}, "bonus_sources": {"race": {"Fight": 3}}})
+    assert compute_effective_skills(derived, data_dir=DATA_DIR)["effective"] == {"Fight": 7}
+
+
+def test_race_fallback_and_table_reload(tmp_path):
+    data = _data(tmp_path)
+    engine = SkillEngine(data)
+    orc = {"race": "Orc", "standing_stone": "The Steed Stone", "skills": {"Good (+3)": ["Physique"]}}
+    assert engine.compute(orc)["effective"] == {"Physique": 5, "Athletics": 1}
+
+    _data(tmp_path, stone_mechanic="+2 to Stealth")
+    os.utime(data / "standing_stones.json", ns=(1, 1))
+    assert engine.compute(orc)["effective"] == {"Physique": 5, "Stealth": 2}
+
+    # The mid-session protocol goes through the same engine
+    (tmp_path / "data" / "pcs").mkdir()
+    assert mid_session_protocol.compute_effective_skills(tmp_path, orc)["effective"]["Stealth"] == 2
+
+
+def test_memoized_by_content(tmp_path, monkeypatch):
+    data = _data(tmp_path)
+    engine = SkillEngine(data)
+    calls = []
+    real_compute = engine._compute
+    monkeypatch.setattr(engine, "_compute", lambda pc: (calls.append(1), real_compute(pc))[1])
+
+    pc_path = tmp_path / "pc.json"
+    pc_path.write_text(json.dumps(PC), encoding="utf-8")
+    first = engine.compute_file(pc_path)
+    engine.compute_file(pc_path)
+    engine.compute(dict(PC, notes="irrelevant field"))
+    engine.compute(json.loads(json.dumps(PC)))
+    assert len(calls) == 2   # the file once, the sheet once
+
+    # Touched but unchanged: no recompute; edited: recomputed
+    os.utime(pc_path, ns=(1, 1))
+    assert engine.compute_file(pc_path) == first
+    assert len(calls) == 2
+    pc_path.write_text(json.dumps(dict(PC, standing_stone=None)), encoding="utf-8")
+    assert engine.compute_file(pc_path)["effective"]["Athletics"] == 2
+    assert len(calls) == 3
+
+
+def test_party_matrix(tmp_path):
+    data = _data(tmp_path)
+    engine = SkillEngine(data)
+    pc_path = tmp_path / "pc_wayn.json"
+    pc_path.write_text(json.dumps(PC), encoding="utf-8")
+    mage = {"name": "Brelyna", "skills": {"Superb (+5)": ["Lore"], "Average (+1)": ["Fight"]}}
+
+    results = engine.compute_party([pc_path, mage])
+    assert [r["effective"].get("Lore", 0) for r in results] == [0, 5]
+
+    names, skills, matrix = engine.party_matrix([pc_path, mage], skills=["Fight", "Lore", "Stealth"])
+    assert names == ["pc_wayn", "Brelyna"]
+    assert skills == ["Fight", "Lore", "Stealth"]
+    assert [[int(v) for v in row] for row in matrix] == [[5, 0, 0], [1, 5, 0]]
+
+    names, skills, _ = engine.party_matrix([pc_path, mage])
+    assert skills == ["Fight", "Athletics", "Physique", "Lore"]
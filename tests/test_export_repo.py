@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental repository export.
+"""
+
+import json
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import export_repo
+from export_repo import MANIFEST_NAME, RepositoryExporter
+
+
+def make_repo(root):
+    (root / "data" / "npcs").mkdir(parents=True)
+    (root / "scripts").mkdir()
+    (root / "source_material" / "raw_pdfs").mkdir(parents=True)
+    (root / "README.md").write_text("# Campaign\n", encoding="utf-8")
+    for i in range(5):
+        (root / "data" / "npcs" / f"npc_{i}.json").write_text(json.dumps({"id": i, "bio": "x" * 2000}), encoding="utf-8")
+    (root / "scripts" / "tool.py").write_text("print('hi')\n", encoding="utf-8")
+    (root / "source_material" / "raw_pdfs" / "module.pdf").write_bytes(b"%PDF-1.4 " + os.urandom(4096))
+    with zipfile.ZipFile(root / "Module Pack.zip", "w") as pack:
+        pack.writestr("module.md", "# Module\n")
+    return RepositoryExporter(str(root))
+
+
+def contents(path):
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        return {name: archive.read(name) for name in archive.namelist()
+                if name not in ("_chatgpt_context.json", MANIFEST_NAME)}
+
+
+def test_export_contents_and_storage(tmp_path):
+    exporter = make_repo(tmp_path)
+    output = exporter.export_to_zip("export.zip")
+    assert output == str(tmp_path / "export.zip")
+    with zipfile.ZipFile(output) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        manifest = json.loads(archive.read(MANIFEST_NAME))["files"]
+    assert infos["data/npcs/npc_0.json"].compress_type == zipfile.ZIP_DEFLATED
+    assert infos["source_material/raw_pdfs/module.pdf"].compress_type == zipfile.ZIP_STORED
+    assert infos["Module Pack.zip"].compress_type == zipfile.ZIP_STORED
+    assert "README.md" in infos and "_statistics.json" in infos
+    assert set(manifest) == set(infos) - {MANIFEST_NAME}
+    assert not (tmp_path / "_chatgpt_context.json").exists()
+
+
+def test_unchanged_members_are_reused(tmp_path, monkeypatch, capsys):
+    exporter = make_repo(tmp_path)
+    exporter.export_to_zip("export.zip")
+    capsys.readouterr()
+
+    changed = tmp_path / "data" / "npcs" / "npc_3.json"
+    changed.write_text(json.dumps({"id": 3, "bio": "changed"}), encoding="utf-8")
+    (tmp_path / "data" / "npcs" / "npc_4.json").unlink()
+    (tmp_path / "data" / "npcs" / "npc_5.json").write_text("{}", encoding="utf-8")
+
+    compressed = []
+    original = export_repo._compress_file
+    monkeypatch.setattr(export_repo, "_compress_file", lambda path, stored: compressed.append(path) or original(path, stored))
+    exporter.export_to_zip("export.zip")
+    out = capsys.readouterr().out
+    assert sorted(os.path.basename(p) for p in compressed) == ["_chatgpt_context.json", "npc_3.json", "npc_5.json"]
+    assert "Reused" in out and "Added: data/npcs/npc_0.json" not in out
+
+    incremental = contents(tmp_path / "export.zip")
+    assert "data/npcs/npc_4.json" not in incremental
+    assert json.loads(incremental["data/npcs/npc_3.json"])["bio"] == "changed"
+    exporter.export_to_zip("full.zip", incremental=False)
+    assert contents(tmp_path / "full.zip") == incremental
+
+
+def test_parallel_compression_matches_serial(tmp_path, monkeypatch):
+    exporter = make_repo(tmp_path)
+    monkeypatch.setattr(export_repo, "PARALLEL_MIN_BYTES", 0)
+    exporter.export_to_zip("serial.zip", workers=1)
+    exporter.export_to_zip("parallel.zip", workers=2)
+    assert contents(tmp_path / "serial.zip") == contents(tmp_path / "parallel.zip")
+    # The other export is not mistaken for a module pack
+    assert "serial.zip" not in contents(tmp_path / "parallel.zip")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the exact 4dF odds engine.
+
+Covers:
+- Passive and opposed outcome distributions match the dice counts.
+- Invokes and bonuses shift the odds; large shifts saturate.
+- Tri-Check success counts form a proper distribution.
+- Skill ratings and stunt bonuses are read from real stat sheets.
+- batch_odds() agrees with check_odds() with and without NumPy.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import fate_odds
+from fate_odds import (batch_odds, check_odds, party_vs_encounter, rank_value,
+                       sheet_rating, skill_ratings, success_chance, tri_check_odds)
+from gm_tools import GMTools
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+def _sheet(sheet_id):
+    with open(os.path.join(DATA_DIR, "npc_stat_sheets", f"{sheet_id}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_passive_distribution_is_exact():
+    odds = check_odds(0, 0)
+    assert sum(odds.values()) == pytest.approx(1.0)
+    # 4dF: of 81 combinations 19 total 0, 26 total +1/+2 and 5 total +3/+4
+    assert odds["tie"] == pytest.approx(19 / 81)
+    assert odds["fail"] == pytest.approx(31 / 81)
+    assert odds["success"] == pytest.approx(26 / 81)
+    assert odds["success_with_style"] == pytest.approx(5 / 81)
+
+
+def test_invokes_and_saturation():
+    assert check_odds(2, 2, invokes=1) == check_odds(4, 2)
+    assert check_odds(1, 0, bonus=2) == check_odds(3, 0)
+    assert check_odds(20, 0)["success_with_style"] == pytest.approx(1.0)
+    assert check_odds(0, 20)["fail"] == pytest.approx(1.0)
+    assert success_chance(0, 0, ties_succeed=True) == pytest.approx(50 / 81)
+
+
+def test_opposed_checks_are_symmetric():
+    a, b = check_odds(3, 1, opposed=True), check_odds(1, 3, opposed=True)
+    assert sum(a.values()) == pytest.approx(1.0)
+    assert a["fail"] == pytest.approx(b["success"] + b["success_with_style"])
+    assert a["tie"] == pytest.approx(b["tie"])
+
+
+def test_tri_check_distribution():
+    checks = [{"skill": 3, "opposition": 2}, {"skill": 2, "opposition": 4, "invokes": 1}, {"skill": 1, "opposition": 3}]
+    result = tri_check_odds(checks)
+    assert set(result["successes"]) == {0, 1, 2, 3}
+    assert sum(result["successes"].values()) == pytest.approx(1.0)
+    assert result["expected"] == pytest.approx(sum(k * p for k, p in result["successes"].items()))
+    p = result["per_check"]
+    assert result["successes"][3] == pytest.approx(p[0] * p[1] * p[2])
+
+
+def test_ratings_from_stat_sheets():
+    assert rank_value("Great") == 4
+    assert rank_value("Good (+3)") == 3
+    assert rank_value("-1") == -1
+    assert rank_value("Unknown") is None
+
+    aela = _sheet("aela_the_huntress")
+    assert skill_ratings(aela)["Shoot"] == 4
+    assert sheet_rating(aela, "Shoot") == 6
+    assert sheet_rating(aela, "Shoot", use_stunts=False) == 4
+    assert sheet_rating(aela, "Lore") == 0
+
+
+@pytest.mark.parametrize("numpy_available", [True, False])
+def test_batch_matches_single_checks(monkeypatch, numpy_available):
+    if numpy_available and not fate_odds.NUMPY_AVAILABLE:
+        pytest.skip("NumPy not installed")
+    monkeypatch.setattr(fate_odds, "NUMPY_AVAILABLE", numpy_available)
+
+    skills, oppositions = [4, 2, -1], [0, 3, 7, 1]
+    grid = batch_odds(skills, oppositions, invokes=1, opposed=True)
+    for i, s in enumerate(skills):
+        for j, o in enumerate(oppositions):
+            expected = check_odds(s, o, invokes=1, opposed=True)
+            assert [float(x) for x in grid[i][j]] == pytest.approx([expected[k] for k in fate_odds.OUTCOMES])
+
+
+def test_party_vs_encounter_and_gm_tools(capsys):
+    report = party_vs_encounter([_sheet("aela_the_huntress")], [_sheet("bandit_marauder")], "Fight")
+    assert report["party"] == ["Aela the Huntress"]
+    assert report["party_ratings"] == [sheet_rating(_sheet("aela_the_huntress"), "Fight")]
+
+    gm = GMTools(DATA_DIR, "/nonexistent-state")
+    result = gm.encounter_odds(["aela_the_huntress"], ["bandit_marauder"], "Fight")
+    assert result["enemies"] == report["enemies"]
+    assert "ENCOUNTER ODDS" in capsys.readouterr().out
+    assert gm.encounter_odds(["nobody"], ["bandit_marauder"]) is None
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for batch first impressions (first_impression.impressions_for_scene).
+
+Covers:
+- Every NPC in a scene gets a line with one appearance load and one write.
+- The appearance is parsed and its conditions compiled once per file version.
+- NPC blobs are built once per NPC file version.
+- Explicit, default and inferred dispositions; conditional lines by NPC blob.
+- NPCs that already have an impression are skipped (no write at all).
+- StoryManager scene NPCs get their barks from the batch call.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import campaign_state
+import first_impression
+from first_impression import impressions_for_scene
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _repo(tmp_path):
+    state_path = tmp_path / "state" / "campaign_state.json"
+    _write(state_path, {"active_pc_id": "pc_test", "civil_war_state": {"player_alliance": "stormcloak"},
+                        "npc_first_impressions": {"old_friend": "met in Riverwood"}})
+    appearance_path = tmp_path / "data" / "pcs" / "appearances" / "test_appearance.json"
+    _write(appearance_path, {
+        "appearance_revision": 1,
+        "first_impression_lines": {"neutral": ["Neutral."], "positive": ["Friendly."], "negative": ["Hostile."]},
+        "conditional_first_impression_lines": [
+            {"id": "companions", "if_npc_blob_any": ["companions"], "lines": {"neutral": ["Whelp."]}},
+        ],
+    })
+    _write(tmp_path / "data" / "npcs" / "aela.json", {"id": "aela", "faction": "Companions"})
+    _write(tmp_path / "data" / "npc_stat_sheets" / "elenwen.json", {"id": "elenwen", "faction": "Thalmor"})
+    _write(tmp_path / "data" / "npcs" / "rikke.json", {"id": "rikke", "faction": "Imperial Legion"})
+    return state_path, appearance_path
+
+
+def test_scene_loads_once_and_writes_once(tmp_path, monkeypatch):
+    state_path, appearance_path = _repo(tmp_path)
+    loads, writes = [], []
+    real_load, real_persist = first_impression.load_json, campaign_state._persist
+    monkeypatch.setattr(first_impression, "load_json", lambda p: (loads.append(p), real_load(p))[1])
+    monkeypatch.setattr(campaign_state, "_persist", lambda *a: (writes.append(a[0]), real_persist(*a))[1])
+
+    lines = impressions_for_scene(state_path, appearance_path,
+                                  ["aela", "elenwen", "rikke", "aela", "stranger"], {"stranger": "positive"})
+
+    assert lines == {"aela": "Whelp.", "elenwen": "Hostile.", "rikke": "Hostile.", "stranger": "Friendly."}
+    assert len(loads) == 1 and len(writes) == 1
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert state["npc_first_impressions"]["elenwen"]["pc_test"]["disposition"] == "negative"
+    assert state["npc_first_impressions"]["aela"]["pc_test"]["source"] == "companions"
+    assert state["npc_first_impressions_legacy"]["old_friend"]["note"] == "met in Riverwood"
+
+    # Everyone has met the PC now: nothing to record, nothing written
+    writes.clear()
+    assert impressions_for_scene(state_path, appearance_path, ["aela", "rikke"], "neutral") == {}
+    assert writes == []
+    assert len(loads) == 1
+    assert impressions_for_scene(state_path, appearance_path, ["rikke"], "positive", force=True) == {"rikke": "Friendly."}
+
+
+def test_appearance_conditions_compiled_per_file_version(tmp_path, monkeypatch):
+    state_path, appearance_path = _repo(tmp_path)
+    compiles = []
+    real_compile = first_impression._compile_conditions
+    monkeypatch.setattr(first_impression, "_compile_conditions", lambda c: (compiles.append(c), real_compile(c))[1])
+
+    assert impressions_for_scene(state_path, appearance_path, ["aela"], "neutral") == {"aela": "Whelp."}
+    assert impressions_for_scene(state_path, appearance_path, ["rikke"], "neutral") == {"rikke": "Neutral."}
+    assert len(compiles) == 1
+
+    appearance = json.loads(appearance_path.read_text(encoding="utf-8"))
+    appearance["conditional_first_impression_lines"].append(
+        {"id": "legion", "if_npc_blob_any": ["legion"], "lines": {"neutral": ["Soldier."]}})
+    _write(appearance_path, appearance)
+    assert impressions_for_scene(state_path, appearance_path, ["rikke"], "neutral", force=True) == {"rikke": "Soldier."}
+    assert len(compiles) == 2
+
+
+def test_npc_blob_built_once_per_file_version(tmp_path, monkeypatch):
+    state_path, appearance_path = _repo(tmp_path)
+    vilkas = tmp_path / "data" / "npcs" / "vilkas.json"
+    _write(vilkas, {"id": "vilkas", "faction": "Companions", "notes": "Sparring master of the Circle"})
+    builds = []
+    real_build = first_impression.build_npc_blob
+    monkeypatch.setattr(first_impression, "build_npc_blob", lambda npc: (builds.append(npc.get("id")), real_build(npc))[1])
+
+    assert impressions_for_scene(state_path, appearance_path, ["vilkas"], "neutral") == {"vilkas": "Whelp."}
+    assert impressions_for_scene(state_path, appearance_path, ["vilkas"], "neutral", force=True) == {"vilkas": "Whelp."}
+    assert builds == ["vilkas"]
+
+    _write(vilkas, {"id": "vilkas", "faction": "Whiterun Guard", "notes": "Left the Circle"})
+    assert impressions_for_scene(state_path, appearance_path, ["vilkas"], "neutral", force=True) == {"vilkas": "Neutral."}
+    assert builds == ["vilkas", "vilkas"]
+
+
+def test_story_manager_scene_uses_batch(tmp_path, monkeypatch):
+    from story_manager import StoryManager
+
+    state_path, appearance_path = _repo(tmp_path)
+    calls = []
+    real = first_impression.impressions_for_scene
+
+    def spy(*args, **kwargs):
+        calls.append(args[2])
+        return real(*args, **kwargs)
+
+    import story_manager
+    monkeypatch.setattr(story_manager, "impressions_for_scene", spy)
+    sm = StoryManager.__new__(StoryManager)
+    sm.data_dir = tmp_path / "data"
+    sm.campaign_state_path = state_path
+    scene = {"friendly": [{"id": "aela"}, "bad entry"], "hostile": [{"id": "npc_stat_elenwen"}],
+             "enemies": [{"id": "aela"}]}
+    with campaign_state.campaign_state_transaction(state_path):
+        sm._add_first_impressions(scene, str(state_path))
+
+    assert calls == [["aela", "elenwen"]]
+    assert scene["friendly"][0]["gm_barks"] == ["Whelp."]
+    assert scene["hostile"][0]["gm_barks"] == ["Hostile."]
+    assert "gm_barks" not in scene["enemies"][0]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the resident GM daemon.
+
+Covers:
+- JSON-RPC dispatch to GMTools / StoryManager / DataQueryManager.
+- Printed output is captured into the response, never onto stdout.
+- Error codes for bad JSON, unknown methods, bad params and input() calls.
+- The stdio transport and the Unix-socket client round trip.
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import gm_daemon
+from gm_daemon import GMDaemon, request, serve_socket, serve_stdio
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+@pytest.fixture(scope="module")
+def daemon(tmp_path_factory):
+    return GMDaemon(DATA_DIR, str(tmp_path_factory.mktemp("state")))
+
+
+def _rpc(daemon, method, params=None, request_id=1):
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return json.loads(daemon.handle(json.dumps(message)))
+
+
+def test_dispatches_to_resident_managers(daemon, capsys):
+    npcs = _rpc(daemon, "query.query_npcs", {"location": "Whiterun"})["result"]["value"]
+    assert npcs and all("Whiterun" in n.get("location", "") for n in npcs)
+
+    result = _rpc(daemon, "gm.tri_check_result", [3])["result"]
+    assert "TRI-CHECK OUTCOME" in result["output"]
+    assert capsys.readouterr().out == ""
+
+    methods = _rpc(daemon, "daemon.methods")["result"]["value"]
+    assert {"gm.view_all_clocks", "story.load_campaign_state", "query.search_text"} <= set(methods)
+    assert not any(m.split(".", 1)[1].startswith("_") for m in methods)
+
+
+def test_errors(daemon):
+    assert json.loads(daemon.handle("not json"))["error"]["code"] == gm_daemon.PARSE_ERROR
+    assert json.loads(daemon.handle("[1, 2]"))["error"]["code"] == gm_daemon.INVALID_REQUEST
+    assert _rpc(daemon, "gm._load_sheet", ["x"])["error"]["code"] == gm_daemon.METHOD_NOT_FOUND
+    assert _rpc(daemon, "nothing.here")["error"]["code"] == gm_daemon.METHOD_NOT_FOUND
+    assert _rpc(daemon, "gm.tri_check_result", {"bogus": 1})["error"]["code"] == gm_daemon.INVALID_PARAMS
+
+    class Prompting:
+        def ask(self):
+            return input("Faction ID: ")
+
+    daemon.services["prompt"] = Prompting()
+    try:
+        interactive = _rpc(daemon, "prompt.ask")
+    finally:
+        del daemon.services["prompt"]
+    assert interactive["error"]["code"] == gm_daemon.SERVER_ERROR
+    assert "interactive input" in interactive["error"]["message"]
+
+    assert daemon.handle(json.dumps({"jsonrpc": "2.0", "method": "daemon.ping"})) is None
+
+
+def test_stdio_transport(daemon):
+    lines = "\n".join([
+        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "daemon.ping"}),
+        "",
+        json.dumps({"jsonrpc": "2.0", "id": 2, "method": "query.get_npc_enemy_stat_by_id", "params": ["enemy_bandit_marauder"]}),
+    ]) + "\n"
+    out = io.StringIO()
+    serve_stdio(daemon, io.StringIO(lines), out)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2]
+    assert responses[0]["result"]["value"]["pid"] == os.getpid()
+    assert responses[1]["result"]["value"]["name"] == "Bandit Marauder"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available")
+def test_socket_round_trip(daemon):
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="gmd"), "gm.sock")
+    daemon.shutdown_requested = False
+    server = threading.Thread(target=serve_socket, args=(daemon, socket_path), daemon=True)
+    server.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.02)
+
+    try:
+        assert request("daemon.ping", socket_path=socket_path)["value"]["pid"] == os.getpid()
+        with pytest.raises(gm_daemon.RPCError):
+            request("gm.no_such_method", socket_path=socket_path)
+        # A second server refuses to steal a live socket
+        with pytest.raises(RuntimeError):
+            serve_socket(daemon, socket_path)
+    finally:
+        request("daemon.shutdown", socket_path=socket_path)
+        server.join(timeout=5)
+    assert not server.is_alive()
+    assert not os.path.exists(socket_path)
+    with pytest.raises(ConnectionError):
+        request("daemon.ping", socket_path=socket_path)
+
+
+def test_cli_params():
+    assert gm_daemon._parse_cli_params(["location=Whiterun", "limit=3"]) == {"location": "Whiterun", "limit": 3}
+    assert gm_daemon._parse_cli_params(["2", "Aela"]) == [2, "Aela"]
+    assert gm_daemon._parse_cli_params([]) is None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled keyword matchers.
+
+Covers:
+- Whole-word / phrase matching with possessive and plural forms.
+- Token caching by content hash (files are not re-read when unchanged).
+- First-impression conditions and relationship inference on the matcher,
+  including the bulk pass over every NPC stat sheet.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import relationship_inference
+from first_impression import select_impression_lines
+from keyword_matcher import KeywordMatcher, TokenCache
+
+PC = {
+    "id": "pc_test",
+    "background": "Survived Helgen and the Great War; served with the Stormcloaks out of Windhelm.",
+}
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_whole_word_matching():
+    matcher = KeywordMatcher(["Nord", "Great War", "Stormcloak", "Jarl", ""])
+    assert matcher.match("The Jarl's Nord guard fought in the great war") == {"jarl", "nord", "great war", ""}
+    assert matcher.match("Nordic ruins, a war that was great, stormcloaks") == {"stormcloak", ""}
+    assert matcher.match("") == {""}
+
+
+def test_token_cache_by_content(tmp_path):
+    cache = TokenCache()
+    assert cache.text("Ulfric's men") is cache.text("Ulfric's men")
+
+    reads = []
+    pc_path = tmp_path / "pc.json"
+    pc_path.write_text(json.dumps(PC), encoding="utf-8")
+    to_text = lambda p: (reads.append(p), json.loads(p.read_text(encoding="utf-8"))["background"])[1]
+    first = cache.file(pc_path, to_text)
+    assert "helgen" in first
+    os.utime(pc_path, ns=(1, 1))                 # touched, same bytes
+    assert cache.file(pc_path, to_text) is first
+    assert len(reads) == 1
+    pc_path.write_text(json.dumps(dict(PC, background="A Riverwood miller")), encoding="utf-8")
+    assert "riverwood" in cache.file(pc_path, to_text)
+    assert len(reads) == 2
+
+
+def test_impression_conditions_match_words():
+    appearance = {
+        "first_impression_lines": {"neutral": ["Hm."]},
+        "conditional_first_impression_lines": [
+            {"id": "both", "if_npc_blob_all": ["thalmor", "justiciar"], "lines": {"neutral": ["Elf."]}},
+            {"id": "legion", "if_npc_blob_any": ["legion", "imperial"], "lines": {"neutral": ["Soldier."]}},
+        ],
+    }
+    assert select_impression_lines(appearance, "neutral", "x", "thalmor justiciar") == (["Elf."], "both")
+    assert select_impression_lines(appearance, "neutral", "x", "npc_stat_legion_scout") == (["Soldier."], "legion")
+    assert select_impression_lines(appearance, "neutral", "x", "imperialist thalmor") == (["Hm."], "default")
+
+
+def test_infer_all_over_stat_sheets(tmp_path):
+    data = tmp_path / "data"
+    _write(data / "npc_stat_sheets" / "ralof.json", {"id": "npc_stat_ralof"})
+    _write(data / "npc_stat_sheets" / "rikke.json", {"id": "npc_stat_legate_rikke"})
+    _write(data / "npc_stat_sheets" / "nobody.json", {"name": "No rules"})
+    assert relationship_inference.stat_sheet_npc_ids(data) == ["nobody", "npc_stat_legate_rikke", "npc_stat_ralof"]
+
+    pc_path = tmp_path / "pc_test.json"
+    pc_path.write_text(json.dumps(PC), encoding="utf-8")
+    quiet = {"id": "pc_quiet", "background": "A Nordic scholar of Talosian ruins"}
+    inferred = relationship_inference.infer_all([pc_path, quiet], data_dir=data)
+    assert inferred == {
+        "pc_test": {
+            "npc_stat_legate_rikke": [relationship_inference.infer_for_npc(PC, "npc_stat_legate_rikke")[0]],
+            "npc_stat_ralof": relationship_inference.infer_for_npc(PC, "npc_stat_ralof"),
+        },
+        "pc_quiet": {},
+    }
+    assert [r["flag"] for r in inferred["pc_test"]["npc_stat_legate_rikke"]] == ["rikke_imperial_bond"]
+
+    state_path = tmp_path / "campaign_state.json"
+    state_path.write_text(json.dumps({"relationship_inference": {"pc_test": {"ralof_stormcloak_bond": {"consumed": True}}}}),
+                          encoding="utf-8")
+    written = relationship_inference.apply_inference_for_party(state_path, [pc_path], data_dir=data)
+    assert list(written["pc_test"]) == ["npc_stat_legate_rikke"]
+    state = json.loads(state_path.read_text(encoding="utf-8"))
+    assert state["relationship_inference"]["pc_test"]["ralof_stormcloak_bond"] == {"consumed": True}
+    assert state["relationship_inference"]["pc_test"]["rikke_imperial_bond"]["consumed"] is False
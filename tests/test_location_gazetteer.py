@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for the location gazetteer and compiled location resolver.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import location_gazetteer
+from location_gazetteer import _Automaton, get_gazetteer, normalize
+from triggers.global_story_triggers import _is_settlement
+from utils import location_matches
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = _Automaton(["he", "she", "his", "hers"])
+    found = sorted(automaton.finditer("ushers"))
+    assert found == [(3, "he"), (3, "she"), (5, "hers")]
+
+
+def test_resolve_canonical_places():
+    gazetteer = get_gazetteer()
+    cases = {
+        "Whiterun - Plains District": ("whiterun_plains_district", "whiterun_hold", "district"),
+        "jorrvaskr_grand_hall": ("jorvaskr_grand_hall", "whiterun_hold", "area"),
+        "Jorvaskr": ("jorvaskr_mead_hall_entrance", "whiterun_hold", "area"),
+        "Dustman's Cairn": ("dustmans_entrance", "whiterun_hold", "area"),
+        "windhelm_gray_quarter": ("windhelm_gray_quarter", "eastmarch_hold", "district"),
+        "Riften": ("riften", "rift_hold", "settlement"),
+        "The Rift wilds": ("rift_hold", "rift_hold", "hold"),
+        "Markarth - Silver-Blood Inn": ("markarth_silver_blood_inn", "reach_hold", "district"),
+    }
+    for text, (location_id, hold, kind) in cases.items():
+        place = gazetteer.resolve(text)
+        assert place is not None, text
+        assert (place.id, place.hold, place.kind) == (location_id, hold, kind), text
+    assert gazetteer.resolve("Ancient Nordic Ruins") is None
+    assert gazetteer.resolve("") is None
+    assert gazetteer.resolve(None) is None
+
+
+def test_shared_names_use_hold_context():
+    gazetteer = get_gazetteer()
+    assert gazetteer.resolve("Jarl's Longhouse, Falkreath").id == "falkreath_jarls_longhouse"
+    assert gazetteer.resolve("Dawnstar jarls_longhouse").id == "dawnstar_jarls_longhouse"
+    assert gazetteer.resolve("Winterhold - Jarl's Longhouse").hold == "winterhold_hold"
+
+
+def test_place_names_match_whole_words():
+    gazetteer = get_gazetteer()
+    # "rift" inside "riften" and "wind" inside "windhelm" are not places
+    assert gazetteer.resolve("riften").id == "riften"
+    assert gazetteer.resolve("windhelm").id == "windhelm"
+    assert gazetteer.resolve("a winding road") is None
+
+
+def test_mentions_keep_substring_semantics():
+    gazetteer = get_gazetteer()
+    terms = gazetteer.mentions("Riften_Marketplace")
+    assert "market" in terms
+    assert "riften" in terms
+    assert "rift" in terms
+    assert "temple" not in terms
+    assert "grand hall" in gazetteer.mentions("jorrvaskr_grand_hall")
+    assert "silver-blood" in gazetteer.mentions("Markarth Silver Blood Inn")
+    assert terms.location.id == "riften_marketplace"
+
+
+def test_results_are_memoized():
+    gazetteer = get_gazetteer()
+    first = gazetteer.resolve("Whiterun Cloud District")
+    assert gazetteer.resolve("whiterun_cloud_district") is first
+    assert gazetteer._scan("Whiterun Cloud District") is gazetteer._scan("whiterun   cloud-district")
+
+
+def test_is_settlement():
+    assert _is_settlement("Whiterun Hold outskirts")
+    assert _is_settlement("dawnstar_windpeak_inn")
+    assert _is_settlement("Jorrvaskr")
+    assert _is_settlement("Dragonsreach")
+    assert not _is_settlement("Dustman's Cairn")
+    assert not _is_settlement("the open tundra")
+
+
+def test_location_matches_uses_canonical_places():
+    assert location_matches("Whiterun", "Whiterun Hold")
+    assert location_matches("Jorrvaskr", "jorvaskr_mead_hall")
+    assert location_matches("dustman's cairn", "Dustmans Cairn")
+    assert not location_matches("Solitude", "Whiterun")
+
+
+def test_gazetteer_recompiles_when_data_changes(tmp_path):
+    holds = tmp_path / "holds"
+    holds.mkdir()
+    hold_file = holds / "test.json"
+    record = {"hold": "Test Hold", "capital": "Testburg", "districts": [{"name": "Old Quarter"}]}
+    hold_file.write_text(json.dumps(record), encoding="utf-8")
+
+    gazetteer = get_gazetteer(tmp_path)
+    assert gazetteer.resolve("Testburg Old Quarter").id == "testburg_old_quarter"
+    assert gazetteer.resolve("New Quarter") is None
+    assert get_gazetteer(tmp_path) is gazetteer
+
+    record["districts"].append({"name": "New Quarter"})
+    time.sleep(0.01)
+    hold_file.write_text(json.dumps(record), encoding="utf-8")
+    assert get_gazetteer(tmp_path) is gazetteer   # not re-checked yet
+    reloaded = get_gazetteer(tmp_path, max_age=0)
+    assert reloaded is not gazetteer
+    assert reloaded.resolve("New Quarter").id == "testburg_new_quarter"
+    assert normalize("Testburg's  New_Quarter!") == "testburgs new quarter"
+
+
+def test_location_matches_does_not_rescan_per_call(monkeypatch):
+    get_gazetteer(max_age=0)
+    scans = []
+    catalog = location_gazetteer.get_catalog()
+    real_scan = catalog.scan
+    monkeypatch.setattr(catalog, "scan", lambda *a, **k: (scans.append(a), real_scan(*a, **k))[1])
+    for _ in range(200):
+        assert location_matches("Jorrvaskr", "jorvaskr_mead_hall")
+        assert not location_matches("Solitude", "Whiterun")
+    assert scans == []
+
+
+def test_new_keywords_compile_in_one_batch(monkeypatch):
+    gazetteer = get_gazetteer()
+    gazetteer.resolve("Riften")
+    compiles = []
+    real_compile = location_gazetteer.LocationGazetteer._compile
+    monkeypatch.setattr(location_gazetteer.LocationGazetteer, "_compile",
+                        lambda self: (compiles.append(self), real_compile(self))[1])
+
+    new = ["stall of the zq fletcher", "zq canal", "zq tannery", "zq well"]
+    terms = gazetteer.mentions("Riften ZQ Canal by the zq_well")
+    assert [k in terms for k in new] == [False, True, False, True]
+    assert compiles == []
+
+    # The next scan compiles all four at once
+    terms = gazetteer.mentions("ZQ Tannery, Riften")
+    assert [k in terms for k in new] == [False, False, True, False]
+    assert "zq tannery" in terms.keywords
+    assert len(compiles) == 1
+    assert [k in gazetteer.mentions("the zq canal") for k in new] == [False, True, False, False]
+    assert len(compiles) == 1
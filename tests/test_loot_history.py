@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only loot history.
+
+Covers:
+- Rolls are appended as JSON lines, not rewritten as one array.
+- Segments rotate at the size limit and are summarized in index.json.
+- Queries by table id and session, and index-driven segment skipping.
+- One-time import of the legacy state/loot_history.json array.
+- Write failures are reported instead of silently swallowed.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import loot_history
+from loot_history import LootHistory
+from loot_manager import LootManager
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+def test_append_writes_one_line_per_roll(tmp_path):
+    history = LootHistory(tmp_path / "loot_history")
+    history.append("coins", ["Copper"], session=1)
+    history.append("gems", ["Garnet", "Ruby"], session=1)
+
+    [segment] = history.segment_paths()
+    lines = segment.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["table"] for line in lines] == ["coins", "gems"]
+    assert json.loads(lines[1])["results"] == ["Garnet", "Ruby"]
+
+
+def test_rotation_and_indexed_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(loot_history, "SEGMENT_MAX_BYTES", 200)
+    history = LootHistory(tmp_path / "loot_history")
+
+    for i in range(12):
+        history.append("coins" if i % 3 else "gems", [f"item {i}"], session=1 + i // 6)
+
+    segments = history.segment_paths()
+    assert len(segments) > 2
+    index = json.loads(history.index_path.read_text(encoding="utf-8"))
+    assert [s["name"] for s in index["segments"]] == [p.name for p in segments[:-1]]
+
+    gems = history.query(table_id="gems")
+    assert [r["results"][0] for r in gems] == ["item 0", "item 3", "item 6", "item 9"]
+    assert history.drops("coins", session=2) == ["item 7", "item 8", "item 10", "item 11"]
+    assert history.query(table_id="gems", session=2, limit=1)[0]["results"] == ["item 9"]
+    assert history.query(table_id="nothing") == []
+
+    summary = history.summary()
+    assert summary["records"] == 12
+    assert summary["tables"] == {"gems": 4, "coins": 8}
+    assert summary["sessions"] == {"1": 6, "2": 6}
+
+
+def test_index_skips_segments_without_the_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(loot_history, "SEGMENT_MAX_BYTES", 150)
+    history = LootHistory(tmp_path / "loot_history")
+    for i in range(6):
+        history.append("coins", [f"c{i}"])
+    history.append("gems", ["g"])
+
+    read = []
+    real_read = loot_history._read_records
+    monkeypatch.setattr(loot_history, "_read_records", lambda p: read.append(p.name) or real_read(p))
+
+    assert history.drops("gems") == ["g"]
+    # Only the segment holding the gems roll (and the active one) are opened
+    assert len(read) <= 2
+
+
+def test_stale_index_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(loot_history, "SEGMENT_MAX_BYTES", 150)
+    history = LootHistory(tmp_path / "loot_history")
+    for i in range(6):
+        history.append("coins", [f"c{i}"], session=3)
+    history.index_path.write_text("not json", encoding="utf-8")
+
+    assert len(history.query(table_id="coins", session=3)) == 6
+
+
+def test_legacy_history_is_imported_once(tmp_path):
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    (state_dir / "loot_history.json").write_text(json.dumps([
+        {"timestamp": "2025-01-01 10:00:00", "table": "coins", "results": ["Old copper"]},
+    ]), encoding="utf-8")
+
+    history = LootHistory(state_dir / "loot_history", legacy_path=state_dir / "loot_history.json")
+    history.append("coins", ["New copper"])
+    history.append("coins", ["Newer copper"])
+    assert history.drops("coins") == ["Old copper", "New copper", "Newer copper"]
+
+
+def test_loot_manager_files_rolls_under_current_session(tmp_path):
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    (state_dir / "campaign_state.json").write_text(json.dumps({"session_count": 5}), encoding="utf-8")
+    lm = LootManager(DATA_DIR, str(state_dir))
+
+    rolled = lm.roll_table("nordic_tomb_minor", seed=1)
+    lm.roll_table("silver_hand_cache", seed=2)
+
+    drops = lm.session_drops("nordic_tomb_minor")
+    assert [r["results"] for r in drops] == [rolled]
+    assert drops[0]["session"] == 5
+    assert lm.session_drops("nordic_tomb_minor", session=4) == []
+
+
+def test_history_write_failure_is_reported(tmp_path, capsys):
+    blocker = tmp_path / "state"
+    blocker.write_text("not a directory", encoding="utf-8")
+    lm = LootManager(DATA_DIR, str(blocker), session=1)
+
+    assert lm.roll_table("nordic_tomb_minor", seed=1)
+    assert "Could not record loot roll" in capsys.readouterr().err
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled alias-method loot sampler.
+
+Covers:
+- Alias tables reproduce the entry weights.
+- Huge weights cost nothing extra (no population expansion).
+- roll_many() batches are reproducible and independent of history.
+- Nested sub-table entries are expanded, with cycles cut off.
+- Compiled tables are cached and rebuilt when loot_tables.json changes.
+"""
+
+import json
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+from loot_manager import LootManager
+from loot_sampler import build_alias, get_loot_table_cache
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+
+
+def _write_tables(data_dir, tables):
+    path = data_dir / "loot" / "loot_tables.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"tables": tables}), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def manager(tmp_path):
+    data_dir = tmp_path / "data"
+    _write_tables(data_dir, {
+        "coins": {"rolls": 1, "entries": [
+            {"text": "Copper", "weight": 6},
+            {"text": "Silver", "weight": 3},
+            {"text": "Gold", "weight": 1},
+        ]},
+        "gems": {"rolls": 1, "entries": [{"text": "Garnet", "weight": 1}]},
+        "hoard": {"rolls": 2, "entries": [
+            {"table": "gems", "weight": 1, "rolls": 2},
+            {"text": "Iron dagger", "weight": 1},
+        ]},
+        "whale": {"rolls": 1, "entries": [
+            {"text": "Common", "weight": 10 ** 12},
+            {"text": "Rare", "weight": 1},
+        ]},
+        "loop_a": {"rolls": 1, "entries": [{"table": "loop_b", "weight": 1}]},
+        "loop_b": {"rolls": 1, "entries": [
+            {"table": "loop_a", "weight": 1},
+            {"text": "Exit", "weight": 1},
+        ]},
+        "empty": {"rolls": 1, "entries": [{"text": "Nothing", "weight": 0}]},
+    })
+    return LootManager(str(data_dir), str(tmp_path / "state"))
+
+
+def test_alias_table_matches_weights():
+    weights = [6, 3, 1]
+    prob, alias = build_alias(weights)
+    # Exact probability mass per outcome
+    mass = [0.0] * len(weights)
+    for i, p in enumerate(prob):
+        mass[i] += p / len(weights)
+        mass[alias[i]] += (1 - p) / len(weights)
+    assert mass == pytest.approx([w / sum(weights) for w in weights])
+
+
+def test_roll_many_distribution_and_reproducibility(manager):
+    hoards = manager.roll_many("coins", 20000, seed=7)
+    assert len(hoards) == 20000 and all(len(h) == 1 for h in hoards)
+    counts = Counter(h[0] for h in hoards)
+    assert counts["Copper"] / 20000 == pytest.approx(0.6, abs=0.02)
+    assert counts["Silver"] / 20000 == pytest.approx(0.3, abs=0.02)
+    assert counts["Gold"] / 20000 == pytest.approx(0.1, abs=0.02)
+
+    assert manager.roll_many("coins", 50, seed=7) == hoards[:50]
+    assert manager.history.segment_paths() == []
+
+
+def test_huge_weights_do_not_expand(manager):
+    results = manager.roll_table("whale", rolls=100, seed=1)
+    assert results == ["Common"] * 100
+
+
+def test_nested_subtables_are_expanded(manager):
+    results = manager.roll_table("hoard", seed=3)
+    # Each draw is either the dagger or two garnets from the sub-table
+    assert set(results) <= {"Iron dagger", "Garnet"}
+    assert len(results) == results.count("Iron dagger") + results.count("Garnet")
+    assert results.count("Garnet") % 2 == 0
+    assert any("Garnet" in h for h in manager.roll_many("hoard", 20, seed=3))
+
+
+def test_subtable_cycles_are_cut(manager):
+    for hoard in manager.roll_many("loop_a", 50, seed=11):
+        assert hoard in ([], ["Exit"])
+
+
+def test_unknown_and_empty_tables(manager):
+    assert manager.roll_table("missing") == []
+    assert manager.roll_table("empty") == []
+    assert manager.roll_many("missing", 5) == []
+
+
+def test_compiled_tables_cached_until_file_changes(manager):
+    first = manager.compiled_tables()
+    assert manager.compiled_tables() is first
+    assert get_loot_table_cache().tables(manager.tables_path) is first
+
+    _write_tables(manager.data_dir, {"coins": {"rolls": 1, "entries": [{"text": "Platinum", "weight": 1}]}})
+    st = os.stat(manager.tables_path)
+    os.utime(manager.tables_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert manager.compiled_tables() is not first
+    assert manager.roll_table("coins", seed=1) == ["Platinum"]
+
+
+def test_real_tables_roll_many():
+    lm = LootManager(DATA_DIR, "/nonexistent-state")
+    tables = lm.compiled_tables().tables
+    assert tables
+    for table_id in tables:
+        hoards = lm.roll_many(table_id, 10, seed=random.randrange(1000))
+        assert len(hoards) == 10
+        assert all(hoard and all(isinstance(item, str) for item in hoard) for hoard in hoards)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent clock index behind mid_session_protocol.top_clocks.
+
+Covers:
+- Clocks and ranking match ClockRegistry (faction-trust clocks included).
+- Unchanged files are not parsed again, in-process or from state/.
+- Changed and deleted files are picked up.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import mid_session_protocol
+from clock_registry import ClockRegistry
+from mid_session_protocol import ClockIndex, top_clocks
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _repo(tmp_path):
+    _write(tmp_path / "data" / "clocks" / "war.json", {"war": {"clocks": {
+        "a": {"name": "Siege", "current": 3, "max": 4},
+        "b": {"name": "Weariness", "current_progress": 1, "total_segments": 8},
+        "c": {"name": "Old Feud", "current": 4, "max": 4, "status": "resolved"},
+    }}})
+    _write(tmp_path / "data" / "clocks" / "trust.json", {"clocks": {
+        "companions_trust": {"name": "Companions", "current_trust": 5, "max_trust": 6},
+    }})
+    _write(tmp_path / "clocks" / "homebrew" / "cult.json", {"clocks": [
+        {"name": "Cult Rising", "progress": 7, "segments": 8},
+    ]})
+    (tmp_path / "state").mkdir()
+    return tmp_path
+
+
+def _counting_loads(monkeypatch):
+    parsed = []
+    real_load = mid_session_protocol.load_clock_file
+    monkeypatch.setattr(mid_session_protocol, "load_clock_file",
+                        lambda p: (parsed.append(Path(p).name), real_load(p))[1])
+    return parsed
+
+
+def test_top_clocks_ranks_and_persists(tmp_path, monkeypatch):
+    repo = _repo(tmp_path)
+    monkeypatch.setattr(mid_session_protocol, "_CLOCK_INDEXES", {})
+    top = top_clocks(repo)
+    assert [(c.id, c.source) for c in top] == [
+        ("cult:cult_rising", "clocks/homebrew/cult.json"),
+        ("trust:companions_trust", "data/clocks/trust.json"),
+        ("war:a", "data/clocks/war.json"),
+        ("war:b", "data/clocks/war.json"),
+    ]
+    assert (repo / "state" / "clock_index.json").exists()
+    assert [c.name for c in top_clocks(repo, limit=1)] == ["Cult Rising"]
+
+    # A fresh index (new process) reuses the stored records
+    parsed = _counting_loads(monkeypatch)
+    index = ClockIndex(repo)
+    assert index.refresh() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 3}
+    assert parsed == []
+    assert [c.id for c in index.top(4)] == [c.id for c in top]
+
+
+def test_data_clocks_match_registry(tmp_path):
+    index = ClockIndex(REPO, tmp_path / "clock_index.json")
+    index.refresh()
+    registry = ClockRegistry(REPO / "data")
+    files = {p.name for p in (REPO / "data" / "clocks").glob("*.json")}
+    expected = [c for c in registry.nearly_full(0) if c.path.parent.name == "clocks" and c.path.name in files]
+    top = index.top(len(expected))
+    assert [(c.id, c.current, c.maximum) for c in top] == [(c.id, c.current, c.maximum) for c in expected]
+    assert any(c.id.startswith("faction_trust_clocks:") for c in top)
+
+
+def test_only_changed_files_are_reparsed(tmp_path, monkeypatch):
+    repo = _repo(tmp_path)
+    index = ClockIndex(repo)
+    index.refresh()
+
+    parsed = _counting_loads(monkeypatch)
+    war = repo / "data" / "clocks" / "war.json"
+    _write(war, {"war": {"clocks": {"b": {"name": "Weariness", "current_progress": 8, "total_segments": 8}}}})
+    os.utime(war, ns=(1, 1))
+    (repo / "clocks" / "homebrew" / "cult.json").unlink()
+    (repo / "clocks" / "broken.json").write_text("{not json", encoding="utf-8")
+
+    assert index.refresh() == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert sorted(parsed) == ["broken.json", "war.json"]
+    assert [(c.name, c.current) for c in index.top()] == [("Weariness", 8), ("Companions", 5)]
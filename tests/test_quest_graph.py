@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled quest graph and its StoryManager integration.
+
+Covers:
+- id lookup, successor/predecessor edges and status buckets.
+- advance_questline() unlocks successors and persists the file.
+- Status buckets stay in sync after advancing.
+- External edits to a quest file are picked up (mtime/size invalidation).
+- A failed save leaves the file intact and drops the unsaved statuses.
+- Query helpers return copies, not live graph records.
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+from quest_graph import get_quest_graph, iter_quest_records
+from story_manager import StoryManager
+
+MAIN_ROOT = ("main_questline", "quests")
+
+
+@pytest.fixture
+def sandbox(tmp_path):
+    data_dir = tmp_path / "data"
+    state_dir = tmp_path / "state"
+    shutil.copytree(_REPO_ROOT / "data" / "quests", data_dir / "quests")
+    state_dir.mkdir()
+    (state_dir / "campaign_state.json").write_text(json.dumps({
+        "active_quests": [],
+        "completed_quests": [],
+        "civil_war_state": {"player_alliance": "imperial"},
+        "faction_flags": {"imperial_intro_complete": True},
+    }), encoding="utf-8")
+    return data_dir, state_dir
+
+
+def _main_path(data_dir):
+    return data_dir / "quests" / "main_quests.json"
+
+
+def test_compiled_graph_edges_and_buckets(sandbox):
+    data_dir, _ = sandbox
+    line = get_quest_graph().questline(_main_path(data_dir), MAIN_ROOT)
+
+    assert line.get("battle_of_whiterun")["name"]
+    assert "divided_loyalties" in line.successors["battle_of_whiterun"]
+    assert "battle_of_whiterun" in line.predecessors["divided_loyalties"]
+    assert [q["id"] for q in line.with_status("available")] == ["battle_of_whiterun"]
+
+    # Compiled once: the same object comes back while the file is unchanged
+    assert get_quest_graph().questline(_main_path(data_dir), MAIN_ROOT) is line
+
+
+def test_advance_questline_unlocks_and_persists(sandbox):
+    data_dir, state_dir = sandbox
+    sm = StoryManager(data_dir=str(data_dir), state_dir=str(state_dir))
+
+    assert sm.advance_questline("main", "battle_of_whiterun", "completed", echo_rewards=False)
+
+    line = sm.quest_graph.questline(_main_path(data_dir), MAIN_ROOT)
+    assert line.get("battle_of_whiterun")["status"] == "completed"
+    assert line.get("divided_loyalties")["status"] == "available"
+    assert [q["id"] for q in line.with_status("available")] == ["divided_loyalties"]
+    assert "battle_of_whiterun" in line.by_status["completed"]
+
+    with open(_main_path(data_dir), encoding="utf-8") as f:
+        on_disk = json.load(f)
+    statuses = {q["id"]: q["status"] for q in iter_quest_records(on_disk["main_questline"]["quests"])}
+    assert statuses["battle_of_whiterun"] == "completed"
+    assert statuses["divided_loyalties"] == "available"
+
+    available = [q["quest"]["id"] for q in sm.get_available_quests() if q["type"] == "main"]
+    assert available == ["divided_loyalties"]
+
+
+def test_unknown_quest_or_questline(sandbox):
+    data_dir, state_dir = sandbox
+    sm = StoryManager(data_dir=str(data_dir), state_dir=str(state_dir))
+    assert sm.advance_questline("main", "no_such_quest", "completed") is False
+    assert sm.advance_questline("main", "", "completed") is False
+    with pytest.raises(ValueError):
+        sm.advance_questline("nonsense", "battle_of_whiterun", "completed")
+
+
+def test_external_edit_recompiles(sandbox):
+    data_dir, state_dir = sandbox
+    sm = StoryManager(data_dir=str(data_dir), state_dir=str(state_dir))
+    first = sm.quest_graph.questline(_main_path(data_dir), MAIN_ROOT)
+
+    with open(_main_path(data_dir), encoding="utf-8") as f:
+        data = json.load(f)
+    data["main_questline"]["quests"]["battle_of_whiterun"]["status"] = "locked"
+    with open(_main_path(data_dir), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    st = os.stat(_main_path(data_dir))
+    os.utime(_main_path(data_dir), ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    second = sm.quest_graph.questline(_main_path(data_dir), MAIN_ROOT)
+    assert second is not first
+    assert second.with_status("available") == []
+
+
+def test_failed_save_drops_unsaved_statuses(sandbox, monkeypatch):
+    data_dir, _ = sandbox
+    graph = get_quest_graph()
+    line = graph.questline(_main_path(data_dir), MAIN_ROOT)
+    before = _main_path(data_dir).read_bytes()
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    line.set_status("battle_of_whiterun", "completed")
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        line.save()
+    monkeypatch.undo()
+
+    assert _main_path(data_dir).read_bytes() == before
+    assert not list(_main_path(data_dir).parent.glob("*.tmp"))
+    reloaded = graph.questline(_main_path(data_dir), MAIN_ROOT)
+    assert reloaded is not line
+    assert reloaded.get("battle_of_whiterun")["status"] == "available"
+
+
+def test_act_and_hook_queries_return_copies(sandbox):
+    data_dir, state_dir = sandbox
+    sm = StoryManager(data_dir=str(data_dir), state_dir=str(state_dir))
+
+    with open(_main_path(data_dir), encoding="utf-8") as f:
+        raw = json.load(f)
+    expected = [q["id"] for q in iter_quest_records(raw["main_questline"]["quests"]) if q.get("act") == "Act I"]
+    act_quests = sm.get_act_appropriate_quests("Act I")
+    assert [q["id"] for q in act_quests] == expected
+
+    act_quests[0]["status"] = "tampered"
+    line = sm.quest_graph.questline(_main_path(data_dir), MAIN_ROOT)
+    assert line.get(act_quests[0]["id"])["status"] != "tampered"
+
+    hooks = sm.get_story_hooks_for_quest("battle_of_whiterun")
+    assert hooks["act"] == "Act I"
+    assert sm.get_story_hooks_for_quest("no_such_quest") is None
+
+
+def test_find_across_all_quest_files(sandbox):
+    data_dir, _ = sandbox
+    hits = get_quest_graph().find(data_dir / "quests", "battle_of_whiterun")
+    assert "main_quests" in {stem for stem, _ in hits}
+    assert all(record["id"] == "battle_of_whiterun" for _, record in hits)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the stat sheet secondary indexes.
+
+Indexed lookups must return exactly what a linear scan with the original
+filters would return, in the same (filename) order.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+from query_data import DataQueryManager
+from story_manager import StoryManager
+from utils import location_matches
+
+DATA_DIR = _REPO_ROOT / "data"
+STAT_DIR = DATA_DIR / "npc_stat_sheets"
+
+
+def _all_sheets():
+    sheets = []
+    for path in sorted(STAT_DIR.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            sheets.append(json.load(f))
+    return sheets
+
+
+def _ids(sheets):
+    return [s.get("id") for s in sheets]
+
+
+@pytest.fixture(scope="module")
+def manager():
+    return DataQueryManager(str(DATA_DIR))
+
+
+@pytest.mark.parametrize("location", ["Whiterun", "ruins", "Windhelm", "Riften", "Nordic Ruins", "Roads", "nowhere"])
+def test_location_and_category_match_linear_scan(manager, location):
+    for category in ("Friendly NPC", "Hostile NPC", "Enemy"):
+        expected = [
+            s for s in _all_sheets()
+            if s.get("category", "").lower() == category.lower()
+            and location_matches(location, s.get("location", ""))
+        ]
+        got = manager.query_npc_enemy_stats(category=category, location=location)
+        assert _ids(got) == _ids(expected)
+
+
+@pytest.mark.parametrize("hold", ["Eastmarch", "The Rift", "Whiterun", "Falkreath", "The Reach", "Winterhold"])
+def test_enemies_by_hold_match_linear_scan(manager, hold):
+    expected = {"primary": [], "contested": [], "rare": []}
+    for s in _all_sheets():
+        if s.get("category") != "Enemy":
+            continue
+        ctx = s.get("hold_context", {})
+        if hold in ctx.get("primary", []):
+            expected["primary"].append(s)
+        elif hold in ctx.get("contested", []):
+            expected["contested"].append(s)
+        elif hold in ctx.get("rare", []):
+            expected["rare"].append(s)
+        elif location_matches(hold, s.get("location", "")) and not ctx:
+            expected["primary"].append(s)
+
+    got = manager.get_enemies_by_hold(hold)
+    for tier in expected:
+        assert _ids(got[tier]) == _ids(expected[tier])
+
+
+@pytest.mark.parametrize("act", ["Act 1", "Act 2", "Act 3"])
+def test_hold_and_act_is_intersection(manager, act):
+    act_ids = set(_ids(manager.get_enemies_by_act(act)))
+    by_hold = manager.get_enemies_by_hold("Eastmarch")
+    combined = manager.get_enemies_by_hold_and_act("Eastmarch", act)
+    for tier in ("primary", "contested", "rare"):
+        assert _ids(combined[tier]) == [i for i in _ids(by_hold[tier]) if i in act_ids]
+
+
+def test_stat_by_id_and_name_filter(manager):
+    sheet = manager.get_npc_enemy_stat_by_id("npc_stat_hadvar")
+    assert sheet is not None and sheet["name"] == "Hadvar"
+    assert manager.get_npc_enemy_stat_by_id("does_not_exist") is None
+    assert all("dragon" in s["name"].lower() for s in manager.query_npc_enemy_stats(name="dragon"))
+
+
+def test_wilderness_encounter_uses_indexed_enemies(tmp_path):
+    sm = StoryManager(data_dir=str(DATA_DIR), state_dir=str(tmp_path))
+    encounter = sm.generate_wilderness_encounter("Eastmarch", act="Act 1", difficulty="hard")
+    assert "error" not in encounter
+    valid = set(_ids(DataQueryManager(str(DATA_DIR)).get_enemies_by_act("Act 1")))
+    assert encounter["enemies"]
+    assert all(e["id"] in valid for e in encounter["enemies"])
+
+
+def test_location_memo_follows_gazetteer_version(monkeypatch):
+    import stat_sheet_index
+    from data_catalog import get_catalog
+
+    index = stat_sheet_index.StatSheetIndex(get_catalog().scan(STAT_DIR))
+    version = ["v1"]
+    calls = []
+    monkeypatch.setattr(stat_sheet_index, "get_gazetteer", lambda: type("G", (), {"version": version[0]})())
+    monkeypatch.setattr(stat_sheet_index, "location_matches", lambda a, b: (calls.append(b), "whiterun" in b)[1])
+
+    first = index.location("Whiterun")
+    n = len(calls)
+    assert index.location("Whiterun") == first and len(calls) == n
+
+    # Hold/location data changed: the memoized answer is recomputed
+    version[0] = "v2"
+    assert index.location("Whiterun") == first
+    assert len(calls) == 2 * n
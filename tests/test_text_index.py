@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent full-text index (BM25 over markdown sections).
+
+Covers:
+- Sections are split at markdown headings and ranked by relevance.
+- The index is persisted and only changed files are re-tokenized.
+- Removed files drop out of the index.
+- search_rules / get_pdf_content return ranked sections, not whole files.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_ROOT / "scripts"))
+
+from text_index import TextIndex, split_sections, tokenize
+from query_data import DataQueryManager
+
+
+RULES_MD = """# Rules
+
+Intro text about the system.
+
+## Stress and Consequences
+
+Physical stress boxes absorb hits. Mental stress absorbs pressure.
+Consequences are aspects that linger.
+
+## Magic
+
+Spells use the Lore skill. Magicka is abstracted.
+"""
+
+LOG_MD = """# Session 1
+
+The party fought a frost troll near Winterhold.
+"""
+
+
+def _make_repo(tmp_path):
+    (tmp_path / "data" / "rules").mkdir(parents=True)
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "data" / "rules" / "core.md").write_text(RULES_MD, encoding="utf-8")
+    (tmp_path / "logs" / "session_01.md").write_text(LOG_MD, encoding="utf-8")
+    return tmp_path
+
+
+def test_split_sections_at_headings():
+    lines = RULES_MD.split("\n")
+    headings = [h for h, _, _ in split_sections(lines)]
+    assert headings == ["Rules", "Stress and Consequences", "Magic"]
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Frost Troll's den, 2 exits") == ["frost", "troll's", "den", "2", "exits"]
+
+
+def test_search_ranks_relevant_section_first(tmp_path):
+    repo = _make_repo(tmp_path)
+    index = TextIndex(repo, index_path=repo / "state" / "idx.json")
+
+    hits = index.search("stress consequences")
+    assert hits[0]["file"] == "data/rules/core.md"
+    assert hits[0]["section"] == "Stress and Consequences"
+    assert any("stress" in line.lower() for line in hits[0]["snippet"])
+
+    troll = index.search("troll")
+    assert [h["file"] for h in troll] == ["logs/session_01.md"]
+
+    # Prefix fallback for words that are not indexed verbatim
+    assert index.search("magick")[0]["section"] == "Magic"
+
+
+def test_scope_restricts_results(tmp_path):
+    repo = _make_repo(tmp_path)
+    index = TextIndex(repo, index_path=repo / "state" / "idx.json")
+    assert index.search("troll", scope="data/rules") == []
+
+
+def test_incremental_refresh_and_persistence(tmp_path):
+    repo = _make_repo(tmp_path)
+    idx_path = repo / "state" / "idx.json"
+
+    first = TextIndex(repo, index_path=idx_path)
+    assert first.refresh() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+    assert json.loads(idx_path.read_text(encoding="utf-8"))["files"]
+
+    # A fresh instance reuses the persisted index
+    second = TextIndex(repo, index_path=idx_path)
+    assert second.refresh()["unchanged"] == 2
+
+    (repo / "logs" / "session_01.md").write_text(LOG_MD + "\nA dragon appeared.\n", encoding="utf-8")
+    (repo / "data" / "rules" / "core.md").unlink()
+    stats = second.refresh()
+    assert stats["updated"] == 1 and stats["removed"] == 1
+    assert second.search("dragon")[0]["file"] == "logs/session_01.md"
+    assert second.search("magic") == []
+
+
+def test_search_refreshes_at_most_once_per_interval(tmp_path, monkeypatch):
+    repo = _make_repo(tmp_path)
+    index = TextIndex(repo, index_path=repo / "state" / "idx.json", refresh_interval=60)
+    assert index.search("troll")
+
+    walks = []
+    real_iter = index._iter_source_files
+    monkeypatch.setattr(index, "_iter_source_files", lambda: (walks.append(1), real_iter())[1])
+    (repo / "logs" / "session_01.md").write_text(LOG_MD + "\nA dragon appeared.\n", encoding="utf-8")
+    for _ in range(5):
+        assert index.search("dragon") == []
+    assert walks == []
+
+    assert index.search("dragon", refresh=True)[0]["file"] == "logs/session_01.md"
+    assert walks == [1]
+    index.refresh_interval = 0
+    index.search("dragon")
+    assert walks == [1, 1]
+
+
+def test_search_rules_returns_ranked_sections(tmp_path):
+    repo = _make_repo(tmp_path)
+    manager = DataQueryManager(str(repo / "data"), text_index_path=str(repo / "state" / "idx.json"))
+
+    results = manager.search_rules("consequences")
+    assert results[0]["file"] == "core.md"
+    assert results[0]["section"] == "Stress and Consequences"
+    assert results[0]["matches"]
+    assert manager.search_rules("") == []
+
+
+def test_get_pdf_content_returns_sections_not_whole_file(tmp_path):
+    manager = DataQueryManager(str(_REPO_ROOT / "data"), text_index_path=str(tmp_path / "idx.json"))
+    full = manager.get_pdf_content("dragonbreak", full_text=True)
+    ranked = manager.get_pdf_content("dragonbreak")
+
+    md_full = [r for r in full["results"] if r["type"] == "markdown"]
+    md_ranked = [r for r in ranked["results"] if r["type"] == "markdown"]
+    assert md_ranked and len(md_ranked) == len(md_full)
+    for whole, part in zip(md_full, md_ranked):
+        assert part["sections"]
+        assert len(part["content"]) < len(whole["content"])
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the three-way Dragonbreak merge.
+
+Covers:
+- Changes made on only one side, or identically on both, merge cleanly.
+- Divergent changes become explicit conflicts settled by a policy.
+- Only records changed since the fracture point are compared.
+- DragonbreakManager.resolve_dragonbreak(resolution_type="merge").
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+import timeline_merge
+from dragonbreak_manager import DragonbreakManager
+from timeline_merge import MISSING, merge_branches, register_policy
+from timeline_store import TimelineStore
+
+
+@pytest.fixture
+def store():
+    store = TimelineStore({}, {})
+    store.create_branch("primary", name="Primary")
+    for i in range(200):
+        store.set("primary", "npcs", f"npc_{i}", {"state": {"alive": True, "location": "Whiterun"}})
+    store.set("primary", "factions", "companions", {"state": {"leader": "Kodlak"}})
+    store.create_branch("branch_1", "primary")
+    return store
+
+
+def _alive(store, branch, npc):
+    return store.get(branch, "npcs", npc)["state"]["alive"]
+
+
+def test_one_sided_and_identical_changes_merge_cleanly(store):
+    store.set("primary", "npcs", "npc_1", {"state": {"alive": True, "location": "Riften"}})
+    store.set("branch_1", "factions", "companions", {"state": {"leader": "Aela"}})
+    store.set("primary", "npcs", "npc_2", {"state": {"alive": False, "location": "Whiterun"}})
+    store.set("branch_1", "npcs", "npc_2", {"state": {"alive": False, "location": "Whiterun"}})
+
+    result = merge_branches(store, "primary", "branch_1")
+    assert result.conflicts == []
+    assert result.changes["npcs"]["npc_1"]["state"]["location"] == "Riften"
+    assert result.changes["factions"]["companions"]["state"]["leader"] == "Aela"
+    assert set(result.changes["npcs"]) == {"npc_1", "npc_2"}
+
+
+def test_fields_merge_and_conflicts_follow_policy(store):
+    # Serana is met after the fracture: alive in one branch, dead in the other
+    store.set("primary", "npcs", "serana", {"state": {"alive": True, "location": "Riften"}, "last_updated": "2026-01-02"})
+    store.set("branch_1", "npcs", "serana", {"state": {"alive": False, "location": "Riften"}, "last_updated": "2026-01-05"})
+
+    manual = merge_branches(store, "primary", "branch_1")
+    [conflict] = manual.unresolved
+    assert conflict["path"] == "npcs/serana/state/alive"
+    assert "base" not in conflict and (conflict["ours"], conflict["theirs"]) == (True, False)
+    merged = manual.changes["npcs"]["serana"]
+    assert merged == {"state": {"alive": True, "location": "Riften"}, "last_updated": "2026-01-05"}
+
+    assert merge_branches(store, "primary", "branch_1", "theirs").changes["npcs"]["serana"]["state"]["alive"] is False
+    assert merge_branches(store, "primary", "branch_1", "base").changes["npcs"]["serana"]["state"] == {"location": "Riften"}
+
+    register_policy("dead_stays_dead", lambda c: c["ours"] and c["theirs"] if c["path"].endswith("/alive") else c["ours"])
+    result = merge_branches(store, "primary", "branch_1", "dead_stays_dead")
+    assert result.changes["npcs"]["serana"]["state"]["alive"] is False
+    assert result.unresolved == [] and len(result.conflicts) == 1
+
+    with pytest.raises(ValueError):
+        merge_branches(store, "primary", "branch_1", "no_such_policy")
+
+
+def test_delete_against_modify_is_a_conflict(store):
+    store.delete("primary", "npcs", "npc_4")
+    store.set("branch_1", "npcs", "npc_4", {"state": {"alive": False, "location": "Sovngarde"}})
+    store.delete("branch_1", "npcs", "npc_5")
+
+    result = merge_branches(store, "primary", "branch_1", "ours")
+    [conflict] = result.conflicts
+    assert conflict["path"] == "npcs/npc_4" and "ours" not in conflict
+    assert result.removed["npcs"] == ["npc_4", "npc_5"]
+
+    kept = merge_branches(store, "primary", "branch_1", lambda c: c.get("theirs", MISSING))
+    assert kept.changes["npcs"]["npc_4"]["state"]["location"] == "Sovngarde"
+
+
+def test_only_changed_records_are_compared(store, monkeypatch):
+    store.set("branch_1", "npcs", "npc_7", {"state": {"alive": False}})
+    seen = []
+    real = timeline_merge.merge_values
+    monkeypatch.setattr(timeline_merge, "merge_values",
+                        lambda *a, **k: seen.append(a[5] if len(a) > 5 else k.get("path")) or real(*a, **k))
+
+    merge_branches(store, "primary", "branch_1")
+    assert seen == [("npcs", "npc_7")]
+    first = merge_branches(store, "primary", "branch_1")
+    assert json.dumps(first.changes, sort_keys=True) == json.dumps(
+        merge_branches(store, "primary", "branch_1").changes, sort_keys=True)
+
+
+def test_manager_merge_resolution(tmp_path, monkeypatch, capsys):
+    work = tmp_path / "scripts"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    manager = DragonbreakManager(str(tmp_path / "data"), str(tmp_path / "state"))
+
+    manager.track_npc_across_branches("tullius", "Tullius", {"primary": {"alive": True}})
+    branch_id = manager.create_timeline_fracture("Battle of Whiterun", "desc", "event")
+    manager.track_npc_across_branches("ulfric", "Ulfric", {"primary": {"alive": True}, branch_id: {"alive": False}})
+    manager.track_npc_across_branches("tullius", "Tullius", {"primary": {"alive": True, "location": "Solitude"}})
+    manager.track_faction_across_branches("legion", "Legion", {branch_id: {"control": "whiterun"}})
+
+    assert manager.resolve_dragonbreak("dragonbreak_1", "merge")
+    out = capsys.readouterr().out
+    assert "1 need a GM ruling" in out and "npcs/ulfric/state/alive" in out
+
+    state = manager.load_dragonbreak_state()
+    dragonbreak = state["active_dragonbreaks"][0]
+    merged = dragonbreak["merged_branch"]
+    assert state["current_timeline"] == merged
+    assert [c["path"] for c in dragonbreak["conflicts"]] == ["npcs/ulfric/state/alive"]
+    assert manager.get_record("npcs", "ulfric")["state"] == {"alive": True}
+    assert manager.get_record("factions", "legion")["state"] == {"control": "whiterun"}
+    assert manager.get_record("npcs", "tullius")["state"] == {"alive": True, "location": "Solitude"}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for copy-on-write Dragonbreak timeline branches.
+
+Covers:
+- New branches are empty and read through to their parent.
+- Writes and deletes stay in the branch that made them, including writes
+  to the parent after the fork.
+- Nested records are never shared between branches.
+- Old full-copy branch files are converted to diffs on load.
+- DragonbreakManager saves only the divergence.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../scripts")))
+
+from dragonbreak_manager import DragonbreakManager
+from timeline_store import TimelineStore
+
+
+@pytest.fixture
+def store():
+    branches = {}
+    store = TimelineStore(branches)
+    store.create_branch("primary", name="Primary Timeline")
+    store.set("primary", "npcs", "ulfric", {"state": {"alive": True, "location": "Windhelm"}})
+    store.set("primary", "quests", "battle_of_whiterun", {"outcome": "pending"})
+    return store
+
+
+def test_branches_read_through_and_diverge(store):
+    branch = store.create_branch("branch_1", "primary", name="Ulfric Falls")
+    assert branch["changes"] == {}
+    assert store.get("branch_1", "npcs", "ulfric")["state"]["alive"] is True
+
+    store.set("branch_1", "npcs", "ulfric", {"state": {"alive": False}})
+    store.create_branch("branch_2", "branch_1")
+    assert store.get("branch_2", "npcs", "ulfric")["state"]["alive"] is False
+    assert store.get("primary", "npcs", "ulfric")["state"]["alive"] is True
+    assert store.ancestors("branch_2") == ["branch_2", "branch_1@2", "primary@1"]
+    assert store.common_ancestor("branch_2", "primary") == "primary@1"
+    assert store.changed_keys("branch_2", "primary@1", "npcs") == {"ulfric"}
+    assert store.diff("branch_2") == {"changes": {}, "removed": {}}
+
+
+def test_parent_writes_after_fork_do_not_leak(store):
+    store.create_branch("branch_1", "primary")
+    assert store.view("branch_1", "npcs") is store.view("branch_1", "npcs")
+    store.set("primary", "npcs", "ulfric", {"state": {"alive": False}})
+    store.set("primary", "npcs", "tullius", {"state": {"alive": True}})
+    assert store.get("branch_1", "npcs", "ulfric")["state"]["alive"] is True
+    assert store.keys("branch_1", "npcs") == ["ulfric"]
+    assert store.diff("primary")["changes"]["npcs"].keys() == {"ulfric", "tullius"}
+
+
+def test_nested_records_are_not_shared(store):
+    store.create_branch("branch_1", "primary")
+    record = store.get("branch_1", "npcs", "ulfric")
+    record["state"]["alive"] = False
+    view = store.section("branch_1", "npcs")
+    view["ulfric"]["state"]["location"] = "Sovngarde"
+    assert store.get("primary", "npcs", "ulfric") == {"state": {"alive": True, "location": "Windhelm"}}
+
+
+def test_delete_is_local_to_branch(store):
+    store.create_branch("branch_1", "primary")
+    store.delete("branch_1", "quests", "battle_of_whiterun")
+    assert store.keys("branch_1", "quests") == []
+    assert store.keys("primary", "quests") == ["battle_of_whiterun"]
+
+    store.set("branch_1", "quests", "battle_of_whiterun", {"outcome": "stormcloak_victory"})
+    assert store.get("branch_1", "quests", "battle_of_whiterun")["outcome"] == "stormcloak_victory"
+
+
+def test_legacy_full_copies_become_diffs():
+    legacy = {
+        "primary": {"id": "primary", "name": "Primary", "npcs": {"a": {"x": 1}, "b": {"x": 2}},
+                    "factions": {}, "quests": {}, "world_state": {}},
+        "branch_1": {"id": "branch_1", "name": "B1", "parent_timeline": "primary",
+                     "npcs": {"a": {"x": 1}, "c": {"x": 3}}, "factions": {}, "quests": {}, "world_state": {}},
+    }
+    store = TimelineStore(legacy)
+    assert "npcs" not in legacy["branch_1"]
+    assert legacy["branch_1"]["changes"] == {"npcs": {"c": {"x": 3}}}
+    assert legacy["branch_1"]["removed"] == {"npcs": ["b"]}
+    assert store.section("branch_1", "npcs") == {"a": {"x": 1}, "c": {"x": 3}}
+    assert store.section("primary", "npcs") == {"a": {"x": 1}, "b": {"x": 2}}
+
+
+def test_manager_stores_only_divergence(tmp_path, monkeypatch, capsys):
+    work = tmp_path / "scripts"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    manager = DragonbreakManager(str(tmp_path / "data"), str(tmp_path / "state"))
+
+    manager.track_npc_across_branches("ulfric", "Ulfric", {"primary": {"alive": True}})
+    for i in range(4):
+        manager.create_timeline_fracture(f"Fracture {i}", "desc", "event")
+    manager.switch_timeline("branch_4")
+    branch_id = manager.create_timeline_fracture("Ulfric Falls", "desc", "event")
+    manager.track_npc_across_branches("ulfric", "Ulfric", {branch_id: {"alive": False}})
+
+    saved = json.loads(manager.dragonbreak_state_path.read_text())
+    branches = saved["timeline_branches"]
+    assert all("npcs" not in b for b in branches.values())
+    assert [b for b in branches if branches[b]["changes"]] == [branch_id]
+    assert list(saved["timeline_snapshots"]) == ["primary@1"]
+
+    assert manager.get_record("npcs", "ulfric", "branch_3")["state"] == {"alive": True}
+    assert manager.get_record("npcs", "ulfric", branch_id)["state"] == {"alive": False}
+    assert manager.get_branch_diff(branch_id)["parent_timeline"] == "branch_4"
+    assert manager.switch_timeline("branch_2")
+    assert manager.get_timeline_state()["npcs"]["ulfric"]["state"] == {"alive": True}
+    assert (tmp_path / "logs" / "dragonbreak_log.md").exists()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental trigger evaluation.
+"""
+
+import copy
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from triggers import router, rule_engine, solitude_triggers
+from triggers.incremental import TrackedDict, TriggerCache, _Reads
+from triggers.router import dispatch_location_triggers
+
+
+def counting_trigger(calls):
+    def trigger(loc, state):
+        calls.append(loc)
+        flags = state.setdefault("scene_flags", {})
+        if flags.get("alarm") and not flags.get("alarm_announced"):
+            flags["alarm_announced"] = True
+            return ["The bells ring."]
+        return []
+    return trigger
+
+
+def test_quiet_trigger_skipped_until_its_inputs_change():
+    calls = []
+    trigger = counting_trigger(calls)
+    cache = TriggerCache()
+    state = {"scene_flags": {}, "time_of_day": "day"}
+
+    assert cache.run("t", trigger, "riften", state) == []
+    assert cache.run("t", trigger, "riften", state) == []
+    assert len(calls) == 1 and cache.skipped == 1
+
+    # Not read by the trigger
+    state["time_of_day"] = "night"
+    state["scene_flags"]["unrelated"] = True
+    assert cache.run("t", trigger, "riften", state) == []
+    assert len(calls) == 1
+    assert cache.reads("t") == ["scene_flags", "scene_flags.alarm"]
+
+    # Read by the trigger
+    state["scene_flags"]["alarm"] = True
+    assert cache.run("t", trigger, "riften", state) == ["The bells ring."]
+    assert state["scene_flags"]["alarm_announced"] is True
+    assert cache.run("t", trigger, "riften", state) == []
+    assert len(calls) == 3
+
+
+def test_other_location_or_invalidate_reruns():
+    calls = []
+    trigger = counting_trigger(calls)
+    cache = TriggerCache()
+    state = {}
+    cache.run("t", trigger, "riften", state)
+    cache.run("t", trigger, "windhelm", state)
+    cache.run("t", trigger, "windhelm", state)
+    cache.invalidate("t")
+    cache.run("t", trigger, "windhelm", state)
+    assert calls == ["riften", "windhelm", "windhelm"]
+
+
+def test_tracked_dict_writes_through():
+    state = {"companions": {"active_companions": ["Lydia"]}}
+    reads = _Reads()
+    view = TrackedDict(state, (), reads)
+
+    assert isinstance(view, dict)
+    flags = view.setdefault("scene_flags", {})
+    flags["seen"] = True
+    view.setdefault("clocks", {})["heat"] = {"current": 1}
+    view["companions"]["active_companions"].append("Serana")
+    view["note"] = view["companions"]
+    assert state["scene_flags"] == {"seen": True}
+    assert state["clocks"] == {"heat": {"current": 1}}
+    assert state["companions"]["active_companions"] == ["Lydia", "Serana"]
+    assert type(state["note"]) is dict
+    assert view.get("missing", 5) == 5
+    assert "quests" not in view
+    assert len(view["companions"]) == 1
+
+    # Values are recorded as first read, so a trigger's own writes count
+    assert not reads.unchanged(state)
+
+    reads = _Reads()
+    view = TrackedDict(state, (), reads)
+    view["companions"].get("active_companions")
+    "quests" in view
+    assert reads.unchanged(state)
+    state["clocks"]["heat"]["current"] = 2
+    assert reads.unchanged(state)
+    state["quests"] = {}
+    assert not reads.unchanged(state)
+
+
+def test_cached_dispatch_matches_uncached():
+    steps = [
+        ("whiterun_plains_district", None),
+        ("whiterun_plains_district", ("time_of_day", "night")),
+        ("whiterun_plains_district", ("scene_flags", {"unrelated": True})),
+        ("Riften Marketplace", None),
+        ("Riften Marketplace", None),
+        ("Riften Marketplace", ("clocks", {"battle_of_whiterun_countdown": {"current_progress": 6}})),
+        ("Riften Marketplace", None),
+        ("windhelm_gray_quarter", ("companions", {"active_companions": ["Lydia"]})),
+        ("windhelm_gray_quarter", None),
+        ("blue palace", None),
+        ("blue palace", ("companions", {"active_companions": ["Marcurio"]})),
+        ("a lonely road", None),
+        ("a lonely road", None),
+    ]
+    cached_state, plain_state = {}, {}
+    cache = TriggerCache()
+    for loc, tweak in steps:
+        if tweak:
+            cached_state[tweak[0]] = copy.deepcopy(tweak[1])
+            plain_state[tweak[0]] = copy.deepcopy(tweak[1])
+        assert cache.dispatch(loc, cached_state) == dispatch_location_triggers(loc, plain_state), loc
+        assert cached_state == plain_state, loc
+    assert cache.skipped > 0
+
+
+def _write_rules(path, rules):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"rules": rules}), encoding="utf-8")
+
+
+def test_rule_file_edits_rerun_quiet_rules(tmp_path, monkeypatch):
+    homebrew = tmp_path / "homebrew.json"
+    hold_file = tmp_path / "holds" / "solitude.json"
+    _write_rules(homebrew, [{"id": "road", "location": {"keywords": ["lonely road"]}, "events": ["A road."]}])
+    _write_rules(hold_file, [])
+    monkeypatch.setattr(rule_engine, "TRIGGER_DATA_DIR", tmp_path)
+    router.load_hold_triggers("haafingar_hold")
+    monkeypatch.setattr(solitude_triggers, "RULES_FILE", hold_file)
+    monkeypatch.setitem(router._RULE_FILES, "haafingar_hold", hold_file)
+
+    cache = TriggerCache()
+    state = {}
+    assert cache.dispatch("a roadside shrine", state) == []
+    assert cache.dispatch("a roadside shrine", state) == []
+    runs = cache.runs
+    assert cache.dispatch("a roadside shrine", state) == []
+    assert cache.runs == runs
+
+    _write_rules(homebrew, [
+        {"id": "road", "location": {"keywords": ["lonely road"]}, "events": ["A road."]},
+        {"id": "shrine", "location": {"keywords": ["roadside shrine"]}, "events": ["A shrine."]},
+    ])
+    assert cache.dispatch("a roadside shrine", state) == ["A shrine."]
+
+    # Same for a hold module whose triggers are a rule file
+    assert cache.dispatch("blue palace", state, hold="haafingar_hold") == []
+    _write_rules(hold_file, [{"id": "palace", "location": {"keywords": ["blue palace"]}, "events": ["Elisif."]}])
+    assert cache.dispatch("blue palace", state, hold="haafingar_hold") == ["Elisif."]
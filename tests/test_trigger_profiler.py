@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the opt-in trigger profiler.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from triggers import profiler, whiterun_triggers
+from triggers.incremental import TriggerCache
+from triggers.router import dispatch_location_triggers
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts")
+
+
+def profile(func):
+    profiler.reset()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+
+
+def test_disabled_by_default_and_restored():
+    original = whiterun_triggers.whiterun_location_triggers
+    assert not profiler.is_enabled()
+    profile(lambda: dispatch_location_triggers("whiterun_plains_district", {}))
+    assert whiterun_triggers.whiterun_location_triggers is original
+    profiler.reset()
+    dispatch_location_triggers("whiterun_plains_district", {})
+    assert profiler.stats() == {}
+
+
+def test_counts_calls_fires_and_flags():
+    state = {}
+
+    def play():
+        for _ in range(2):
+            dispatch_location_triggers("jorrvaskr_grand_hall", state)
+            dispatch_location_triggers("a lonely road", state)
+
+    plain_state = {}
+    for _ in range(2):
+        dispatch_location_triggers("jorrvaskr_grand_hall", plain_state)
+        dispatch_location_triggers("a lonely road", plain_state)
+    profile(play)
+    assert state == plain_state
+
+    rows = profiler.stats()
+    hold = rows["whiterun_triggers.whiterun_location_triggers"]
+    assert hold["calls"] == 2 and hold["fires"] == 2
+    assert "jorvaskr_vignar_notice_pending" in hold["flags_set"]
+    assert hold["total_ms"] >= hold["max_ms"] > 0
+    # Called by the hold module and by the router for the road
+    assert rows["global_story_triggers.global_story_triggers"]["calls"] == 4
+    assert rows["rule_engine.evaluate"]["calls"] >= 4
+    assert rows["jorvaskr_events.vignar_eorlund_notice_prompt"]["flags_set"] == {"jorvaskr_vignar_notice_pending": 1}
+
+
+def test_profiling_through_cache_adds_no_reads():
+    def run():
+        cache = TriggerCache()
+        state = {"scene_flags": {}}
+        cache.dispatch("a lonely road", state)
+        return cache.reads("global")
+
+    assert profile(run) == run()
+
+
+def test_export_and_report(tmp_path, capsys):
+    profile(lambda: dispatch_location_triggers("Riften Marketplace", {}))
+    path = tmp_path / "profile.jsonl"
+    written = profiler.export_jsonl(str(path), session="s1")
+    profiler.export_jsonl(str(path), session="s2")
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2 * written
+    assert {line["session"] for line in lines} == {"s1", "s2"}
+
+    merged = profiler.load_jsonl([str(path)])
+    rift = merged["rift_triggers.rift_location_triggers"]
+    assert rift["calls"] == 2 and rift["fires"] == 2
+
+    assert profiler.main(["report", str(path), "--limit", "3"]) == 0
+    out = capsys.readouterr().out
+    assert "rift_triggers.rift_location_triggers" in out
+    assert "Never fired" in out
+
+
+def test_env_var_profiles_process(tmp_path):
+    path = tmp_path / "env.jsonl"
+    code = (
+        "from triggers.router import dispatch_location_triggers\n"
+        "dispatch_location_triggers('Riften Marketplace', {})\n"
+    )
+    env = dict(os.environ, TRIGGER_PROFILE=str(path))
+    subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, env=env, check=True)
+    triggers = {json.loads(line)["trigger"] for line in path.read_text(encoding="utf-8").splitlines()}
+    assert "rift_triggers.rift_location_triggers" in triggers
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the location trigger router.
+"""
+
+import copy
+import os
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from triggers.global_story_triggers import global_story_triggers
+from triggers.router import dispatch_location_triggers, resolve_hold
+from triggers.rift_triggers import rift_location_triggers
+from triggers.whiterun_triggers import whiterun_location_triggers
+
+
+def test_resolve_hold():
+    cases = {
+        "Riften Marketplace": "rift_hold",
+        "whiterun_plains_district": "whiterun_hold",
+        "jorrvaskr_grand_hall": "whiterun_hold",
+        "windhelm_gray_quarter": "eastmarch_hold",
+        "Bards College": "haafingar_hold",
+        "college_courtyard": "winterhold_hold",
+        "saarthal_excavation": "winterhold_hold",
+        "Karthspire camp": "reach_hold",
+        "Dawnstar": "pale_hold",
+    }
+    for loc, hold in cases.items():
+        assert resolve_hold(loc) == hold, loc
+    assert resolve_hold("a lonely road") is None
+
+
+def test_dispatch_matches_direct_call():
+    state = {"companions": {"active_companions": ["Lydia"]}}
+    for loc, direct in (("whiterun_plains_district", whiterun_location_triggers),
+                        ("Riften Marketplace", rift_location_triggers)):
+        routed_state, direct_state = copy.deepcopy(state), copy.deepcopy(state)
+        assert dispatch_location_triggers(loc, routed_state) == direct(loc, direct_state)
+        assert routed_state == direct_state
+
+
+def test_unknown_location_runs_global_triggers_only():
+    state = {"clocks": {"battle_of_whiterun_countdown": {"current_progress": 6}}}
+    expected_state = copy.deepcopy(state)
+    expected = global_story_triggers("a lonely road", expected_state)
+    assert expected
+    assert dispatch_location_triggers("a lonely road", state) == expected
+    # An explicit hold overrides the resolved one
+    assert dispatch_location_triggers("a lonely road", {}, hold="rift_hold") == []
+
+
+def test_dispatch_imports_only_the_resolved_hold():
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.abspath(SCRIPTS_DIR)!r})\n"
+        "from triggers import dispatch_location_triggers\n"
+        "dispatch_location_triggers('Riften Marketplace', {})\n"
+        "print(','.join(sorted(m for m in sys.modules if m.startswith('triggers.') or m.endswith('_events'))))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    loaded = set(out.strip().split(","))
+    assert "triggers.rift_triggers" in loaded
+    assert "triggers.whiterun_triggers" not in loaded
+    assert "triggers.windhelm_triggers" not in loaded
+    assert "jorvaskr_events" not in loaded
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative trigger rule engine.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from triggers import rule_engine
+from triggers.router import dispatch_location_triggers
+from triggers.rule_engine import Rule, RuleEngine, get_rule_engine
+
+
+def make_engine(*specs):
+    return RuleEngine.from_records([("test.json", {"rules": list(specs)})])
+
+
+def test_place_rules_cover_everything_inside():
+    engine = make_engine(
+        {"id": "city", "location": {"places": ["whiterun"]}, "events": ["city"]},
+        {"id": "hold", "location": {"holds": ["rift_hold"]}, "events": ["rift"]},
+        {"id": "anywhere", "events": ["anywhere"]},
+    )
+    assert engine.evaluate("Whiterun - Plains District", {}) == ["city", "anywhere"]
+    assert engine.evaluate("jorrvaskr_grand_hall", {}) == ["city", "anywhere"]
+    assert engine.evaluate("Riften Marketplace", {}) == ["rift", "anywhere"]
+    assert engine.evaluate("a lonely road", {}) == ["anywhere"]
+
+
+def test_keyword_predicates():
+    engine = make_engine(
+        {"id": "market", "location": {"all_keywords": ["riften", "market"]}, "events": ["market"]},
+        {"id": "wilds", "location": {"keywords": ["rift"], "not_keywords": ["riften"]}, "events": ["wilds"]},
+    )
+    assert engine.evaluate("riften_market", {}) == ["market"]
+    assert engine.evaluate("The Rift forest", {}) == ["wilds"]
+    assert engine.evaluate("Riften Temple", {}) == []
+
+
+def test_requires_guards():
+    engine = make_engine({
+        "id": "guarded",
+        "location": {"keywords": ["riften"]},
+        "requires": {
+            "flags_set": ["met_maven"],
+            "flags_unset": ["brynjolf_met"],
+            "clocks": {"thieves_guild_heat": {"min": 2, "max": 4}},
+            "quests": {"a_chance_arrangement": "absent", "taking_care_of_business": ["active", "completed"]},
+            "companions": ["iona"],
+            "state": {"player.thieves_guild_member": False},
+            "night": True,
+        },
+        "events": ["fired"],
+    })
+    state = {
+        "scene_flags": {"met_maven": True},
+        "clocks": {"thieves_guild_heat": {"current_progress": 3}},
+        "quests": {"active": ["taking_care_of_business"]},
+        "companions": {"active_companions": ["Iona"]},
+        "player": {"thieves_guild_member": False},
+        "time_of_day": "night",
+    }
+    assert engine.evaluate("Riften", state) == ["fired"]
+
+    for path, value in (
+        (("scene_flags", "brynjolf_met"), True),
+        (("clocks", "thieves_guild_heat"), {"current_progress": 5}),
+        (("quests", "completed"), ["a_chance_arrangement"]),
+        (("companions", "active_companions"), []),
+        (("player", "thieves_guild_member"), True),
+        (("time_of_day",), "day"),
+    ):
+        changed = json.loads(json.dumps(state))
+        target = changed
+        for part in path[:-1]:
+            target = target[part]
+        target[path[-1]] = value
+        assert engine.evaluate("Riften", changed) == [], path
+
+
+def test_once_and_set_flags():
+    engine = make_engine(
+        {"id": "intro", "location": {"keywords": ["riften"]}, "once": True,
+         "events": ["intro"], "set_flags": ["riften_visited"]},
+        {"id": "return", "location": {"keywords": ["riften"]},
+         "requires": {"flags_set": ["riften_visited"]}, "events": ["welcome back"]},
+    )
+    state = {}
+    assert engine.evaluate("Riften", state) == ["intro"]
+    assert state["scene_flags"] == {"riften_visited": True, "rule:intro": True}
+    assert engine.evaluate("Riften", state) == ["welcome back"]
+
+
+def test_shared_conditions_are_tested_once():
+    calls = []
+    engine = make_engine(*[
+        {"id": f"rule_{i}", "location": {"keywords": ["riften"]},
+         "requires": {"flags_unset": ["shared"]}, "events": [str(i)]}
+        for i in range(5)
+    ])
+    assert len(engine._conditions) == 1
+    condition = next(iter(engine._conditions.values()))
+    original = condition.test
+    condition.test = lambda state: calls.append(1) or original(state)
+    assert engine.evaluate("Riften", {}) == ["0", "1", "2", "3", "4"]
+    assert len(calls) == 1
+    assert [r.id for r in engine.rules_reading("scene_flags")] == [f"rule_{i}" for i in range(5)]
+
+
+def test_only_indexed_rules_are_candidates():
+    engine = make_engine(*[
+        {"id": f"whiterun_{i}", "location": {"places": ["whiterun"]}, "events": ["x"]}
+        for i in range(300)
+    ] + [{"id": "riften", "location": {"places": ["riften"]}, "events": ["riften"]}])
+    assert [r.id for r in engine.candidates("Riften Marketplace")] == ["riften"]
+    assert engine.evaluate("Riften Marketplace", {}) == ["riften"]
+
+
+def test_locationless_rules_are_pruned_by_guard():
+    engine = make_engine(*[
+        {"id": f"flag_{i}", "requires": {"flags_set": [f"flag_{i}"]}, "events": [f"flag_{i}"]}
+        for i in range(300)
+    ] + [
+        {"id": "heat_2", "requires": {"clocks": {"heat": {"min": 2}}}, "events": ["heat_2"]},
+        {"id": "heat_5", "requires": {"clocks": {"heat": 5}}, "events": ["heat_5"]},
+        {"id": "always", "events": ["always"]},
+    ])
+    calls = []
+    for condition in engine._conditions.values():
+        original = condition.test
+        condition.test = lambda state, key=condition.key, original=original: calls.append(key) or original(state)
+
+    state = {"scene_flags": {"flag_7": True, "flag_9": False}, "clocks": {"heat": {"current_progress": 3}}}
+    assert [r.id for r in engine.candidates("a lonely road", state)] == ["flag_7", "heat_2", "always"]
+    assert engine.evaluate("a lonely road", state) == ["flag_7", "heat_2", "always"]
+    # Rules whose guard is unmet were never condition-checked
+    assert sorted(calls) == sorted([("flag", "flag_7", True), ("clock", "heat", 2, None)])
+
+    # Without a state every rule is still a candidate
+    assert len(engine.candidates("a lonely road")) == 303
+
+
+def test_invalid_rules_are_skipped(capsys):
+    engine = make_engine(
+        {"id": "bad", "requires": {"moon_phase": "full"}},
+        {"id": "bad_quest", "requires": {"quests": {"x": "maybe"}}},
+        {"events": ["no id"]},
+        {"id": "good", "events": ["ok"]},
+    )
+    assert [r.id for r in engine.rules] == ["good"]
+    out = capsys.readouterr().out
+    assert "skipping trigger rule 'bad'" in out and "bad_quest" in out
+
+
+def test_rule_files_reload_and_run_from_router(tmp_path, monkeypatch):
+    rules_file = tmp_path / "homebrew.json"
+    rules_file.write_text(json.dumps({"rules": [
+        {"id": "shrine", "location": {"keywords": ["roadside shrine"]}, "once": True, "events": ["A shrine."]},
+    ]}), encoding="utf-8")
+    monkeypatch.setattr(rule_engine, "TRIGGER_DATA_DIR", tmp_path)
+
+    engine = get_rule_engine()
+    assert get_rule_engine() is engine
+    state = {}
+    assert dispatch_location_triggers("a roadside shrine", state) == ["A shrine."]
+    assert dispatch_location_triggers("a roadside shrine", state) == []
+
+    time.sleep(0.01)
+    rules_file.write_text(json.dumps({"rules": [
+        {"id": "shrine", "location": {"keywords": ["roadside shrine"]}, "events": ["A new shrine."]},
+    ]}), encoding="utf-8")
+    assert get_rule_engine() is not engine
+    assert dispatch_location_triggers("a roadside shrine", state) == ["A new shrine."]
+
+
+def test_rule_requires_id():
+    try:
+        Rule({"events": ["x"]}, 0)
+    except ValueError as e:
+        assert "no id" in str(e)
+    else:
+        raise AssertionError("expected ValueError")